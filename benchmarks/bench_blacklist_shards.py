@@ -0,0 +1,90 @@
+"""
+Compare a monolithic blacklist with lazily loaded shards: startup time and memory of the rules for a
+project that only imports a few of the libraries covered. Packs are generated on disk (one module per
+covered library, 40k rules by default) and contributed through mypy_pure.blacklists entry points.
+
+Usage:
+    python benchmarks/bench_blacklist_shards.py [--libraries N] [--rules R] [--imported I]
+"""
+
+import argparse
+import importlib
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from mypy_pure.blacklists import ALWAYS_LOADED, ENTRY_POINT_GROUP, BlacklistShards
+from mypy_pure.purity.matcher import IMPURE, NameMatcher
+
+
+def write_packs(directory: Path, libraries: int, rules: int) -> list[EntryPoint]:
+    entry_points = []
+    for i in range(libraries):
+        names = ''.join(f"    'lib{i}.module{j % 20}.call_{j}',\n" for j in range(rules))
+        (directory / f'pack_lib{i}.py').write_text(f'IMPURE_FUNCTIONS = [\n{names}]\n', encoding='utf-8')
+        entry_points.append(EntryPoint(f'lib{i}', f'pack_lib{i}:IMPURE_FUNCTIONS', ENTRY_POINT_GROUP))
+    return entry_points
+
+
+def forget_packs(libraries: int) -> None:
+    for i in range(libraries):
+        sys.modules.pop(f'pack_lib{i}', None)
+    importlib.invalidate_caches()
+
+
+def measure(func: Callable[[], Any]) -> tuple[Any, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, size
+
+
+def monolithic(imports: list[str]) -> NameMatcher:
+    shards = BlacklistShards()
+    return NameMatcher(shards.load_all())
+
+
+def sharded(imports: list[str]) -> NameMatcher:
+    shards = BlacklistShards()
+    matcher = NameMatcher(shards.load(ALWAYS_LOADED))
+    matcher.add(shards.load(imports), IMPURE)
+    return matcher
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--libraries', type=int, default=200)
+    parser.add_argument('--rules', type=int, default=200, help='rules per library')
+    parser.add_argument('--imported', type=int, default=5, help='libraries the project imports')
+    args = parser.parse_args()
+
+    imports = ['os', 'json', *(f'lib{i}.module0' for i in range(args.imported))]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        entry_points = write_packs(Path(tmp_dir), args.libraries, args.rules)
+        sys.path.insert(0, tmp_dir)
+        with patch('mypy_pure.blacklists.entry_points', return_value=entry_points):
+            results = {}
+            for name, load in (('monolithic', monolithic), ('sharded', sharded)):
+                forget_packs(args.libraries)
+                _, elapsed, size = measure(lambda load=load: load(imports))
+                results[name] = (elapsed, size)
+        sys.path.remove(tmp_dir)
+
+    print(f'{args.libraries} packs of {args.rules} rules, project importing {args.imported} of them')
+    for name, (elapsed, size) in results.items():
+        print(f'{name:10}: {elapsed * 1000:8.1f} ms, {size / 2**20:6.1f} MiB')
+    (mono_time, mono_size), (shard_time, shard_size) = results['monolithic'], results['sharded']
+    print(f'startup: {mono_time / shard_time:.1f}x faster, memory: {mono_size / shard_size:.1f}x less')
+
+
+if __name__ == '__main__':
+    main()
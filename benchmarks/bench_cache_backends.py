@@ -0,0 +1,95 @@
+"""
+Compare the backends of the summary cache: a directory with one file per entry, and a SQLite
+database in write-ahead logging mode. Entries are the size of the cache entry of a module of
+benchmarks/bench_cli.py; they are written by several processes at once, as parallel mypy runs
+sharing a cache would, then read back by one process, as a warm run would.
+
+Usage:
+    python benchmarks/bench_cache_backends.py [--entries N] [--writers W]
+"""
+
+import argparse
+import ast
+import multiprocessing
+import tempfile
+import time
+
+from mypy_pure.cache import (
+    CACHE_BACKENDS,
+    CacheBackend,
+    CacheEntry,
+    SummaryCache,
+    open_cache,
+)
+from mypy_pure.purity.summary import ModuleAnalysis
+from mypy_pure.purity.visitor import PurityVisitor
+
+
+def sample_entry() -> CacheEntry:
+    lines = ['import os', 'from mypy_pure import pure', 'from project import module_0']
+    for j in range(20):
+        lines.append(
+            f'\n\n@pure\ndef func_{j}(x: int) -> int:\n    return module_0.func_{j}(x) + func_{max(j - 1, 0)}(x)'
+        )
+    visitor = PurityVisitor('project.module_1')
+    visitor.visit(ast.parse('\n'.join(lines)))
+    analysis = ModuleAnalysis('project.module_1', 'project/module_1.py', visitor.calls, visitor.imports, {})
+    return {'module': analysis.module, 'analysis': analysis.to_dict(), 'summary': None, 'discovered': {}}
+
+
+def keys(writer: int, entries: int) -> list[str]:
+    return [SummaryCache.key(f'module_{writer}_{i}', SummaryCache.content_hash(b''), '') for i in range(entries)]
+
+
+def open_backend(backend: str, location: str) -> CacheBackend:
+    cache = open_cache(backend, location, '')
+    assert cache is not None
+    return cache
+
+
+def write(backend: str, location: str, writer: int, entries: int) -> None:
+    cache = open_backend(backend, location)
+    entry = sample_entry()
+    for key in keys(writer, entries):
+        cache.put(key, entry)
+    cache.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=5_000, help='entries per writer')
+    parser.add_argument('--writers', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f'{args.writers} writers of {args.entries} entries each')
+    for backend in CACHE_BACKENDS:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            start = time.perf_counter()
+            processes = [
+                multiprocessing.Process(target=write, args=(backend, tmp_dir, writer, args.entries))
+                for writer in range(args.writers)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            written = time.perf_counter() - start
+
+            cache = open_backend(backend, tmp_dir)
+            start = time.perf_counter()
+            for writer in range(args.writers):
+                for key in keys(writer, args.entries):
+                    cache.get(key)
+            cache.flush()
+            read = time.perf_counter() - start
+            total = args.writers * args.entries
+            assert (cache.hits, cache.misses) == (total, 0), (cache.hits, cache.misses)
+            print(
+                f'{backend:10} write {written * 1000:8.1f} ms ({written / total * 1e6:6.1f} us/entry), '
+                f'warm read {read * 1000:8.1f} ms ({read / total * 1e6:6.1f} us/entry), '
+                f'{cache.hits} hits, {cache.misses} misses'
+            )
+
+
+if __name__ == '__main__':
+    main()
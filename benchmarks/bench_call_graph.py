@@ -0,0 +1,188 @@
+"""
+Compare the interned CSR CallGraph with the dict[str, set[str]] call graph it replaced: memory held by
+the graph and purity propagation throughput, on a generated graph (1M edges by default).
+
+Usage:
+    python benchmarks/bench_call_graph.py [--functions N] [--calls C]
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from mypy_pure.configuration import BLACKLIST
+from mypy_pure.purity.checker import compute_purity
+from mypy_pure.purity.graph import CallGraph, CallGraphBuilder
+from mypy_pure.purity.matcher import IMPURE, PURE, NameMatcher
+
+EXTERNAL_CALLS = [name.split('.') for name in ('len', 'abs', 'os.path.join', 'json.dumps', 'print', 'os.remove')]
+
+
+def generate_calls(functions: int, calls: int, seed: int = 0) -> Iterator[tuple[str, str | None]]:
+    """Yield (function, None) for every definition and (function, callee) for every call, as a visitor sees them."""
+    rng = random.Random(seed)
+    for i in range(functions):
+        fn = f'func_{i}'
+        yield fn, None
+        for _ in range(calls):
+            if rng.random() < 0.7:
+                # Mostly calls to nearby functions, as in real modules; the names are built per call site
+                yield fn, f'func_{min(functions - 1, i + rng.randint(1, 50))}'
+            else:
+                yield fn, '.'.join(rng.choice(EXTERNAL_CALLS))
+
+
+def build_dict(functions: int, calls: int) -> dict[str, set[str]]:
+    graph: dict[str, set[str]] = {}
+    for fn, callee in generate_calls(functions, calls):
+        if callee is None:
+            graph[fn] = set()
+        else:
+            graph[fn].add(callee)
+    return graph
+
+
+def build_csr(functions: int, calls: int) -> CallGraph:
+    builder = CallGraphBuilder()
+    for fn, callee in generate_calls(functions, calls):
+        if callee is None:
+            builder.add_function(fn)
+        else:
+            builder.add_call(fn, callee)
+    return builder.build()
+
+
+def dict_compute_purity(calls: dict[str, set[str]], pure_functions: set[str], matcher: NameMatcher) -> dict[str, bool]:
+    """The previous PurityChecker, walking names: iterative Tarjan over dict[str, set[str]]."""
+    index: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    successors: dict[str, list[str]] = {}
+    direct: dict[str, set[str]] = {}
+    impure: dict[str, set[str]] = {}
+    purity: dict[str, bool] = {}
+
+    def successors_of(fn: str) -> list[str]:
+        found, blacklisted = [], set()
+        for callee in calls.get(fn, set()):
+            verdict = matcher.verdict(callee)
+            if verdict == PURE:
+                continue
+            if verdict == IMPURE:
+                blacklisted.add(callee)
+            if callee in pure_functions or callee in calls:
+                found.append(callee)
+        successors[fn], direct[fn] = found, blacklisted
+        return found
+
+    for root in pure_functions:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors_of(root)))]
+        while work:
+            fn, it = work[-1]
+            for callee in it:
+                if callee not in index:
+                    index[callee] = lowlink[callee] = len(index)
+                    stack.append(callee)
+                    on_stack.add(callee)
+                    work.append((callee, iter(successors_of(callee))))
+                    break
+                if callee in on_stack:
+                    lowlink[fn] = min(lowlink[fn], index[callee])
+            else:
+                work.pop()
+                if work:
+                    lowlink[work[-1][0]] = min(lowlink[work[-1][0]], lowlink[fn])
+                if lowlink[fn] == index[fn]:
+                    close_component(fn, stack, on_stack, successors, direct, impure, purity)
+    return purity
+
+
+def close_component(
+    root: str,
+    stack: list[str],
+    on_stack: set[str],
+    successors: dict[str, list[str]],
+    direct: dict[str, set[str]],
+    impure: dict[str, set[str]],
+    purity: dict[str, bool],
+) -> None:
+    """Pop the strongly connected component of a root off the Tarjan stack and decide its members together."""
+    component = []
+    while True:
+        member = stack.pop()
+        on_stack.discard(member)
+        component.append(member)
+        if member == root:
+            break
+    members, found = set(component), set()
+    for member in component:
+        found |= direct.pop(member)
+        for callee in successors.pop(member):
+            if callee not in members and callee in impure:
+                found |= impure[callee]
+    for member in component:
+        purity[member] = not found
+        if found:
+            impure[member] = set(found)
+
+
+def measure(build: Callable[[], Any]) -> tuple[Any, float, int]:
+    """Build a graph twice: once timed, once traced to get the memory it holds."""
+    gc.collect()
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    graph = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return graph, elapsed, size
+
+
+def best_of(repeat: int, func: Callable[[], Any]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--functions', type=int, default=100_000)
+    parser.add_argument('--calls', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    dict_graph, dict_build, dict_size = measure(lambda: build_dict(args.functions, args.calls))
+    csr_graph, csr_build, csr_size = measure(lambda: build_csr(args.functions, args.calls))
+    edges = sum(len(callees) for callees in dict_graph.values())
+    print(f'{args.functions} functions, {edges} distinct edges (build times include generating the calls)')
+    print(f'dict[str, set[str]]: {dict_size / 2**20:8.1f} MiB, built in {dict_build:6.2f} s')
+    print(f'CallGraph (CSR):     {csr_size / 2**20:8.1f} MiB, built in {csr_build:6.2f} s')
+    print(f'memory: {dict_size / csr_size:.1f}x smaller')
+
+    pure_functions = set(dict_graph)
+    dict_time = best_of(args.repeat, lambda: dict_compute_purity(dict_graph, pure_functions, NameMatcher(BLACKLIST)))
+    csr_time = best_of(
+        args.repeat, lambda: compute_purity(csr_graph, pure_functions, set(), matcher=NameMatcher(BLACKLIST))
+    )
+    print(f'propagation on dict[str, set[str]]: {dict_time:6.2f} s ({edges / dict_time / 1e6:.2f} M edges/s)')
+    print(f'propagation on CallGraph:           {csr_time:6.2f} s ({edges / csr_time / 1e6:.2f} M edges/s)')
+    print(f'speedup: {dict_time / csr_time:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
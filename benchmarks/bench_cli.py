@@ -0,0 +1,65 @@
+"""
+Measure the standalone checker (what `mypy-pure` runs) on a generated project, for several numbers of jobs.
+
+Usage:
+    python benchmarks/bench_cli.py [--files N] [--functions F] [--jobs 1 2 4 8]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from mypy.find_sources import create_source_list
+from mypy.options import Options
+
+from mypy_pure.configuration import PurityConfig
+from mypy_pure.project import ProjectChecker
+
+
+def generate_project(root: str, files: int, functions: int, package_name: str = 'project') -> None:
+    package = os.path.join(root, package_name)
+    os.makedirs(package)
+    with open(os.path.join(package, '__init__.py'), 'w', encoding='utf-8'):
+        pass
+    for i in range(files):
+        lines = ['import os', 'from mypy_pure import pure']
+        if i:
+            lines.append(f'from {package_name} import module_{i - 1}')
+        for j in range(functions):
+            decorator = '@pure\n' if j % 5 == 0 else ''
+            call = f'module_{i - 1}.func_{j}(x)' if i and j % 7 == 0 else f'func_{max(j - 1, 0)}(x - 1)'
+            impure = '    os.remove(str(x))\n' if i % 1000 == 0 and j == 0 else ''
+            lines.append(
+                f'\n\n{decorator}def func_{j}(x: int) -> int:\n'
+                f'    y = [abs(v) for v in range(x) if v % 2]\n'
+                f'{impure}'
+                f'    return {call} + len(y)'
+            )
+        with open(os.path.join(package, f'module_{i}.py'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=20_000)
+    parser.add_argument('--functions', type=int, default=20)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        generate_project(tmp_dir, args.files, args.functions)
+        sources = create_source_list([os.path.join(tmp_dir, 'project')], Options())
+        print(f'{len(sources)} files, {args.functions} functions each, {os.cpu_count()} CPUs')
+
+        baseline = None
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            violations = ProjectChecker(PurityConfig()).check(sources, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f'--jobs {jobs:<3} {elapsed:7.2f} s  ({baseline / elapsed:.2f}x, {len(violations)} violations)')
+
+
+if __name__ == '__main__':
+    main()
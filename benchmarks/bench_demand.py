@@ -0,0 +1,118 @@
+"""
+Compare the full analysis of a project with the demand-driven one (mypy-pure --demand-driven), on
+large generated service modules where only a fraction of the functions are @pure helpers.
+
+Most functions are handlers that log, call other handlers and the pure helpers; the @pure helpers
+call each other and a helper of the previous module. Only the helpers, and what they reach, are
+visited by a demand-driven analysis. Both analyses must give the same verdicts.
+
+Usage:
+    python benchmarks/bench_demand.py [--modules M] [--functions F] [--pure-fraction P]
+"""
+
+import argparse
+import ast
+import gc
+import os
+import tempfile
+import time
+
+from mypy.find_sources import create_source_list
+from mypy.options import Options
+
+from mypy_pure.configuration import PurityConfig
+from mypy_pure.project import ProjectChecker
+from mypy_pure.purity.visitor import PurityVisitor
+
+
+def generate_module(index: int, functions: int, pure_fraction: float) -> str:
+    helpers = max(1, int(functions * pure_fraction))
+    lines = ['import logging', 'from mypy_pure import pure']
+    if index > 0:
+        lines.append(f'from services import service_{index - 1}')
+    lines.append('')
+    for i in range(helpers):
+        # One helper in ten of the first module prints, so that some verdicts are violations
+        call = f'service_{index - 1}.helper_{i}(x)' if index > 0 else ('print(x)' if i % 10 == 0 else 'x')
+        lines.append(
+            f'@pure\n'
+            f'def helper_{i}(x: int) -> int:\n'
+            f'    values = [abs(v) for v in range(x) if v % {i % 5 + 2}]\n'
+            f'    return helper_{max(i - 1, 0)}(len(values)) + {call}\n'
+        )
+    for i in range(functions - helpers):
+        lines.append(
+            f'def handle_{i}(request: dict) -> dict:\n'
+            f'    logging.info("handling %s", request.get("id"))\n'
+            f'    payload = {{key: str(value).strip() for key, value in request.items() if value is not None}}\n'
+            f'    if len(payload) > {i % 7}:\n'
+            f'        payload["score"] = helper_{i % helpers}(len(payload)) + handle_{max(i - 1, 0)}(payload)["n"]\n'
+            f'    return {{"n": len(payload), "body": sorted(payload.items(), key=lambda item: item[0])}}\n'
+        )
+    return '\n'.join(lines)
+
+
+def visit_time(trees: list[tuple[str, ast.Module]], demand_driven: bool) -> float:
+    """Time to visit parsed modules; only the @pure functions of each module for a demand-driven visit."""
+    graphs = []
+    start = time.perf_counter()
+    for module, tree in trees:
+        visitor = PurityVisitor(module)
+        if demand_driven:
+            visitor.index(tree)
+            pending = list(visitor.pure_functions_lineno)
+            while pending:
+                pending.extend(callee for callee in visitor.visit_function(pending.pop()) if '.' not in callee)
+        else:
+            visitor.visit(tree)
+        graphs.append(visitor.calls)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modules', type=int, default=10)
+    parser.add_argument('--functions', type=int, default=2_000, help='functions per module')
+    parser.add_argument('--pure-fraction', type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        package = os.path.join(tmp_dir, 'services')
+        os.makedirs(package)
+        open(os.path.join(package, '__init__.py'), 'w').close()
+        trees = []
+        lines = 0
+        for index in range(args.modules):
+            source = generate_module(index, args.functions, args.pure_fraction)
+            lines += source.count('\n') + 1
+            trees.append((f'services.service_{index}', ast.parse(source)))
+            with open(os.path.join(package, f'service_{index}.py'), 'w', encoding='utf-8') as f:
+                f.write(source)
+        sources = create_source_list([package], Options())
+        print(f'{args.modules} modules, {lines} lines, {args.pure_fraction:.0%} of the functions @pure')
+
+        full_visit, demand_visit = visit_time(trees, False), visit_time(trees, True)
+        print(f'visit only:  full {full_visit * 1000:8.1f} ms, demand-driven {demand_visit * 1000:8.1f} ms ', end='')
+        print(f'({full_visit / demand_visit:.1f}x faster)')
+
+        verdicts = []
+        times = []
+        for demand_driven in (False, True):
+            checker = ProjectChecker(PurityConfig())
+            start = time.perf_counter()
+            if demand_driven:
+                # As mypy-pure --demand-driven does
+                gc.disable()
+            try:
+                violations = checker.check(sources, demand_driven=demand_driven)
+            finally:
+                gc.enable()
+            times.append(time.perf_counter() - start)
+            verdicts.append([violation.format() for violation in violations])
+        assert verdicts[0] == verdicts[1], 'the analyses disagree'
+        print(f'full check:  full {times[0] * 1000:8.1f} ms, demand-driven {times[1] * 1000:8.1f} ms ', end='')
+        print(f'({times[0] / times[1]:.1f}x faster, parsing included, {len(verdicts[0])} violations)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure `mypy-pure index` and `mypy-pure query` on a generated project: the time it takes to check
+the project and write its index, then the latency of queries answered from it, compared with the
+full check it would take to answer them without an index.
+
+The project is made of packages as in benchmarks/bench_watch.py: the modules of a package call into
+the previous one, and the first module of every package calls os.remove.
+
+Usage:
+    python benchmarks/bench_index.py [--packages P] [--modules M] [--functions F] [--repeat R]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from typing import Any
+
+from bench_cli import generate_project
+from mypy.find_sources import create_source_list
+from mypy.options import Options
+
+from mypy_pure.configuration import PurityConfig
+from mypy_pure.index import PurityIndex, write_index
+from mypy_pure.project import ProjectChecker
+
+
+def latency(query: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = query()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--packages', type=int, default=20)
+    parser.add_argument('--modules', type=int, default=50, help='modules per package')
+    parser.add_argument('--functions', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        project = os.path.join(tmp_dir, 'project')
+        os.makedirs(project)
+        for package in range(args.packages):
+            generate_project(project, args.modules, args.functions, f'package_{package}')
+        sources = create_source_list([project], Options())
+        checker = ProjectChecker(PurityConfig())
+        start = time.perf_counter()
+        violations = checker.check(sources)
+        checked = time.perf_counter() - start
+        index_path = os.path.join(tmp_dir, 'index.sqlite')
+        start = time.perf_counter()
+        functions, calls = write_index(index_path, checker, violations)
+        written = time.perf_counter() - start
+        print(f'{len(sources)} files, {functions} functions, {calls} calls')
+        print(f'full check:  {checked * 1000:9.1f} ms')
+        print(f'write index: {written * 1000:9.1f} ms ({os.path.getsize(index_path) / 2**20:.1f} MiB)')
+
+        index = PurityIndex(index_path)
+        last = f'package_0.module_{args.modules - 1}'
+        queries: list[tuple[str, Callable[[], Any]]] = [
+            ('callers os.remove', lambda: index.callers('os.remove')),
+            ('callers package_0.* (glob)', lambda: index.callers('package_0.*')),
+            (
+                'callers --transitive package_0.module_0.func_0',
+                lambda: index.callers('package_0.module_0.func_0', True),
+            ),
+            (f'callees {last}.func_19', lambda: index.callees(f'{last}.func_19')),
+            (f'why {last}.func_0', lambda: index.why(f'{last}.func_0')),
+        ]
+        for label, query in queries:
+            elapsed, result = latency(query, args.repeat)
+            size = len(result[0]) if label.startswith('why') else len(result)
+            print(f'{label + ":":50} {elapsed * 1000:7.2f} ms ({size} names, ', end='')
+            print(f'{checked / elapsed:.0f}x faster than a check)')
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Replay a scripted edit session against the language server (`mypy-pure lsp`) on a generated project,
+and measure the latency of every edit: from the didChange notification to its published diagnostics.
+
+The project is made of packages as in benchmarks/bench_watch.py. The session opens a module, types an
+impure call into one of its @pure functions one character at a time (most intermediate states do not
+parse), then deletes it again the same way. It does so for the last module of a package, which nothing
+uses, and for the first one, which its whole package uses.
+
+Usage:
+    python benchmarks/bench_lsp.py [--packages P] [--modules M] [--functions F]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from io import BytesIO
+from typing import Any
+
+from bench_cli import generate_project
+
+from mypy_pure.lsp import LanguageServer, path_to_uri
+
+TYPED = '    print(x)\n'
+
+
+def session(text: str) -> list[str]:
+    """The texts of a document while TYPED is typed at the start of its first function body, then deleted."""
+    offset = text.index(':\n', text.index('def func_0')) + 2
+    typed = [text[:offset] + TYPED[:i] + text[offset:] for i in range(1, len(TYPED) + 1)]
+    return [*typed, *reversed(typed[:-1]), text]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--packages', type=int, default=20)
+    parser.add_argument('--modules', type=int, default=50, help='modules per package')
+    parser.add_argument('--functions', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for package in range(args.packages):
+            generate_project(tmp_dir, args.modules, args.functions, f'package_{package}')
+        output = BytesIO()
+        server = LanguageServer(BytesIO(), output)
+
+        def send(method: str, params: dict[str, Any], id: int | None = None) -> None:
+            message: dict[str, Any] = {'jsonrpc': '2.0', 'method': method, 'params': params}
+            if id is not None:
+                message['id'] = id
+            server.handle(message)
+            output.seek(0)
+            output.truncate()
+
+        start = time.perf_counter()
+        send('initialize', {'rootUri': path_to_uri(tmp_dir)}, id=1)
+        initialize = time.perf_counter() - start
+        print(f'{args.packages * (args.modules + 1)} files, {args.functions} functions each')
+        print(f'initialize (full check):      {initialize * 1000:9.1f} ms')
+
+        package = os.path.join(tmp_dir, 'package_0')
+        for label, index in (('module nothing uses', args.modules - 1), ('module its package uses', 0)):
+            path = os.path.join(package, f'module_{index}.py')
+            uri = path_to_uri(path)
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+            send(
+                'textDocument/didOpen',
+                {'textDocument': {'uri': uri, 'languageId': 'python', 'version': 0, 'text': text}},
+            )
+            latencies = []
+            for version, content in enumerate(session(text), 1):
+                start = time.perf_counter()
+                send(
+                    'textDocument/didChange',
+                    {'textDocument': {'uri': uri, 'version': version}, 'contentChanges': [{'text': content}]},
+                )
+                latencies.append(time.perf_counter() - start)
+            send('textDocument/didClose', {'textDocument': {'uri': uri}})
+            latencies.sort()
+            print(
+                f'{len(latencies)} edits of a {label + ":":24} mean {statistics.mean(latencies) * 1000:6.1f} ms, '
+                f'p50 {latencies[len(latencies) // 2] * 1000:6.1f} ms, '
+                f'p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.1f} ms, max {latencies[-1] * 1000:6.1f} ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare deciding callees with the compiled NameMatcher against the set-based checks it replaced
+(two membership tests per list, each building a 'builtins.' f-string), for blacklists of growing size.
+
+Usage:
+    python benchmarks/bench_matcher.py [--sizes 200 10000 100000] [--callees N] [--repeat R]
+"""
+
+import argparse
+import random
+import time
+
+from mypy_pure.purity.matcher import NameMatcher
+
+
+def generate_names(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [f'pkg{rng.randrange(500)}.mod{rng.randrange(50)}.func_{i}' for i in range(count)]
+
+
+def set_based(callees: list[str], blacklist: set[str], whitelist: set[str]) -> int:
+    impure = 0
+    for callee in callees:
+        if callee in whitelist or f'builtins.{callee}' in whitelist:
+            continue
+        if callee in blacklist or f'builtins.{callee}' in blacklist:
+            impure += 1
+    return impure
+
+
+def matcher_based(callees: list[str], matcher: NameMatcher) -> int:
+    return sum(1 for callee in callees if matcher.is_impure(callee))
+
+
+def best_of(repeat: int, func, *args) -> float:  # type: ignore[no-untyped-def]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 10_000, 100_000])
+    parser.add_argument('--callees', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{args.callees} callee checks (a typical project calls the same names many times)')
+    for size in args.sizes:
+        blacklist = set(generate_names(size, seed=1))
+        whitelist = set(generate_names(size // 10, seed=2))
+        # Half of the calls hit the blacklist, the other half are unknown names; names repeat
+        pool = list(blacklist)[: min(size, 5000)] + generate_names(min(size, 5000), seed=3)
+        rng = random.Random(4)
+        callees = [rng.choice(pool) for _ in range(args.callees)]
+
+        start = time.perf_counter()
+        matcher = NameMatcher(blacklist, whitelist)
+        build_time = time.perf_counter() - start
+
+        assert set_based(callees, blacklist, whitelist) == matcher_based(callees, matcher)
+        set_time = best_of(args.repeat, set_based, callees, blacklist, whitelist)
+        matcher_time = best_of(args.repeat, matcher_based, callees, matcher)
+
+        print(f'blacklist of {size} entries (matcher built in {build_time * 1000:.1f} ms)')
+        print(f'  set-based checks: {set_time * 1000:8.1f} ms')
+        print(f'  NameMatcher:      {matcher_time * 1000:8.1f} ms')
+        print(f'  speedup: {set_time / matcher_time:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
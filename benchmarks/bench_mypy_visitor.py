@@ -0,0 +1,88 @@
+"""
+Compare the cost of analyzing a module by re-reading and re-parsing its source with ``ast``
+against walking the MypyFile tree that mypy has already built.
+
+Usage:
+    python benchmarks/bench_mypy_visitor.py [--functions N] [--repeat R]
+"""
+
+import argparse
+import ast
+import os
+import tempfile
+import time
+
+from mypy.errors import Errors
+from mypy.options import Options
+from mypy.parse import parse
+
+from mypy_pure.purity.mypy_visitor import MypyPurityVisitor
+from mypy_pure.purity.visitor import PurityVisitor
+
+
+def generate_module(functions: int) -> str:
+    lines = ['import os', 'from mypy_pure import pure', '']
+    for i in range(functions):
+        decorator = '@pure\n' if i % 10 == 0 else ''
+        lines.append(
+            f'{decorator}def func_{i}(x: int) -> int:\n'
+            f'    y = [abs(v) for v in range(x) if v % 2]\n'
+            f'    if x > {i}:\n'
+            f'        os.path.join(str(x), str(y))\n'
+            f'    return func_{max(i - 1, 0)}(x - 1) + len(y)\n'
+        )
+    return '\n'.join(lines)
+
+
+def parse_with_mypy(path: str, source: str) -> object:
+    options = Options()
+    if hasattr(options, 'native_parser'):
+        options.native_parser = False
+    return parse(source, path, 'bench_module', Errors(options), options)
+
+
+def bench_ast(path: str) -> None:
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    visitor = PurityVisitor()
+    visitor.visit(ast.parse(source, filename=path))
+
+
+def bench_tree(tree: object) -> None:
+    visitor = MypyPurityVisitor()
+    visitor.visit(tree)  # type: ignore[arg-type]
+
+
+def best_of(repeat: int, func, *args) -> float:  # type: ignore[no-untyped-def]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--functions', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    source = generate_module(args.functions)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'bench_module.py')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        tree = parse_with_mypy(path, source)
+
+        ast_time = best_of(args.repeat, bench_ast, path)
+        tree_time = best_of(args.repeat, bench_tree, tree)
+
+    print(f'module: {args.functions} functions, {source.count(chr(10))} lines')
+    print(f'read + ast.parse + PurityVisitor: {ast_time * 1000:8.1f} ms')
+    print(f'MypyPurityVisitor on MypyFile:    {tree_time * 1000:8.1f} ms')
+    print(f'speedup: {ast_time / tree_time:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
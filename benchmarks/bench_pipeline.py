@@ -0,0 +1,93 @@
+"""
+Compare the plugin analyzing modules with @pure functions synchronously, inside get_additional_deps,
+with the background pipeline, on generated modules parsed by mypy one after the other: the time the
+plugin hooks keep mypy waiting in get_additional_deps and when the verdicts are decided (joining
+the background analyses), and the wall time of the whole build. Worker threads can only overlap with
+mypy with more than one CPU, on a free-threaded build: with a GIL, they take turns with it.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--modules N] [--functions F] [--jobs J]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from mypy.errors import Errors
+from mypy.nodes import MypyFile
+from mypy.options import Options
+from mypy.parse import parse
+from mypy.plugin import ReportConfigContext
+
+from mypy_pure.pipeline import available_cpus, gil_enabled
+from mypy_pure.plugin import PurityPlugin
+
+
+def generate_module(index: int, functions: int) -> str:
+    lines = ['from mypy_pure import pure', '']
+    for j in range(functions):
+        lines += ['', '@pure', f'def f{j}(x: int) -> int:', f'    y = f{j - 1}(x) if x else x' if j else '    y = x']
+        lines += ['    for i in range(x):', '        y += abs(i) * len(str(i))', '    return y', '']
+    return '\n'.join(lines)
+
+
+def run(paths: list[Path], jobs: int, root: Path) -> tuple[float, float, float]:
+    config_file = root / f'mypy_{jobs}.ini'
+    config_file.write_text(f'[mypy-pure]\ncache = False\nanalysis_jobs = {jobs}\n', encoding='utf-8')
+    options = Options()
+    options.config_file = str(config_file)
+    options.cache_dir = os.devnull
+    plugin = PurityPlugin(options)
+
+    announce = 0.0
+    modules: dict[str, MypyFile] = {}
+    start = time.perf_counter()
+    for path in paths:
+        tree = parse(path.read_text(encoding='utf-8'), str(path), path.stem, Errors(options), options)
+        tree._fullname = path.stem
+        modules[path.stem] = tree
+        hook_start = time.perf_counter()
+        plugin.get_additional_deps(tree)
+        announce += time.perf_counter() - hook_start
+    plugin.set_modules(modules)
+    hook_start = time.perf_counter()
+    # The first cache write of a module with @pure functions joins the analyses and decides the verdicts
+    plugin.report_config_data(ReportConfigContext(paths[0].stem, str(paths[0]), is_check=False))
+    verdicts = time.perf_counter() - hook_start
+    elapsed = time.perf_counter() - start
+    plugin._PurityPlugin__pipeline.shutdown()  # type: ignore[attr-defined]
+    return announce, verdicts, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modules', type=int, default=200)
+    parser.add_argument('--functions', type=int, default=40, help='@pure functions per module')
+    parser.add_argument('--jobs', type=int, default=max(1, min(4, available_cpus() - 1)))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        paths = []
+        for i in range(args.modules):
+            path = root / f'module{i}.py'
+            path.write_text(generate_module(i, args.functions), encoding='utf-8')
+            paths.append(path)
+        results = {'synchronous': run(paths, 0, root)}
+        results[f'{args.jobs} threads'] = run(paths, args.jobs, root)
+
+    gil = 'GIL' if gil_enabled() else 'free-threaded'
+    print(f'{args.modules} modules of {args.functions} @pure functions, {available_cpus()} CPUs, {gil}')
+    for name, (announce, verdicts, elapsed) in results.items():
+        print(
+            f'{name:12}: get_additional_deps {announce * 1000:8.1f} ms, verdicts {verdicts * 1000:8.1f} ms, '
+            f'wall {elapsed * 1000:8.1f} ms'
+        )
+    (sync_announce, sync_verdicts, _), (announce, verdicts, _) = results.values()
+    print(f'time mypy waits on the plugin: {(sync_announce + sync_verdicts) / (announce + verdicts):.1f}x less')
+
+
+if __name__ == '__main__':
+    main()
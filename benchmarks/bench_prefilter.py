@@ -0,0 +1,84 @@
+"""
+Measure what the @pure marker prefilter saves in get_additional_deps on a project where few modules
+define @pure functions: the plugin hook against analyzing every module as it did before.
+
+Usage:
+    python benchmarks/bench_prefilter.py [--modules N] [--pure-ratio R] [--functions F]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from mypy.errors import Errors
+from mypy.nodes import MypyFile, SymbolTable
+from mypy.options import Options
+from mypy.parse import parse
+
+from mypy_pure.plugin import PurityPlugin
+from mypy_pure.purity.mypy_visitor import MypyPurityVisitor
+
+
+def generate_module(index: int, functions: int, with_pure: bool) -> str:
+    lines = ['import os']
+    if with_pure:
+        lines.append('from mypy_pure import pure')
+    for i in range(functions):
+        decorator = '@pure\n' if with_pure and i % 10 == 0 else ''
+        lines.append(
+            f'\n\n{decorator}def func_{i}(x: int) -> int:\n'
+            f'    y = [abs(v) for v in range(x) if v % 2]\n'
+            f'    if x > {index}:\n'
+            f'        os.path.join(str(x), str(y))\n'
+            f'    return func_{max(i - 1, 0)}(x - 1) + len(y)'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modules', type=int, default=2000)
+    parser.add_argument('--pure-ratio', type=float, default=0.05)
+    parser.add_argument('--functions', type=int, default=50)
+    args = parser.parse_args()
+
+    options = Options()
+    options.config_file = None
+    options.cache_dir = os.devnull
+    if hasattr(options, 'native_parser'):
+        options.native_parser = False
+
+    pure_every = max(1, round(1 / args.pure_ratio)) if args.pure_ratio else args.modules + 1
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        trees: list[MypyFile] = []
+        for i in range(args.modules):
+            source = generate_module(i, args.functions, with_pure=i % pure_every == 0)
+            path = os.path.join(tmp_dir, f'module_{i}.py')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            tree = parse(source, path, f'module_{i}', Errors(options), options)
+            tree._fullname = f'module_{i}'
+            tree.names = SymbolTable()
+            trees.append(tree)
+
+        start = time.perf_counter()
+        for tree in trees:
+            visitor = MypyPurityVisitor(tree.fullname)
+            visitor.visit(tree)
+        visit_all = time.perf_counter() - start
+
+        plugin = PurityPlugin(options)
+        start = time.perf_counter()
+        for tree in trees:
+            plugin.get_additional_deps(tree)
+        prefiltered = time.perf_counter() - start
+
+    print(f'{args.modules} modules, {args.functions} functions each, 1 in {pure_every} with @pure functions')
+    print(f'analyze every module:            {visit_all * 1000:8.1f} ms')
+    print(f'get_additional_deps (prefilter): {prefiltered * 1000:8.1f} ms')
+    print(f'speedup: {visit_all / prefiltered:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare a hand-maintained Python set, imported at startup, with the mapped purity database, for the
+same generated names (300k by default): the time and memory it takes to make them available, and the
+time of looking up names that are and are not known.
+
+Usage:
+    python benchmarks/bench_stdlib_database.py [--entries N] [--lookups L]
+"""
+
+import argparse
+import importlib
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from mypy_pure.purity.database import PurityDatabase, write_database
+from mypy_pure.purity.effects import FILE_IO
+from mypy_pure.purity.matcher import IMPURE
+
+
+def generate_names(entries: int) -> list[str]:
+    return [f'lib{i % 500}.module{i % 37}.Class{i % 11}.call_{i}' for i in range(entries)]
+
+
+def measure(func: Callable[[], Any]) -> tuple[Any, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=300_000)
+    parser.add_argument('--lookups', type=int, default=10_000)
+    args = parser.parse_args()
+
+    names = generate_names(args.entries)
+    probes = [*names[:: max(1, len(names) // args.lookups)], *(f'missing.call_{i}' for i in range(args.lookups))]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        source = ''.join(f'    {name!r},\n' for name in names)
+        (root / 'bench_blacklist_set.py').write_text(f'IMPURE_FUNCTIONS = {{\n{source}}}\n', encoding='utf-8')
+        write_database(str(root / 'bench.puritydb'), {name: (IMPURE, FILE_IO) for name in names})
+        sys.path.insert(0, tmp_dir)
+        # Compile the module once, as an installed package would be
+        importlib.import_module('bench_blacklist_set')
+        sys.modules.pop('bench_blacklist_set')
+
+        blacklist, set_startup, set_size = measure(
+            lambda: importlib.import_module('bench_blacklist_set').IMPURE_FUNCTIONS
+        )
+        database, db_startup, db_size = measure(lambda: PurityDatabase.open(str(root / 'bench.puritydb')))
+        assert database is not None
+        start = time.perf_counter()
+        set_hits = sum(name in blacklist for name in probes)
+        set_lookup = time.perf_counter() - start
+        start = time.perf_counter()
+        db_hits = sum(database.lookup(name) is not None for name in probes)
+        db_lookup = time.perf_counter() - start
+        assert set_hits == db_hits
+        database.close()
+        sys.path.remove(tmp_dir)
+
+    print(f'{args.entries} names, {len(probes)} lookups')
+    print(f'python set:      startup {set_startup * 1000:8.1f} ms, {set_size / 2**20:6.1f} MiB, ', end='')
+    print(f'lookup {set_lookup / len(probes) * 1e6:6.2f} us')
+    print(f'mapped database: startup {db_startup * 1000:8.1f} ms, {db_size / 2**20:6.1f} MiB, ', end='')
+    print(f'lookup {db_lookup / len(probes) * 1e6:6.2f} us')
+    print(f'startup: {set_startup / db_startup:.0f}x faster, memory: {set_size / max(db_size, 1):.0f}x less')
+
+
+if __name__ == '__main__':
+    main()
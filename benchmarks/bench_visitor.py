@@ -0,0 +1,166 @@
+"""
+Compare the iterative PurityVisitor with the ast.NodeVisitor it replaced, which dispatched on every
+node and resolved attribute chains recursively, on a generated module of 50k+ lines by default.
+Both must find the same imports, calls and @pure functions.
+
+Usage:
+    python benchmarks/bench_visitor.py [--functions N] [--repeat R]
+"""
+
+import argparse
+import ast
+import time
+
+from mypy_pure.purity.graph import CallGraph, CallGraphBuilder
+from mypy_pure.purity.types import EffectMask, FuncName, LineNo
+from mypy_pure.purity.visitor import (
+    PurityVisitor,
+    absolute_import_module,
+    allowed_effects,
+)
+
+
+class NodeVisitorPurityVisitor(ast.NodeVisitor):
+    """The ast.NodeVisitor implementation of PurityVisitor, as it was before the iterative scanner."""
+
+    def __init__(self, module: str | None = None, is_package: bool = False) -> None:
+        self.module = module
+        self.is_package = is_package
+        self.imports: dict[str, str] = {}
+        self.builder = CallGraphBuilder()
+        self.pure_functions_lineno: dict[FuncName, LineNo] = {}
+        self.allowed_effects: dict[FuncName, EffectMask] = {}
+        self.current_function: FuncName | None = None
+        self.classes: list[str] = []  # classes around the visited node, since the function it is in
+
+    @property
+    def calls(self) -> CallGraph:
+        return self.builder.build()
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.imports[alias.asname or alias.name] = alias.name
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module = absolute_import_module(self.module, self.is_package, node.level, node.module or '')
+        for alias in node.names:
+            self.imports[alias.asname or alias.name] = f'{module}.{alias.name}' if module else alias.name
+        self.generic_visit(node)
+
+    def resolve_name(self, node: ast.AST) -> str | None:
+        if isinstance(node, ast.Name):
+            return self.imports.get(node.id, node.id)
+        elif isinstance(node, ast.Attribute):
+            base = self.resolve_name(node.value)
+            if base:
+                return f'{base}.{node.attr}'
+        return None
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.classes.append(node.name)
+        self.generic_visit(node)
+        self.classes.pop()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self.handle_function_def(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self.handle_function_def(node)
+
+    def handle_function_def(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        is_pure = False
+        allowed: EffectMask = 0
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call) and self.is_pure_decorator(decorator.func):
+                is_pure = True
+                allowed |= allowed_effects(decorator.keywords)
+            elif self.is_pure_decorator(decorator):
+                is_pure = True
+        name = '.'.join([*self.classes, node.name])
+        if is_pure:
+            self.pure_functions_lineno[name] = node.lineno
+            if allowed:
+                self.allowed_effects[name] = allowed
+        prev_function, prev_classes = self.current_function, self.classes
+        self.current_function, self.classes = name, []
+        self.builder.add_function(name)
+        self.generic_visit(node)
+        self.current_function, self.classes = prev_function, prev_classes
+
+    def is_pure_decorator(self, decorator: ast.expr) -> bool:
+        if self.resolve_name(decorator) == PurityVisitor.PURE_DECORATOR_FULLNAME:
+            return True
+        elif isinstance(decorator, ast.Name) and decorator.id == 'pure':
+            return self.imports.get('pure') in {PurityVisitor.PURE_DECORATOR_FULLNAME, 'mypy_pure.pure'}
+        elif isinstance(decorator, ast.Attribute) and decorator.attr == 'pure':
+            return self.resolve_name(decorator.value) == 'mypy_pure.decorators'
+        return False
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if self.current_function is not None:
+            callee_name = self.resolve_name(node.func)
+            if callee_name:
+                self.builder.add_call(self.current_function, callee_name)
+        self.generic_visit(node)
+
+
+def generate_module(functions: int) -> str:
+    """About 10 lines per function, in classes, with nested functions, lambdas and comprehensions."""
+    lines = ['import os', 'import os.path as osp', 'from mypy_pure import pure', 'from . import helpers', '']
+    for i in range(functions):
+        if i % 50 == 0:
+            lines.append(f'class Service{i}(helpers.Base):')
+        decorator = '    @pure(allow=["logging"])\n' if i % 10 == 0 else ''
+        lines.append(
+            f'{decorator}'
+            f'    def method_{i}(self, x: int, items: list[int]) -> int:\n'
+            f'        import json\n'
+            f'        y = [abs(v) * 2 for v in items if v % {i % 7 + 2}]\n'
+            f'        key = sorted(items, key=lambda v: helpers.weights.get(v, 0))\n'
+            f'        if x > {i}:\n'
+            f'            osp.join(str(x), json.dumps({{"y": y, "key": key}}))\n'
+            f'            self.client.session.post(helpers.config.url, data=str(y))\n'
+            f'        def inner(z: int) -> int:\n'
+            f'            return os.path.basename(str(z)).count("a") + self.method_{max(i - 1, 0)}(z, [])\n'
+            f'        return inner(x) + len(y) + helpers.compute(x, *items, scale={i})\n'
+        )
+    return '\n'.join(lines)
+
+
+def measure(visitor_class: type, tree: ast.AST, repeat: int) -> tuple[float, tuple]:
+    best = float('inf')
+    result: tuple = ()
+    for _ in range(repeat):
+        visitor = visitor_class('project.services', False)
+        start = time.perf_counter()
+        visitor.visit(tree)
+        calls = visitor.calls
+        best = min(best, time.perf_counter() - start)
+        result = (
+            visitor.imports,
+            {fn: list(calls[fn]) for fn in calls},
+            visitor.pure_functions_lineno,
+            visitor.allowed_effects,
+        )
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--functions', type=int, default=5_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    source = generate_module(args.functions)
+    tree = ast.parse(source)
+    print(f'{source.count(chr(10)) + 1} lines, {args.functions} functions')
+    before, expected = measure(NodeVisitorPurityVisitor, tree, args.repeat)
+    after, result = measure(PurityVisitor, tree, args.repeat)
+    assert result == expected, 'the visitors disagree'
+    print(f'ast.NodeVisitor:   {before * 1000:8.1f} ms')
+    print(f'iterative scanner: {after * 1000:8.1f} ms ({before / after:.1f}x faster)')
+
+
+if __name__ == '__main__':
+    main()
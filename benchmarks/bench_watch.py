@@ -0,0 +1,65 @@
+"""
+Measure the latency of watch mode (`mypy-pure --watch`) on a generated project: the time from a save to
+fresh diagnostics (one poll of the files plus the recheck), compared with a full check.
+
+The project is made of packages whose modules each import the previous module of their package, as in
+benchmarks/bench_cli.py, so a module is used by the modules after it in its package. The edits are of
+the last module of a package, which nothing uses, and of the first one, which its whole package uses.
+
+Usage:
+    python benchmarks/bench_watch.py [--packages P] [--modules M] [--functions F]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from bench_cli import generate_project
+from mypy.options import Options
+
+from mypy_pure.configuration import PurityConfig
+from mypy_pure.project import ProjectChecker
+from mypy_pure.watch import SourceWatcher
+
+
+def edit(path: str) -> None:
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n\ndef added(x: int) -> int:\n    print(x)\n    return x\n')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--packages', type=int, default=100)
+    parser.add_argument('--modules', type=int, default=50, help='modules per package')
+    parser.add_argument('--functions', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for package in range(args.packages):
+            generate_project(tmp_dir, args.modules, args.functions, f'package_{package}')
+        watcher = SourceWatcher([tmp_dir], Options())
+        checker = ProjectChecker(PurityConfig())
+        start = time.perf_counter()
+        checker.check(watcher.sources)
+        full = time.perf_counter() - start
+        print(f'{len(watcher.sources)} files, {args.functions} functions each')
+        print(f'full check:                         {full * 1000:9.1f} ms')
+
+        package = os.path.join(tmp_dir, 'package_0')
+        for label, index in (('module nothing uses', args.modules - 1), ('module its package uses', 0)):
+            edit(os.path.join(package, f'module_{index}.py'))
+            start = time.perf_counter()
+            changed, removed = watcher.poll()
+            polled = time.perf_counter()
+            checker.recheck(changed, removed)
+            end = time.perf_counter()
+            print(
+                f'save of a {label + ":":24} {(end - start) * 1000:9.1f} ms '
+                f'(poll {(polled - start) * 1000:.1f} ms, recheck {(end - polled) * 1000:.1f} ms, '
+                f'{full / (end - start):.0f}x faster)'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,3 @@
-from mypy_pure.decorators import pure  # noqa: F401
+from mypy_pure.decorators import pure
 
 __all__ = ['pure']
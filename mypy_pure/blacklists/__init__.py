@@ -0,0 +1,103 @@
+import hashlib
+import importlib
+import os
+import pkgutil
+import warnings
+from collections.abc import Iterable
+from importlib.metadata import EntryPoint, entry_points
+
+from mypy_pure.blacklists import shards
+from mypy_pure.purity.types import FuncName
+
+# Entry-point group through which installed packages contribute blacklist shards: the name of every
+# entry point is the top-level module it covers, its object an iterable of names (or a callable
+# returning one), e.g. 'requests = mypy_pure_requests:IMPURE_FUNCTIONS'
+ENTRY_POINT_GROUP = 'mypy_pure.blacklists'
+
+# Shards loaded whatever the checked modules import
+ALWAYS_LOADED = ('builtins',)
+
+
+def top_level_module(name: str) -> str:
+    return name.partition('.')[0]
+
+
+class BlacklistShards:
+    """
+    The built-in blacklist, split into one shard per top-level module, plus the shards of installed packs.
+
+    Every module of the shards package is the shard of the top-level module it is named after, with its
+    names in IMPURE_FUNCTIONS. A shard is only imported (and an entry point only loaded) the first
+    time a checked module imports its top-level module, so rules for libraries a project never
+    imports cost neither startup time nor memory. Several packs may cover the same module.
+    """
+
+    def __init__(self, use_entry_points: bool = True) -> None:
+        self.__builtin_shards = {
+            name for _, name, is_package in pkgutil.iter_modules(shards.__path__) if not is_package
+        }
+        self.__entry_points: dict[str, list[EntryPoint]] = {}
+        if use_entry_points:
+            for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+                self.__entry_points.setdefault(entry_point.name, []).append(entry_point)
+        self.__loaded: set[str] = set()
+
+    @property
+    def available(self) -> list[str]:
+        """Top-level modules with a shard."""
+        return sorted(self.__builtin_shards | set(self.__entry_points))
+
+    @property
+    def loaded(self) -> list[str]:
+        return sorted(self.__loaded)
+
+    def fingerprint(self) -> list[str]:
+        """
+        What identifies the rules of every shard without loading them, for cache keys.
+
+        Built-in shards are identified by a hash of their files, packs by their entry point and the
+        version of the distribution that provides it: never by modification times, so that every
+        installation of the same versions shares the same summary cache keys.
+        """
+        identities = []
+        for name in sorted(self.__builtin_shards):
+            path = os.path.join(shards.__path__[0], f'{name}.py')
+            try:
+                with open(path, 'rb') as f:
+                    identities.append(f'{name}:{hashlib.sha256(f.read()).hexdigest()}')
+            except OSError:  # pragma: no cover
+                identities.append(f'{name}:missing')
+        for name, shard_entry_points in sorted(self.__entry_points.items()):
+            for entry_point in shard_entry_points:
+                distribution = entry_point.dist
+                version = f'{distribution.name} {distribution.version}' if distribution is not None else ''
+                identities.append(f'{name}={entry_point.value}@{version}')
+        return identities
+
+    def load(self, names: Iterable[str]) -> list[FuncName]:
+        """Load the shards of the top-level modules of some names (imports); return the names they add."""
+        impure_functions: list[FuncName] = []
+        for module in sorted({top_level_module(name) for name in names}):
+            if module not in self.__loaded:
+                impure_functions.extend(self.__load_shard(module))
+        return impure_functions
+
+    def load_all(self) -> list[FuncName]:
+        return self.load(self.available)
+
+    def __load_shard(self, module: str) -> list[FuncName]:
+        self.__loaded.add(module)
+        impure_functions: list[FuncName] = []
+        if module in self.__builtin_shards:
+            shard = importlib.import_module(f'{shards.__name__}.{module}')
+            impure_functions.extend(shard.IMPURE_FUNCTIONS)
+        for entry_point in self.__entry_points.get(module, []):
+            try:
+                names = entry_point.load()
+                if callable(names):
+                    names = names()
+                impure_functions.extend(name for name in names if isinstance(name, str))
+            except Exception as exc:  # noqa: BLE001 - loading a pack runs the code of an installed package
+                # A broken pack must not break the type check: its rules are missing, and the user is told why
+                warnings.warn(f'mypy-pure: could not load the pack {entry_point.value}: {exc!r}', stacklevel=2)
+        return impure_functions
@@ -0,0 +1,6 @@
+# Impure functions of atexit, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'atexit.register',
+    'atexit.unregister',
+}
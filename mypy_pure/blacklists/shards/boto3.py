@@ -0,0 +1,13 @@
+# Impure functions of boto3 (AWS clients read credentials and call AWS), only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'boto3.client',
+    'boto3.resource',
+    'boto3.setup_default_session',
+    'boto3.set_stream_logger',
+    'boto3.Session.client',
+    'boto3.Session.resource',
+    'boto3.session.Session.client',
+    'boto3.session.Session.resource',
+    'boto3.s3.transfer.S3Transfer.*',
+}
@@ -0,0 +1,11 @@
+# Impure builtins, always loaded: builtins are called without being imported
+
+IMPURE_FUNCTIONS = {
+    'builtins.open',
+    'builtins.print',
+    'builtins.input',
+    'builtins.exec',
+    'builtins.eval',  # Can have side effects
+    'builtins.compile',  # Can have side effects
+    'builtins.__import__',
+}
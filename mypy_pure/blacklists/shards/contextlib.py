@@ -0,0 +1,7 @@
+# Impure functions of contextlib (context managers with side effects), only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'contextlib.redirect_stdout',
+    'contextlib.redirect_stderr',
+    'contextlib.suppress',
+}
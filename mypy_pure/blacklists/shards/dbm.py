@@ -0,0 +1,7 @@
+# Impure functions of dbm, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'dbm.open',
+    'dbm.ndbm.open',
+    'dbm.gnu.open',
+}
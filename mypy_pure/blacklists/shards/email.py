@@ -0,0 +1,8 @@
+# Impure functions of email.message (mutation), only loaded when a checked module imports email
+
+IMPURE_FUNCTIONS = {
+    'email.message.Message.attach',
+    'email.message.Message.add_header',
+    'email.message.Message.replace_header',
+    'email.message.Message.set_payload',
+}
@@ -0,0 +1,6 @@
+# Impure functions of ftplib, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'ftplib.FTP',
+    'ftplib.FTP_TLS',
+}
@@ -0,0 +1,9 @@
+# Impure functions of gc, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'gc.collect',
+    'gc.set_threshold',
+    'gc.set_debug',
+    'gc.enable',
+    'gc.disable',
+}
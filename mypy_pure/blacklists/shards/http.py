@@ -0,0 +1,6 @@
+# Impure functions of http.client, only loaded when a checked module imports http
+
+IMPURE_FUNCTIONS = {
+    'http.client.HTTPConnection',
+    'http.client.HTTPSConnection',
+}
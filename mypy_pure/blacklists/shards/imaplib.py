@@ -0,0 +1,6 @@
+# Impure functions of imaplib, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'imaplib.IMAP4',
+    'imaplib.IMAP4_SSL',
+}
@@ -0,0 +1,12 @@
+# Impure functions of logging, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'logging.debug',
+    'logging.info',
+    'logging.warning',
+    'logging.error',
+    'logging.critical',
+    'logging.log',
+    'logging.exception',
+    'logging.basicConfig',
+}
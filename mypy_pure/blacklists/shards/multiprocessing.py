@@ -0,0 +1,8 @@
+# Impure functions of multiprocessing, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'multiprocessing.Process',
+    'multiprocessing.Pool',
+    'multiprocessing.Queue',
+    'multiprocessing.Pipe',
+}
@@ -0,0 +1,58 @@
+# Impure functions of os, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    # File/Dir operations
+    'os.remove',
+    'os.unlink',
+    'os.rmdir',
+    'os.mkdir',
+    'os.makedirs',
+    'os.rename',
+    'os.replace',
+    'os.link',
+    'os.symlink',
+    'os.chmod',
+    'os.chown',
+    'os.utime',
+    'os.truncate',
+    'os.ftruncate',
+    'os.removedirs',
+    'os.renames',
+    # Process/System
+    'os.system',
+    'os.popen',
+    'os.spawnl',
+    'os.spawnle',
+    'os.spawnlp',
+    'os.spawnlpe',
+    'os.spawnv',
+    'os.spawnve',
+    'os.spawnvp',
+    'os.spawnvpe',
+    'os.execl',
+    'os.execle',
+    'os.execlp',
+    'os.execlpe',
+    'os.execv',
+    'os.execve',
+    'os.execvp',
+    'os.execvpe',
+    'os.fork',
+    'os.kill',
+    'os.abort',
+    'os.chdir',
+    'os.fchdir',
+    'os.putenv',
+    'os.unsetenv',
+    'os.setuid',
+    'os.setgid',
+    'os.setpgrp',
+    # I/O
+    'os.open',
+    'os.read',
+    'os.write',
+    'os.close',
+    'os.pipe',
+    'os.dup',
+    'os.dup2',
+}
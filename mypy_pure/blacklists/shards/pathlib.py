@@ -0,0 +1,16 @@
+# Impure functions of pathlib (write operations), only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'pathlib.Path.write_text',
+    'pathlib.Path.write_bytes',
+    'pathlib.Path.touch',
+    'pathlib.Path.mkdir',
+    'pathlib.Path.unlink',
+    'pathlib.Path.rmdir',
+    'pathlib.Path.rename',
+    'pathlib.Path.replace',
+    'pathlib.Path.chmod',
+    'pathlib.Path.lchmod',
+    'pathlib.Path.symlink_to',
+    'pathlib.Path.hardlink_to',
+}
@@ -0,0 +1,8 @@
+# Impure functions of pickle (loading can execute arbitrary code), only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'pickle.dump',
+    'pickle.dumps',
+    'pickle.load',
+    'pickle.loads',
+}
@@ -0,0 +1,6 @@
+# Impure functions of poplib, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'poplib.POP3',
+    'poplib.POP3_SSL',
+}
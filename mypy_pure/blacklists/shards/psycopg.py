@@ -0,0 +1,13 @@
+# Impure functions of psycopg 3 (PostgreSQL connections), only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'psycopg.connect',
+    'psycopg.Connection.*',
+    'psycopg.AsyncConnection.*',
+    'psycopg.Cursor.*',
+    'psycopg.AsyncCursor.*',
+    'psycopg.ServerCursor.*',
+    'psycopg.AsyncServerCursor.*',
+    'psycopg.connection.Connection.*',
+    'psycopg.cursor.Cursor.*',
+}
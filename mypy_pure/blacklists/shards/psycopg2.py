@@ -0,0 +1,14 @@
+# Impure functions of psycopg2 (PostgreSQL connections), only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'psycopg2.connect',
+    'psycopg2.extensions.connection.*',
+    'psycopg2.extensions.cursor.*',
+    'psycopg2.extras.execute_batch',
+    'psycopg2.extras.execute_values',
+    'psycopg2.extras.register_uuid',
+    'psycopg2.extras.register_hstore',
+    'psycopg2.pool.SimpleConnectionPool',
+    'psycopg2.pool.ThreadedConnectionPool',
+    'psycopg2.pool.AbstractConnectionPool.*',
+}
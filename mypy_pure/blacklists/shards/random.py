@@ -0,0 +1,6 @@
+# Impure functions of random (they change the global generator), only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'random.seed',
+    'random.setstate',
+}
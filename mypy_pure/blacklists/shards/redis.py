@@ -0,0 +1,13 @@
+# Impure functions of redis (commands sent to a server), only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'redis.from_url',
+    'redis.Redis.*',
+    'redis.StrictRedis.*',
+    'redis.client.Redis.*',
+    'redis.client.Pipeline.*',
+    'redis.cluster.RedisCluster.*',
+    'redis.asyncio.from_url',
+    'redis.asyncio.Redis.*',
+    'redis.asyncio.client.Redis.*',
+}
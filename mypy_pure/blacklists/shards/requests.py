@@ -0,0 +1,26 @@
+# Impure functions of requests (HTTP requests), only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'requests.request',
+    'requests.get',
+    'requests.options',
+    'requests.head',
+    'requests.post',
+    'requests.put',
+    'requests.patch',
+    'requests.delete',
+    'requests.api.*',
+    'requests.Session.request',
+    'requests.Session.get',
+    'requests.Session.options',
+    'requests.Session.head',
+    'requests.Session.post',
+    'requests.Session.put',
+    'requests.Session.patch',
+    'requests.Session.delete',
+    'requests.Session.send',
+    'requests.Session.close',
+    'requests.sessions.Session.request',
+    'requests.sessions.Session.send',
+    'requests.adapters.HTTPAdapter.send',
+}
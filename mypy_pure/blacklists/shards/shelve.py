@@ -0,0 +1,5 @@
+# Impure functions of shelve, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'shelve.open',
+}
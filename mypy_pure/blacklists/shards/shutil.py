@@ -0,0 +1,14 @@
+# Impure functions of shutil, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'shutil.rmtree',
+    'shutil.copy',
+    'shutil.copy2',
+    'shutil.copyfile',
+    'shutil.copytree',
+    'shutil.move',
+    'shutil.chown',
+    'shutil.disk_usage',
+    'shutil.make_archive',
+    'shutil.unpack_archive',
+}
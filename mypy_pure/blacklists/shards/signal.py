@@ -0,0 +1,7 @@
+# Impure functions of signal, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'signal.signal',
+    'signal.alarm',
+    'signal.pause',
+}
@@ -0,0 +1,7 @@
+# Impure functions of smtplib, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'smtplib.SMTP',
+    'smtplib.SMTP_SSL',
+    'smtplib.LMTP',
+}
@@ -0,0 +1,9 @@
+# Impure functions of socket, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'socket.socket',
+    'socket.create_connection',
+    'socket.create_server',
+    'socket.fromfd',
+    'socket.socketpair',
+}
@@ -0,0 +1,22 @@
+# Impure functions of SQLAlchemy (engines, connections and sessions), only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'sqlalchemy.create_engine',
+    'sqlalchemy.engine.create_engine',
+    'sqlalchemy.ext.asyncio.create_async_engine',
+    'sqlalchemy.Engine.*',
+    'sqlalchemy.engine.Engine.*',
+    'sqlalchemy.Connection.*',
+    'sqlalchemy.engine.Connection.*',
+    'sqlalchemy.orm.Session.*',
+    'sqlalchemy.orm.session.Session.*',
+    'sqlalchemy.orm.scoped_session.*',
+    'sqlalchemy.ext.asyncio.AsyncEngine.*',
+    'sqlalchemy.ext.asyncio.AsyncConnection.*',
+    'sqlalchemy.ext.asyncio.AsyncSession.*',
+    'sqlalchemy.MetaData.create_all',
+    'sqlalchemy.MetaData.drop_all',
+    'sqlalchemy.MetaData.reflect',
+    'sqlalchemy.Table.create',
+    'sqlalchemy.Table.drop',
+}
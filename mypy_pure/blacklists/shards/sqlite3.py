@@ -0,0 +1,5 @@
+# Impure functions of sqlite3, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'sqlite3.connect',
+}
@@ -0,0 +1,11 @@
+# Impure functions of subprocess, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'subprocess.run',
+    'subprocess.call',
+    'subprocess.check_call',
+    'subprocess.check_output',
+    'subprocess.Popen',
+    'subprocess.getstatusoutput',
+    'subprocess.getoutput',
+}
@@ -0,0 +1,12 @@
+# Impure functions of sys, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'sys.exit',
+    'sys.stdout.write',
+    'sys.stderr.write',
+    'sys.stdin.read',
+    'sys.stdin.readline',
+    'sys.setrecursionlimit',
+    'sys.settrace',
+    'sys.setprofile',
+}
@@ -0,0 +1,5 @@
+# Impure functions of telnetlib, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'telnetlib.Telnet',
+}
@@ -0,0 +1,9 @@
+# Impure functions of tempfile, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'tempfile.TemporaryFile',
+    'tempfile.NamedTemporaryFile',
+    'tempfile.TemporaryDirectory',
+    'tempfile.mkstemp',
+    'tempfile.mkdtemp',
+}
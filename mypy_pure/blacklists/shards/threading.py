@@ -0,0 +1,10 @@
+# Impure functions of threading, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'threading.Thread',
+    'threading.Lock',
+    'threading.RLock',
+    'threading.Semaphore',
+    'threading.Event',
+    'threading.Timer',
+}
@@ -0,0 +1,5 @@
+# Impure functions of time, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'time.sleep',
+}
@@ -0,0 +1,7 @@
+# Impure functions of urllib, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'urllib.request.urlopen',
+    'urllib.request.urlretrieve',
+    'urllib.request.install_opener',
+}
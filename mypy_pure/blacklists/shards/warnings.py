@@ -0,0 +1,8 @@
+# Impure functions of warnings, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'warnings.warn',
+    'warnings.warn_explicit',
+    'warnings.simplefilter',
+    'warnings.filterwarnings',
+}
@@ -0,0 +1,7 @@
+# Impure functions of webbrowser, only loaded when a checked module imports it
+
+IMPURE_FUNCTIONS = {
+    'webbrowser.open',
+    'webbrowser.open_new',
+    'webbrowser.open_new_tab',
+}
@@ -0,0 +1,390 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any, Protocol
+
+# Bump whenever the analysis or the layout of the entries changes: old entries are then ignored.
+CACHE_VERSION = 6
+CACHE_DIR_NAME = '.mypy_pure_cache'
+DEFAULT_MAX_ENTRIES = 20000
+
+CacheEntry = dict[str, Any]
+
+# Backends of the summary cache, as the cache_backend option names them
+DIRECTORY_BACKEND = 'directory'
+SQLITE_BACKEND = 'sqlite'
+CACHE_BACKENDS = (DIRECTORY_BACKEND, SQLITE_BACKEND)
+
+
+@contextmanager
+def atomic_write(path: str, suffix: str = '') -> Iterator[str]:
+    """
+    Yield a temporary path in the directory of a file, moved over the file once the block succeeds,
+    so that readers see either the old file or the new one; removed when the block fails.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=suffix)
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:  # pragma: no cover
+            pass
+        raise
+
+
+class CacheBackend(Protocol):
+    """
+    Where summary cache entries are stored. Entries are addressed by SummaryCache.key, which only
+    depends on the content of a module and on the rules, so a cache can be shared by every checkout
+    of a project. Backends never raise: an entry that cannot be read is a miss, one that cannot be
+    written is dropped.
+    """
+
+    @property
+    def hits(self) -> int: ...
+
+    @property
+    def misses(self) -> int: ...
+
+    @property
+    def location(self) -> str: ...
+
+    def get(self, key: str) -> CacheEntry | None: ...
+
+    def put(self, key: str, entry: CacheEntry) -> None: ...
+
+    def flush(self) -> None:
+        """Write what the backend may have kept for later, e.g. which entries were used."""
+
+    def close(self) -> None:
+        """Flush, and release what the backend keeps open; it is opened again when used."""
+
+
+class SummaryCache:
+    """
+    On-disk cache of per-module purity summaries.
+
+    Every entry is a JSON file named after its key, inside a directory that depends on CACHE_VERSION.
+    Writes are atomic, unreadable or foreign entries are treated as misses, so the directory can be
+    deleted at any time. The number of entries is bounded: when it grows over max_entries, the least
+    recently used ones (by file modification time, refreshed on every hit) are evicted.
+    """
+
+    def __init__(self, root: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.__directory = os.path.join(root, f'v{CACHE_VERSION}')
+        self.__max_entries = max(max_entries, 1)
+        self.__entry_count: int | None = None
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    @property
+    def location(self) -> str:
+        return self.__directory
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def fingerprint(*name_sets: Iterable[str]) -> str:
+        """Stable digest of several collections of names, e.g. the active blacklist and whitelist."""
+        digest = hashlib.sha256()
+        for names in name_sets:
+            for name in sorted(names):
+                digest.update(name.encode('utf-8'))
+                digest.update(b'\n')
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(module: str, content_hash: str, config_fingerprint: str) -> str:
+        return hashlib.sha256(f'{module}\0{content_hash}\0{config_fingerprint}'.encode()).hexdigest()
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.__directory, key[:2], f'{key}.json')
+
+    def get(self, key: str) -> CacheEntry | None:
+        path = self.__path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.__misses += 1
+            return None
+        if not isinstance(entry, dict) or entry.get('version') != CACHE_VERSION or entry.get('key') != key:
+            self.__misses += 1
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:  # pragma: no cover
+            pass
+        self.__hits += 1
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        path = self.__path(key)
+        try:
+            existed = os.path.exists(path)
+            with atomic_write(path, '.json') as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({**entry, 'version': CACHE_VERSION, 'key': key}, f, separators=(',', ':'))
+        except OSError:  # pragma: no cover
+            # A read-only or full disk must never break the type check
+            return
+
+        if not existed:
+            if self.__entry_count is None:
+                self.__entry_count = len(self.__entry_paths())
+            else:
+                self.__entry_count += 1
+            if self.__entry_count > self.__max_entries:
+                self.__evict()
+
+    def flush(self) -> None:
+        # Entries are written as they come, and marked as used on every hit
+        pass
+
+    def close(self) -> None:
+        # Nothing is kept open
+        pass
+
+    def __entry_paths(self) -> list[str]:
+        paths: list[str] = []
+        try:
+            with os.scandir(self.__directory) as buckets:
+                for bucket in buckets:
+                    if not bucket.is_dir():
+                        continue
+                    with os.scandir(bucket.path) as entries:
+                        paths.extend(e.path for e in entries if e.name.endswith('.json') and e.name[0] != '.')
+        except OSError:  # pragma: no cover
+            pass
+        return paths
+
+    def __evict(self) -> None:
+        """Remove the least recently used entries, leaving some room so eviction does not run on every write."""
+        timestamps = []
+        for path in self.__entry_paths():
+            try:
+                timestamps.append((os.stat(path).st_mtime_ns, path))
+            except OSError:  # pragma: no cover
+                continue
+        timestamps.sort()
+        target = self.__max_entries * 9 // 10
+        excess = max(len(timestamps) - target, 0)
+        for _, path in timestamps[:excess]:
+            try:
+                os.remove(path)
+            except OSError:  # pragma: no cover
+                pass
+        self.__entry_count = len(timestamps) - excess
+
+
+class SqliteSummaryCache:
+    """
+    Summary cache in a single SQLite database, in write-ahead logging mode.
+
+    Every write is a transaction, so readers never see half an entry, and several mypy processes
+    can read while one writes; writers wait for each other (up to a timeout, after which the entry
+    is dropped). The database file depends on CACHE_VERSION, like the directory of SummaryCache. The
+    entries used by a run are marked as such when the run is done (flush), not on every hit, and
+    the least recently used entries are evicted when there are more than max_entries.
+
+    Write-ahead logging needs the processes to share memory: the database must be on a local disk.
+    """
+
+    TIMEOUT = 30.0  # seconds a writer waits for another one
+
+    def __init__(self, root: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.__path = os.path.join(root, f'summaries-v{CACHE_VERSION}.sqlite')
+        self.__max_entries = max(max_entries, 1)
+        self.__connection: sqlite3.Connection | None = None
+        self.__used: set[str] = set()  # keys of the entries read since the last flush
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def location(self) -> str:
+        return self.__path
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def __connect(self) -> sqlite3.Connection:
+        if self.__connection is None:
+            os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+            # Autocommit: every statement is its own transaction
+            connection = sqlite3.connect(self.__path, timeout=self.TIMEOUT, isolation_level=None)
+            try:
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute('PRAGMA synchronous=NORMAL')
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS entries '
+                    '(key TEXT PRIMARY KEY, entry TEXT NOT NULL, used INTEGER NOT NULL)'
+                )
+                connection.execute('CREATE INDEX IF NOT EXISTS entries_used ON entries (used)')
+            except sqlite3.Error:
+                connection.close()
+                raise
+            self.__connection = connection
+        return self.__connection
+
+    def get(self, key: str) -> CacheEntry | None:
+        try:
+            row = self.__connect().execute('SELECT entry FROM entries WHERE key = ?', (key,)).fetchone()
+            entry = json.loads(row[0]) if row is not None else None
+        except (OSError, ValueError, sqlite3.Error):
+            entry = None
+        if not isinstance(entry, dict) or entry.get('key') != key:
+            self.__misses += 1
+            return None
+        self.__used.add(key)
+        self.__hits += 1
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        data = json.dumps({**entry, 'version': CACHE_VERSION, 'key': key}, separators=(',', ':'))
+        try:
+            connection = self.__connect()
+            connection.execute(
+                'INSERT OR REPLACE INTO entries (key, entry, used) VALUES (?, ?, ?)', (key, data, time.time_ns())
+            )
+            self.__used.discard(key)
+        except (OSError, sqlite3.Error):  # pragma: no cover
+            # A locked, read-only or full database must never break the type check
+            pass
+
+    def flush(self) -> None:
+        if self.__connection is None:
+            return
+        try:
+            now = time.time_ns()
+            connection = self.__connection
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.executemany('UPDATE entries SET used = ? WHERE key = ?', [(now, k) for k in self.__used])
+                (count,) = connection.execute('SELECT COUNT(*) FROM entries').fetchone()
+                if count > self.__max_entries:
+                    # Leave some room, so eviction does not run on every build
+                    excess = count - self.__max_entries * 9 // 10
+                    connection.execute(
+                        'DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used LIMIT ?)', (excess,)
+                    )
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        except sqlite3.Error:  # pragma: no cover
+            pass
+        self.__used.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+
+def open_cache(
+    backend: str, location: str | None, mypy_cache_dir: str, max_entries: int = DEFAULT_MAX_ENTRIES
+) -> CacheBackend | None:
+    """
+    Build the summary cache of a backend. It lives in location when one is given (e.g. a directory
+    shared by a team), otherwise next to mypy's cache directory, and is disabled with mypy's cache.
+    """
+    if location is None:
+        if not mypy_cache_dir or os.path.abspath(mypy_cache_dir) == os.path.abspath(os.devnull):
+            return None
+        location = os.path.join(os.path.dirname(os.path.abspath(mypy_cache_dir)), CACHE_DIR_NAME)
+    if backend == SQLITE_BACKEND:
+        return SqliteSummaryCache(location, max_entries=max_entries)
+    return SummaryCache(location, max_entries=max_entries)
+
+
+class DependencyRecords:
+    """
+    Files the verdicts of every module with @pure functions depended on in the previous run.
+
+    mypy only rechecks a module when the interface of one of its imports changes, but adding a print
+    to the body of a helper makes the @pure functions calling it impure. The plugin reports a digest
+    of the state of these files through report_config_data, and keeps the list of files here, inside
+    mypy's own cache directory, so that mypy can tell on the next run whether the module must be
+    checked again.
+
+    The calls that mypy found to be impure from the type of their receiver are kept the same way,
+    in records of another kind, for the modules mypy does not check again.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.__directory = directory
+
+    @classmethod
+    def in_mypy_cache(cls, mypy_cache_dir: str, kind: str = 'dependencies') -> 'DependencyRecords | None':
+        """Build the records stored inside mypy's cache directory, or None if mypy's cache is disabled."""
+        if not mypy_cache_dir or os.path.abspath(mypy_cache_dir) == os.path.abspath(os.devnull):
+            return None
+        return cls(os.path.join(mypy_cache_dir, 'mypy_pure', f'v{CACHE_VERSION}', kind))
+
+    def __path(self, module: str) -> str:
+        return os.path.join(self.__directory, f'{module}.json')
+
+    def get(self, module: str) -> list[Any] | None:
+        try:
+            with open(self.__path(module), 'r', encoding='utf-8') as f:
+                paths = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return paths if isinstance(paths, list) else None
+
+    def put(self, module: str, paths: list[Any]) -> None:
+        path = self.__path(module)
+        try:
+            with atomic_write(path, '.json') as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(paths, f)
+        except OSError:  # pragma: no cover
+            return
+
+    def remove(self, module: str) -> None:
+        try:
+            os.remove(self.__path(module))
+        except OSError:
+            pass
+
+    @staticmethod
+    def fingerprint(paths: Iterable[str]) -> str:
+        """Digest of the current size and modification time of some files (missing files included)."""
+        digest = hashlib.sha256()
+        for path in sorted(paths):
+            try:
+                stat = os.stat(path)
+                state = f'{stat.st_mtime_ns}:{stat.st_size}'
+            except OSError:
+                state = 'missing'
+            digest.update(f'{path}\0{state}\n'.encode())
+        return digest.hexdigest()
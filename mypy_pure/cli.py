@@ -0,0 +1,253 @@
+"""
+Check @pure functions without running a full mypy type check.
+
+Usage:
+    mypy-pure [paths ...] [--config-file FILE] [--jobs N] [--demand-driven | --watch [--interval SECONDS]]
+    mypy-pure lsp [--config-file FILE]
+    mypy-pure export --shard I/N [paths ...] [--output FILE] [--config-file FILE] [--jobs N]
+    mypy-pure merge ARTIFACT [ARTIFACT ...] [--config-file FILE]
+    mypy-pure index [paths ...] [--output FILE] [--config-file FILE] [--jobs N]
+    mypy-pure query {callers,callees,why} NAME [--transitive] [--index FILE]
+    python -m mypy_pure [paths ...]
+"""
+
+import argparse
+import gc
+import os
+import sys
+from collections.abc import Callable
+
+from mypy.find_sources import InvalidSourceList, create_source_list
+from mypy.options import Options
+
+from mypy_pure import lsp
+from mypy_pure.configuration import CONFIG_FILES, PurityConfig, find_config_file
+from mypy_pure.index import DEFAULT_INDEX, InvalidIndex, PurityIndex, write_index
+from mypy_pure.project import ProjectChecker, Violation
+from mypy_pure.shards import InvalidArtifact, ShardArtifact, parse_shard, select_shard
+from mypy_pure.watch import DEFAULT_INTERVAL, SourceWatcher, watch
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='mypy-pure', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('paths', nargs='*', default=['.'], help='files and directories to check (default: .)')
+    parser.add_argument(
+        '--config-file', help=f'file with a [mypy-pure] section (default: first of {", ".join(CONFIG_FILES)})'
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=os.cpu_count() or 1, help='number of processes (default: number of CPUs)'
+    )
+    parser.add_argument(
+        '--demand-driven',
+        action='store_true',
+        help='only analyze the functions @pure functions reach, in one process (not with --watch)',
+    )
+    parser.add_argument(
+        '-w', '--watch', action='store_true', help='check again the files that change, until interrupted'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f'seconds between two polls of the files in watch mode (default: {DEFAULT_INTERVAL})',
+    )
+    return parser
+
+
+def report(checker: ProjectChecker, violations: list[Violation], sources: int) -> int:
+    """Print the errors and violations of a check like mypy does; return the exit status."""
+    for error in checker.errors:
+        sys.stdout.write(f'{error}\n')
+    for violation in violations:
+        sys.stdout.write(f'{violation.format()}\n')
+    if checker.skipped:
+        counts: dict[str, int] = {}
+        for reason in checker.skipped.values():
+            counts[reason] = counts.get(reason, 0) + 1
+        details = ', '.join(f'{reason}: {count}' for reason, count in sorted(counts.items()))
+        sys.stdout.write(f'Skipped {len(checker.skipped)} source files ({details})\n')
+    checked = sources - len(checker.skipped)
+
+    if checker.errors:
+        sys.stdout.write(f'Found {len(checker.errors)} files that could not be parsed\n')
+        return 2
+    if violations:
+        files = len({violation.path for violation in violations})
+        sys.stdout.write(
+            f'Found {len(violations)} error{"s" if len(violations) != 1 else ""} in {files} '
+            f'file{"s" if files != 1 else ""} (checked {checked} source files)\n'
+        )
+        return 1
+    sys.stdout.write(f'Success: no issues found in {checked} source files\n')
+    return 0
+
+
+def shard_type(text: str) -> tuple[int, int]:
+    try:
+        return parse_shard(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def export_main(argv: list[str]) -> int:
+    """Analyze one shard of the sources and write its artifact, for `mypy-pure merge`."""
+    parser = argparse.ArgumentParser(
+        prog='mypy-pure export', description='Analyze one shard of a project, for mypy-pure merge.'
+    )
+    parser.add_argument('paths', nargs='*', default=['.'], help='files and directories to check (default: .)')
+    parser.add_argument('--shard', type=shard_type, required=True, help='the shard to analyze: I/N, from 1/N to N/N')
+    parser.add_argument('-o', '--output', help='artifact to write (default: mypy-pure-shard-I-of-N.json)')
+    parser.add_argument('--config-file', help='file with a [mypy-pure] section')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=os.cpu_count() or 1, help='number of processes (default: number of CPUs)'
+    )
+    args = parser.parse_args(argv)
+    index, count = args.shard
+    options = Options()
+    try:
+        sources = select_shard(create_source_list(args.paths, options), index, count)
+    except InvalidSourceList as exc:
+        sys.stderr.write(f'mypy-pure: {exc}\n')
+        return 2
+    checker = ProjectChecker(PurityConfig.from_file(args.config_file or find_config_file()), options)
+    checker.analyze(sources, jobs=max(1, args.jobs))
+    output = args.output or f'mypy-pure-shard-{index}-of-{count}.json'
+    checker.export(args.shard, len(sources)).write(output)
+    sys.stdout.write(
+        f'Analyzed {len(checker.modules)} of {len(sources)} source files of shard {index}/{count} into {output}\n'
+    )
+    return 0
+
+
+def merge_main(argv: list[str]) -> int:
+    """Check the artifacts of every shard of a project, as one unsharded run would check it."""
+    parser = argparse.ArgumentParser(
+        prog='mypy-pure merge', description='Check the artifacts of every shard written by mypy-pure export.'
+    )
+    parser.add_argument('artifacts', nargs='+', help='artifacts of all the shards')
+    parser.add_argument('--config-file', help='file with a [mypy-pure] section')
+    args = parser.parse_args(argv)
+    try:
+        artifact = ShardArtifact.merge([ShardArtifact.read(path) for path in args.artifacts])
+    except InvalidArtifact as exc:
+        sys.stderr.write(f'mypy-pure: {exc}\n')
+        return 2
+    checker = ProjectChecker(PurityConfig.from_file(args.config_file or find_config_file()))
+    return report(checker, checker.check_artifact(artifact), artifact.sources)
+
+
+def index_main(argv: list[str]) -> int:
+    """Check a project and write its index, for `mypy-pure query`."""
+    parser = argparse.ArgumentParser(prog='mypy-pure index', description='Check a project and index it.')
+    parser.add_argument('paths', nargs='*', default=['.'], help='files and directories to index (default: .)')
+    parser.add_argument('-o', '--output', default=DEFAULT_INDEX, help=f'index to write (default: {DEFAULT_INDEX})')
+    parser.add_argument('--config-file', help='file with a [mypy-pure] section')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=os.cpu_count() or 1, help='number of processes (default: number of CPUs)'
+    )
+    args = parser.parse_args(argv)
+    options = Options()
+    try:
+        sources = create_source_list(args.paths, options)
+    except InvalidSourceList as exc:
+        sys.stderr.write(f'mypy-pure: {exc}\n')
+        return 2
+    checker = ProjectChecker(PurityConfig.from_file(args.config_file or find_config_file()), options)
+    violations = checker.check(sources, jobs=max(1, args.jobs))
+    for error in checker.errors:
+        sys.stdout.write(f'{error}\n')
+    functions, calls = write_index(args.output, checker, violations)
+    sys.stdout.write(
+        f'Indexed {functions} functions and {calls} calls of {len(checker.modules)} modules into {args.output}\n'
+    )
+    return 0
+
+
+def query_main(argv: list[str]) -> int:
+    """Answer a question from the index written by `mypy-pure index`."""
+    parser = argparse.ArgumentParser(prog='mypy-pure query', description='Query the index of mypy-pure index.')
+    parser.add_argument(
+        'question',
+        choices=['callers', 'callees', 'why'],
+        help='functions calling NAME, names FUNCTION calls, or why FUNCTION is impure',
+    )
+    parser.add_argument('name', help="qualified name; callers and callees accept globs, e.g. 'requests.*'")
+    parser.add_argument('-t', '--transitive', action='store_true', help='callers and callees through other functions')
+    parser.add_argument('--index', default=DEFAULT_INDEX, help=f'index to query (default: {DEFAULT_INDEX})')
+    args = parser.parse_args(argv)
+    try:
+        index = PurityIndex(args.index)
+    except InvalidIndex as exc:
+        sys.stderr.write(f'mypy-pure: {exc}\n')
+        return 2
+    try:
+        if args.question == 'why':
+            answer = index.why(args.name)
+            if answer is None:
+                sys.stderr.write(f'mypy-pure: {args.name} is not a function of the index\n')
+                return 2
+            path, effects = answer
+            if not path:
+                sys.stdout.write(f'{args.name} is pure\n')
+            else:
+                sys.stdout.write(f'{args.name} is impure ({", ".join(effects)}): {" -> ".join(path)}\n')
+            return 0
+        neighbours = index.callees if args.question == 'callees' else index.callers
+        names = neighbours(args.name, args.transitive)
+        for name in names:
+            sys.stdout.write(f'{name}\n')
+        return 0 if names else 1
+    finally:
+        index.close()
+
+
+# Subcommands, by the first argument (a path with the same name must be written e.g. './lsp')
+COMMANDS: dict[str, Callable[[list[str]], int]] = {
+    'lsp': lsp.main,
+    'export': export_main,
+    'merge': merge_main,
+    'index': index_main,
+    'query': query_main,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.demand_driven and args.watch:
+        parser.error('--demand-driven cannot be used with --watch')
+    config = PurityConfig.from_file(args.config_file or find_config_file())
+
+    options = Options()
+    checker = ProjectChecker(config, options)
+    jobs = max(1, args.jobs)
+    try:
+        if args.watch:
+            watcher = SourceWatcher(args.paths, options)
+            return watch(
+                checker,
+                watcher,
+                lambda violations: report(checker, violations, len(watcher.sources)),
+                jobs=jobs,
+                interval=args.interval,
+            )
+        sources = create_source_list(args.paths, options)
+    except InvalidSourceList as exc:
+        sys.stderr.write(f'mypy-pure: {exc}\n')
+        return 2
+
+    gc_was_enabled = gc.isenabled()
+    if args.demand_driven:
+        # Every tree is kept until the last function is visited: collecting garbage would walk them over and over
+        gc.disable()
+    try:
+        violations = checker.check(sources, jobs=jobs, demand_driven=args.demand_driven)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return report(checker, violations, len(sources))
@@ -1,209 +1,153 @@
-BLACKLIST = {
-    # === Builtins ===
-    'builtins.open',
-    'builtins.print',
-    'builtins.input',
-    'builtins.exec',
-    'builtins.eval',  # Can have side effects
-    'builtins.compile',  # Can have side effects
-    'builtins.__import__',
-    # === os module - File/Dir operations ===
-    'os.remove',
-    'os.unlink',
-    'os.rmdir',
-    'os.mkdir',
-    'os.makedirs',
-    'os.rename',
-    'os.replace',
-    'os.link',
-    'os.symlink',
-    'os.chmod',
-    'os.chown',
-    'os.utime',
-    'os.truncate',
-    'os.ftruncate',
-    'os.removedirs',
-    'os.renames',
-    # === os module - Process/System ===
-    'os.system',
-    'os.popen',
-    'os.spawnl',
-    'os.spawnle',
-    'os.spawnlp',
-    'os.spawnlpe',
-    'os.spawnv',
-    'os.spawnve',
-    'os.spawnvp',
-    'os.spawnvpe',
-    'os.execl',
-    'os.execle',
-    'os.execlp',
-    'os.execlpe',
-    'os.execv',
-    'os.execve',
-    'os.execvp',
-    'os.execvpe',
-    'os.fork',
-    'os.kill',
-    'os.abort',
-    'os.chdir',
-    'os.fchdir',
-    'os.putenv',
-    'os.unsetenv',
-    'os.setuid',
-    'os.setgid',
-    'os.setpgrp',
-    # === os module - I/O ===
-    'os.open',
-    'os.read',
-    'os.write',
-    'os.close',
-    'os.pipe',
-    'os.dup',
-    'os.dup2',
-    # === sys module ===
-    'sys.exit',
-    'sys.stdout.write',
-    'sys.stderr.write',
-    'sys.stdin.read',
-    'sys.stdin.readline',
-    'sys.setrecursionlimit',
-    'sys.settrace',
-    'sys.setprofile',
-    # === subprocess ===
-    'subprocess.run',
-    'subprocess.call',
-    'subprocess.check_call',
-    'subprocess.check_output',
-    'subprocess.Popen',
-    'subprocess.getstatusoutput',
-    'subprocess.getoutput',
-    # === shutil ===
-    'shutil.rmtree',
-    'shutil.copy',
-    'shutil.copy2',
-    'shutil.copyfile',
-    'shutil.copytree',
-    'shutil.move',
-    'shutil.chown',
-    'shutil.disk_usage',
-    'shutil.make_archive',
-    'shutil.unpack_archive',
-    # === time ===
-    'time.sleep',
-    # === random (state modification) ===
-    'random.seed',
-    'random.setstate',
-    # === socket ===
-    'socket.socket',
-    'socket.create_connection',
-    'socket.create_server',
-    'socket.fromfd',
-    'socket.socketpair',
-    # === pathlib (write operations) ===
-    'pathlib.Path.write_text',
-    'pathlib.Path.write_bytes',
-    'pathlib.Path.touch',
-    'pathlib.Path.mkdir',
-    'pathlib.Path.unlink',
-    'pathlib.Path.rmdir',
-    'pathlib.Path.rename',
-    'pathlib.Path.replace',
-    'pathlib.Path.chmod',
-    'pathlib.Path.lchmod',
-    'pathlib.Path.symlink_to',
-    'pathlib.Path.hardlink_to',
-    # === tempfile ===
-    'tempfile.TemporaryFile',
-    'tempfile.NamedTemporaryFile',
-    'tempfile.TemporaryDirectory',
-    'tempfile.mkstemp',
-    'tempfile.mkdtemp',
-    # === logging ===
-    'logging.debug',
-    'logging.info',
-    'logging.warning',
-    'logging.error',
-    'logging.critical',
-    'logging.log',
-    'logging.exception',
-    'logging.basicConfig',
-    # === pickle (can execute arbitrary code) ===
-    'pickle.dump',
-    'pickle.dumps',
-    'pickle.load',
-    'pickle.loads',
-    # === shelve (persistent storage) ===
-    'shelve.open',
-    # === dbm (database) ===
-    'dbm.open',
-    'dbm.ndbm.open',
-    'dbm.gnu.open',
-    # === sqlite3 ===
-    'sqlite3.connect',
-    # === threading ===
-    'threading.Thread',
-    'threading.Lock',
-    'threading.RLock',
-    'threading.Semaphore',
-    'threading.Event',
-    'threading.Timer',
-    # === multiprocessing ===
-    'multiprocessing.Process',
-    'multiprocessing.Pool',
-    'multiprocessing.Queue',
-    'multiprocessing.Pipe',
-    # === signal ===
-    'signal.signal',
-    'signal.alarm',
-    'signal.pause',
-    # === atexit ===
-    'atexit.register',
-    'atexit.unregister',
-    # === webbrowser ===
-    'webbrowser.open',
-    'webbrowser.open_new',
-    'webbrowser.open_new_tab',
-    # === email.message (mutation) ===
-    'email.message.Message.attach',
-    'email.message.Message.add_header',
-    'email.message.Message.replace_header',
-    'email.message.Message.set_payload',
-    # === http.client ===
-    'http.client.HTTPConnection',
-    'http.client.HTTPSConnection',
-    # === urllib ===
-    'urllib.request.urlopen',
-    'urllib.request.urlretrieve',
-    'urllib.request.install_opener',
-    # === ftplib ===
-    'ftplib.FTP',
-    'ftplib.FTP_TLS',
-    # === smtplib ===
-    'smtplib.SMTP',
-    'smtplib.SMTP_SSL',
-    'smtplib.LMTP',
-    # === poplib ===
-    'poplib.POP3',
-    'poplib.POP3_SSL',
-    # === imaplib ===
-    'imaplib.IMAP4',
-    'imaplib.IMAP4_SSL',
-    # === telnetlib ===
-    'telnetlib.Telnet',
-    # === gc (garbage collection) ===
-    'gc.collect',
-    'gc.set_threshold',
-    'gc.set_debug',
-    'gc.enable',
-    'gc.disable',
-    # === warnings ===
-    'warnings.warn',
-    'warnings.warn_explicit',
-    'warnings.simplefilter',
-    'warnings.filterwarnings',
-    # === contextlib (some context managers have side effects) ===
-    'contextlib.redirect_stdout',
-    'contextlib.redirect_stderr',
-    'contextlib.suppress',
-}
+import configparser
+import os
+from typing import Any
+
+from mypy_pure.blacklists import BlacklistShards
+from mypy_pure.cache import CACHE_BACKENDS, DEFAULT_MAX_ENTRIES, DIRECTORY_BACKEND
+from mypy_pure.pipeline import default_jobs
+from mypy_pure.purity.types import FuncName
+
+CONFIG_SECTION = 'mypy-pure'
+
+# Configuration files looked up in a directory, in mypy's order
+CONFIG_FILES = ('mypy.ini', '.mypy.ini', 'setup.cfg')
+
+
+def find_config_file(directory: str = '.') -> str | None:
+    for config_file in CONFIG_FILES:
+        path = os.path.join(directory, config_file) if directory != '.' else config_file
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def __getattr__(name: str) -> Any:
+    # BLACKLIST used to be a set defined here; the built-in rules are now lazily loaded shards
+    if name == 'BLACKLIST':
+        return set(BlacklistShards(use_entry_points=False).load_all())
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class PurityConfig:
+    """The [mypy-pure] section of a mypy configuration file, shared by the mypy plugin and the CLI."""
+
+    def __init__(self) -> None:
+        self.__impure_functions: set[FuncName] = set()
+        self.__pure_functions: set[FuncName] = set()
+        self.__cache = True
+        self.__cache_max_entries = DEFAULT_MAX_ENTRIES
+        self.__cache_backend = DIRECTORY_BACKEND
+        self.__cache_path: str | None = None
+        self.__discover_by_import = False
+        self.__skip_modules: list[str] = []
+        self.__include_modules: list[str] = []
+        self.__analysis_jobs = default_jobs()
+        self.__stdlib_database = True
+        self.__stdlib_database_path: str | None = None
+
+    @classmethod
+    def from_file(cls, config_file: str | None) -> 'PurityConfig':
+        """Read the configuration; a missing or unreadable file leaves the defaults in place."""
+        purity_config = cls()
+        if not config_file:
+            return purity_config
+
+        config = configparser.ConfigParser()
+        try:
+            config.read(config_file)
+            if CONFIG_SECTION in config:
+                section = config[CONFIG_SECTION]
+                # Impure functions (blacklist) and pure functions (whitelist)
+                purity_config.__impure_functions = cls.__names(section.get('impure_functions', ''))
+                purity_config.__pure_functions = cls.__names(section.get('pure_functions', ''))
+
+                # Persistent summary cache
+                purity_config.__cache = section.getboolean('cache', fallback=True)
+                purity_config.__cache_max_entries = section.getint('cache_max_entries', fallback=DEFAULT_MAX_ENTRIES)
+                cache_backend = section.get('cache_backend', '').strip().lower()
+                if cache_backend in CACHE_BACKENDS:
+                    purity_config.__cache_backend = cache_backend
+                cache_path = section.get('cache_path', '').strip()
+                if cache_path:
+                    purity_config.__cache_path = os.path.expanduser(os.path.expandvars(cache_path))
+
+                # __mypy_pure__ is read statically unless importing the modules is explicitly allowed
+                purity_config.__discover_by_import = section.getboolean('discover_by_import', fallback=False)
+
+                # Modules that are not analyzed, on top of the standard library and site-packages
+                purity_config.__skip_modules = cls.__patterns(section.get('skip_modules', ''))
+                purity_config.__include_modules = cls.__patterns(section.get('include_modules', ''))
+
+                # Background workers of the plugin (0: analyze modules while mypy waits)
+                analysis_jobs = section.getint('analysis_jobs', fallback=purity_config.__analysis_jobs)
+                purity_config.__analysis_jobs = max(0, analysis_jobs)
+
+                # Verdicts of the standard library generated from typeshed, in a mapped file
+                purity_config.__stdlib_database = section.getboolean('stdlib_database', fallback=True)
+                database_path = section.get('stdlib_database_path', '').strip()
+                if database_path:
+                    purity_config.__stdlib_database_path = os.path.expanduser(os.path.expandvars(database_path))
+        except (OSError, ValueError, configparser.Error):  # pragma: no cover
+            # If config file can't be read or parsed, continue with defaults
+            pass
+        return purity_config
+
+    @staticmethod
+    def __names(value: str) -> set[FuncName]:
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+    @staticmethod
+    def __patterns(value: str) -> list[str]:
+        return [pattern.strip() for pattern in value.split(',') if pattern.strip()]
+
+    @property
+    def impure_functions(self) -> set[FuncName]:
+        return self.__impure_functions
+
+    @property
+    def pure_functions(self) -> set[FuncName]:
+        return self.__pure_functions
+
+    @property
+    def cache(self) -> bool:
+        return self.__cache
+
+    @property
+    def cache_max_entries(self) -> int:
+        return self.__cache_max_entries
+
+    @property
+    def cache_backend(self) -> str:
+        """How summary cache entries are stored: 'directory' (one file per entry) or 'sqlite'."""
+        return self.__cache_backend
+
+    @property
+    def cache_path(self) -> str | None:
+        """Where the summary cache is stored, e.g. on a shared mount; None for next to mypy's cache directory."""
+        return self.__cache_path
+
+    @property
+    def discover_by_import(self) -> bool:
+        return self.__discover_by_import
+
+    @property
+    def skip_modules(self) -> list[str]:
+        return self.__skip_modules
+
+    @property
+    def include_modules(self) -> list[str]:
+        return self.__include_modules
+
+    @property
+    def analysis_jobs(self) -> int:
+        """Background analysis workers of the plugin; by default some on free-threaded builds, none with a GIL."""
+        return self.__analysis_jobs
+
+    @property
+    def stdlib_database(self) -> bool:
+        return self.__stdlib_database
+
+    @property
+    def stdlib_database_path(self) -> str | None:
+        """Where the stdlib database is read (and built if missing); None for the user cache directory."""
+        return self.__stdlib_database_path
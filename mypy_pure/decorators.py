@@ -1,9 +1,34 @@
-from typing import Callable, ParamSpec, TypeVar, cast
+from collections.abc import Callable, Iterable
+from typing import Literal, ParamSpec, TypeVar, overload
 
 P = ParamSpec('P')
 R = TypeVar('R')
 
+# Effect kinds a @pure function may be allowed to have, see mypy_pure.purity.effects
+EffectKind = Literal['file_io', 'network', 'process', 'nondeterminism', 'global_state', 'logging']
 
-def pure(func: Callable[P, R]) -> Callable[P, R]:
-    setattr(func, '__pure__', True)
-    return cast(Callable[P, R], func)
+
+@overload
+def pure(func: Callable[P, R]) -> Callable[P, R]: ...
+
+
+@overload
+def pure(*, allow: Iterable[EffectKind] = ()) -> Callable[[Callable[P, R]], Callable[P, R]]: ...
+
+
+def pure(
+    func: Callable[P, R] | None = None, *, allow: Iterable[EffectKind] = ()
+) -> Callable[P, R] | Callable[[Callable[P, R]], Callable[P, R]]:
+    """
+    Declare a function pure. With allow, it may still reach blacklisted calls of the given effect
+    kinds, e.g. @pure(allow=['logging']), and is only impure when it reaches any other kind.
+    """
+    allowed = frozenset(allow)
+
+    def decorate(f: Callable[P, R]) -> Callable[P, R]:
+        f.__pure__ = True  # type: ignore[attr-defined]
+        if allowed:
+            f.__pure_allow__ = allowed  # type: ignore[attr-defined]
+        return f
+
+    return decorate if func is None else decorate(func)
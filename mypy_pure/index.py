@@ -0,0 +1,224 @@
+"""
+Queryable index of a checked project: who calls what, and why functions are impure.
+
+`mypy-pure index` checks a project and stores its call graph, with the calls resolved to the
+functions they reach across modules, its imports, its @pure functions and the verdict of every
+function in a SQLite database. `mypy-pure query` answers from it with indexed lookups, without
+parsing anything:
+
+    mypy-pure query callers os.remove --transitive
+    mypy-pure query callees app.compute
+    mypy-pure query why app.compute
+
+Every impure function keeps the next step of its shortest call path to a blacklisted call (see
+Witnesses), so explaining a verdict costs one lookup per step.
+"""
+
+import os
+import sqlite3
+from urllib.request import pathname2url
+
+from mypy_pure.cache import atomic_write
+from mypy_pure.project import ProjectChecker, Violation
+from mypy_pure.purity.effects import effect_names
+from mypy_pure.purity.summary import MAX_REEXPORT_DEPTH, ModuleAnalysis, module_of
+from mypy_pure.purity.types import FuncName
+
+# Bump whenever the schema or the names of the functions change: older indexes must be built again
+INDEX_VERSION = 2
+DEFAULT_INDEX = '.mypy_pure_index.sqlite'
+
+SCHEMA = (
+    'CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)',
+    'CREATE TABLE modules (name TEXT PRIMARY KEY, path TEXT NOT NULL)',
+    'CREATE TABLE imports (module TEXT NOT NULL, alias TEXT NOT NULL, name TEXT NOT NULL)',
+    # next: the next function on the shortest call path of an impure function (NULL when it makes
+    # the blacklisted call first_call itself); line: of the def of @pure functions only
+    (
+        'CREATE TABLE functions (name TEXT PRIMARY KEY, module TEXT NOT NULL, line INTEGER, '
+        'marked_pure INTEGER NOT NULL, impure INTEGER NOT NULL, effects INTEGER NOT NULL, next TEXT, first_call TEXT)'
+    ),
+    # impure: the callee is a blacklisted call
+    'CREATE TABLE calls (caller TEXT NOT NULL, callee TEXT NOT NULL, impure INTEGER NOT NULL)',
+    (
+        'CREATE TABLE violations '
+        '(function TEXT PRIMARY KEY, path TEXT NOT NULL, line INTEGER NOT NULL, message TEXT NOT NULL)'
+    ),
+)
+INDEXES = (
+    'CREATE INDEX calls_caller ON calls (caller)',
+    'CREATE INDEX calls_callee ON calls (callee)',
+    'CREATE INDEX imports_name ON imports (name)',
+)
+
+GLOB_CHARACTERS = frozenset('*?[')
+
+
+class InvalidIndex(Exception):
+    """An index that does not exist, cannot be read or was built by another version of mypy-pure."""
+
+
+def resolve_call(
+    name: FuncName, analyses: dict[str, ModuleAnalysis], functions: set[FuncName], resolved: dict[FuncName, FuncName]
+) -> FuncName:
+    """
+    The function of an analyzed module a (qualified) called name reaches, following re-exports like
+    resolve_reference does; the name itself when it is not defined in an analyzed module.
+    """
+    if name in resolved:
+        return resolved[name]
+    target = name
+    for _ in range(MAX_REEXPORT_DEPTH):
+        if target in functions:
+            break
+        module = module_of(target, analyses)
+        if module is None:
+            target = name
+            break
+        head, _, rest = target.removeprefix(f'{module}.').partition('.')
+        alias = analyses[module].imports.get(head)
+        if alias is None or alias == target:
+            target = name
+            break
+        target = f'{alias}.{rest}' if rest else alias
+    else:  # pragma: no cover
+        target = name
+    resolved[name] = target
+    return target
+
+
+def write_index(path: str, checker: ProjectChecker, violations: list[Violation]) -> tuple[int, int]:
+    """
+    Write the index of the last check of a checker, replacing the file atomically; return the
+    number of functions and calls indexed.
+    """
+    analyses = checker.modules
+    witnesses = checker.propagate()
+    functions = {f'{module}.{fn}' for module, analysis in analyses.items() for fn in analysis.calls}
+    resolved: dict[FuncName, FuncName] = {}
+
+    function_rows = []
+    call_rows = []
+    for module, analysis in sorted(analyses.items()):
+        for fn, callees in analysis.calls.items():
+            qualified = f'{module}.{fn}'
+            blacklisted = set(witnesses.direct_calls(qualified)) if qualified in witnesses else set()
+            for callee in sorted(callees):
+                target = (
+                    f'{module}.{callee}'
+                    if callee in analysis.calls
+                    else resolve_call(callee, analyses, functions, resolved)
+                )
+                call_rows.append((qualified, target, callee in blacklisted))
+            line = analysis.pure_functions_lineno.get(fn)
+            verdict: tuple[bool, int, FuncName | None, FuncName | None]
+            if qualified in witnesses:
+                verdict = (
+                    True,
+                    witnesses.effects(qualified),
+                    witnesses.parent(qualified),
+                    witnesses.first_call(qualified),
+                )
+            else:
+                verdict = (False, 0, None, None)
+            function_rows.append((qualified, module, line, line is not None, *verdict))
+    violation_rows = []
+    modules_by_path = {analysis.path: module for module, analysis in analyses.items()}
+    for violation in violations:
+        function = f'{modules_by_path[violation.path]}.{violation.function}'
+        violation_rows.append((function, violation.path, violation.line, violation.message))
+
+    with atomic_write(path, '.sqlite') as tmp_path:
+        connection = sqlite3.connect(tmp_path)
+        try:
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.execute("INSERT INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),))
+            connection.executemany(
+                'INSERT INTO modules VALUES (?, ?)', [(module, analysis.path) for module, analysis in analyses.items()]
+            )
+            connection.executemany(
+                'INSERT INTO imports VALUES (?, ?, ?)',
+                [
+                    (module, alias, name)
+                    for module, analysis in analyses.items()
+                    for alias, name in analysis.imports.items()
+                ],
+            )
+            connection.executemany('INSERT INTO functions VALUES (?, ?, ?, ?, ?, ?, ?, ?)', function_rows)
+            connection.executemany('INSERT INTO calls VALUES (?, ?, ?)', call_rows)
+            connection.executemany('INSERT OR REPLACE INTO violations VALUES (?, ?, ?, ?)', violation_rows)
+            # Indexes are faster to build once the rows are in
+            for statement in INDEXES:
+                connection.execute(statement)
+            connection.commit()
+        finally:
+            connection.close()
+    return len(function_rows), len(call_rows)
+
+
+class PurityIndex:
+    """Read-only queries on an index written by write_index. Names may be globs, e.g. 'requests.*'."""
+
+    def __init__(self, path: str) -> None:
+        if not os.path.isfile(path):
+            raise InvalidIndex(f'{path}: no such index, build it with mypy-pure index')
+        try:
+            self.__connection = sqlite3.connect(f'file:{pathname2url(os.path.abspath(path))}?mode=ro', uri=True)
+            row = self.__connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        except sqlite3.Error as exc:
+            raise InvalidIndex(f'{path}: {exc}') from exc
+        if row is None or row[0] != str(INDEX_VERSION):
+            self.__connection.close()
+            raise InvalidIndex(f'{path}: index of another version of mypy-pure, build it again')
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def callers(self, name: str, transitive: bool = False) -> list[FuncName]:
+        """The functions that call a name, or that reach it through other functions when transitive."""
+        return self.__neighbours('caller', 'callee', name, transitive)
+
+    def callees(self, name: str, transitive: bool = False) -> list[FuncName]:
+        """The names a function calls (resolved to functions of the project), or that it reaches when transitive."""
+        return self.__neighbours('callee', 'caller', name, transitive)
+
+    def why(self, function: FuncName) -> tuple[list[FuncName], list[str]] | None:
+        """
+        The shortest call path from a function to a blacklisted call, both included, and the effect
+        kinds the function reaches; an empty path for a pure function, None for an unknown one.
+        """
+        row = self.__function(function)
+        if row is None:
+            return None
+        impure, effects, step, first_call = row
+        if not impure:
+            return [], []
+        path = [function]
+        while step is not None:
+            path.append(step)
+            step_row = self.__function(step)
+            step = step_row[2] if step_row is not None else None
+        # Every function on the path ends it with the same call
+        path.append(first_call or '')
+        return path, effect_names(effects)
+
+    def __function(self, function: FuncName) -> tuple[bool, int, FuncName | None, FuncName | None] | None:
+        row = self.__connection.execute(
+            'SELECT impure, effects, next, first_call FROM functions WHERE name = ?', (function,)
+        ).fetchone()
+        return (bool(row[0]), row[1], row[2], row[3]) if row is not None else None
+
+    def __neighbours(self, result: str, key: str, name: str, transitive: bool) -> list[FuncName]:
+        match = 'GLOB' if GLOB_CHARACTERS & set(name) else '='
+        if transitive:
+            # UNION drops the names already reached, which ends the recursion on cycles
+            query = (
+                f'WITH RECURSIVE reached(name) AS ('
+                f'SELECT {result} FROM calls WHERE {key} {match} ? '
+                f'UNION SELECT calls.{result} FROM calls JOIN reached ON calls.{key} = reached.name'
+                f') SELECT name FROM reached ORDER BY name'
+            )
+        else:
+            query = f'SELECT DISTINCT {result} FROM calls WHERE {key} {match} ? ORDER BY {result}'
+        return [row[0] for row in self.__connection.execute(query, (name,))]
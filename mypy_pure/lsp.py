@@ -0,0 +1,263 @@
+"""
+Language server of mypy-pure: purity errors in editors, as the code is typed.
+
+A minimal Language Server Protocol implementation over stdio (JSON-RPC with Content-Length
+headers). The workspace is checked once when the editor connects; after that, every change of a
+document analyzes its unsaved buffer alone and reuses the summaries of every other module (see
+ProjectChecker.recheck), and only the diagnostics of that document are published.
+
+Usage:
+    mypy-pure lsp [--config-file FILE]
+    python -m mypy_pure.lsp
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections.abc import Callable
+from typing import Any, BinaryIO
+from urllib.parse import unquote, urlparse
+from urllib.request import pathname2url
+
+from mypy.find_sources import InvalidSourceList, create_source_list
+from mypy.modulefinder import BuildSource
+from mypy.options import Options
+
+from mypy_pure.configuration import PurityConfig, find_config_file
+from mypy_pure.project import ProjectChecker, Violation
+
+# JSON-RPC error codes
+METHOD_NOT_FOUND = -32601
+INVALID_REQUEST = -32600
+
+# LSP constants
+TEXT_DOCUMENT_SYNC_FULL = 1
+SEVERITY_ERROR = 1
+DIAGNOSTIC_SOURCE = 'mypy-pure'
+
+Message = dict[str, Any]
+
+
+def read_message(reader: BinaryIO) -> Message | None:
+    """Read a JSON-RPC message framed with LSP headers; None at the end of the stream."""
+    content_length = None
+    while True:
+        line = reader.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode('ascii').partition(':')
+        if name.strip().lower() == 'content-length':
+            content_length = int(value.strip())
+    if content_length is None:
+        raise ValueError('message without Content-Length header')
+    message: Message = json.loads(reader.read(content_length).decode('utf-8'))
+    return message
+
+
+def write_message(writer: BinaryIO, message: Message) -> None:
+    body = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    writer.write(b'Content-Length: %d\r\n\r\n' % len(body))
+    writer.write(body)
+    writer.flush()
+
+
+def uri_to_path(uri: str) -> str:
+    return os.path.normpath(unquote(urlparse(uri).path))
+
+
+def path_to_uri(path: str) -> str:
+    return f'file://{pathname2url(os.path.abspath(path))}'
+
+
+def line_range(text: str, line: int) -> dict[str, Any]:
+    """The range of a (1-based) line of a document, without its indentation."""
+    lines = text.splitlines()
+    content = lines[line - 1] if 0 < line <= len(lines) else ''
+    start = len(content) - len(content.lstrip())
+    return {'start': {'line': line - 1, 'character': start}, 'end': {'line': line - 1, 'character': len(content)}}
+
+
+class LanguageServer:
+    """
+    Serve purity diagnostics to an editor.
+
+    Documents are synchronized in full: every change carries the whole text, which is what the
+    visitor needs anyway. Diagnostics are published for the document that changed only; when a
+    document is saved or closed, the diagnostics of every open document are published again, since
+    the verdicts of the modules that call into it may have changed.
+    """
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO, config_file: str | None = None) -> None:
+        self.__reader = reader
+        self.__writer = writer
+        self.__config_file = config_file
+        self.__options = Options()
+        self.__checker: ProjectChecker | None = None
+        self.__sources: dict[str, BuildSource] = {}  # path -> source of the workspace
+        self.__documents: dict[str, str] = {}  # path -> text of the open documents
+        self.__shutdown = False
+        self.__handlers: dict[str, Callable[[Any], Any]] = {
+            'initialize': self.__initialize,
+            'shutdown': self.__shutdown_request,
+            'textDocument/didOpen': self.__did_open,
+            'textDocument/didChange': self.__did_change,
+            'textDocument/didSave': self.__did_save,
+            'textDocument/didClose': self.__did_close,
+        }
+
+    def serve(self) -> int:
+        """Handle messages until the exit notification or the end of the input; return the exit status."""
+        while True:
+            message = read_message(self.__reader)
+            if message is None or message.get('method') == 'exit':
+                return 0 if self.__shutdown else 1
+            self.handle(message)
+
+    def handle(self, message: Message) -> None:
+        method = message.get('method')
+        handler = self.__handlers.get(method) if isinstance(method, str) else None
+        if 'id' not in message:
+            # Notifications get no answer, whether they are known or not
+            if handler is not None:
+                handler(message.get('params') or {})
+            return
+        if handler is None:
+            code = METHOD_NOT_FOUND if isinstance(method, str) else INVALID_REQUEST
+            self.__send({'id': message['id'], 'error': {'code': code, 'message': f'unsupported method: {method}'}})
+            return
+        self.__send({'id': message['id'], 'result': handler(message.get('params') or {})})
+
+    def __send(self, message: Message) -> None:
+        write_message(self.__writer, {'jsonrpc': '2.0', **message})
+
+    def __initialize(self, params: dict[str, Any]) -> dict[str, Any]:
+        root_uri = params.get('rootUri')
+        root = uri_to_path(root_uri) if root_uri else params.get('rootPath')
+        config_file = self.__config_file or (find_config_file(root) if root else None)
+        self.__checker = ProjectChecker(PurityConfig.from_file(config_file), self.__options)
+        sources: list[BuildSource] = []
+        if root:
+            try:
+                sources = create_source_list([root], self.__options)
+            except InvalidSourceList:  # pragma: no cover
+                pass
+        self.__sources = {os.path.normpath(source.path): source for source in sources if source.path}
+        self.__checker.check(sources)
+        return {
+            'capabilities': {
+                'textDocumentSync': {'openClose': True, 'change': TEXT_DOCUMENT_SYNC_FULL, 'save': True},
+            },
+            'serverInfo': {'name': DIAGNOSTIC_SOURCE},
+        }
+
+    def __shutdown_request(self, params: dict[str, Any]) -> None:
+        self.__shutdown = True
+
+    def __did_open(self, params: dict[str, Any]) -> None:
+        document = params['textDocument']
+        self.__update(uri_to_path(document['uri']), document['text'])
+
+    def __did_change(self, params: dict[str, Any]) -> None:
+        changes = params.get('contentChanges') or []
+        if changes:
+            # Full synchronization: the last change holds the whole text
+            self.__update(uri_to_path(params['textDocument']['uri']), changes[-1]['text'])
+
+    def __did_save(self, params: dict[str, Any]) -> None:
+        path = uri_to_path(params['textDocument']['uri'])
+        text = params.get('text')
+        if text is not None:
+            self.__update(path, text)
+        for open_path in sorted(self.__documents):
+            self.__publish(open_path)
+
+    def __did_close(self, params: dict[str, Any]) -> None:
+        path = uri_to_path(params['textDocument']['uri'])
+        self.__documents.pop(path, None)
+        source = self.__source(path)
+        if self.__checker is not None and source is not None and os.path.isfile(path):
+            # Back to the content of the file
+            self.__checker.recheck([source])
+        self.__send_diagnostics(path, [])
+        for open_path in sorted(self.__documents):
+            self.__publish(open_path)
+
+    def __update(self, path: str, text: str) -> None:
+        self.__documents[path] = text
+        source = self.__source(path)
+        if self.__checker is None or source is None:
+            return
+        self.__checker.recheck([source], buffers={path: text.encode('utf-8')})
+        self.__publish(path)
+
+    def __source(self, path: str) -> BuildSource | None:
+        """The source of a document: in the workspace, or on its own for files outside of it."""
+        source = self.__sources.get(path)
+        if source is None and path.endswith(('.py', '.pyi')) and os.path.isfile(path):
+            try:
+                sources = create_source_list([path], self.__options)
+            except InvalidSourceList:  # pragma: no cover
+                return None
+            if sources:
+                source = self.__sources[path] = sources[0]
+        return source
+
+    def __publish(self, path: str) -> None:
+        if self.__checker is None:  # pragma: no cover
+            return
+        text = self.__documents.get(path, '')
+        diagnostics = [
+            self.__diagnostic(text, violation)
+            for violation in self.__checker.file_violations(path)
+            if violation.line > 0
+        ]
+        error = self.__checker.file_error(path)
+        if error is not None:
+            diagnostics.append(self.__error_diagnostic(text, path, error))
+        self.__send_diagnostics(path, diagnostics)
+
+    def __send_diagnostics(self, path: str, diagnostics: list[dict[str, Any]]) -> None:
+        self.__send(
+            {
+                'method': 'textDocument/publishDiagnostics',
+                'params': {'uri': path_to_uri(path), 'diagnostics': diagnostics},
+            }
+        )
+
+    @staticmethod
+    def __diagnostic(text: str, violation: Violation) -> dict[str, Any]:
+        return {
+            'range': line_range(text, violation.line),
+            'severity': SEVERITY_ERROR,
+            'source': DIAGNOSTIC_SOURCE,
+            'code': 'impure',
+            'message': violation.message,
+        }
+
+    @staticmethod
+    def __error_diagnostic(text: str, path: str, error: str) -> dict[str, Any]:
+        # Errors are formatted like mypy's: 'path:line: error: message  [syntax]' or 'path: error: message'
+        location, _, message = error.removeprefix(f'{path}:').partition(': error: ')
+        line = int(location) if location.isdigit() else 1
+        return {
+            'range': line_range(text, line),
+            'severity': SEVERITY_ERROR,
+            'source': DIAGNOSTIC_SOURCE,
+            'code': 'syntax',
+            'message': message.removesuffix('  [syntax]'),
+        }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='mypy-pure lsp', description='Language server of mypy-pure, over stdio.')
+    parser.add_argument('--config-file', help='file with a [mypy-pure] section (default: the one of the workspace)')
+    args = parser.parse_args(argv)
+    return LanguageServer(sys.stdin.buffer, sys.stdout.buffer, args.config_file).serve()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import fnmatch
+import os
+import re
+import sysconfig
+from collections.abc import Iterable
+
+from mypy.build import default_data_dir
+
+# Modules that are never worth analyzing, whatever their path: their purity is only decided by the lists
+DEFAULT_SKIP_MODULES = ('builtins', 'typing.*', 'sys.*', 'os.*', 'abc', 'enum', 'mypy.*', '_*')
+
+# Directories third-party distributions are installed into
+SITE_PACKAGES_DIRS = frozenset({'site-packages', 'dist-packages'})
+
+# Reasons for skipping a module, as reported
+SKIPPED_BY_CONFIG = 'skip_modules'
+SKIPPED_BY_DEFAULT = 'default'
+SKIPPED_STDLIB = 'stdlib'
+SKIPPED_SITE_PACKAGES = 'site-packages'
+
+
+def compile_module_patterns(patterns: Iterable[str]) -> re.Pattern[str] | None:
+    """
+    Compile module globs into a single regular expression; None when there are no patterns.
+
+    Patterns are matched like mypy's per-module sections: 'pkg.*' matches pkg and every module below
+    it, and other wildcards ('tests.*_fixtures', '*.migrations.*') are shell-style globs.
+    """
+    regexes = []
+    for pattern in patterns:
+        pattern = pattern.strip()
+        if not pattern:
+            continue
+        if pattern.endswith('.*'):
+            regexes.append(fnmatch.translate(pattern[:-2]))
+        regexes.append(fnmatch.translate(pattern))
+    return re.compile('|'.join(regexes)) if regexes else None
+
+
+def stdlib_directories() -> list[str]:
+    """The standard library of the running interpreter and the typeshed stubs bundled with mypy."""
+    paths = sysconfig.get_paths()
+    directories = {paths[name] for name in ('stdlib', 'platstdlib') if name in paths}
+    directories.add(os.path.join(default_data_dir(), 'typeshed'))
+    return sorted(os.path.normcase(os.path.realpath(directory)) for directory in directories)
+
+
+class ModuleFilter:
+    """
+    Decide which modules are analyzed.
+
+    Modules are skipped when they match skip_modules or the default skip list, or when their file
+    lives in the standard library (or typeshed) or in a site-packages directory, which are only
+    called into and whose purity is decided by the blacklist, the whitelist and __mypy_pure__.
+    include_modules overrides every skip. The patterns are compiled into two regular expressions and
+    the reason for every module is memoized.
+    """
+
+    def __init__(
+        self,
+        skip_modules: Iterable[str] = (),
+        include_modules: Iterable[str] = (),
+        stdlib_dirs: Iterable[str] | None = None,
+    ) -> None:
+        self.__skip = compile_module_patterns(skip_modules)
+        self.__default_skip = compile_module_patterns(DEFAULT_SKIP_MODULES)
+        self.__include = compile_module_patterns(include_modules)
+        self.__stdlib_dirs = tuple(
+            os.path.join(directory, '') for directory in (stdlib_directories() if stdlib_dirs is None else stdlib_dirs)
+        )
+        self.__reasons: dict[str, str | None] = {}
+
+    def skip_reason(self, module: str, path: str | None = None) -> str | None:
+        """Why a module is not analyzed, or None if it is."""
+        if module in self.__reasons:
+            return self.__reasons[module]
+        reason = self.__skip_reason(module, path)
+        # Without a path, only the name decides: ask again when the path is known
+        if path or reason is not None:
+            self.__reasons[module] = reason
+        return reason
+
+    def is_skipped(self, module: str, path: str | None = None) -> bool:
+        return self.skip_reason(module, path) is not None
+
+    def __skip_reason(self, module: str, path: str | None) -> str | None:
+        if self.__include is not None and self.__include.match(module):
+            return None
+        if self.__skip is not None and self.__skip.match(module):
+            return SKIPPED_BY_CONFIG
+        if self.__default_skip is not None and self.__default_skip.match(module):
+            return SKIPPED_BY_DEFAULT
+        if not path:
+            return None
+        real_path = os.path.normcase(os.path.realpath(path))
+        for directory in self.__stdlib_dirs:
+            # site-packages usually lives inside the standard library directory, and typeshed inside mypy
+            relative_path = real_path.removeprefix(directory)
+            if relative_path != real_path and SITE_PACKAGES_DIRS.isdisjoint(relative_path.split(os.sep)):
+                return SKIPPED_STDLIB
+        if not SITE_PACKAGES_DIRS.isdisjoint(real_path.split(os.sep)):
+            return SKIPPED_SITE_PACKAGES
+        return None
@@ -0,0 +1,108 @@
+import atexit
+import os
+import sys
+from collections.abc import Callable
+from concurrent.futures import BrokenExecutor, Future, ThreadPoolExecutor
+
+from mypy_pure.purity.summary import ModuleAnalysis
+
+# Most workers started when analysis_jobs is not configured
+MAX_DEFAULT_JOBS = 4
+
+
+def gil_enabled() -> bool:
+    """Whether the running interpreter has a GIL (always, before the free-threaded builds of 3.13)."""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return bool(is_gil_enabled()) if is_gil_enabled is not None else True
+
+
+def available_cpus() -> int:
+    process_cpu_count = getattr(os, 'process_cpu_count', None)
+    if process_cpu_count is not None:
+        return process_cpu_count() or 1
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1  # pragma: no cover
+
+
+def default_jobs() -> int:
+    """
+    Workers when analysis_jobs is not configured: one per CPU left to mypy, on free-threaded builds.
+
+    With a GIL, worker threads only take turns with mypy and the build gets no faster: none.
+    """
+    if gil_enabled():
+        return 0
+    return max(0, min(MAX_DEFAULT_JOBS, available_cpus() - 1))
+
+
+class AnalysisPipeline:
+    """
+    Analyze modules in the background while mypy goes on with the build.
+
+    Submitted analyses are run by a bounded pool of threads. They walk the trees mypy has already
+    parsed, so nothing is read or parsed again. The pool is started with the first submission and shut
+    down by the owner once the analyses are joined, or when the interpreter exits. Results are only
+    waited for when they are joined, once a verdict is needed.
+    """
+
+    def __init__(self, jobs: int) -> None:
+        self.__jobs = jobs
+        self.__executor: ThreadPoolExecutor | None = None
+        self.__pending: dict[str, Future[ModuleAnalysis | None]] = {}
+
+    @property
+    def jobs(self) -> int:
+        return self.__jobs
+
+    @property
+    def pending(self) -> list[str]:
+        """Modules submitted and not joined yet."""
+        return sorted(self.__pending)
+
+    def __contains__(self, module: object) -> bool:
+        return module in self.__pending
+
+    def submit(self, module: str, analyze: Callable[[], ModuleAnalysis | None]) -> bool:
+        """Start analyzing a module; False when no worker can be started, and the caller must analyze it."""
+        if self.__jobs <= 0:
+            return False
+        if self.__executor is None:
+            try:
+                self.__executor = ThreadPoolExecutor(max_workers=self.__jobs, thread_name_prefix='mypy-pure')
+            except RuntimeError:  # pragma: no cover
+                # The interpreter is shutting down: analyze in the calling thread
+                self.__jobs = 0
+                return False
+            atexit.register(self.shutdown)
+        self.cancel(module)
+        self.__pending[module] = self.__executor.submit(analyze)
+        return True
+
+    def cancel(self, module: str) -> None:
+        """Forget the analysis of a module that changed again before it was joined."""
+        future = self.__pending.pop(module, None)
+        if future is not None:
+            future.cancel()
+
+    def join(self) -> dict[str, ModuleAnalysis | None]:
+        """Wait for every pending analysis; None for modules whose worker failed (other errors are raised)."""
+        results: dict[str, ModuleAnalysis | None] = {}
+        pending, self.__pending = self.__pending, {}
+        for module, future in sorted(pending.items()):
+            try:
+                results[module] = future.result()
+            except (BrokenExecutor, RecursionError):
+                # A pool that could not start a thread, or a tree too deep for the smaller stack of a
+                # worker thread: the caller analyzes the module itself
+                results[module] = None
+        return results
+
+    def shutdown(self) -> None:
+        """Stop the workers; the next submission starts a new pool."""
+        for module in list(self.__pending):
+            self.cancel(module)
+        if self.__executor is not None:
+            atexit.unregister(self.shutdown)
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
@@ -1,79 +1,346 @@
 import ast
-import configparser
+import functools
 import importlib
+import os
 import sys
+import warnings
+from collections.abc import Callable, Iterable
+from typing import Any
 
-from mypy.nodes import MypyFile
+from mypy.errorcodes import ErrorCode
+from mypy.nodes import (
+    GDEF,
+    CallExpr,
+    ClassDef,
+    Decorator,
+    Expression,
+    FuncDef,
+    IfStmt,
+    MypyFile,
+    OverloadedFuncDef,
+    Statement,
+    SymbolTableNode,
+    TypeInfo,
+    Var,
+)
 from mypy.options import Options
-from mypy.plugin import Plugin
+from mypy.plugin import (
+    CheckerPluginInterface,
+    FunctionContext,
+    MethodContext,
+    Plugin,
+    ReportConfigContext,
+)
+from mypy.types import Type, UnboundType
 
-from mypy_pure.configuration import BLACKLIST
-from mypy_pure.purity.checker import compute_purity
-from mypy_pure.purity.types import FuncName
+from mypy_pure.blacklists import ALWAYS_LOADED, BlacklistShards
+from mypy_pure.cache import (
+    DEFAULT_MAX_ENTRIES,
+    DIRECTORY_BACKEND,
+    CacheEntry,
+    DependencyRecords,
+    SummaryCache,
+    open_cache,
+)
+from mypy_pure.configuration import PurityConfig
+from mypy_pure.module_filter import SKIPPED_BY_CONFIG, ModuleFilter
+from mypy_pure.pipeline import AnalysisPipeline, default_jobs
+from mypy_pure.purity.discovery import (
+    PureDeclarationFinder,
+    may_define_pure_functions,
+    qualify_pure_functions,
+)
+from mypy_pure.purity.matcher import IMPURE as IMPURE_VERDICT
+from mypy_pure.purity.matcher import PURE, NameMatcher, normalize_name
+from mypy_pure.purity.methods import MethodMatcher
+from mypy_pure.purity.mypy_visitor import MypyPurityVisitor
+from mypy_pure.purity.summary import (
+    ModuleAnalysis,
+    ModuleSummary,
+    module_of,
+    propagate_summaries,
+    resolve_reference,
+    summarize_module,
+)
+from mypy_pure.purity.types import CallMap, EffectMask, FuncName
 from mypy_pure.purity.visitor import PurityVisitor
+from mypy_pure.purity.witnesses import impurity_message, policy_violation
+from mypy_pure.stdlib_database import load_stdlib_database
+
+IMPURE = ErrorCode('impure', 'Function decorated with @pure calls impure functions', 'General')
+
+# Private symbol added to every analyzed module, whose type names the content hash of the module
+FINGERPRINT_SYMBOL = '__mypy_pure_fingerprint__'
+
+
+def fingerprint_trigger(module: str) -> str:
+    """The fine-grained trigger dmypy fires when the content of a module changes."""
+    return f'<{module}.{FINGERPRINT_SYMBOL}>'
 
 
 class PurityPlugin(Plugin):
     def __init__(self, options: Options) -> None:
         super().__init__(options)
-        self.__checked_files: set[str] = set()
-        self.__blacklist: set[FuncName] = BLACKLIST.copy()
+        # module name -> (mtime, size, content hash) of the file its analysis comes from
+        self.__module_states: dict[str, tuple[int, int, str]] = {}
+        # Shards of the built-in blacklist and of installed packs, loaded as checked modules import them
+        self.__blacklist_shards = BlacklistShards()
+        self.__blacklist: set[FuncName] = set(self.__blacklist_shards.load(ALWAYS_LOADED))
         self.__whitelist: set[FuncName] = set()  # Pure functions from config
-        self.__loaded_modules: set[str] = set()
+        self.__configured_whitelist: set[FuncName] = set()
+        # module name -> (file the module was loaded from and its mtime, pure functions it declares)
+        # module -> (path and content hash of its file, pure functions its __mypy_pure__ declares)
+        self.__loaded_modules: dict[str, tuple[tuple[str, str] | None, list[FuncName]]] = {}
+        self.__use_cache = True
+        self.__cache_max_entries = DEFAULT_MAX_ENTRIES
+        self.__cache_backend = DIRECTORY_BACKEND
+        self.__cache_path: str | None = None
+        self.__discover_by_import = False
+        self.__skip_modules: list[str] = []
+        self.__include_modules: list[str] = []
+        self.__analysis_jobs = default_jobs()
+        self.__use_stdlib_database = True
+        self.__stdlib_database_path: str | None = None
         self.__load_config(options)
+        self.__configured_whitelist = set(self.__whitelist)
+        self.__declaration_finder = PureDeclarationFinder(options)
+        # Verdicts of every callable of the standard library, looked up in a mapped file
+        self.__stdlib_database = (
+            load_stdlib_database(self.__stdlib_database_path) if self.__use_stdlib_database else None
+        )
+        if self.__use_stdlib_database and self.__stdlib_database is None and options.verbosity >= 1:
+            print('mypy-pure: no stdlib database, build it with: python -m mypy_pure.stdlib_database', file=sys.stderr)
+        self.__matcher = NameMatcher(self.__blacklist, self.__whitelist, self.__stdlib_database)
+        self.__method_matcher = MethodMatcher(self.__matcher)
+        self.__module_filter = ModuleFilter(self.__skip_modules, self.__include_modules)
+        self.__config_fingerprint = SummaryCache.fingerprint(
+            self.__blacklist,
+            self.__whitelist,
+            ['import' if self.__discover_by_import else 'static'],
+            [f'skip:{pattern}' for pattern in self.__skip_modules],
+            [f'include:{pattern}' for pattern in self.__include_modules],
+            self.__blacklist_shards.fingerprint(),
+            [self.__stdlib_database.metadata if self.__stdlib_database is not None else 'no stdlib database'],
+        )
+        self.__cache = (
+            open_cache(self.__cache_backend, self.__cache_path, options.cache_dir, self.__cache_max_entries)
+            if self.__use_cache
+            else None
+        )
+        self.__cache_keys: dict[str, str] = {}  # module -> cache key of its current content
+        self.__analyses: dict[str, ModuleAnalysis] = {}
+        self.__summaries: dict[str, ModuleSummary] = {}
+        # module -> cache entry whose summary is restored when needed, if its __mypy_pure__ modules did not change
+        self.__cached_summaries: dict[str, CacheEntry] = {}
+        self.__unsummarized_modules: set[str] = set()
+        self.__discovered: dict[str, list[str]] = {}  # module -> modules whose __mypy_pure__ it relied on
+        self.__dirty_modules: set[str] = set()  # modules whose cache entry must be written
+        self.__modules: dict[str, MypyFile] = {}
+        self.__module_by_path: dict[str, str] = {}
+        # (module, line of the def) -> (function, impure calls it reaches, shortest call path to one of them,
+        # effect kinds it reaches that its @pure(allow=...) policy does not allow)
+        self.__violations: dict[tuple[str, int], tuple[FuncName, list[FuncName], list[FuncName], EffectMask]] = {}
+        # module with @pure functions -> files its verdicts depend on
+        self.__dependencies: dict[str, list[str]] = {}
+        # module with @pure functions -> modules its verdicts depend on
+        self.__dependency_modules: dict[str, set[str]] = {}
+        # module with @pure functions -> fine-grained targets (of dmypy) in which its @pure functions are reported
+        self.__pure_function_targets: dict[str, set[str]] = {}
+        self.__dependency_records = DependencyRecords.in_mypy_cache(options.cache_dir)
+        # module -> function -> impure calls mypy resolved from the types of their receivers or callees
+        self.__typed_calls: dict[str, dict[FuncName, set[FuncName]]] = {}
+        self.__typed_call_records = DependencyRecords.in_mypy_cache(options.cache_dir, 'typed_calls')
+        self.__typed_calls_version = 0  # incremented with every new typed call
+        self.__violations_versions: dict[str, int] = {}  # module -> typed calls version of its violations
+        # (module, line of the def) -> @pure function mypy checked, and whether it was reported
+        self.__checked_pure_functions: dict[tuple[str, int], tuple[FuncDef, bool]] = {}
+        # module -> decorator expression -> function it decorates, to find the target of @pure(allow=...)
+        self.__decorated_functions: dict[str, dict[Expression, FuncDef]] = {}
+        # Modules with @pure markers are analyzed in the background while mypy goes on with the build
+        self.__pipeline = AnalysisPipeline(self.__analysis_jobs)
+        self.__purity_pending = False  # set_modules ran, and the verdicts of its build are not decided yet
 
     def __load_config(self, options: Options) -> None:
         if not options.config_file:  # pragma: no cover
             return
 
-        config = configparser.ConfigParser()
-        try:
-            config.read(options.config_file)
-            if 'mypy-pure' in config:
-                # Load impure functions (blacklist)
-                impure_funcs = config['mypy-pure'].get('impure_functions', '')
-                for func in impure_funcs.split(','):
-                    func = func.strip()
-                    if func:
-                        self.__blacklist.add(func)
-
-                # Load pure functions (whitelist)
-                pure_funcs = config['mypy-pure'].get('pure_functions', '')
-                for func in pure_funcs.split(','):
-                    func = func.strip()
-                    if func:
-                        self.__whitelist.add(func)
-        except (OSError, configparser.Error):  # pragma: no cover
-            # If config file can't be read or parsed, continue with defaults
-            pass
+        config = PurityConfig.from_file(options.config_file)
+        self.__blacklist.update(config.impure_functions)
+        self.__whitelist.update(config.pure_functions)
+        self.__use_cache = config.cache
+        self.__cache_max_entries = config.cache_max_entries
+        self.__cache_backend = config.cache_backend
+        self.__cache_path = config.cache_path
+        self.__discover_by_import = config.discover_by_import
+        self.__skip_modules = config.skip_modules
+        self.__include_modules = config.include_modules
+        self.__analysis_jobs = config.analysis_jobs
+        self.__use_stdlib_database = config.stdlib_database
+        self.__stdlib_database_path = config.stdlib_database_path
 
     def __load_module_pure_functions(self, module_name: str) -> None:
         if module_name in self.__loaded_modules:
             return
 
-        self.__loaded_modules.add(module_name)
+        source: tuple[str, str] | None = None
+        pure_functions: list[FuncName] = []
+        self.__loaded_modules[module_name] = (source, pure_functions)
+        try:
+            if self.__discover_by_import:
+                source, pure_functions = self.__import_module_pure_functions(module_name)
+            else:
+                path = self.__declaration_path(module_name)
+                if path:
+                    content_hash, pure_functions = self.__declaration_finder.declarations(module_name, path)
+                    source = (path, content_hash)
+        except OSError:
+            # Unreadable modules simply declare nothing
+            pass
+        self.__loaded_modules[module_name] = (source, pure_functions)
+        self.__add_pure_functions(pure_functions)
+
+    def __declaration_path(self, module_name: str) -> str | None:
+        tree = self.__modules.get(module_name)
+        return tree.path if tree is not None and tree.path else self.__declaration_finder.find(module_name)
+
+    def __load_blacklist_shards(self, imported: Iterable[str]) -> None:
+        impure_functions = self.__blacklist_shards.load(imported)
+        if impure_functions:
+            self.__blacklist.update(impure_functions)
+            self.__matcher.add(impure_functions, IMPURE_VERDICT)
+
+    def __add_pure_functions(self, pure_functions: list[FuncName]) -> None:
+        self.__whitelist.update(pure_functions)
+        self.__matcher.add(pure_functions, PURE)
+
+    @staticmethod
+    def __import_module_pure_functions(module_name: str) -> tuple[tuple[str, str] | None, list[FuncName]]:
+        """Import a module to read its __mypy_pure__; only used when enabled with discover_by_import."""
+        source: tuple[str, str] | None = None
+        pure_functions: list[FuncName] = []
         try:
             module = importlib.import_module(module_name)
-            if hasattr(module, '__mypy_pure__'):
-                pure_funcs = getattr(module, '__mypy_pure__')
-                if isinstance(pure_funcs, (list, tuple, set)):
-                    for func in pure_funcs:
-                        if isinstance(func, str):
-                            # If it's just the function name, prepend module name
-                            if '.' not in func:
-                                self.__whitelist.add(f'{module_name}.{func}')
-                            else:
-                                self.__whitelist.add(func)
-        except (ImportError, AttributeError, Exception):
-            # Module not found, no __mypy_pure__, or other import issues
+            module_file = getattr(module, '__file__', None)
+            if module_file:
+                with open(module_file, 'rb') as f:
+                    source = (module_file, SummaryCache.content_hash(f.read()))
+            pure_funcs = getattr(module, '__mypy_pure__', None)
+            if isinstance(pure_funcs, (list, tuple, set)):
+                names = [func for func in pure_funcs if isinstance(func, str)]
+                pure_functions = qualify_pure_functions(names, module_name)
+        except (ImportError, OSError):
+            # Module not found or unreadable: it declares nothing
             pass
+        except Exception as exc:  # noqa: BLE001 - importing runs the code of the module
+            warnings.warn(f'mypy-pure: could not import {module_name} to read __mypy_pure__: {exc!r}', stacklevel=2)
+        return source, pure_functions
+
+    def __discover_pure_functions(self, imports: dict[str, str]) -> list[str]:
+        """Load __mypy_pure__ of every module (and parent package) imported by a file; return their names."""
+        discovered: list[str] = []
+        for fullname in imports.values():
+            # fullname might be 'module.submodule.function' or just 'module'
+            # We try to load the top-level module and submodules
+            parts = fullname.split('.')
+            current_module = parts[0]
+            for part in [None, *parts[1:]]:
+                if part is not None:
+                    current_module = f'{current_module}.{part}'
+                self.__load_module_pure_functions(current_module)
+                if current_module not in discovered:
+                    discovered.append(current_module)
+        return discovered
+
+    def __restore_discovered_modules(self, discovered: dict[str, Any]) -> bool:
+        """
+        Reuse the __mypy_pure__ declarations stored in a cache entry, if none of their modules changed.
+
+        Modules are compared by name and content hash, never by path or modification time, so that an
+        entry written in another checkout or on another machine (e.g. a pre-seeded CI cache) is reused.
+        """
+        sources: dict[str, tuple[str, str]] = {}
+        for module_name, (content_hash, _) in discovered.items():
+            if content_hash is None:
+                continue
+            path = self.__declaration_path(module_name)
+            try:
+                if path is None or self.__declaration_finder.declarations(module_name, path)[0] != content_hash:
+                    return False
+            except OSError:
+                return False
+            sources[module_name] = (path, content_hash)
+
+        for module_name, (_, pure_functions) in discovered.items():
+            if module_name not in self.__loaded_modules:
+                self.__loaded_modules[module_name] = (sources.get(module_name), list(pure_functions))
+                self.__add_pure_functions(pure_functions)
+        return True
+
+    def __analyze_tree(self, file: MypyFile, needs_bodies: bool = False) -> ModuleAnalysis | None:
+        """
+        Collect calls, imports and @pure functions of a file.
+
+        mypy has already parsed the file, so its tree is walked directly instead of reading and
+        parsing the source again. The source is only parsed when the tree is not usable: mypy keeps
+        trees in serialized form when it runs parallel workers, loads them from its cache without
+        their definitions, frees them once it has checked their module (outside of dmypy), and strips
+        function bodies of modules whose errors are ignored (which matters for modules with @pure
+        functions, and for every module when needs_bodies is set).
+        """
+        if getattr(file, 'raw_data', None) is None and not file.is_cache_skeleton and file.defs:
+            tree_visitor = MypyPurityVisitor(file.fullname, file.is_package_init_file())
+            tree_visitor.visit(file)
+            if not (needs_bodies or tree_visitor.pure_functions_lineno) or not tree_visitor.has_stripped_bodies:
+                return ModuleAnalysis(
+                    module=file.fullname,
+                    path=file.path,
+                    calls=tree_visitor.calls,
+                    imports=tree_visitor.imports,
+                    pure_functions_lineno=tree_visitor.pure_functions_lineno,
+                    complete=not tree_visitor.has_stripped_bodies,
+                    allowed_effects=tree_visitor.allowed_effects,
+                )
+        return self.__analyze_source(file.fullname, file.path, file.is_package_init_file())
+
+    def __analyze_in_background(self, file: MypyFile) -> ModuleAnalysis | None:
+        # The visitor only reads the syntax of the tree, which semantic analysis leaves alone
+        try:
+            return self.__analyze_tree(file)
+        except (OSError, SyntaxError, ValueError):
+            # Analyzed again when the analyses are joined, where the error is handled
+            return None
+
+    @staticmethod
+    def __analyze_source(module: str, path: str, is_package: bool) -> ModuleAnalysis | None:
+        if not path:  # pragma: no cover
+            return None
+
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+
+        tree = ast.parse(source, filename=path)
+        visitor = PurityVisitor(module, is_package)
+        visitor.visit(tree)
+        return ModuleAnalysis(
+            module=module,
+            path=path,
+            calls=visitor.calls,
+            imports=visitor.imports,
+            pure_functions_lineno=visitor.pure_functions_lineno,
+            allowed_effects=visitor.allowed_effects,
+        )
+
+    def __is_skipped(self, module: str, path: str | None) -> bool:
+        # The standard library, site-packages and skip_modules are only called into, never analyzed
+        return self.__module_filter.is_skipped(module, path)
 
     def get_additional_deps(self, file: MypyFile) -> list[tuple[int, str, int]]:
         """
         Mypy hook that is called for each file to determine additional dependencies.
 
-        We use this hook as an entry point to analyze the file for purity violations.
-        It is called for every file that mypy checks.
+        We use this hook as an entry point to analyze the file. It is called for every file that mypy
+        parses; files with @pure markers are handed to the background pipeline, and the purity of
+        their @pure functions is only decided once every module they may call into has been analyzed.
 
         Args:
             file: The MypyFile object representing the file being checked.
@@ -81,78 +348,541 @@ class PurityPlugin(Plugin):
         Returns:
             A list of additional dependencies (always empty in our case, as we only use this for analysis).
         """
-        if file.fullname in self.__checked_files:  # pragma: no cover
+        if self.__is_skipped(file.fullname, file.path):
             return []
+        try:
+            content_hash = None
+            source = None
+            if file.path:
+                changed = self.__read_if_changed(file.fullname, file.path)
+                self.__add_fingerprint(file, self.__module_states[file.fullname][2])
+                if changed is None:
+                    # Same file as the one already analyzed, e.g. a dmypy recheck of another module
+                    return []
+                content_hash, source = changed
+            self.__invalidate(file.fullname)
+            # mypy checks the module again: the calls it resolves from types are collected again
+            self.__typed_calls[file.fullname] = {}
+            if self.__typed_call_records is not None:
+                self.__typed_call_records.remove(file.fullname)
 
-        # Skip stdlib and other system modules to avoid noise and performance hit
-        # This list is heuristic.
-        if file.fullname.startswith(('builtins', 'typing', 'sys', 'os', 'abc', 'enum', 'mypy.', '_')):
-            return []
+            if self.__cache is not None and content_hash is not None:
+                cache_key = SummaryCache.key(file.fullname, content_hash, self.__config_fingerprint)
+                self.__cache_keys[file.fullname] = cache_key
+                entry = self.__cache.get(cache_key)
+                if entry is not None:
+                    # The entry may come from another checkout of the project, in a shared cache
+                    self.__analyses[file.fullname] = ModuleAnalysis.from_dict({**entry['analysis'], 'path': file.path})
+                    if entry['summary'] is not None:
+                        # The modules it discovered are only all located once the build is parsed
+                        self.__cached_summaries[file.fullname] = entry
+                    return []
 
-        self.__checked_files.add(file.fullname)
+            if source is not None and not may_define_pure_functions(source):
+                # Most modules have no @pure function: they are only analyzed if a @pure function
+                # calls into them, when set_modules summarizes them on demand
+                return []
 
-        try:
-            # We need to read the source file again because MypyFile doesn't expose the raw source easily here,
-            # and we want to parse it with ast.
-            if not file.path:  # pragma: no cover
+            if self.__pipeline.submit(file.fullname, functools.partial(self.__analyze_in_background, file)):
+                # Visited by a worker while mypy goes on; joined when a verdict is needed
                 return []
+            analysis = self.__analyze_tree(file)
+            if analysis is not None:
+                self.__analyses[file.fullname] = analysis
+                self.__dirty_modules.add(file.fullname)
 
-            with open(file.path, 'r', encoding='utf-8') as f:
-                source = f.read()
+        except (OSError, SyntaxError, ValueError):
+            # The file vanished or does not parse: mypy reports it itself
+            pass
+        except Exception as exc:  # pragma: no cover  # noqa: BLE001 - a bug must not fail the type check
+            warnings.warn(f'mypy-pure: could not analyze {file.fullname}: {exc!r}', stacklevel=2)
 
-            tree = ast.parse(source, filename=file.path)
-            visitor = PurityVisitor()
-            visitor.visit(tree)
+        return []
 
-            if not visitor.pure_functions_lineno:
-                return []
+    def __add_fingerprint(self, file: MypyFile, content_hash: str) -> None:
+        """
+        Make dmypy recheck the @pure functions whose verdicts depend on a module when its content changes.
 
-            # Auto-discover pure functions from imported modules
-            # We look at the imports found by the visitor
-            for alias, fullname in visitor.imports.items():
-                # fullname might be 'module.submodule.function' or just 'module'
-                # We try to load the top-level module and submodules
-                parts = fullname.split('.')
-                current_module = parts[0]
-                self.__load_module_pure_functions(current_module)
-                for part in parts[1:]:
-                    current_module = f'{current_module}.{part}'
-                    self.__load_module_pure_functions(current_module)
+        dmypy only rechecks the dependents of a module when the symbols it exports change, not when a
+        function body does. The module gets a private symbol whose type names its content hash, so that
+        any edit fires its trigger, and the targets reporting @pure functions that depend on it are
+        registered as dependents of that trigger (the modules of those functions register it as well).
+        """
+        var = Var(FINGERPRINT_SYMBOL, UnboundType(content_hash))
+        var._fullname = f'{file.fullname}.{FINGERPRINT_SYMBOL}'
+        file.names[FINGERPRINT_SYMBOL] = SymbolTableNode(GDEF, var, module_public=False, no_serialize=True)
+        targets = {
+            target
+            for module, dependencies in self.__dependency_modules.items()
+            if file.fullname in dependencies
+            for target in self.__pure_function_targets.get(module, ())
+        }
+        if targets:
+            file.plugin_deps.setdefault(fingerprint_trigger(file.fullname), set()).update(targets)
+
+    def __read_if_changed(self, module: str, path: str) -> tuple[str, bytes] | None:
+        """
+        Return the content hash and content of a module file, or None when it is the file that was already analyzed.
+
+        The plugin lives as long as the dmypy daemon, so every module is tracked by modification time
+        and size first, and by content hash when those changed: touching a file does not invalidate it.
+        """
+        stat = os.stat(path)
+        state = self.__module_states.get(module)
+        if state is not None and state[:2] == (stat.st_mtime_ns, stat.st_size):
+            return None
+        with open(path, 'rb') as f:
+            source = f.read()
+        content_hash = SummaryCache.content_hash(source)
+        self.__module_states[module] = (stat.st_mtime_ns, stat.st_size, content_hash)
+        if state is not None and state[2] == content_hash:
+            return None
+        return content_hash, source
+
+    def __invalidate(self, module: str) -> None:
+        """Forget what was computed from a module that changed, and from the modules that depend on it."""
+        self.__pipeline.cancel(module)
+        self.__analyses.pop(module, None)
+        self.__pure_function_targets.pop(module, None)
+        self.__summaries.pop(module, None)
+        self.__cached_summaries.pop(module, None)
+        self.__discovered.pop(module, None)
 
-            purity_map, impure_calls_map = compute_purity(
-                calls=visitor.calls,
-                pure_functions=set(visitor.pure_functions_lineno.keys()),
-                blacklist=self.__blacklist,
-                whitelist=self.__whitelist,
+        # Its __mypy_pure__ declaration may have changed: it is read again when needed, and the modules
+        # whose summaries relied on it are summarized again (their analyses are still valid)
+        declared = self.__loaded_modules.pop(module, None)
+        if declared is not None and declared[1]:
+            self.__whitelist = self.__configured_whitelist.union(
+                *(pure_functions for _, pure_functions in self.__loaded_modules.values())
             )
+            self.__matcher = NameMatcher(self.__blacklist, self.__whitelist, self.__stdlib_database)
+            self.__method_matcher = MethodMatcher(self.__matcher)
+        for dependent, discovered in list(self.__discovered.items()):
+            if module in discovered:
+                self.__summaries.pop(dependent, None)
+                self.__discovered.pop(dependent, None)
 
-            for fn, lineno in visitor.pure_functions_lineno.items():
-                if not purity_map.get(fn, True):
-                    # Get the impure functions that were called
-                    impure_funcs = impure_calls_map.get(fn, set())
-                    if impure_funcs:
-                        # Format the list of impure functions
-                        impure_list = ', '.join(f"'{f}'" for f in sorted(impure_funcs))
-                        msg = (
-                            f'{file.path}:{lineno}: '
-                            f"error: Function '{fn}' is impure because it calls {impure_list}\n"
-                        )
-                    else:  # pragma: no cover
-                        # Fallback to generic message if no specific calls tracked
-                        # This shouldn't happen with current implementation
-                        msg = (
-                            f'{file.path}:{lineno}: '
-                            f"error: Function '{fn}' is annotated as pure but calls impure functions.\n"
-                        )
-                    sys.stdout.write(msg)
-                    sys.stdout.flush()
-
-        except Exception as _exc:  # pragma: no cover  # noqa
-            # Silently fail or print debug info if needed
-            # sys.stdout.write(f'AST Analysis failed for {file.fullname}: {e}\n')
-            pass
+    def __summary_of(self, module: str) -> ModuleSummary | None:
+        """Return the summary of a module, analyzing it on demand the first time it is needed."""
+        if module in self.__summaries:
+            return self.__summaries[module]
+        entry = self.__cached_summaries.pop(module, None)
+        if entry is not None and self.__restore_discovered_modules(entry['discovered']):
+            summary = ModuleSummary.from_dict(entry['summary'])
+            self.__summaries[module] = summary
+            self.__discovered[module] = list(entry['discovered'])
+            return summary
+        tree = self.__modules.get(module)
+        if module in self.__unsummarized_modules or self.__is_skipped(module, tree.path if tree is not None else None):
+            return None
+        self.__unsummarized_modules.add(module)
 
-        return []
+        analysis = self.__analyses.get(module)
+        if analysis is None or not analysis.complete:
+            # Not analyzed in this run (cached by mypy, or without @pure marker), or parsed without function bodies
+            if tree is None or tree.is_stub or not tree.path:
+                return None
+            analysis = self.__analyze_tree(tree, needs_bodies=True)
+            if analysis is None:  # pragma: no cover
+                return None
+            self.__analyses[module] = analysis
+            self.__dirty_modules.add(module)
+
+        self.__discovered[module] = self.__discover_pure_functions(analysis.imports)
+        self.__load_blacklist_shards(analysis.imports.values())
+        summary = summarize_module(
+            module=module,
+            calls=self.__calls_with_typed_calls(module, analysis),
+            imports=analysis.imports,
+            matcher=self.__matcher,
+        )
+        self.__summaries[module] = summary
+        self.__unsummarized_modules.discard(module)
+        self.__dirty_modules.add(module)
+        return summary
+
+    def __typed_calls_of(self, module: str) -> dict[FuncName, set[FuncName]]:
+        """Impure calls mypy resolved from types in a module: in this run, or in the last one that checked it."""
+        typed_calls = self.__typed_calls.get(module)
+        if typed_calls is None:
+            records = self.__typed_call_records.get(module) if self.__typed_call_records is not None else None
+            typed_calls = {}
+            for fn, call in records or []:
+                typed_calls.setdefault(fn, set()).add(call)
+            self.__typed_calls[module] = typed_calls
+            self.__load_blacklist_shards(call for calls in typed_calls.values() for call in calls)
+        return typed_calls
+
+    def __calls_with_typed_calls(self, module: str, analysis: ModuleAnalysis) -> CallMap:
+        typed_calls = self.__typed_calls_of(module)
+        if not typed_calls:
+            return analysis.calls
+        calls: dict[FuncName, set[FuncName]] = {fn: set(callees) for fn, callees in analysis.calls.items()}
+        for fn, impure_calls in typed_calls.items():
+            calls.setdefault(fn, set()).update(impure_calls)
+        return calls
+
+    def set_modules(self, modules: dict[str, MypyFile]) -> None:
+        """
+        Mypy hook called once every module of the build has been parsed.
+
+        The verdicts of the build are decided the first time one is needed, when mypy checks a @pure
+        function or writes the cache of a module with @pure functions, so the background analyses
+        overlap with mypy's semantic analysis and with the checking of the modules imported first.
+        """
+        super().set_modules(modules)
+        self.__modules = modules
+        # Modules removed from the build (e.g. deleted between two dmypy runs)
+        for module in [m for m in self.__module_states if m not in modules]:
+            self.__invalidate(module)
+            del self.__module_states[module]
+        self.__unsummarized_modules.clear()
+        self.__module_by_path = {tree.path: module for module, tree in modules.items() if tree.path}
+        # Classes of the previous build may have changed
+        self.__method_matcher = MethodMatcher(self.__matcher)
+        self.__checked_pure_functions.clear()
+        self.__decorated_functions.clear()
+        self.__purity_pending = True
+        self.__report_skipped_modules()
+
+    def __check_pending_purity(self) -> None:
+        """
+        Join the background analyses and decide the @pure functions of the build, once per build.
+
+        Every module with @pure functions is summarized, then the modules they call into, on demand.
+        The summaries are combined across module boundaries and the violations are recorded.
+        """
+        if not self.__purity_pending:
+            return
+        self.__purity_pending = False
+        try:
+            self.__join_analyses()
+            self.__check_purity()
+        except Exception as exc:  # pragma: no cover  # noqa: BLE001 - a bug must not fail the type check
+            # No verdict is reported for this build
+            warnings.warn(f'mypy-pure: could not decide the @pure functions: {exc!r}', stacklevel=2)
+
+    def __join_analyses(self) -> None:
+        results = self.__pipeline.join()
+        # Nothing is submitted until the next build: do not keep idle workers around
+        self.__pipeline.shutdown()
+        for module, analysis in results.items():
+            tree = self.__modules.get(module)
+            if analysis is None and tree is not None:
+                # The worker could not analyze the file; mypy reports its syntax errors itself
+                try:
+                    analysis = self.__analyze_tree(tree)
+                except (OSError, SyntaxError, ValueError):  # pragma: no cover
+                    pass
+            if analysis is not None:
+                self.__analyses[module] = analysis
+                self.__dirty_modules.add(module)
+
+    def __report_skipped_modules(self) -> None:
+        """
+        Tell how many modules of the build were not analyzed, by reason: whenever skip_modules skipped
+        some, otherwise with mypy -v (the standard library is skipped by every build).
+        """
+        counts: dict[str, int] = {}
+        for module, tree in self.__modules.items():
+            reason = self.__module_filter.skip_reason(module, tree.path)
+            if reason is not None:
+                counts[reason] = counts.get(reason, 0) + 1
+        if not counts.get(SKIPPED_BY_CONFIG) and self.options.verbosity < 1:
+            return
+        details = ', '.join(f'{reason}: {count}' for reason, count in sorted(counts.items()))
+        skipped = sum(counts.values())
+        print(
+            f'mypy-pure: skipped {skipped} of {len(self.__modules)} modules' + (f' ({details})' if details else ''),
+            file=sys.stderr,
+        )
+
+    def __check_purity(self, modules: list[str] | None = None) -> None:
+        """Decide the @pure functions of some modules (by default, of every module) and record their violations."""
+        known_modules = set(self.__analyses) | set(self.__modules)
+        roots = [
+            module
+            for module, analysis in self.__analyses.items()
+            if analysis.pure_functions_lineno and (modules is None or module in modules)
+        ]
+        # module -> modules whose summaries were needed to resolve its calls into other modules
+        module_edges: dict[str, set[str]] = {}
+        pending = list(roots)
+        seen = set(pending)
+        while pending:
+            module = pending.pop()
+            touched = module_edges.setdefault(module, set())
+
+            def summary_of(name: str, touched: set[str] = touched) -> ModuleSummary | None:
+                touched.add(name)
+                return self.__summary_of(name)
+
+            summary = self.__summary_of(module)
+            if summary is None:
+                continue
+            for references in summary.callees.values():
+                for reference in references:
+                    if reference in summary.callees:
+                        continue
+                    callee = resolve_reference(reference, summary_of, known_modules)
+                    callee_module = module_of(callee, self.__summaries) if callee else None
+                    if callee_module is not None and callee_module not in seen:
+                        seen.add(callee_module)
+                        pending.append(callee_module)
+
+        pure_functions = [f'{module}.{fn}' for module in roots for fn in self.__analyses[module].pure_functions_lineno]
+        witnesses = propagate_summaries(self.__summaries, pure_functions, self.__matcher.effects)
+        if modules is None:
+            self.__violations = {}
+            self.__dependencies = {}
+            self.__dependency_modules = {}
+        else:
+            for key in [key for key in self.__violations if key[0] in modules]:
+                del self.__violations[key]
+        for module in roots:
+            self.__violations_versions[module] = self.__typed_calls_version
+            analysis = self.__analyses[module]
+            for fn, lineno in analysis.pure_functions_lineno.items():
+                violation = policy_violation(witnesses, f'{module}.{fn}', analysis.allowed_effects.get(fn, 0))
+                if violation is not None:
+                    impure_calls, path, disallowed = violation
+                    path = [name.removeprefix(f'{module}.') for name in path]
+                    self.__violations[(module, lineno)] = (fn, impure_calls, path, disallowed)
+            self.__dependency_modules[module] = self.__dependency_modules_of(module, module_edges)
+            self.__dependencies[module] = self.__dependency_paths(module, module_edges)
+
+        self.__save_to_cache()
+
+    @staticmethod
+    def __reachable_modules(root: str, module_edges: dict[str, set[str]]) -> set[str]:
+        reachable = {root}
+        pending = [root]
+        while pending:
+            for callee_module in module_edges.get(pending.pop(), ()):
+                if callee_module not in reachable:
+                    reachable.add(callee_module)
+                    pending.append(callee_module)
+        return reachable
+
+    def __dependency_modules_of(self, root: str, module_edges: dict[str, set[str]]) -> set[str]:
+        """Modules (and modules with __mypy_pure__ declarations) the verdicts of a module depend on."""
+        reachable = self.__reachable_modules(root, module_edges)
+        modules = {discovered for module in reachable for discovered in self.__discovered.get(module, [])}
+        return (modules | reachable) - {root}
+
+    def __dependency_paths(self, root: str, module_edges: dict[str, set[str]]) -> list[str]:
+        """Files of the modules (and __mypy_pure__ declarations) the verdicts of a module depend on."""
+        paths: set[str] = set()
+        for module in self.__reachable_modules(root, module_edges):
+            if module != root:
+                tree = self.__modules.get(module)
+                analysis = self.__analyses.get(module)
+                path = analysis.path if analysis is not None else tree.path if tree is not None else None
+                if path:
+                    paths.add(path)
+            for discovered in self.__discovered.get(module, []):
+                source, _ = self.__loaded_modules.get(discovered, (None, []))
+                if source is not None:
+                    paths.add(source[0])
+        return sorted(paths)
+
+    def get_function_hook(self, fullname: str) -> Callable[[FunctionContext], Type] | None:
+        # mypy type checks decorators as calls, so this runs once for every @pure function it checks
+        if fullname == PurityVisitor.PURE_DECORATOR_FULLNAME:
+            return self.__report_violation
+        # mypy has resolved the function, through aliases and re-exports
+        self.__load_blacklist_shards([fullname])
+        if self.__matcher.is_impure(fullname):
+            return functools.partial(self.__record_typed_call, normalize_name(fullname))
+        return None
+
+    def get_method_hook(self, fullname: str) -> Callable[[MethodContext], Type] | None:
+        # fullname is the class of the receiver, as mypy inferred it, and the method
+        class_name, _, method = fullname.rpartition('.')
+        symbol = self.lookup_fully_qualified(class_name) if class_name else None
+        if symbol is None or not isinstance(symbol.node, TypeInfo):
+            return None
+        self.__load_blacklist_shards(base.fullname for base in symbol.node.mro)
+        impure_call = self.__method_matcher.impure_call(symbol.node, method)
+        if impure_call is not None:
+            return functools.partial(self.__record_typed_call, normalize_name(impure_call))
+        return None
+
+    def __record_typed_call(self, call: FuncName, ctx: FunctionContext | MethodContext) -> Type:
+        """
+        Attribute an impure call that mypy resolved to the function it is made in.
+
+        The summary of the module is built again with it when it is needed. @pure functions of the
+        module that mypy has already checked are decided again, and reported if they became impure:
+        their module is still being checked, so it is not too late.
+        """
+        module = self.__module_by_path.get(ctx.api.path)
+        fn = self.__enclosing_function(ctx.api)
+        if module is None or fn is None or self.__is_skipped(module, ctx.api.path):
+            return ctx.default_return_type
+        impure_calls = self.__typed_calls_of(module).setdefault(fn, set())
+        if call not in impure_calls:
+            impure_calls.add(call)
+            self.__typed_calls_version += 1
+            self.__summaries.pop(module, None)
+            self.__cached_summaries.pop(module, None)
+            self.__save_typed_calls(module)
+            for (pure_module, _), (func, reported) in list(self.__checked_pure_functions.items()):
+                if pure_module == module and not reported:
+                    self.__report_pure_function(module, func, ctx.api)
+        return ctx.default_return_type
+
+    @staticmethod
+    def __enclosing_function(api: CheckerPluginInterface) -> FuncName | None:
+        """Name of the innermost function (not lambda) mypy is checking, as the visitors name it (Class.method)."""
+        scope = getattr(api, 'scope', None)
+        names: list[str] = []
+        for node in reversed(getattr(scope, 'stack', [])):
+            if isinstance(node, FuncDef):
+                if names:
+                    break
+                names.append(node.name)
+            elif isinstance(node, TypeInfo) and names:
+                names.append(node.name)
+        return '.'.join(reversed(names)) or None
+
+    def __report_violation(self, ctx: FunctionContext) -> Type:
+        # The hook fires for @pure with the decorator, and for @pure(...) with the call of the decorator
+        if isinstance(ctx.context, (Decorator, CallExpr)):
+            module = self.__module_by_path.get(ctx.api.path)
+            if module is not None:
+                if isinstance(ctx.context, Decorator):
+                    func: FuncDef | None = ctx.context.func
+                else:
+                    func = self.__decorated_function(module, ctx.context)
+                if func is not None:
+                    self.__report_pure_function(module, func, ctx.api)
+        return ctx.default_return_type
+
+    def __decorated_function(self, module: str, decorator: Expression) -> FuncDef | None:
+        """The function a decorator expression of a module decorates; None for any other expression."""
+        index = self.__decorated_functions.get(module)
+        if index is None:
+            index = self.__decorated_functions[module] = {}
+            tree = self.__modules.get(module)
+            stack: list[Statement] = list(tree.defs) if tree is not None else []
+            while stack:
+                node = stack.pop()
+                if isinstance(node, Decorator):
+                    for expression in node.decorators:
+                        index[expression] = node.func
+                    stack.extend(node.func.body.body)
+                elif isinstance(node, FuncDef):
+                    stack.extend(node.body.body)
+                elif isinstance(node, OverloadedFuncDef):
+                    stack.extend(node.items)
+                elif isinstance(node, ClassDef):
+                    stack.extend(node.defs.body)
+                elif isinstance(node, IfStmt):
+                    for block in node.body:
+                        stack.extend(block.body)
+                    if node.else_body is not None:
+                        stack.extend(node.else_body.body)
+        return index.get(decorator)
+
+    def __report_pure_function(self, module: str, func: FuncDef, api: CheckerPluginInterface) -> None:
+        self.__check_pending_purity()
+        if self.__violations_versions.get(module) != self.__typed_calls_version:
+            # Impure calls found from types since the violations of the module were decided
+            self.__check_purity([module])
+        self.__register_dependencies(module, api)
+        violation = self.__violations.get((module, func.line))
+        if violation is not None:
+            api.fail(impurity_message(*violation), func, code=IMPURE)
+        self.__checked_pure_functions[(module, func.line)] = (func, violation is not None)
+
+    def __register_dependencies(self, module: str, api: CheckerPluginInterface) -> None:
+        """Make dmypy report the @pure functions of a module again when a module their verdicts depend on changes."""
+        scope = getattr(api, 'tscope', None)
+        target = scope.current_target() if scope is not None else module
+        self.__pure_function_targets.setdefault(module, set()).add(target)
+        tree = self.__modules.get(module)
+        if tree is not None:
+            for dependency in self.__dependency_modules.get(module, ()):
+                tree.plugin_deps.setdefault(fingerprint_trigger(dependency), set()).add(target)
+
+    def report_config_data(self, ctx: ReportConfigContext) -> Any:
+        """
+        Make mypy's incremental cache aware of what decides the verdicts of a module.
+
+        The configuration is reported for every module. Modules with @pure functions also report the
+        state of the files of the modules their verdicts depend on, so that mypy checks them again
+        (and the plugin reports them again) when one of those files changes.
+        """
+        data: dict[str, str] = {'config': self.__config_fingerprint}
+        if not ctx.is_check and self.__may_have_pure_functions(ctx.id):
+            # Its dependencies are only known once the verdicts are decided
+            self.__check_pending_purity()
+        if self.__dependency_records is None:
+            return data
+        if ctx.is_check:
+            paths = self.__dependency_records.get(ctx.id)
+        else:
+            paths = self.__dependencies.get(ctx.id)
+            if paths:
+                self.__dependency_records.put(ctx.id, paths)
+            else:
+                self.__dependency_records.remove(ctx.id)
+        if paths:
+            data['dependencies'] = DependencyRecords.fingerprint(paths)
+        return data
+
+    def __may_have_pure_functions(self, module: str) -> bool:
+        analysis = self.__analyses.get(module)
+        return module in self.__pipeline or (analysis is not None and bool(analysis.pure_functions_lineno))
+
+    def __save_typed_calls(self, module: str) -> None:
+        """
+        Keep the typed calls of a module, for the runs in which mypy does not check it again.
+
+        They are written as they are found: mypy writes its cache of a module before checking the
+        function bodies, so no hook runs once a module is completely checked.
+        """
+        if self.__typed_call_records is not None:
+            typed_calls = self.__typed_calls.get(module, {})
+            self.__typed_call_records.put(
+                module, sorted([fn, call] for fn, calls in typed_calls.items() for call in calls)
+            )
+
+    def __save_to_cache(self) -> None:
+        if self.__cache is None:
+            return
+        for module in sorted(self.__dirty_modules):
+            cache_key = self.__cache_keys.get(module)
+            if cache_key is None:
+                continue
+            summary = self.__summaries.get(module)
+            # Content hashes only, no paths: the entry is valid in any checkout with the same modules
+            discovered: dict[str, list[Any]] = {}
+            for discovered_module in self.__discovered.get(module, []):
+                source, pure_functions = self.__loaded_modules[discovered_module]
+                discovered[discovered_module] = [source[1] if source is not None else None, pure_functions]
+            self.__cache.put(
+                cache_key,
+                {
+                    'module': module,
+                    'analysis': self.__analyses[module].to_dict(),
+                    # Typed calls depend on other modules, so summaries that include them are not kept
+                    'summary': (
+                        summary.to_dict() if summary is not None and not self.__typed_calls.get(module) else None
+                    ),
+                    'discovered': discovered,
+                },
+            )
+        self.__dirty_modules.clear()
+        # mypy does not tell plugins when the run ends, and this may be its last build
+        self.__cache.close()
+        if self.options.verbosity >= 1:
+            print(
+                f'mypy-pure: summary cache: {self.__cache.hits} hits, {self.__cache.misses} misses '
+                f'({self.__cache_backend} at {self.__cache.location})',
+                file=sys.stderr,
+            )
 
 
 def plugin(version: str) -> type[PurityPlugin]:
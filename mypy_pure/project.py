@@ -0,0 +1,592 @@
+import ast
+import os
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+from mypy.modulefinder import BuildSource
+from mypy.options import Options
+
+from mypy_pure.blacklists import ALWAYS_LOADED, BlacklistShards
+from mypy_pure.configuration import PurityConfig
+from mypy_pure.module_filter import ModuleFilter
+from mypy_pure.purity.discovery import (
+    PureDeclarationFinder,
+    parse_mypy_pure,
+    qualify_pure_functions,
+)
+from mypy_pure.purity.effects import effect_names
+from mypy_pure.purity.matcher import IMPURE, PURE, NameMatcher
+from mypy_pure.purity.summary import (
+    MAX_REEXPORT_DEPTH,
+    ModuleAnalysis,
+    ModuleSummary,
+    module_of,
+    propagate_summaries,
+    resolve_reference,
+    summarize_module,
+)
+from mypy_pure.purity.types import EffectMask, FuncName, LineNo
+from mypy_pure.purity.visitor import PurityVisitor
+from mypy_pure.purity.witnesses import Witnesses, impurity_message, policy_violation
+from mypy_pure.shards import ShardArtifact
+from mypy_pure.stdlib_database import load_stdlib_database
+
+# Below this number of files per worker, starting a process pool costs more than it saves
+MIN_FILES_PER_JOB = 16
+
+
+class Violation:
+    """A @pure function that reaches impure calls."""
+
+    def __init__(
+        self,
+        path: str,
+        line: LineNo,
+        function: FuncName,
+        impure_calls: list[FuncName],
+        call_path: list[FuncName] | None = None,
+        disallowed_effects: EffectMask = 0,
+    ) -> None:
+        self.__path = path
+        self.__line = line
+        self.__function = function
+        self.__impure_calls = impure_calls
+        self.__call_path = call_path or [function, *impure_calls[:1]]
+        self.__disallowed_effects = disallowed_effects
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def line(self) -> LineNo:
+        return self.__line
+
+    @property
+    def function(self) -> FuncName:
+        return self.__function
+
+    @property
+    def impure_calls(self) -> list[FuncName]:
+        return self.__impure_calls
+
+    @property
+    def call_path(self) -> list[FuncName]:
+        """Shortest call path from the function to one of its impure calls."""
+        return self.__call_path
+
+    @property
+    def disallowed_effects(self) -> list[str]:
+        """Effect kinds reached that the @pure(allow=...) policy of the function does not allow; none without one."""
+        return effect_names(self.__disallowed_effects)
+
+    @property
+    def message(self) -> str:
+        return impurity_message(self.__function, self.__impure_calls, self.__call_path, self.__disallowed_effects)
+
+    def format(self) -> str:
+        """Format like a mypy error, so editors and CI annotations understand it."""
+        return f'{self.__path}:{self.__line}: error: {self.message}  [impure]'
+
+
+class FileAnalysis:
+    """What a worker returns for a file: its analysis and declarations, or why it could not be analyzed."""
+
+    def __init__(
+        self,
+        analysis: ModuleAnalysis | None,
+        declared_pure_functions: list[FuncName],
+        error: str | None = None,
+    ) -> None:
+        self.__analysis = analysis
+        self.__declared_pure_functions = declared_pure_functions
+        self.__error = error
+
+    @property
+    def analysis(self) -> ModuleAnalysis | None:
+        return self.__analysis
+
+    @property
+    def declared_pure_functions(self) -> list[FuncName]:
+        """The __mypy_pure__ declaration of the module, qualified with its name."""
+        return self.__declared_pure_functions
+
+    @property
+    def error(self) -> str | None:
+        return self.__error
+
+
+def analyze_file(path: str, module: str, is_package: bool) -> FileAnalysis:
+    """Parse a file and collect its calls, imports, @pure functions and __mypy_pure__ declaration."""
+    try:
+        with open(path, 'rb') as f:
+            source = f.read()
+    except OSError as exc:
+        return FileAnalysis(None, [], f'{path}: error: {exc}')
+    return analyze_source(source, path, module, is_package)
+
+
+def analyze_source(source: bytes, path: str, module: str, is_package: bool) -> FileAnalysis:
+    """Same as analyze_file, for the source of a file that may not be saved, e.g. an editor buffer."""
+    tree = parse_source(source, path)
+    if isinstance(tree, FileAnalysis):
+        return tree
+
+    visitor = PurityVisitor(module, is_package)
+    visitor.visit(tree)
+    analysis = ModuleAnalysis(
+        module=module,
+        path=path,
+        calls=visitor.calls,
+        imports=visitor.imports,
+        pure_functions_lineno=visitor.pure_functions_lineno,
+        allowed_effects=visitor.allowed_effects,
+    )
+    return FileAnalysis(analysis, qualify_pure_functions(parse_mypy_pure(source), module))
+
+
+def parse_source(source: bytes, path: str) -> ast.Module | FileAnalysis:
+    """Parse the source of a file; the FileAnalysis of the error when it does not parse."""
+    try:
+        return ast.parse(source, filename=path)
+    except SyntaxError as exc:
+        return FileAnalysis(None, [], f'{path}:{exc.lineno or 1}: error: {exc.msg}  [syntax]')
+    except ValueError as exc:
+        return FileAnalysis(None, [], f'{path}: error: {exc}')
+
+
+def analyze_files(sources: list[BuildSource], jobs: int = 1) -> list[FileAnalysis]:
+    """Analyze files, in a pool of processes when there are enough of them; results keep the input order."""
+    paths = [os.path.normpath(source.path) if source.path else '' for source in sources]
+    modules = [source.module for source in sources]
+    packages = [os.path.basename(path).startswith('__init__.') for path in paths]
+
+    jobs = max(1, min(jobs, len(sources) // MIN_FILES_PER_JOB))
+    if jobs == 1:
+        return list(map(analyze_file, paths, modules, packages))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Chunks amortize the inter-process communication; several per worker keep the load balanced
+        chunksize = max(1, len(sources) // (jobs * 8))
+        return list(executor.map(analyze_file, paths, modules, packages, chunksize=chunksize))
+
+
+def demanded_function(name: FuncName, visitors: Mapping[str, PurityVisitor]) -> tuple[str, FuncName] | None:
+    """
+    The module and function of the indexed modules a qualified call reaches, following re-exports
+    like resolve_reference does; None when it is not a function of one of them.
+    """
+    for _ in range(MAX_REEXPORT_DEPTH):
+        module = module_of(name, visitors)
+        if module is None:
+            return None
+        visitor = visitors[module]
+        head, _, rest = name.removeprefix(f'{module}.').partition('.')
+        if not rest and head in visitor.indexed_functions:
+            return module, head
+        target = visitor.imports.get(head)
+        if target is None or target == name:
+            return None
+        name = f'{target}.{rest}' if rest else target
+    return None  # pragma: no cover
+
+
+def analyze_on_demand(sources: list[BuildSource]) -> list[FileAnalysis]:
+    """
+    Same as analyze_files, but only the bodies of the @pure functions and of the functions of the
+    sources they reach are analyzed, in one process: every file is parsed and indexed first (see
+    PurityVisitor.index), then functions are visited as calls reach them, across modules. The
+    analyses are incomplete: they are only right about the functions @pure functions reach. Every tree
+    is kept until the end, so the mypy-pure command holds off garbage collection around it.
+    """
+    paths = [os.path.normpath(source.path) if source.path else '' for source in sources]
+    results: list[FileAnalysis | None] = []
+    visitors: dict[str, PurityVisitor] = {}
+    declarations: dict[str, list[FuncName]] = {}
+    for source, path in zip(sources, paths):
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError as exc:
+            results.append(FileAnalysis(None, [], f'{path}: error: {exc}'))
+            continue
+        tree = parse_source(content, path)
+        if isinstance(tree, FileAnalysis):
+            results.append(tree)
+            continue
+        visitor = PurityVisitor(source.module, os.path.basename(path).startswith('__init__.'))
+        visitor.index(tree)
+        visitors[source.module] = visitor
+        declarations[source.module] = qualify_pure_functions(parse_mypy_pure(content), source.module)
+        results.append(None)
+
+    pending = [(module, fn) for module, visitor in visitors.items() for fn in visitor.pure_functions_lineno]
+    while pending:
+        module, fn = pending.pop()
+        visitor = visitors[module]
+        for callee in visitor.visit_function(fn):
+            if callee in visitor.indexed_functions:
+                pending.append((module, callee))
+            else:
+                function = demanded_function(callee, visitors)
+                if function is not None:
+                    pending.append(function)
+
+    analyses = []
+    for source, path, result in zip(sources, paths, results):
+        if result is None:
+            visitor = visitors[source.module]
+            analysis = ModuleAnalysis(
+                module=source.module,
+                path=path,
+                calls=visitor.calls,
+                imports=visitor.imports,
+                pure_functions_lineno=visitor.pure_functions_lineno,
+                complete=False,
+                allowed_effects=visitor.allowed_effects,
+            )
+            result = FileAnalysis(analysis, declarations[source.module])
+        analyses.append(result)
+    return analyses
+
+
+class ProjectChecker:
+    """
+    Check the purity of a set of files without running mypy.
+
+    Files of skipped modules (skip_modules, the standard library, site-packages) are left out. The
+    other files are parsed in parallel; the whitelist is then completed with the __mypy_pure__ declarations
+    of the checked files and of the modules they import, every module is summarized and the summaries
+    are propagated across modules, exactly as the mypy plugin does.
+
+    Analyses, summaries and verdicts are kept, with an index of the modules every summary resolves
+    its calls into, so that recheck only analyzes the files that changed and only decides again the
+    @pure functions of the modules that depend on them.
+    """
+
+    def __init__(self, config: PurityConfig, options: Options | None = None) -> None:
+        self.__config = config
+        self.__blacklist_shards = BlacklistShards()
+        self.__database = load_stdlib_database(config.stdlib_database_path) if config.stdlib_database else None
+        self.__blacklist: list[FuncName] = [*self.__blacklist_shards.load(ALWAYS_LOADED), *config.impure_functions]
+        self.__discovered_pure_functions: dict[str, list[FuncName]] = {}  # __mypy_pure__ of imported modules
+        self.__matcher = NameMatcher(self.__blacklist, config.pure_functions, self.__database)
+        self.__declaration_finder = PureDeclarationFinder(options or Options())
+        self.__discovered_modules: set[str] = set()
+        self.__module_filter = ModuleFilter(config.skip_modules, config.include_modules)
+        self.__errors: dict[str, str] = {}  # path -> why it could not be analyzed
+        self.__skipped: dict[str, str] = {}
+        self.__analyses: dict[str, ModuleAnalysis] = {}
+        self.__declared_pure_functions: dict[str, list[FuncName]] = {}  # module -> its __mypy_pure__
+        self.__module_by_path: dict[str, str] = {}
+        self.__summaries: dict[str, ModuleSummary] = {}
+        # module -> modules its summary resolves calls into, and the reverse index
+        self.__references: dict[str, set[str]] = {}
+        self.__dependents: dict[str, set[str]] = {}
+        self.__violations: dict[str, list[Violation]] = {}  # module -> violations of its @pure functions
+        self.__demand_driven = False  # whether the analyses only cover what @pure functions reach
+
+    @property
+    def errors(self) -> list[str]:
+        """Files that could not be analyzed, formatted like mypy errors."""
+        return sorted(self.__errors.values())
+
+    @property
+    def skipped(self) -> dict[str, str]:
+        """Files that were not analyzed, with the reason why."""
+        return self.__skipped
+
+    @property
+    def modules(self) -> dict[str, ModuleAnalysis]:
+        """Analyses of the checked modules."""
+        return self.__analyses
+
+    @property
+    def summaries(self) -> dict[str, ModuleSummary]:
+        """Summaries of the checked modules, as of the last check."""
+        return self.__summaries
+
+    def propagate(self) -> Witnesses:
+        """The witnesses of every impure function of the checked modules, @pure or not."""
+        return propagate_summaries(self.__summaries, None, self.__matcher.effects)
+
+    def file_violations(self, path: str) -> list[Violation]:
+        """Violations of the @pure functions of a file, as of the last check."""
+        module = self.__module_by_path.get(os.path.normpath(path))
+        return list(self.__violations.get(module, [])) if module is not None else []
+
+    def file_error(self, path: str) -> str | None:
+        """Why a file could not be analyzed at the last check, if it could not."""
+        return self.__errors.get(os.path.normpath(path))
+
+    def check(self, sources: list[BuildSource], jobs: int = 1, demand_driven: bool = False) -> list[Violation]:
+        """
+        Check the sources. A demand_driven check only analyzes the functions @pure functions reach
+        (see analyze_on_demand): the verdicts are the same, but it cannot be rechecked.
+        """
+        self.analyze(sources, jobs, demand_driven)
+        return self.check_analyses(self.__analyses)
+
+    def analyze(self, sources: list[BuildSource], jobs: int = 1, demand_driven: bool = False) -> None:
+        """Parse the sources and read the declarations they rely on, without deciding anything yet."""
+        self.__demand_driven = demand_driven
+        self.__skipped = {}
+        self.__errors = {}
+        self.__analyses = {}
+        self.__declared_pure_functions = {}
+        self.__module_by_path = {}
+        checked_sources = self.__checked_sources(sources)
+        paths = [os.path.normpath(source.path) if source.path else '' for source in checked_sources]
+        results = analyze_on_demand(checked_sources) if demand_driven else analyze_files(checked_sources, jobs)
+        self.__add_results(paths, results)
+        for analysis in self.__analyses.values():
+            self.__discover_pure_functions(analysis.imports.values())
+
+    def export(self, shard: tuple[int, int], sources: int) -> ShardArtifact:
+        """What the last analyze found, as the artifact of a shard of a project (with its number of sources)."""
+        return ShardArtifact(
+            [shard],
+            sources,
+            self.__analyses,
+            self.__declared_pure_functions,
+            self.__discovered_pure_functions,
+            self.__errors,
+            self.__skipped,
+        )
+
+    def check_artifact(self, artifact: ShardArtifact) -> list[Violation]:
+        """Check what the shards of a project found (see ShardArtifact.merge), as check would check the project."""
+        self.__demand_driven = False
+        self.__skipped = dict(artifact.skipped)
+        self.__errors = dict(artifact.errors)
+        self.__declared_pure_functions = dict(artifact.declared_pure_functions)
+        self.__discovered_pure_functions = dict(artifact.discovered_pure_functions)
+        self.__discovered_modules.update(artifact.analyses, artifact.discovered_pure_functions)
+        self.__rebuild_matcher()
+        return self.check_analyses(dict(artifact.analyses))
+
+    def check_analyses(self, analyses: dict[str, ModuleAnalysis]) -> list[Violation]:
+        self.__analyses = analyses
+        self.__module_by_path = {analysis.path: module for module, analysis in analyses.items()}
+        for analysis in analyses.values():
+            self.__load_blacklist_shards(analysis.imports.values())
+        return self.__check_all()
+
+    def recheck(
+        self, sources: list[BuildSource], removed: Iterable[str] = (), buffers: Mapping[str, bytes] | None = None
+    ) -> list[Violation]:
+        """
+        Check again after some files changed or were added (sources) and others were deleted (removed paths).
+        The source of a file is taken from buffers (by path) when it is there, e.g. for unsaved editor buffers;
+        a buffer that does not parse is reported, but its module keeps the analysis of its last version that did.
+
+        Only the given files are analyzed, and only the modules that changed are summarized again.
+        The @pure functions decided again are those of the changed modules and of the modules that
+        reach them through the index of references, so propagation only walks the summaries of the
+        components of the module graph a change can affect. When a change can affect every module
+        (modules added or removed, __mypy_pure__ declarations or rules that changed), every module is
+        summarized and decided again, still without analyzing the other files again. A checker whose
+        last check was demand-driven cannot recheck (ValueError).
+        """
+        if self.__demand_driven:
+            raise ValueError('a demand-driven check cannot be rechecked: the other modules were not fully analyzed')
+        changed: set[str] = set()
+        everything = False
+        for path in removed:
+            path = os.path.normpath(path)
+            self.__errors.pop(path, None)
+            self.__skipped.pop(path, None)
+            module = self.__module_by_path.pop(path, None)
+            if module is not None:
+                self.__forget(module)
+                everything = True
+
+        buffers = buffers or {}
+        checked_paths: list[str] = []
+        results: list[FileAnalysis] = []
+        declarations: dict[str, list[FuncName]] = {}
+        for source in self.__checked_sources(sources):
+            path = os.path.normpath(source.path) if source.path else ''
+            result = self.__analyze(source, path, buffers)
+            if result is None:
+                continue
+            self.__errors.pop(path, None)
+            module = self.__module_by_path.pop(path, None)
+            if module is None:
+                everything = True
+            else:
+                declarations[module] = self.__declared_pure_functions.get(module, [])
+                self.__forget(module)
+            changed.add(source.module)
+            checked_paths.append(path)
+            results.append(result)
+        self.__add_results(checked_paths, results)
+        for module in changed:
+            # A module that cannot be analyzed any more, or whose declarations other modules may rely on
+            if module not in self.__analyses or declarations.get(module) != self.__declared_pure_functions[module]:
+                everything = True
+        if everything:
+            self.__rebuild_matcher()
+
+        version = self.__matcher.version
+        for module in changed & self.__analyses.keys():
+            imports = self.__analyses[module].imports.values()
+            self.__load_blacklist_shards(imports)
+            self.__discover_pure_functions(imports)
+        if everything or version != self.__matcher.version:
+            # Verdicts of names may have changed: every summary is built again
+            return self.__check_all()
+
+        for module in changed:
+            self.__summarize(module)
+        for module in changed:
+            self.__index(module)
+        return self.__decide(self.__closure(changed, self.__dependents))
+
+    def __analyze(self, source: BuildSource, path: str, buffers: Mapping[str, bytes]) -> FileAnalysis | None:
+        """Analyze a changed file or its buffer; None when the buffer does not parse: the module keeps its analysis."""
+        is_package = os.path.basename(path).startswith('__init__.')
+        if path not in buffers:
+            return analyze_file(path, source.module, is_package)
+        result = analyze_source(buffers[path], path, source.module, is_package)
+        if result.analysis is None and path in self.__module_by_path:
+            # A buffer in the middle of an edit
+            self.__errors[path] = result.error or ''
+            return None
+        return result
+
+    @staticmethod
+    def __closure(modules: set[str], edges: dict[str, set[str]]) -> set[str]:
+        """The modules reachable from some modules through an index of references (or of dependents)."""
+        reached = set(modules)
+        pending = list(modules)
+        while pending:
+            for module in edges.get(pending.pop(), ()):
+                if module not in reached:
+                    reached.add(module)
+                    pending.append(module)
+        return reached
+
+    def __checked_sources(self, sources: list[BuildSource]) -> list[BuildSource]:
+        checked_sources = []
+        for source in sources:
+            reason = self.__module_filter.skip_reason(source.module, source.path)
+            if reason is None:
+                checked_sources.append(source)
+            else:
+                self.__skipped[source.path or source.module] = reason
+        return checked_sources
+
+    def __add_results(self, paths: list[str], results: list[FileAnalysis]) -> None:
+        for path, result in zip(paths, results):
+            if result.error is not None:
+                self.__errors[path] = result.error
+            if result.analysis is not None:
+                module = result.analysis.module
+                self.__analyses[module] = result.analysis
+                self.__module_by_path[result.analysis.path] = module
+                self.__declared_pure_functions[module] = result.declared_pure_functions
+                self.__matcher.add(result.declared_pure_functions, PURE)
+        self.__discovered_modules.update(self.__analyses)
+
+    def __forget(self, module: str) -> None:
+        self.__analyses.pop(module, None)
+        self.__declared_pure_functions.pop(module, None)
+        self.__summaries.pop(module, None)
+        self.__violations.pop(module, None)
+        for reference in self.__references.pop(module, set()):
+            self.__dependents.get(reference, set()).discard(module)
+
+    def __rebuild_matcher(self) -> None:
+        """Rules can only be added to a matcher: a declaration that changed needs a new one."""
+        declared = [name for names in self.__declared_pure_functions.values() for name in names]
+        discovered = [name for names in self.__discovered_pure_functions.values() for name in names]
+        self.__matcher = NameMatcher(
+            self.__blacklist,
+            [*self.__config.pure_functions, *discovered, *declared],
+            self.__database,
+        )
+
+    def __load_blacklist_shards(self, imported: Iterable[str]) -> None:
+        # Rules of the libraries the checked modules import
+        impure_functions = self.__blacklist_shards.load(imported)
+        if impure_functions:
+            self.__blacklist.extend(impure_functions)
+            self.__matcher.add(impure_functions, IMPURE)
+
+    def __summarize(self, module: str) -> None:
+        analysis = self.__analyses[module]
+        self.__summaries[module] = summarize_module(module, analysis.calls, analysis.imports, self.__matcher)
+
+    def __index(self, module: str) -> None:
+        """Record the modules the summary of a module resolves its calls into, re-exports included."""
+        touched: set[str] = set()
+
+        def summary_of(name: str) -> ModuleSummary | None:
+            touched.add(name)
+            return self.__summaries.get(name)
+
+        summary = self.__summaries[module]
+        for references in summary.callees.values():
+            for reference in references:
+                if reference not in summary.callees:
+                    resolve_reference(reference, summary_of, self.__summaries)
+        touched.discard(module)
+        for reference in self.__references.get(module, set()) - touched:
+            self.__dependents.get(reference, set()).discard(module)
+        for reference in touched:
+            self.__dependents.setdefault(reference, set()).add(module)
+        self.__references[module] = touched
+
+    def __check_all(self) -> list[Violation]:
+        self.__summaries = {}
+        self.__references = {}
+        self.__dependents = {}
+        self.__violations = {}
+        for module in self.__analyses:
+            self.__summarize(module)
+        for module in self.__analyses:
+            self.__index(module)
+        return self.__decide(set(self.__analyses))
+
+    def __decide(self, modules: set[str]) -> list[Violation]:
+        """Decide the @pure functions of some modules, from the summaries of the modules they reach."""
+        reachable = self.__closure(modules, self.__references)
+        summaries = {module: self.__summaries[module] for module in reachable if module in self.__summaries}
+        pure_functions = [
+            f'{module}.{fn}' for module in modules for fn in self.__analyses[module].pure_functions_lineno
+        ]
+        witnesses = propagate_summaries(summaries, pure_functions, self.__matcher.effects)
+
+        for module in modules:
+            analysis = self.__analyses[module]
+            violations = []
+            for fn, lineno in analysis.pure_functions_lineno.items():
+                violation = policy_violation(witnesses, f'{module}.{fn}', analysis.allowed_effects.get(fn, 0))
+                if violation is not None:
+                    impure_calls, path, disallowed = violation
+                    path = [name.removeprefix(f'{module}.') for name in path]
+                    violations.append(Violation(analysis.path, lineno, fn, impure_calls, path, disallowed))
+            violations.sort(key=lambda violation: (violation.line, violation.function))
+            self.__violations[module] = violations
+        # The violations of a module share its path: sorting the modules is enough
+        ordered = sorted(self.__violations, key=lambda module: self.__analyses[module].path)
+        return [violation for module in ordered for violation in self.__violations[module]]
+
+    def __discover_pure_functions(self, imported: Iterable[str]) -> None:
+        """Read __mypy_pure__ of the imported modules (and parent packages) that are not being checked."""
+        for fullname in imported:
+            parts = fullname.split('.')
+            for i in range(1, len(parts) + 1):
+                module = '.'.join(parts[:i])
+                if module in self.__discovered_modules:
+                    continue
+                self.__discovered_modules.add(module)
+                try:
+                    path = self.__declaration_finder.find(module)
+                    if path:
+                        pure_functions = self.__declaration_finder.declarations(module, path)[1]
+                        self.__discovered_pure_functions[module] = pure_functions
+                        self.__matcher.add(pure_functions, PURE)
+                except OSError:  # pragma: no cover
+                    # Unreadable modules simply declare nothing
+                    pass
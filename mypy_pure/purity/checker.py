@@ -1,91 +1,106 @@
-from mypy_pure.purity.types import CallGraph, FuncName
+from mypy_pure.purity.graph import CallGraph
+from mypy_pure.purity.matcher import IMPURE, PURE, NameMatcher
+from mypy_pure.purity.types import CallMap, FuncName, SymbolId
+from mypy_pure.purity.witnesses import Witnesses, find_witnesses
+
+# Verdict of a callee that was not asked to the matcher yet
+UNDECIDED = 0xFF
 
 
 class PurityChecker:
+    """
+    Propagate impurity through a call graph.
+
+    The functions reachable from the pure functions are collected, then impurity flows backwards
+    from the functions that make blacklisted calls to their callers, breadth first (see
+    find_witnesses). Each function and call is handled a bounded number of times and no recursion
+    is involved, so neither call cycles nor deep call chains are a problem. Impure functions get a
+    parent pointer towards their nearest blacklisted call instead of a copy of every call they
+    reach; the full sets are computed on demand.
+
+    The walk runs on the interned symbols of a CallGraph: each callee is decided once, and names
+    only come back when the results are returned.
+
+    Callees are decided by a NameMatcher. Callers that already compiled their rules pass it as
+    matcher; blacklist then only holds extra names that must be treated as impure calls.
+    """
+
     def __init__(
         self,
-        calls: CallGraph,
+        calls: CallMap,
         pure_functions: set[FuncName],
         blacklist: set[FuncName],
         whitelist: set[FuncName] | None = None,
+        matcher: NameMatcher | None = None,
     ) -> None:
-        self.__calls = calls
+        self.__graph = CallGraph.from_mapping(calls)
         self.__pure_functions = pure_functions
-        self.__blacklist = blacklist
-        self.__whitelist = whitelist or set()
-        self.__purity: dict[FuncName, bool] = {}
-        self.__visited: set[FuncName] = set()
-        self.__impure_calls: dict[FuncName, set[FuncName]] = {}
-
-    def run(self) -> tuple[dict[FuncName, bool], dict[FuncName, set[FuncName]]]:
-        """Run purity analysis and return purity map and impure calls."""
-        for function in self.__pure_functions:
-            self.__analyze(function)
-        return self.__purity, self.__impure_calls
-
-    def __analyze(self, fn: FuncName) -> bool:
-        if fn in self.__purity:
-            return self.__purity[fn]
-        if fn in self.__visited:
-            return True  # pragma: no cover # avoid cycles
-
-        self.__visited.add(fn)
-        try:
-            # Check direct impure calls
-            callees: set[FuncName] = self.__calls.get(fn, set())
-            for callee in callees:
-                # If function is in whitelist, it's pure - skip blacklist check
-                if callee in self.__whitelist or f'builtins.{callee}' in self.__whitelist:
-                    continue  # pragma: no cover
-
-                # Check blacklist
-                if callee in self.__blacklist or f'builtins.{callee}' in self.__blacklist:
-                    self.__purity[fn] = False
-                    if fn not in self.__impure_calls:
-                        self.__impure_calls[fn] = set()
-                    self.__impure_calls[fn].add(callee)
-                    # Continue checking to find all impure calls
-                    continue
+        if matcher is None:
+            matcher = NameMatcher(blacklist, whitelist or ())
+            blacklist = set()
+        self.__matcher = matcher
+        symbols = self.__graph.symbols
+        self.__blacklist = {symbol for symbol in map(symbols.get, blacklist) if symbol is not None}
+        self.__pure_symbols = {symbol for symbol in map(symbols.get, pure_functions) if symbol is not None}
+        self.__verdicts = bytearray([UNDECIDED]) * len(symbols)
+        self.__functions = self.__graph.function_flags
 
-            # Check recursive callees
-            for callee in callees:
-                # Skip whitelisted functions in recursive analysis too
-                if callee in self.__whitelist or f'builtins.{callee}' in self.__whitelist:
-                    continue
+    def run(self) -> tuple[dict[FuncName, bool], Witnesses]:
+        """Run purity analysis and return purity map and the witnesses of the impure functions."""
+        symbols = self.__graph.symbols
+        purity: dict[FuncName, bool] = {}
+        roots: list[SymbolId] = []
+        # Sorted, so that the shortest paths chosen among paths of the same length do not change between runs
+        for name in sorted(self.__pure_functions):
+            root = symbols.get(name)
+            if root is None:
+                # Neither defined nor called in the graph: it calls nothing
+                purity[name] = True
+            else:
+                roots.append(root)
 
-                if callee in self.__pure_functions or callee in self.__calls:
-                    if not self.__analyze(callee):
-                        self.__purity[fn] = False
-                        if fn not in self.__impure_calls:
-                            self.__impure_calls[fn] = set()
-                        # Propagate impure calls from callee
-                        if callee in self.__impure_calls:
-                            self.__impure_calls[fn].update(self.__impure_calls[callee])
-                        else:  # pragma: no cover
-                            # Callee itself is the impure one
-                            self.__impure_calls[fn].add(callee)
+        reachable, witnesses = find_witnesses(roots, self.__expand, symbols.names.__getitem__, self.__matcher.effects)
+        for symbol in reachable:
+            name = symbols.names[symbol]
+            purity[name] = name not in witnesses
+        return purity, witnesses
 
-            # Only set to True if we haven't found it to be False
-            if fn not in self.__purity:
-                self.__purity[fn] = True
-            return self.__purity[fn]
-        finally:
-            self.__visited.remove(fn)
+    def __expand(self, fn: SymbolId) -> tuple[list[SymbolId], list[FuncName]]:
+        verdicts, functions, names = self.__verdicts, self.__functions, self.__graph.symbols.names
+        blacklist, pure_symbols = self.__blacklist, self.__pure_symbols
+        successors: list[SymbolId] = []
+        direct_impure_calls: list[FuncName] = []
+        for callee in self.__graph.successors(fn):
+            verdict = verdicts[callee]
+            if verdict == UNDECIDED:
+                # A function of the analyzed code shadows the database (e.g. a local 'max'), not the rules
+                match = self.__matcher.rule_verdict if functions[callee] else self.__matcher.verdict
+                verdict = verdicts[callee] = match(names[callee])
+            # If function is in whitelist, it's pure - skip blacklist check and propagation
+            if verdict == PURE:
+                continue
+            if verdict == IMPURE or callee in blacklist:
+                direct_impure_calls.append(names[callee])
+            if functions[callee] or callee in pure_symbols:
+                successors.append(callee)
+        return successors, direct_impure_calls
 
 
 def compute_purity(
-    calls: CallGraph,
+    calls: CallMap,
     pure_functions: set[FuncName],
     blacklist: set[FuncName],
     whitelist: set[FuncName] | None = None,
-) -> tuple[dict[FuncName, bool], dict[FuncName, set[FuncName]]]:
+    matcher: NameMatcher | None = None,
+) -> tuple[dict[FuncName, bool], Witnesses]:
     """
     Compute purity of functions.
 
     Returns:
-        Tuple of (purity_map, impure_calls_map)
+        Tuple of (purity_map, witnesses)
         - purity_map: dict mapping function names to their purity status
-        - impure_calls_map: dict mapping impure function names to the set of impure functions they call
+        - witnesses: mapping of impure function names to the set of impure functions they call, computed
+          on demand, with the shortest call path to one of them (Witnesses.path)
     """
-    checker = PurityChecker(calls, pure_functions, blacklist, whitelist)
+    checker = PurityChecker(calls, pure_functions, blacklist, whitelist, matcher)
     return checker.run()
@@ -0,0 +1,130 @@
+import mmap
+import struct
+from collections.abc import Iterator, Mapping
+
+from mypy_pure.cache import atomic_write
+from mypy_pure.purity.matcher import UNKNOWN, normalize_name
+from mypy_pure.purity.types import FuncName
+
+# Bump whenever the layout of the file changes: files of other versions are not opened
+FORMAT_VERSION = 1
+MAGIC = b'MPDB'
+
+# magic, format version, length of the metadata, number of entries
+_HEADER = struct.Struct('<4sHHI')
+_OFFSET = struct.Struct('<I')
+_VERDICT_MASK = 0b11
+_CATEGORY_SHIFT = 2
+
+
+class PurityDatabase:
+    """
+    Read-only database of verdicts and side-effect categories, looked up without being loaded.
+
+    The file holds a header and its metadata, a table of count + 1 offsets, one flags byte per
+    entry (verdict in the low bits, category above) and the names, UTF-8 encoded, sorted and
+    concatenated. A lookup is a binary search that only reads the offsets and the names it compares
+    from the mapped file, so opening a database costs the same with a hundred or a million names.
+    """
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        magic, version, metadata_length, count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError('not a purity database of this version')
+        self.__buffer = buffer
+        self.__count = count
+        self.__offsets_start = _HEADER.size + metadata_length
+        self.__flags_start = self.__offsets_start + (count + 1) * _OFFSET.size
+        self.__names_start = self.__flags_start + count
+        if len(buffer) < self.__names_start + self.__offset(count):
+            raise ValueError('truncated purity database')
+        self.__metadata = struct.unpack_from(f'{metadata_length}s', buffer, _HEADER.size)[0].decode('utf-8')
+
+    @classmethod
+    def open(cls, path: str) -> 'PurityDatabase | None':
+        """Map a database file; None when it is missing, of another version or corrupt."""
+        try:
+            with open(path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            return cls(buffer)
+        except (ValueError, struct.error):
+            buffer.close()
+            return None
+
+    @property
+    def metadata(self) -> str:
+        """What the database was built from, e.g. the version of typeshed."""
+        return self.__metadata
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __iter__(self) -> Iterator[FuncName]:
+        for index in range(self.__count):
+            yield self.__name(index).decode('utf-8')
+
+    def lookup(self, name: FuncName) -> tuple[int, int] | None:
+        """The verdict and side-effect category of a name, None if the database does not know it."""
+        key = normalize_name(name).encode('utf-8')
+        index = self.__lower_bound(key)
+        if index == self.__count or self.__name(index) != key:
+            return None
+        flags = self.__buffer[self.__flags_start + index]
+        return flags & _VERDICT_MASK, flags >> _CATEGORY_SHIFT
+
+    def verdict(self, name: FuncName) -> int:
+        entry = self.lookup(name)
+        return entry[0] if entry is not None else UNKNOWN
+
+    def covers(self, prefix: str) -> bool:
+        """Whether the database knows names below a dotted prefix, e.g. methods of a class."""
+        key = f'{normalize_name(prefix)}.'.encode()
+        index = self.__lower_bound(key)
+        return index < self.__count and self.__name(index).startswith(key)
+
+    def close(self) -> None:
+        if isinstance(self.__buffer, mmap.mmap):
+            self.__buffer.close()
+
+    def __offset(self, index: int) -> int:
+        return _OFFSET.unpack_from(self.__buffer, self.__offsets_start + index * _OFFSET.size)[0]
+
+    def __name(self, index: int) -> bytes:
+        start = self.__names_start + self.__offset(index)
+        end = self.__names_start + self.__offset(index + 1)
+        return bytes(self.__buffer[start:end])
+
+    def __lower_bound(self, key: bytes) -> int:
+        low, high = 0, self.__count
+        while low < high:
+            middle = (low + high) // 2
+            if self.__name(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+def encode_database(entries: Mapping[FuncName, tuple[int, int]], metadata: str = '') -> bytes:
+    """Serialize verdicts and categories by name into the format PurityDatabase reads."""
+    names = sorted({normalize_name(name).encode('utf-8'): entry for name, entry in entries.items()}.items())
+    encoded_metadata = metadata.encode('utf-8')
+    offsets = bytearray()
+    flags = bytearray()
+    position = 0
+    for name, (verdict, category) in names:
+        offsets += _OFFSET.pack(position)
+        flags.append(verdict | category << _CATEGORY_SHIFT)
+        position += len(name)
+    offsets += _OFFSET.pack(position)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded_metadata), len(names))
+    return b''.join([header, encoded_metadata, bytes(offsets), bytes(flags), *(name for name, _ in names)])
+
+
+def write_database(path: str, entries: Mapping[FuncName, tuple[int, int]], metadata: str = '') -> None:
+    """Write a database atomically, so that processes mapping the previous file are not disturbed."""
+    with atomic_write(path, '.puritydb') as tmp_path, open(tmp_path, 'wb') as f:
+        f.write(encode_database(entries, metadata))
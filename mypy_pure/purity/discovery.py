@@ -0,0 +1,109 @@
+import ast
+import copy
+import hashlib
+import os
+import re
+
+from mypy.build import default_data_dir
+from mypy.modulefinder import FindModuleCache, compute_search_paths
+from mypy.options import Options
+
+from mypy_pure.purity.types import FuncName
+
+MYPY_PURE_NAME = '__mypy_pure__'
+# A module marks functions as pure by importing mypy_pure and applying @pure (or @mypy_pure.pure), or
+# declares them in __mypy_pure__; words that merely contain 'pure' ('impure', 'purge') are not markers
+PURE_MARKERS = re.compile(rb'\bmypy_pure\b|@[ \t]*pure\b|\b__mypy_pure__\b')
+
+
+def qualify_pure_functions(names: list[str], module_name: str) -> list[FuncName]:
+    # If it's just the function name, prepend module name
+    return [name if '.' in name else f'{module_name}.{name}' for name in names]
+
+
+def may_define_pure_functions(source: bytes) -> bool:
+    """Tell, without parsing, whether a module can contain @pure functions: files without the marker cannot."""
+    return PURE_MARKERS.search(source) is not None
+
+
+def parse_mypy_pure(source: bytes) -> list[str]:
+    """
+    Read the __mypy_pure__ declaration of a module without running it.
+
+    Only literal lists, tuples and sets of strings assigned at module level are understood, which is
+    how the declaration is documented.
+    """
+    if MYPY_PURE_NAME.encode() not in source:
+        return []
+
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+
+    declared: list[str] = []
+    for stmt in tree.body:
+        if isinstance(stmt, ast.Assign):
+            targets, value, extend = stmt.targets, stmt.value, False
+        elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+            targets, value, extend = [stmt.target], stmt.value, False
+        elif isinstance(stmt, ast.AugAssign) and isinstance(stmt.op, ast.Add):
+            targets, value, extend = [stmt.target], stmt.value, True
+        else:
+            continue
+        if not any(isinstance(target, ast.Name) and target.id == MYPY_PURE_NAME for target in targets):
+            continue
+        try:
+            names = ast.literal_eval(value)
+        except ValueError:
+            continue
+        if not isinstance(names, (list, tuple, set, frozenset)):
+            continue
+        strings = [name for name in names if isinstance(name, str)]
+        declared = declared + strings if extend else strings
+    return declared
+
+
+class PureDeclarationFinder:
+    """
+    Find and read the __mypy_pure__ declarations of modules statically.
+
+    Modules are located with mypy's own module finder, so the same search path as the type check is
+    used (MYPYPATH, mypy_path, installed packages, stub packages and typeshed), and their source or
+    stub is parsed instead of imported. Declarations are memoized per resolved path and modification
+    time, so long-lived processes such as dmypy only read a file again when it changes.
+    """
+
+    def __init__(self, options: Options) -> None:
+        self.__options = options
+        self.__module_finder: FindModuleCache | None = None
+        # path -> (mtime, content hash, raw declared names)
+        self.__declarations: dict[str, tuple[int, str, list[str]]] = {}
+
+    def __finder(self) -> FindModuleCache:
+        if self.__module_finder is None:
+            options = copy.copy(self.__options)
+            # Untyped packages may still declare their pure functions
+            options.follow_untyped_imports = True
+            search_paths = compute_search_paths([], options, default_data_dir())
+            self.__module_finder = FindModuleCache(search_paths, fscache=None, options=options)
+        return self.__module_finder
+
+    def find(self, module_name: str) -> str | None:
+        """Return the path of the source or stub mypy would use for a module, or None if there is none."""
+        result = self.__finder().find_module(module_name)
+        return result if isinstance(result, str) else None
+
+    def declarations(self, module_name: str, path: str) -> tuple[str, list[FuncName]]:
+        """
+        Return the content hash of a module file and the pure functions it declares. The hash, unlike
+        the modification time, is the same in every checkout and installation of the module.
+        """
+        mtime = os.stat(path).st_mtime_ns
+        memoized = self.__declarations.get(path)
+        if memoized is None or memoized[0] != mtime:
+            with open(path, 'rb') as f:
+                source = f.read()
+            memoized = (mtime, hashlib.sha256(source).hexdigest(), parse_mypy_pure(source))
+            self.__declarations[path] = memoized
+        return memoized[1], qualify_pure_functions(memoized[2], module_name)
@@ -0,0 +1,123 @@
+import fnmatch
+import re
+from collections.abc import Iterable
+
+from mypy_pure.purity.types import EffectMask, FuncName
+
+# Side-effect categories of impure functions
+NO_EFFECT = 0
+FILE_IO = 1
+NETWORK = 2
+PROCESS = 3
+NONDETERMINISM = 4
+GLOBAL_STATE = 5
+LOGGING = 6
+
+CATEGORY_NAMES = {
+    NO_EFFECT: 'none',
+    FILE_IO: 'file_io',
+    NETWORK: 'network',
+    PROCESS: 'process',
+    NONDETERMINISM: 'nondeterminism',
+    GLOBAL_STATE: 'global_state',
+    LOGGING: 'logging',
+}
+
+
+def effect_bit(category: int) -> EffectMask:
+    """The bit of a category in an effect mask; no bit for NO_EFFECT."""
+    return 1 << (category - 1) if category != NO_EFFECT else 0
+
+
+# Effect kinds by name, as @pure(allow=...) and 'name:kind' rules spell them
+EFFECT_KINDS: dict[str, EffectMask] = {
+    name: effect_bit(category) for category, name in CATEGORY_NAMES.items() if category != NO_EFFECT
+}
+ALL_EFFECTS: EffectMask = sum(EFFECT_KINDS.values())
+
+
+def effect_mask(kinds: Iterable[str]) -> EffectMask:
+    """The mask of some effect kind names; unknown names are ignored."""
+    mask = 0
+    for kind in kinds:
+        mask |= EFFECT_KINDS.get(kind.strip(), 0)
+    return mask
+
+
+def effect_names(mask: EffectMask) -> list[str]:
+    return [name for name, bit in EFFECT_KINDS.items() if mask & bit]
+
+
+# Category of an impure function, by the first glob its (normalized) name matches
+EFFECT_RULES: list[tuple[str, int]] = [
+    ('print', LOGGING),
+    ('sys.stdout.*', LOGGING),
+    ('sys.stderr.*', LOGGING),
+    ('logging.*', LOGGING),
+    ('warnings.warn*', LOGGING),
+    ('input', FILE_IO),
+    ('open', FILE_IO),
+    ('sys.stdin.*', FILE_IO),
+    ('sys.exit', PROCESS),
+    ('signal.alarm', PROCESS),
+    ('signal.pause', PROCESS),
+    ('subprocess.*', PROCESS),
+    ('multiprocessing.*', PROCESS),
+    ('webbrowser.*', PROCESS),
+    ('os.system', PROCESS),
+    ('os.popen', PROCESS),
+    ('os.spawn*', PROCESS),
+    ('os.exec*', PROCESS),
+    ('os.fork*', PROCESS),
+    ('os.kill*', PROCESS),
+    ('os.abort', PROCESS),
+    ('os.urandom', NONDETERMINISM),
+    ('os.getrandom', NONDETERMINISM),
+    ('random.*', NONDETERMINISM),
+    ('secrets.*', NONDETERMINISM),
+    ('uuid.uuid1', NONDETERMINISM),
+    ('uuid.uuid4', NONDETERMINISM),
+    ('time.*', NONDETERMINISM),
+    ('datetime.*', NONDETERMINISM),
+    ('os.chdir', GLOBAL_STATE),
+    ('os.fchdir', GLOBAL_STATE),
+    ('os.putenv', GLOBAL_STATE),
+    ('os.unsetenv', GLOBAL_STATE),
+    ('os.set*', GLOBAL_STATE),
+    ('os.*', FILE_IO),
+    ('shutil.*', FILE_IO),
+    ('tempfile.*', FILE_IO),
+    ('pathlib.*', FILE_IO),
+    ('io.*', FILE_IO),
+    ('dbm.*', FILE_IO),
+    ('shelve.*', FILE_IO),
+    ('sqlite3.*', FILE_IO),
+    ('pickle.dump', FILE_IO),
+    ('pickle.load', FILE_IO),
+    ('socket.*', NETWORK),
+    ('_socket.*', NETWORK),
+    ('ssl.*', NETWORK),
+    ('http.*', NETWORK),
+    ('urllib.*', NETWORK),
+    ('ftplib.*', NETWORK),
+    ('smtplib.*', NETWORK),
+    ('poplib.*', NETWORK),
+    ('imaplib.*', NETWORK),
+    ('telnetlib.*', NETWORK),
+    ('requests.*', NETWORK),
+    ('boto3.*', NETWORK),
+    ('redis.*', NETWORK),
+    ('psycopg.*', NETWORK),
+    ('psycopg2.*', NETWORK),
+    ('sqlalchemy.*', NETWORK),
+]
+
+_EFFECT_PATTERNS = [(re.compile(fnmatch.translate(pattern)), category) for pattern, category in EFFECT_RULES]
+
+
+def effect_category(name: FuncName) -> int:
+    """The side-effect category of an impure function; global state when no rule says otherwise."""
+    for pattern, category in _EFFECT_PATTERNS:
+        if pattern.match(name):
+            return category
+    return GLOBAL_STATE
@@ -0,0 +1,181 @@
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Mapping
+
+from mypy_pure.purity.types import CallMap, FuncName, SymbolId
+
+# Edges are packed in a single integer while a graph is being built: caller in the high half
+EDGE_SHIFT = 32
+EDGE_MASK = (1 << EDGE_SHIFT) - 1
+
+
+class SymbolTable:
+    """Interned names: every distinct name is stored once and identified by a small integer."""
+
+    __slots__ = ('__ids', '__names')
+
+    def __init__(self, names: Iterable[FuncName] = ()) -> None:
+        self.__names: list[FuncName] = list(names)
+        self.__ids: dict[FuncName, SymbolId] = {name: symbol for symbol, name in enumerate(self.__names)}
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    def get(self, name: FuncName) -> SymbolId | None:
+        return self.__ids.get(name)
+
+    def name(self, symbol: SymbolId) -> FuncName:
+        return self.__names[symbol]
+
+    @property
+    def names(self) -> list[FuncName]:
+        return self.__names
+
+
+class CallGraph(Mapping[FuncName, frozenset[FuncName]]):
+    """
+    Immutable call graph in compressed sparse row form.
+
+    Names are interned in a SymbolTable and the callees of symbol i are targets[offsets[i]:offsets[i + 1]],
+    two flat arrays of 32-bit integers: an edge costs 4 bytes instead of a set entry pointing to its own
+    copy of the callee name, and walking the graph only hashes integers. Functions defined in the module
+    are flagged in a bytearray; other symbols are callees only and have no successors.
+
+    The graph is also a read-only mapping from function name to its callees, so it can be used where
+    the plain dict of sets was used before.
+    """
+
+    __slots__ = ('__functions', '__offsets', '__symbols', '__targets')
+
+    def __init__(
+        self, symbols: SymbolTable, offsets: 'array[int]', targets: 'array[int]', functions: bytearray
+    ) -> None:
+        self.__symbols = symbols
+        self.__offsets = offsets
+        self.__targets = targets
+        self.__functions = functions
+
+    @classmethod
+    def from_mapping(cls, calls: CallMap) -> 'CallGraph':
+        if isinstance(calls, CallGraph):
+            return calls
+        builder = CallGraphBuilder()
+        for fn, callees in calls.items():
+            builder.add_function(fn)
+            for callee in callees:
+                builder.add_call(fn, callee)
+        return builder.build()
+
+    @property
+    def symbols(self) -> SymbolTable:
+        return self.__symbols
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.__targets)
+
+    @property
+    def function_flags(self) -> bytearray:
+        """1 at the symbols of the functions defined in the graph, 0 at the symbols that are only called."""
+        return self.__functions
+
+    def is_function(self, symbol: SymbolId) -> bool:
+        return bool(self.__functions[symbol])
+
+    def successors(self, symbol: SymbolId) -> 'array[int]':
+        """Symbols called by a symbol, without duplicates."""
+        start, end = self.__offsets[symbol], self.__offsets[symbol + 1]
+        return self.__targets[start:end]
+
+    def called_names(self) -> set[FuncName]:
+        """Every name called by some function of the graph."""
+        names = self.__symbols.names
+        return {names[symbol] for symbol in set(self.__targets)}
+
+    def __getitem__(self, fn: FuncName) -> frozenset[FuncName]:
+        symbol = self.__symbols.get(fn)
+        if symbol is None or not self.__functions[symbol]:
+            raise KeyError(fn)
+        names = self.__symbols.names
+        return frozenset(names[callee] for callee in self.successors(symbol))
+
+    def __contains__(self, fn: object) -> bool:
+        symbol = self.__symbols.get(fn) if isinstance(fn, str) else None
+        return symbol is not None and bool(self.__functions[symbol])
+
+    def __iter__(self) -> Iterator[FuncName]:
+        names = self.__symbols.names
+        return (names[symbol] for symbol, is_function in enumerate(self.__functions) if is_function)
+
+    def __len__(self) -> int:
+        return self.__functions.count(1)
+
+    def __repr__(self) -> str:
+        return f'CallGraph({dict(self)!r})'
+
+
+class CallGraphBuilder:
+    """
+    Collect the calls of a module while it is visited and compile them into a CallGraph.
+
+    Defining a function again (a conditional or overloaded definition) replaces its calls, as the
+    last definition is the one that runs: the edges recorded for it until then are dropped when the
+    graph is built.
+    """
+
+    __slots__ = ('__built_size', '__edges', '__functions', '__graph', '__ids', '__names', '__redefined')
+
+    def __init__(self) -> None:
+        self.__ids: dict[FuncName, SymbolId] = {}
+        self.__names: list[FuncName] = []
+        self.__functions: set[SymbolId] = set()
+        self.__edges = array('Q')  # caller << EDGE_SHIFT | callee
+        self.__redefined: dict[SymbolId, int] = {}  # symbol -> number of edges when it was last defined
+        self.__graph: CallGraph | None = None
+        self.__built_size = (0, 0)
+
+    def __intern(self, name: FuncName) -> SymbolId:
+        symbol = self.__ids.get(name)
+        if symbol is None:
+            symbol = self.__ids[name] = len(self.__names)
+            self.__names.append(name)
+        return symbol
+
+    def add_function(self, fn: FuncName) -> None:
+        symbol = self.__intern(fn)
+        if symbol in self.__functions:
+            self.__redefined[symbol] = len(self.__edges)
+        self.__functions.add(symbol)
+        self.__graph = None
+
+    def add_call(self, fn: FuncName, callee: FuncName) -> None:
+        ids = self.__ids
+        symbol = ids.get(callee)
+        if symbol is None:
+            symbol = ids[callee] = len(self.__names)
+            self.__names.append(callee)
+        self.__edges.append(ids[fn] << EDGE_SHIFT | symbol)
+
+    def build(self) -> CallGraph:
+        if self.__graph is not None and self.__built_size == (len(self.__names), len(self.__edges)):
+            return self.__graph
+
+        edges: Iterable[int] = self.__edges
+        if self.__redefined:
+            redefined = self.__redefined
+            edges = [edge for i, edge in enumerate(edges) if i >= redefined.get(edge >> EDGE_SHIFT, 0)]
+        # Sorting the packed edges groups them by caller: the row of a symbol starts at its first edge
+        packed = array('Q', sorted(set(edges)))
+        count = len(self.__names)
+        offsets = array('I', [bisect_left(packed, symbol << EDGE_SHIFT) for symbol in range(count + 1)])
+        # The callee is the low half of every packed edge
+        low_half = 0 if sys.byteorder == 'little' else 1
+        targets = array('I', memoryview(packed).cast('B').cast('I')[low_half::2].tobytes())
+        functions = bytearray(count)
+        for symbol in self.__functions:
+            functions[symbol] = 1
+
+        self.__graph = CallGraph(SymbolTable(self.__names), offsets, targets, functions)
+        self.__built_size = (count, len(self.__edges))
+        return self.__graph
@@ -0,0 +1,204 @@
+from collections.abc import Iterable
+from typing import Protocol
+
+from mypy_pure.purity.effects import (
+    EFFECT_KINDS,
+    GLOBAL_STATE,
+    effect_bit,
+    effect_category,
+)
+from mypy_pure.purity.types import EffectMask, FuncName
+
+# Verdicts of NameMatcher.verdict
+UNKNOWN = 0
+PURE = 1
+IMPURE = 2
+
+WILDCARD_SUFFIX = '.*'
+BUILTINS_PREFIX = 'builtins.'
+KIND_SEPARATOR = ':'
+
+
+def normalize_name(name: str) -> str:
+    """Builtins are called without their module, so 'builtins.print' and 'print' are the same name."""
+    return name.strip().removeprefix(BUILTINS_PREFIX)
+
+
+def split_kind(rule: str) -> tuple[str, EffectMask | None]:
+    """Split the effect kind off a rule, as in 'os.environ.get:global_state'; None when it has none."""
+    name, separator, kind = rule.rpartition(KIND_SEPARATOR)
+    if not separator or kind.strip() not in EFFECT_KINDS:
+        return rule, None
+    return name, EFFECT_KINDS[kind.strip()]
+
+
+class VerdictDatabase(Protocol):
+    """Verdicts and side-effect categories of names no rule matches, e.g. the stdlib database."""
+
+    def lookup(self, name: FuncName) -> tuple[int, int] | None: ...
+
+    def covers(self, prefix: str) -> bool: ...
+
+
+class _TrieNode:
+    __slots__ = ('children', 'effects', 'verdict')
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.verdict = UNKNOWN
+        self.effects: EffectMask = 0
+
+
+class NameMatcher:
+    """
+    Compiled blacklist and whitelist rules.
+
+    A rule is either a function name ('os.remove') or a dotted prefix followed by '.*' ('socket.*',
+    'boto3.client.*'), which matches every name below that prefix. Names are kept in a hash table and
+    prefixes in a trie of dotted segments, so deciding a name costs one dict lookup for the exact
+    rules plus one step per segment, and every verdict is memoized.
+
+    Precedence: an exact rule beats any wildcard rule and a longer prefix beats a shorter one; when a
+    name is both blacklisted and whitelisted by rules of the same kind, the whitelist wins. Names no
+    rule matches get the verdict of the database, if any.
+
+    Blacklist rules carry the effect kind of what they match, either spelled after the rule
+    ('os.environ.get:global_state') or derived from the name (see purity.effects).
+    """
+
+    def __init__(
+        self,
+        blacklist: Iterable[FuncName] = (),
+        whitelist: Iterable[FuncName] = (),
+        database: VerdictDatabase | None = None,
+    ) -> None:
+        self.__exact: dict[FuncName, int] = {}
+        self.__exact_effects: dict[FuncName, EffectMask] = {}
+        self.__prefixes = _TrieNode()
+        self.__has_prefixes = False
+        self.__owners: set[str] = set()  # what exact rules are qualified with, e.g. classes
+        self.__verdicts: dict[FuncName, int] = {}
+        self.__effects: dict[FuncName, EffectMask] = {}
+        self.__version = 0
+        self.__database = database
+        self.add(blacklist, IMPURE)
+        self.add(whitelist, PURE)
+
+    def add(self, names: Iterable[FuncName], verdict: int) -> None:
+        """Add blacklist (IMPURE) or whitelist (PURE) rules."""
+        for rule in names:
+            rule, effects = split_kind(rule)
+            name = normalize_name(rule)
+            if not name:
+                continue
+            if effects is None:
+                effects = effect_bit(effect_category(name))
+            if name.endswith(WILDCARD_SUFFIX):
+                node = self.__prefixes
+                for segment in name.removesuffix(WILDCARD_SUFFIX).split('.'):
+                    node = node.children.setdefault(segment, _TrieNode())
+                if node.verdict != PURE:
+                    node.verdict = verdict
+                    node.effects = effects if verdict == IMPURE else 0
+                self.__has_prefixes = True
+            else:
+                if self.__exact.get(name) != PURE:
+                    self.__exact[name] = verdict
+                    self.__exact_effects[name] = effects if verdict == IMPURE else 0
+                self.__owners.add(name.rpartition('.')[0])
+        self.__verdicts.clear()
+        self.__effects.clear()
+        self.__version += 1
+
+    @property
+    def database(self) -> VerdictDatabase | None:
+        return self.__database
+
+    @property
+    def version(self) -> int:
+        """Incremented whenever rules are added, so that verdicts derived from this matcher can be invalidated."""
+        return self.__version
+
+    def covers(self, prefix: str) -> bool:
+        """Whether any rule may match a name below a dotted prefix, e.g. a method of a class."""
+        prefix = normalize_name(prefix)
+        if prefix in self.__owners or (self.__database is not None and self.__database.covers(prefix)):
+            return True
+        node = self.__prefixes
+        for segment in prefix.split('.'):
+            child = node.children.get(segment)
+            if child is None:
+                return False
+            node = child
+            if node.verdict != UNKNOWN:
+                return True
+        return False
+
+    def verdict(self, name: FuncName) -> int:
+        """Return PURE, IMPURE or UNKNOWN for a called name."""
+        verdict = self.__verdicts.get(name)
+        if verdict is None:
+            verdict = self.__match(name)
+            self.__verdicts[name] = verdict
+        return verdict
+
+    def rule_verdict(self, name: FuncName) -> int:
+        """Return the verdict of the rules alone, for names the database must not decide (e.g. local functions)."""
+        return self.__match_rules(normalize_name(name))
+
+    def effects(self, name: FuncName) -> EffectMask:
+        """The effect kinds of a called name, as a mask; 0 unless it is impure."""
+        effects = self.__effects.get(name)
+        if effects is None:
+            effects = 0
+            if self.verdict(name) == IMPURE:
+                # Impure names always have some effect: global state, unless something says otherwise
+                effects = self.__match_effects(name) or effect_bit(GLOBAL_STATE)
+            self.__effects[name] = effects
+        return effects
+
+    def is_pure(self, name: FuncName) -> bool:
+        return self.verdict(name) == PURE
+
+    def is_impure(self, name: FuncName) -> bool:
+        return self.verdict(name) == IMPURE
+
+    def __match(self, name: FuncName) -> int:
+        normalized = normalize_name(name)
+        verdict = self.__match_rules(normalized)
+        if verdict == UNKNOWN and self.__database is not None:
+            entry = self.__database.lookup(normalized)
+            verdict = entry[0] if entry is not None else UNKNOWN
+        return verdict
+
+    def __match_rules(self, normalized: str) -> int:
+        verdict = self.__exact.get(normalized, UNKNOWN)
+        if verdict == UNKNOWN and self.__has_prefixes:
+            node = self.__match_prefixes(normalized)
+            verdict = node.verdict if node is not None else UNKNOWN
+        return verdict
+
+    def __match_effects(self, name: FuncName) -> EffectMask:
+        # The effects of the rule __match took the verdict from
+        normalized = normalize_name(name)
+        if normalized in self.__exact:
+            return self.__exact_effects[normalized]
+        node = self.__match_prefixes(normalized) if self.__has_prefixes else None
+        if node is not None:
+            return node.effects
+        entry = self.__database.lookup(normalized) if self.__database is not None else None
+        return effect_bit(entry[1]) if entry is not None else 0
+
+    def __match_prefixes(self, normalized: str) -> _TrieNode | None:
+        # Longest matching prefix; a wildcard never matches the prefix itself ('socket.*' vs 'socket')
+        match = None
+        node = self.__prefixes
+        segments = normalized.split('.')
+        for segment in segments[:-1]:
+            child = node.children.get(segment)
+            if child is None:
+                break
+            node = child
+            if node.verdict != UNKNOWN:
+                match = node
+        return match
@@ -0,0 +1,46 @@
+from mypy.nodes import TypeInfo
+
+from mypy_pure.purity.matcher import IMPURE, UNKNOWN, NameMatcher
+from mypy_pure.purity.types import FuncName
+
+
+class MethodMatcher:
+    """
+    Blacklisted method calls, found from the type mypy inferred for their receiver.
+
+    Rules name methods by the class that defines them ('pathlib.Path.write_text', 'redis.Redis.*'), so a
+    call on an instance of a subclass is matched by walking the MRO of its class, from the class itself
+    to object, until a rule matches. Rules of a class do not apply to a method that a class before it in
+    the MRO overrides. Classes without any rule are skipped with a single lookup in the index of
+    qualified names of the matcher, and the result of every walk is cached per TypeInfo and method.
+    """
+
+    def __init__(self, matcher: NameMatcher) -> None:
+        self.__matcher = matcher
+        self.__version = matcher.version
+        self.__impure_calls: dict[TypeInfo, dict[str, FuncName | None]] = {}
+
+    def impure_call(self, info: TypeInfo, method: str) -> FuncName | None:
+        """The blacklisted method a call of method on an instance of info matches, None if it is not blacklisted."""
+        if self.__version != self.__matcher.version:
+            # Rules were added (a blacklist shard, a __mypy_pure__ declaration): walks must be done again
+            self.__impure_calls.clear()
+            self.__version = self.__matcher.version
+        impure_calls = self.__impure_calls.get(info)
+        if impure_calls is None:
+            impure_calls = self.__impure_calls[info] = {}
+        if method not in impure_calls:
+            impure_calls[method] = self.__find_impure_call(info, method)
+        return impure_calls[method]
+
+    def __find_impure_call(self, info: TypeInfo, method: str) -> FuncName | None:
+        for base in info.mro:
+            if self.__matcher.covers(base.fullname):
+                name = f'{base.fullname}.{method}'
+                verdict = self.__matcher.verdict(name)
+                if verdict != UNKNOWN:
+                    return name if verdict == IMPURE else None
+            if method in base.names:
+                # The method is defined here: the rules of the classes it overrides do not apply
+                break
+        return None
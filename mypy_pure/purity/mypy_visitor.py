@@ -0,0 +1,276 @@
+from typing import Any
+
+from mypy import nodes
+from mypy.nodes import (
+    Block,
+    CallExpr,
+    ClassDef,
+    Decorator,
+    Expression,
+    FuncDef,
+    Import,
+    ImportAll,
+    ImportFrom,
+    ListExpr,
+    MemberExpr,
+    MypyFile,
+    NameExpr,
+    Node,
+    OverloadedFuncDef,
+    SetExpr,
+    StrExpr,
+    TupleExpr,
+)
+
+from mypy_pure.purity.effects import effect_mask
+from mypy_pure.purity.graph import CallGraph, CallGraphBuilder
+from mypy_pure.purity.types import (
+    EffectMask,
+    FuncName,
+    ImportAlias,
+    ImportFullName,
+    LineNo,
+)
+from mypy_pure.purity.visitor import PurityVisitor, absolute_import_module
+
+# Attributes that hold the child nodes of every mypy node type that can contain a call,
+# mirroring mypy.traverser.TraverserVisitor. Compiled mypy does not allow interpreted
+# subclasses of its visitors, so the tree is walked through this table instead.
+_CHILD_ATTRIBUTES: dict[str, tuple[str, ...]] = {
+    'MypyFile': ('defs',),
+    'Block': ('body',),
+    'FuncDef': ('arguments', 'body'),
+    'LambdaExpr': ('arguments', 'body'),
+    'Argument': ('initializer',),
+    'OverloadedFuncDef': ('items', 'impl'),
+    'ClassDef': ('decorators', 'base_type_exprs', 'metaclass', 'keywords', 'defs'),
+    'ExpressionStmt': ('expr',),
+    'AssignmentStmt': ('rvalue', 'lvalues'),
+    'OperatorAssignmentStmt': ('rvalue', 'lvalue'),
+    'WhileStmt': ('expr', 'body', 'else_body'),
+    'ForStmt': ('index', 'expr', 'body', 'else_body'),
+    'ReturnStmt': ('expr',),
+    'AssertStmt': ('expr', 'msg'),
+    'DelStmt': ('expr',),
+    'IfStmt': ('expr', 'body', 'else_body'),
+    'RaiseStmt': ('expr', 'from_expr'),
+    'TryStmt': ('body', 'types', 'vars', 'handlers', 'else_body', 'finally_body'),
+    'WithStmt': ('expr', 'target', 'body'),
+    'MatchStmt': ('subject', 'guards', 'bodies'),
+    'TypeAliasStmt': ('value',),
+    'MemberExpr': ('expr',),
+    'YieldFromExpr': ('expr',),
+    'YieldExpr': ('expr',),
+    'CallExpr': ('callee', 'args'),
+    'OpExpr': ('left', 'right'),
+    'ComparisonExpr': ('operands',),
+    'SliceExpr': ('begin_index', 'end_index', 'stride'),
+    'CastExpr': ('expr',),
+    'AssertTypeExpr': ('expr',),
+    'RevealExpr': ('expr',),
+    'AssignmentExpr': ('target', 'value'),
+    'UnaryExpr': ('expr',),
+    'ListExpr': ('items',),
+    'TupleExpr': ('items',),
+    'SetExpr': ('items',),
+    'DictExpr': ('items',),
+    'TemplateStrExpr': ('items',),
+    'IndexExpr': ('base', 'index'),
+    'GeneratorExpr': ('sequences', 'indices', 'condlists', 'left_expr'),
+    'DictionaryComprehension': ('sequences', 'indices', 'condlists', 'key', 'value'),
+    'ListComprehension': ('generator',),
+    'SetComprehension': ('generator',),
+    'ConditionalExpr': ('cond', 'if_expr', 'else_expr'),
+    'TypeApplication': ('expr',),
+    'StarExpr': ('expr',),
+    'AwaitExpr': ('expr',),
+    'SuperExpr': ('call',),
+}
+
+# Attributes of statements that hold blocks of other statements
+BLOCK_ATTRIBUTES = ('body', 'else_body', 'handlers', 'finally_body', 'bodies')
+
+CHILD_ATTRIBUTES: dict[type, tuple[str, ...]] = {
+    getattr(nodes, name): attributes for name, attributes in _CHILD_ATTRIBUTES.items() if hasattr(nodes, name)
+}
+
+
+def allowed_effects(decorator: CallExpr) -> EffectMask:
+    """The effect kinds allowed by the arguments of @pure(allow=...): string literals, alone or in a collection."""
+    kinds: list[str] = []
+    for name, value in zip(decorator.arg_names, decorator.args):
+        if name != 'allow':
+            continue
+        values = value.items if isinstance(value, (ListExpr, TupleExpr, SetExpr)) else [value]
+        kinds.extend(item.value for item in values if isinstance(item, StrExpr))
+    return effect_mask(kinds)
+
+
+class MypyPurityVisitor:
+    """
+    Collect the same facts as PurityVisitor from a MypyFile that mypy has already parsed.
+
+    The plugin receives files before semantic analysis, so RefExpr.fullname is still empty at that
+    point and names are resolved through the import statements of the file, exactly as the ast-based
+    visitor does. Functions of a class body are named Class.method, like PurityVisitor names them.
+    """
+
+    PURE_DECORATOR_FULLNAME = PurityVisitor.PURE_DECORATOR_FULLNAME
+
+    def __init__(self, module: str | None = None, is_package: bool = False) -> None:
+        # Name of the visited module, only needed to resolve relative imports
+        self.__module = module
+        self.__is_package = is_package
+        self.__imports: dict[ImportAlias, ImportFullName] = {}  # alias -> fullname
+        self.__calls = CallGraphBuilder()  # func_name -> callees
+        self.__pure_functions_lineno: dict[FuncName, LineNo] = {}  # func_name -> lineno
+        self.__allowed_effects: dict[FuncName, EffectMask] = {}  # func_name -> effects of @pure(allow=...)
+        self.__has_stripped_bodies = False
+        # Functions and classes defined in a class body -> their name qualified with the classes around them
+        self.__qualified_names: dict[Node, FuncName] = {}
+
+    @property
+    def calls(self) -> CallGraph:
+        return self.__calls.build()
+
+    @property
+    def pure_functions_lineno(self) -> dict[FuncName, LineNo]:
+        return self.__pure_functions_lineno
+
+    @property
+    def allowed_effects(self) -> dict[FuncName, EffectMask]:
+        return self.__allowed_effects
+
+    @property
+    def imports(self) -> dict[ImportAlias, ImportFullName]:
+        return self.__imports
+
+    @property
+    def has_stripped_bodies(self) -> bool:
+        """Whether mypy dropped some function bodies (it does so for modules whose errors are ignored)."""
+        return self.__has_stripped_bodies
+
+    def visit(self, file: MypyFile) -> None:
+        # Iterative pre-order walk: every pending node carries the function it belongs to.
+        stack: list[tuple[Node, FuncName | None]] = [(file, None)]
+        while stack:
+            node, current_function = stack.pop()
+            if isinstance(node, Decorator):
+                current_function = self.__handle_function_def(node.func, decorators=node.decorators)
+                # The decorated FuncDef is handled here, so only its contents are walked.
+                stack.append((node.func.body, current_function))
+                for argument in reversed(node.func.arguments):
+                    stack.append((argument, current_function))
+                for decorator in reversed(node.decorators):
+                    stack.append((decorator, current_function))
+                continue
+            current_function = self.__handle_node(node, current_function)
+
+            attributes = CHILD_ATTRIBUTES.get(type(node))
+            if not attributes:
+                continue
+            children: list[Node] = []
+            for attribute in attributes:
+                self.__collect_nodes(getattr(node, attribute), children)
+            for child in reversed(children):
+                stack.append((child, current_function))
+
+    def __handle_node(self, node: Node, current_function: FuncName | None) -> FuncName | None:
+        """Record what a single node contributes and return the function its children belong to."""
+        if isinstance(node, FuncDef):
+            return self.__handle_function_def(node, decorators=[])
+        if isinstance(node, ClassDef):
+            self.__handle_class_def(node)
+        elif isinstance(node, Import):
+            for module_id, as_id in node.ids:
+                self.__imports[as_id or module_id] = module_id
+        elif isinstance(node, ImportFrom):
+            module = absolute_import_module(self.__module, self.__is_package, node.relative, node.id)
+            for name, as_name in node.names:
+                self.__imports[as_name or name] = f'{module}.{name}' if module else name
+        elif isinstance(node, ImportAll):
+            module = absolute_import_module(self.__module, self.__is_package, node.relative, node.id)
+            self.__imports['*'] = f'{module}.*' if module else '*'
+        elif isinstance(node, CallExpr) and current_function is not None:
+            callee_name = self.__resolve_name(node.callee)
+            if callee_name:
+                self.__calls.add_call(current_function, callee_name)
+        return current_function
+
+    @staticmethod
+    def __collect_nodes(value: Any, out: list[Node]) -> None:
+        if isinstance(value, Node):
+            out.append(value)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                MypyPurityVisitor.__collect_nodes(item, out)
+        elif isinstance(value, dict):
+            for item in value.values():
+                MypyPurityVisitor.__collect_nodes(item, out)
+
+    def __resolve_name(self, node: Expression) -> str | None:
+        attrs: list[str] = []
+        while isinstance(node, MemberExpr):
+            attrs.append(node.name)
+            node = node.expr
+        if not isinstance(node, NameExpr):
+            return None
+        base = self.__imports.get(node.name, node.name)
+        return '.'.join([base, *reversed(attrs)])
+
+    def __handle_class_def(self, node: ClassDef) -> None:
+        """Name the functions and classes of a class body after it, through the if and try blocks that hold them."""
+        prefix = self.__qualified_names.pop(node, node.name)
+        statements: list[Node] = list(node.defs.body)
+        while statements:
+            statement = statements.pop()
+            if isinstance(statement, Decorator):
+                statement = statement.func
+            if isinstance(statement, (FuncDef, ClassDef)):
+                self.__qualified_names[statement] = f'{prefix}.{statement.name}'
+            elif isinstance(statement, OverloadedFuncDef):
+                for item in [*statement.items, statement.impl]:
+                    func = item.func if isinstance(item, Decorator) else item
+                    if func is not None:
+                        self.__qualified_names[func] = f'{prefix}.{func.name}'
+            elif isinstance(statement, Block):
+                statements.extend(statement.body)
+            else:
+                for attribute in BLOCK_ATTRIBUTES:
+                    blocks = getattr(statement, attribute, None)
+                    if isinstance(blocks, Block):
+                        statements.append(blocks)
+                    elif isinstance(blocks, list):
+                        statements.extend(block for block in blocks if isinstance(block, Block))
+
+    def __handle_function_def(self, func: FuncDef, decorators: list[Expression]) -> FuncName:
+        if func.body is not None and not func.body.body:
+            self.__has_stripped_bodies = True
+        fn = self.__qualified_names.pop(func, func.name)
+
+        is_pure = False
+        allowed: EffectMask = 0
+        for decorator in decorators:
+            if isinstance(decorator, CallExpr) and self.__is_pure_decorator(decorator.callee):
+                is_pure = True
+                allowed |= allowed_effects(decorator)
+            elif self.__is_pure_decorator(decorator):
+                is_pure = True
+
+        if is_pure:
+            self.__pure_functions_lineno[fn] = func.line
+            if allowed:
+                self.__allowed_effects[fn] = allowed
+        self.__calls.add_function(fn)
+        return fn
+
+    def __is_pure_decorator(self, decorator: Expression) -> bool:
+        dec_name = self.__resolve_name(decorator)
+        if dec_name == self.PURE_DECORATOR_FULLNAME:
+            return True
+        elif isinstance(decorator, NameExpr) and decorator.name == 'pure':
+            imported_from = self.__imports.get('pure')
+            return imported_from in {self.PURE_DECORATOR_FULLNAME, 'mypy_pure.pure'}
+        elif isinstance(decorator, MemberExpr) and decorator.name == 'pure':
+            return self.__resolve_name(decorator.expr) == 'mypy_pure.decorators'  # pragma: no cover
+        return False
@@ -0,0 +1,276 @@
+from collections.abc import Callable, Container, Iterable, Mapping
+from typing import Any
+
+from mypy_pure.purity.checker import compute_purity
+from mypy_pure.purity.graph import CallGraph
+from mypy_pure.purity.matcher import UNKNOWN, NameMatcher
+from mypy_pure.purity.types import (
+    CallMap,
+    EffectMask,
+    FuncName,
+    ImportAlias,
+    ImportFullName,
+    LineNo,
+)
+from mypy_pure.purity.witnesses import Witnesses, find_witnesses
+
+# Maximum number of re-exports followed when resolving a reference to a function of another module
+MAX_REEXPORT_DEPTH = 16
+
+
+class ModuleAnalysis:
+    """What a visitor collected from a module: its call graph, imports and @pure functions."""
+
+    def __init__(
+        self,
+        module: str,
+        path: str,
+        calls: CallMap,
+        imports: dict[ImportAlias, ImportFullName],
+        pure_functions_lineno: dict[FuncName, LineNo],
+        complete: bool = True,
+        allowed_effects: dict[FuncName, EffectMask] | None = None,
+    ) -> None:
+        self.__module = module
+        self.__path = path
+        self.__calls = CallGraph.from_mapping(calls)
+        self.__imports = imports
+        self.__pure_functions_lineno = pure_functions_lineno
+        self.__complete = complete
+        self.__allowed_effects = allowed_effects or {}
+
+    @property
+    def module(self) -> str:
+        return self.__module
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def calls(self) -> CallGraph:
+        return self.__calls
+
+    @property
+    def imports(self) -> dict[ImportAlias, ImportFullName]:
+        return self.__imports
+
+    @property
+    def pure_functions_lineno(self) -> dict[FuncName, LineNo]:
+        return self.__pure_functions_lineno
+
+    @property
+    def complete(self) -> bool:
+        """False when function bodies were missing from the analyzed tree, so calls may be missing too."""
+        return self.__complete
+
+    @property
+    def allowed_effects(self) -> dict[FuncName, EffectMask]:
+        """The effect kinds @pure(allow=...) functions may have, for those that have some."""
+        return self.__allowed_effects
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'module': self.__module,
+            'path': self.__path,
+            'calls': {fn: sorted(callees) for fn, callees in self.__calls.items()},
+            'imports': self.__imports,
+            'pure_functions_lineno': self.__pure_functions_lineno,
+            'complete': self.__complete,
+            'allowed_effects': self.__allowed_effects,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'ModuleAnalysis':
+        return cls(
+            module=data['module'],
+            path=data['path'],
+            calls=data['calls'],
+            imports=dict(data['imports']),
+            pure_functions_lineno=dict(data['pure_functions_lineno']),
+            complete=data['complete'],
+            allowed_effects=dict(data['allowed_effects']),
+        )
+
+
+class ModuleSummary:
+    """
+    What a module tells the modules that call into it about the purity of its functions.
+
+    Bodies are analyzed once, when the summary is built, and reduced to the functions that may be
+    impure: those that reach a blacklisted call or a function of another module inside the module.
+    For each of them, qualified with the module name, it keeps the blacklisted calls it makes itself
+    and the calls through which impurity may reach it: functions of the module that may be impure
+    and functions of other modules, which are only resolved during the global propagation. Every other
+    function is pure and not stored at all.
+    """
+
+    def __init__(
+        self,
+        module: str,
+        witnesses: dict[FuncName, list[FuncName]],
+        callees: dict[FuncName, list[FuncName]],
+        aliases: dict[ImportAlias, ImportFullName],
+    ) -> None:
+        self.__module = module
+        self.__witnesses = witnesses
+        self.__callees = callees
+        self.__aliases = aliases
+
+    @property
+    def module(self) -> str:
+        return self.__module
+
+    @property
+    def witnesses(self) -> dict[FuncName, list[FuncName]]:
+        """Qualified function name -> blacklisted calls it makes."""
+        return self.__witnesses
+
+    @property
+    def callees(self) -> dict[FuncName, list[FuncName]]:
+        """Qualified name of every function that may be impure -> functions it calls that may be impure."""
+        return self.__callees
+
+    @property
+    def aliases(self) -> dict[ImportAlias, ImportFullName]:
+        """Names imported by the module, used to follow re-exports."""
+        return self.__aliases
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'module': self.__module,
+            'witnesses': self.__witnesses,
+            'callees': self.__callees,
+            'aliases': self.__aliases,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'ModuleSummary':
+        return cls(
+            module=data['module'],
+            witnesses={fn: list(calls) for fn, calls in data['witnesses'].items()},
+            callees={fn: list(callees) for fn, callees in data['callees'].items()},
+            aliases=dict(data['aliases']),
+        )
+
+
+def module_of(name: str, modules: Container[str]) -> str | None:
+    """Return the longest prefix of a dotted name that is one of the given modules."""
+    parts = name.split('.')
+    for i in range(len(parts) - 1, 0, -1):
+        candidate = '.'.join(parts[:i])
+        if candidate in modules:
+            return candidate
+    return None
+
+
+def summarize_module(
+    module: str,
+    calls: CallMap,
+    imports: dict[ImportAlias, ImportFullName],
+    matcher: NameMatcher,
+) -> ModuleSummary:
+    """Analyze the bodies of a module once and reduce them to a ModuleSummary."""
+    calls = CallGraph.from_mapping(calls)
+    local_functions = set(calls)
+    imported = set(imports.values())
+
+    # Calls to names that come from an import and are not known to be pure or impure may reach
+    # functions of other analyzed modules
+    external: set[FuncName] = set()
+    for callee in calls.called_names():
+        if callee in local_functions or matcher.verdict(callee) != UNKNOWN:
+            continue
+        if callee in imported or module_of(callee, imported) is not None:
+            external.add(callee)
+
+    # Propagate inside the module, treating external calls as blacklisted calls that are split off afterwards
+    _, found = compute_purity(
+        calls=calls,
+        pure_functions=local_functions,
+        blacklist=external,
+        matcher=matcher,
+    )
+
+    witnesses: dict[FuncName, list[FuncName]] = {}
+    callees: dict[FuncName, list[FuncName]] = {}
+    for fn in found:
+        qualified = f'{module}.{fn}'
+        direct_calls = found.direct_calls(fn)
+        fn_witnesses = [call for call in direct_calls if call not in external]
+        if fn_witnesses:
+            witnesses[qualified] = fn_witnesses
+        callees[qualified] = [f'{module}.{callee}' for callee in found.successors(fn)] + [
+            call for call in direct_calls if call in external
+        ]
+
+    return ModuleSummary(module=module, witnesses=witnesses, callees=callees, aliases=dict(imports))
+
+
+def resolve_reference(
+    name: FuncName,
+    summary_of: Callable[[str], 'ModuleSummary | None'],
+    modules: Container[str],
+) -> FuncName | None:
+    """
+    Map a name a module calls to the qualified function of the module that defines it.
+
+    Returns None when the function is pure or its module was not analyzed. Summaries are requested
+    through summary_of, so callers can build them on demand.
+    """
+    for _ in range(MAX_REEXPORT_DEPTH):
+        module = module_of(name, modules)
+        if module is None:
+            return None
+        summary = summary_of(module)
+        if summary is None:
+            return None
+        if name in summary.callees:
+            return name
+        # Follow names a package imports from elsewhere, e.g. 'pkg.helper' -> 'pkg.impl.helper'
+        local_name = name.removeprefix(f'{module}.')
+        head, _, rest = local_name.partition('.')
+        target = summary.aliases.get(head)
+        if target is None or target == name:
+            return None
+        name = f'{target}.{rest}' if rest else target
+    return None  # pragma: no cover
+
+
+def propagate_summaries(
+    summaries: Mapping[str, ModuleSummary],
+    roots: Iterable[FuncName] | None = None,
+    call_effects: Callable[[FuncName], EffectMask] | None = None,
+) -> Witnesses:
+    """
+    Combine module summaries into the witnesses of the impure functions, across module boundaries.
+
+    Only the functions reachable from roots (qualified names, by default every function that may be
+    impure) are decided. call_effects gives the effect kinds of blacklisted calls, usually
+    NameMatcher.effects.
+
+    Returns:
+        Witnesses mapping the qualified name of every impure function found to the blacklisted calls it
+        reaches, with the shortest call path to one of them.
+    """
+    owners = {fn: summary for summary in summaries.values() for fn in summary.callees}
+    resolved: dict[FuncName, FuncName | None] = {}
+
+    def expand(fn: FuncName) -> tuple[list[FuncName], list[FuncName]]:
+        summary = owners[fn]
+        successors = []
+        for callee in summary.callees[fn]:
+            if callee not in summary.callees:
+                if callee not in resolved:
+                    resolved[callee] = resolve_reference(callee, summaries.get, summaries)
+                target = resolved[callee]
+                if target is None:
+                    continue
+                callee = target
+            successors.append(callee)
+        return successors, summary.witnesses.get(fn, [])
+
+    # Sorted, so that the shortest paths chosen among paths of the same length do not change between runs
+    start = sorted(owners if roots is None else (fn for fn in roots if fn in owners))
+    _, witnesses = find_witnesses(start, expand, str, call_effects)
+    return witnesses
@@ -1,7 +1,10 @@
+from collections.abc import Iterable, Mapping
 from typing import TypeAlias
 
 FuncName: TypeAlias = str
 LineNo: TypeAlias = int
-CallGraph: TypeAlias = dict[FuncName, set[FuncName]]
+SymbolId: TypeAlias = int  # Interned name, see purity.graph.SymbolTable
+CallMap: TypeAlias = Mapping[FuncName, Iterable[FuncName]]  # caller -> callees, e.g. a CallGraph or a dict of sets
 ImportAlias: TypeAlias = str
 ImportFullName: TypeAlias = str
+EffectMask: TypeAlias = int  # OR of effect kind bits, see purity.effects
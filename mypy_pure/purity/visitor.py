@@ -1,7 +1,11 @@
 import ast
+from collections.abc import Collection
+from typing import cast
 
+from mypy_pure.purity.effects import effect_mask
+from mypy_pure.purity.graph import CallGraph, CallGraphBuilder
 from mypy_pure.purity.types import (
-    CallGraph,
+    EffectMask,
     FuncName,
     ImportAlias,
     ImportFullName,
@@ -9,35 +13,214 @@ from mypy_pure.purity.types import (
 )
 
 
-class PurityVisitor(ast.NodeVisitor):
+def absolute_import_module(module: str | None, is_package: bool, level: int, target: str) -> str:
+    """
+    Return the absolute name of the module a relative import refers to.
+
+    When the importing module is unknown, or the import goes beyond its top-level package, the name
+    written in the import is kept as it is.
+    """
+    if level == 0 or not module:
+        return target
+    parts = module.split('.')
+    if not is_package:
+        parts = parts[:-1]
+    if level - 1 >= len(parts):
+        return target
+    parts = parts[: len(parts) - (level - 1)]
+    return '.'.join(parts + ([target] if target else []))
+
+
+def allowed_effects(keywords: list[ast.keyword]) -> EffectMask:
+    """The effect kinds allowed by the arguments of @pure(allow=...): string literals, alone or in a collection."""
+    kinds: list[str] = []
+    for keyword in keywords:
+        if keyword.arg != 'allow':
+            continue
+        values = keyword.value.elts if isinstance(keyword.value, (ast.List, ast.Tuple, ast.Set)) else [keyword.value]
+        kinds.extend(
+            value.value for value in values if isinstance(value, ast.Constant) and isinstance(value.value, str)
+        )
+    return effect_mask(kinds)
+
+
+# Fields that never hold a node worth scanning: identifiers, flags, contexts and operators
+SCALAR_FIELDS = frozenset(
+    {'arg', 'asname', 'attr', 'conversion', 'ctx', 'id', 'is_async', 'kind', 'kwd_attrs', 'level', 'module', 'name'}
+    | {'names', 'op', 'ops', 'simple', 'tag', 'type_comment'}
+)
+# Fields of statements that hold other statements (or except handlers and match cases, which hold some)
+STATEMENT_FIELDS = ('body', 'handlers', 'cases', 'orelse', 'finalbody')
+# Definitions a class body names after the class (Class.method), as mypy does
+CLASS_MEMBERS = frozenset({ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef})
+# Nodes that cannot hold an import, a definition or a call
+LEAVES = frozenset({ast.Name, ast.Constant, ast.Pass, ast.Break, ast.Continue, ast.Global, ast.Nonlocal})
+
+_child_fields: dict[type[ast.AST], tuple[str, ...]] = {}
+
+
+def child_fields(node_type: type[ast.AST]) -> tuple[str, ...]:
+    """The fields of a node type that may hold nodes to scan, in the order ast.NodeVisitor visits them."""
+    fields = _child_fields.get(node_type)
+    if fields is None:
+        fields = _child_fields[node_type] = tuple(field for field in node_type._fields if field not in SCALAR_FIELDS)
+    return fields
+
+
+class PurityVisitor:
+    """
+    Scan a module for its imports, its functions with their @pure decorators, and the calls they make.
+
+    The tree is walked with an explicit stack rather than with ast.NodeVisitor: only imports,
+    function definitions and calls are dispatched on, other nodes just have their children pushed,
+    and subtrees that cannot hold any of them (names, constants, the dotted name a call is made to)
+    are not walked at all. Nodes are popped in the order ast.NodeVisitor would visit them, so an
+    import affects the calls that follow it in the same way. Functions defined in a class body are
+    named after the classes around them (Class.method), as mypy names them.
+
+    A demand-driven analysis uses two passes instead of visit: index records the imports and the
+    functions of the module, with their decorators, walking statements only; visit_function then
+    analyzes the body of a function when it is asked for, usually because a @pure function reaches
+    it. Calls are then resolved with every import of the module, wherever it is.
+    """
+
     PURE_DECORATOR_FULLNAME = 'mypy_pure.decorators.pure'
 
-    def __init__(self) -> None:
+    def __init__(self, module: str | None = None, is_package: bool = False) -> None:
+        # Name of the visited module, only needed to resolve relative imports
+        self.__module = module
+        self.__is_package = is_package
         self.__imports: dict[ImportAlias, ImportFullName] = {}  # alias -> fullname
-        self.__calls: CallGraph = {}  # func_name -> set(callees)
+        self.__calls = CallGraphBuilder()  # func_name -> callees
         self.__pure_functions_lineno: dict[FuncName, LineNo] = {}  # func_name -> lineno
-        self.__current_function: FuncName | None = None
+        self.__allowed_effects: dict[FuncName, EffectMask] = {}  # func_name -> effects of @pure(allow=...)
+        # (name, *attributes in reverse order) -> dotted name, valid until the next import rebinds a name
+        self.__dotted_names: dict[tuple[str, ...], str] = {}
+        # Functions and classes defined in a class body -> their name qualified with the classes around them
+        self.__qualified_names: dict[ast.AST, FuncName] = {}
+        # Demand-driven analysis: func_name -> its definitions, and the functions already visited
+        self.__definitions: dict[FuncName, list[ast.FunctionDef | ast.AsyncFunctionDef]] = {}
+        self.__visited_functions: set[FuncName] = set()
 
     @property
     def calls(self) -> CallGraph:
-        return self.__calls
+        return self.__calls.build()
 
     @property
     def pure_functions_lineno(self) -> dict[FuncName, LineNo]:
         return self.__pure_functions_lineno
 
+    @property
+    def allowed_effects(self) -> dict[FuncName, EffectMask]:
+        return self.__allowed_effects
+
     @property
     def imports(self) -> dict[ImportAlias, ImportFullName]:
         return self.__imports
 
-    def visit_Import(self, node: ast.Import) -> None:
-        for alias in node.names:
-            name = alias.asname or alias.name
-            self.__imports[name] = alias.name
-        self.generic_visit(node)
+    @property
+    def indexed_functions(self) -> Collection[FuncName]:
+        """The functions index found, nested ones included."""
+        return self.__definitions.keys()
+
+    def visit(self, tree: ast.AST) -> None:
+        self.__scan([(tree, None)], None)
+        self.__qualified_names.clear()
+
+    def index(self, tree: ast.AST) -> None:
+        """First pass of a demand-driven analysis: imports, functions and decorators, without the expressions."""
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            if node_type is ast.FunctionDef or node_type is ast.AsyncFunctionDef:
+                definition = cast(ast.FunctionDef | ast.AsyncFunctionDef, node)
+                fn = self.__qualified_names.get(definition, definition.name)
+                self.__handle_decorators(definition, fn)
+                self.__definitions.setdefault(fn, []).append(definition)
+            elif node_type is ast.Import or node_type is ast.ImportFrom:
+                self.__handle_import(cast(ast.Import | ast.ImportFrom, node))
+                continue
+            elif node_type is ast.ClassDef:
+                self.__handle_class_def(cast(ast.ClassDef, node))
+            for field in reversed(STATEMENT_FIELDS):
+                statements = getattr(node, field, None)
+                # The body of a lambda or of a conditional expression is an expression
+                if type(statements) is list:
+                    stack.extend(reversed(statements))
+
+    def visit_function(self, fn: FuncName) -> list[FuncName]:
+        """
+        Second pass of a demand-driven analysis: analyze the definitions of a function found by index, the
+        first time it is asked for, and return the names it calls. Nested functions are left to their own visit.
+        """
+        if fn in self.__visited_functions or fn not in self.__definitions:
+            return []
+        self.__visited_functions.add(fn)
+        callees: list[FuncName] = []
+        self.__scan([(definition, None) for definition in reversed(self.__definitions[fn])], callees)
+        return callees
+
+    def __scan(self, stack: list[tuple[ast.AST, FuncName | None]], callees: list[FuncName] | None) -> None:
+        """Scan nodes (with the function they are in), collecting the calls in callees too for a demand-driven visit."""
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            node, function = pop()
+            node_type = type(node)
+            if node_type is ast.Call:
+                if self.__handle_call(cast(ast.Call, node), function, stack, callees):
+                    continue
+            elif node_type is ast.FunctionDef or node_type is ast.AsyncFunctionDef:
+                if callees is not None and function is not None:
+                    continue
+                function = self.__handle_function_def(cast(ast.FunctionDef | ast.AsyncFunctionDef, node))
+            elif node_type is ast.Import or node_type is ast.ImportFrom:
+                self.__handle_import(cast(ast.Import | ast.ImportFrom, node))
+                continue
+            elif node_type is ast.ClassDef:
+                self.__handle_class_def(cast(ast.ClassDef, node))
+            # Children are pushed last first, to be popped in the order of the fields
+            for field in reversed(child_fields(node_type)):
+                value = getattr(node, field)
+                if type(value) is list:
+                    for child in reversed(value):
+                        if child is not None and type(child) not in LEAVES:
+                            push((child, function))
+                elif value is not None and type(value) not in LEAVES:
+                    push((value, function))
 
-    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
-        module = node.module or ''
+    def __handle_call(
+        self,
+        node: ast.Call,
+        function: FuncName | None,
+        stack: list[tuple[ast.AST, FuncName | None]],
+        callees: list[FuncName] | None,
+    ) -> bool:
+        """Record a call to a dotted name and push its arguments; False when the callee is another expression."""
+        callee = self.__resolve_name(node.func)
+        if callee is None:
+            return False
+        if function is not None:
+            self.__calls.add_call(function, callee)
+            if callees is not None:
+                callees.append(callee)
+        # Only the arguments may hold other calls
+        for keyword in reversed(node.keywords):
+            stack.append((keyword, function))
+        for arg in reversed(node.args):
+            if type(arg) not in LEAVES:
+                stack.append((arg, function))
+        return True
+
+    def __handle_import(self, node: ast.Import | ast.ImportFrom) -> None:
+        self.__dotted_names.clear()
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                name = alias.asname or alias.name
+                self.__imports[name] = alias.name
+            return
+        module = absolute_import_module(self.__module, self.__is_package, node.level, node.module or '')
         for alias in node.names:
             name = alias.asname or alias.name
             if module:
@@ -45,68 +228,76 @@ class PurityVisitor(ast.NodeVisitor):
             else:
                 fullname = alias.name
             self.__imports[name] = fullname
-        self.generic_visit(node)
 
     def __resolve_name(self, node: ast.AST) -> str | None:
-        if isinstance(node, ast.Name):
-            return self.__imports.get(node.id, node.id)
-        elif isinstance(node, ast.Attribute):
-            base = self.__resolve_name(node.value)
-            if base:
-                return f'{base}.{node.attr}'
-        return None
-
-    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
-        self.__handle_function_def(node)
-
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
-        self.__handle_function_def(node)
-
-    def __handle_function_def(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
-        # Check for @pure decorator
+        """The dotted name a Name or a chain of Attributes on a Name refers to, None for other expressions."""
+        if type(node) is ast.Name:
+            name = cast(ast.Name, node).id
+            return self.__imports.get(name, name)
+        attributes: list[str] = []
+        while type(node) is ast.Attribute:
+            attribute = cast(ast.Attribute, node)
+            attributes.append(attribute.attr)
+            node = attribute.value
+        if type(node) is not ast.Name or not attributes:
+            return None
+        name = cast(ast.Name, node).id
+        key = (name, *attributes)
+        dotted_name = self.__dotted_names.get(key)
+        if dotted_name is None:
+            attributes.append(self.__imports.get(name, name))
+            dotted_name = self.__dotted_names[key] = '.'.join(reversed(attributes))
+        return dotted_name
+
+    def __handle_class_def(self, node: ast.ClassDef) -> None:
+        """Name the functions and classes of a class body after it, through the if and try blocks that hold them."""
+        prefix = self.__qualified_names.get(node, node.name)
+        statements: list[ast.AST] = list(node.body)
+        while statements:
+            statement = statements.pop()
+            if type(statement) in CLASS_MEMBERS:
+                member = cast(ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef, statement)
+                self.__qualified_names[member] = f'{prefix}.{member.name}'
+                continue
+            for field in STATEMENT_FIELDS:
+                block = getattr(statement, field, None)
+                if type(block) is list:
+                    statements.extend(block)
+
+    def __handle_function_def(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> FuncName:
+        fn = self.__qualified_names.get(node, node.name)
+        self.__handle_decorators(node, fn)
+        self.__calls.add_function(fn)
+        return fn
+
+    def __handle_decorators(self, node: ast.FunctionDef | ast.AsyncFunctionDef, fn: FuncName) -> None:
+        # Check for @pure decorator, or @pure(allow=...)
         is_pure = False
+        allowed: EffectMask = 0
         for decorator in node.decorator_list:
-            dec_name = self.__resolve_name(decorator)
-            if dec_name == self.PURE_DECORATOR_FULLNAME:
+            if isinstance(decorator, ast.Call) and self.__is_pure_decorator(decorator.func):
+                is_pure = True
+                allowed |= allowed_effects(decorator.keywords)
+            elif self.__is_pure_decorator(decorator):
                 is_pure = True
-            elif isinstance(decorator, ast.Name) and decorator.id == 'pure':
-                # Check if 'pure' is imported from the right place
-                imported_from = self.__imports.get('pure')
-                if imported_from in {self.PURE_DECORATOR_FULLNAME, 'mypy_pure.pure'}:
-                    is_pure = True  # pragma: no cover
-                # Or if it's just 'pure' and we assume it's the one (for simple cases)
-
-            elif isinstance(decorator, ast.Attribute) and decorator.attr == 'pure':
-                # Handle @decorators.pure
-                base = self.__resolve_name(decorator.value)  # pragma: no cover
-                if base == 'mypy_pure.decorators':  # pragma: no cover
-                    is_pure = True  # pragma: no cover
 
         if is_pure:
-            self.__pure_functions_lineno[node.name] = node.lineno
-
-        prev_function = self.__current_function
-        self.__current_function = node.name
-        self.__calls[node.name] = set()
-
-        self.generic_visit(node)
-
-        self.__current_function = prev_function
-
-    def visit_Call(self, node: ast.Call) -> None:
-        if self.__current_function is None:
-            self.generic_visit(node)
-            return
-
-        callee_name = None
-        if isinstance(node.func, ast.Name):
-            callee_name = self.__imports.get(node.func.id, node.func.id)
-        elif isinstance(node.func, ast.Attribute):
-            base = self.__resolve_name(node.func.value)
-            if base:
-                callee_name = f'{base}.{node.func.attr}'
+            self.__pure_functions_lineno[fn] = node.lineno
+            if allowed:
+                self.__allowed_effects[fn] = allowed
 
-        if callee_name:
-            self.__calls[self.__current_function].add(callee_name)
+    def __is_pure_decorator(self, decorator: ast.expr) -> bool:
+        dec_name = self.__resolve_name(decorator)
+        if dec_name == self.PURE_DECORATOR_FULLNAME:
+            return True
+        elif isinstance(decorator, ast.Name) and decorator.id == 'pure':
+            # Check if 'pure' is imported from the right place
+            imported_from = self.__imports.get('pure')
+            return imported_from in {self.PURE_DECORATOR_FULLNAME, 'mypy_pure.pure'}  # pragma: no cover
+            # Or if it's just 'pure' and we assume it's the one (for simple cases)
 
-        self.generic_visit(node)
+        elif isinstance(decorator, ast.Attribute) and decorator.attr == 'pure':
+            # Handle @decorators.pure
+            base = self.__resolve_name(decorator.value)  # pragma: no cover
+            return base == 'mypy_pure.decorators'  # pragma: no cover
+        return False
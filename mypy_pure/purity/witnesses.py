@@ -0,0 +1,297 @@
+from collections import deque
+from collections.abc import Callable, Container, Hashable, Iterable, Iterator, Mapping
+from typing import TypeVar
+
+from mypy_pure.purity.effects import effect_bit, effect_category, effect_names
+from mypy_pure.purity.matcher import normalize_name
+from mypy_pure.purity.types import EffectMask, FuncName
+
+Node = TypeVar('Node', bound=Hashable)
+
+
+class Witnesses(Mapping[FuncName, frozenset[FuncName]]):
+    """
+    Why functions are impure.
+
+    Every impure function keeps a single parent pointer, the next function on its shortest call path
+    to a blacklisted call (None when it makes that call itself), and the blacklisted call that path
+    ends with. That is enough to give a verdict and to explain it, and it takes constant space per
+    function, however long the chains and wide the fan-outs.
+
+    The full set of blacklisted calls a function reaches is only computed when it is asked for,
+    typically for the functions that are reported. As a mapping, the witnesses go from every impure
+    function to that set. The effect kinds a function reaches are folded the same way, into one
+    integer mask per function (see purity.effects).
+    """
+
+    def __init__(
+        self,
+        parents: dict[FuncName, FuncName | None],
+        first_calls: dict[FuncName, FuncName],
+        successors: dict[FuncName, list[FuncName]],
+        direct_calls: dict[FuncName, list[FuncName]],
+        call_effects: Callable[[FuncName], EffectMask] | None = None,
+    ) -> None:
+        self.__parents = parents
+        self.__first_calls = first_calls
+        # Impure callees and blacklisted calls of every impure function, to build the full sets
+        self.__successors = successors
+        self.__direct_calls = direct_calls
+        self.__call_effects = call_effects
+        self.__impure_calls: dict[FuncName, frozenset[FuncName]] = {}
+        self.__effects: dict[FuncName, EffectMask] = {}
+
+    def path(self, fn: FuncName) -> list[FuncName]:
+        """Shortest call path from an impure function to a blacklisted call, both included."""
+        path = [fn]
+        parent = self.__parents[fn]
+        while parent is not None:
+            path.append(parent)
+            parent = self.__parents[parent]
+        path.append(self.__first_calls[fn])
+        return path
+
+    def parent(self, fn: FuncName) -> FuncName | None:
+        """The next function on the shortest call path of an impure function; None when it makes the call itself."""
+        return self.__parents[fn]
+
+    def first_call(self, fn: FuncName) -> FuncName:
+        """The blacklisted call at the end of the shortest call path of an impure function."""
+        return self.__first_calls[fn]
+
+    def successors(self, fn: FuncName) -> list[FuncName]:
+        """The impure functions an impure function calls."""
+        return self.__successors.get(fn, [])
+
+    def direct_calls(self, fn: FuncName) -> list[FuncName]:
+        """The blacklisted calls an impure function makes itself."""
+        return self.__direct_calls.get(fn, [])
+
+    def call_effects(self, call: FuncName) -> EffectMask:
+        """The effect kinds of a blacklisted call; kinds the matcher does not know are derived from the name."""
+        effects = self.__call_effects(call) if self.__call_effects is not None else 0
+        return effects or effect_bit(effect_category(normalize_name(call)))
+
+    def effects(self, fn: FuncName) -> EffectMask:
+        """The effect kinds of the blacklisted calls a function reaches, 0 for a pure function."""
+        if fn not in self.__parents:
+            return 0
+        masks = self.__effects
+        if fn not in masks:
+            for component in self.__components(fn, masks):
+                mask = 0
+                for member in component:
+                    for call in self.direct_calls(member):
+                        mask |= self.call_effects(call)
+                    for callee in self.successors(member):
+                        # Members of the component are not done yet
+                        mask |= masks.get(callee, 0)
+                for member in component:
+                    masks[member] = mask
+        return masks[fn]
+
+    def path_to(self, fn: FuncName, effects: EffectMask) -> list[FuncName]:
+        """
+        Shortest call path from an impure function to a blacklisted call with any of some effect kinds,
+        both included; empty when it reaches none.
+        """
+        if not self.effects(fn) & effects:
+            return []
+        parents: dict[FuncName, FuncName | None] = {fn: None}
+        queue: deque[FuncName] = deque([fn])
+        while queue:
+            caller = queue.popleft()
+            for call in self.direct_calls(caller):
+                if self.call_effects(call) & effects:
+                    path = [call]
+                    step: FuncName | None = caller
+                    while step is not None:
+                        path.append(step)
+                        step = parents[step]
+                    return path[::-1]
+            for callee in self.successors(caller):
+                if callee not in parents and self.effects(callee) & effects:
+                    parents[callee] = caller
+                    queue.append(callee)
+        return []  # pragma: no cover
+
+    def __getitem__(self, fn: FuncName) -> frozenset[FuncName]:
+        if fn not in self.__parents:
+            raise KeyError(fn)
+        if fn not in self.__impure_calls:
+            self.__collect_impure_calls(fn)
+        return self.__impure_calls[fn]
+
+    def __contains__(self, fn: object) -> bool:
+        return fn in self.__parents
+
+    def __iter__(self) -> Iterator[FuncName]:
+        return iter(self.__parents)
+
+    def __len__(self) -> int:
+        return len(self.__parents)
+
+    def __collect_impure_calls(self, root: FuncName) -> None:
+        """Compute the blacklisted calls reached by a function and by the impure functions it reaches."""
+        done = self.__impure_calls
+        for component in self.__components(root, done):
+            impure_calls: set[FuncName] = set()
+            for member in component:
+                impure_calls.update(self.direct_calls(member))
+                for callee in self.successors(member):
+                    # Members of the component are not done yet
+                    impure_calls |= done.get(callee, frozenset())
+            frozen = frozenset(impure_calls)
+            for member in component:
+                done[member] = frozen
+
+    def __components(self, root: FuncName, done: Container[FuncName]) -> Iterator[list[FuncName]]:
+        """
+        The strongly connected components reached from a function, skipping the functions in done.
+
+        Components are found with an iterative Tarjan, which completes them in reverse topological
+        order, so the caller can combine each of them with the results of its callees, already in
+        done when the next component is asked for.
+        """
+        index: dict[FuncName, int] = {root: 0}
+        lowlink: dict[FuncName, int] = {root: 0}
+        component_stack = [root]
+        on_component_stack = {root}
+        work = [(root, iter(self.successors(root)))]
+        while work:
+            fn, callees = work[-1]
+            for callee in callees:
+                if callee in done:
+                    continue
+                if callee not in index:
+                    index[callee] = lowlink[callee] = len(index)
+                    component_stack.append(callee)
+                    on_component_stack.add(callee)
+                    work.append((callee, iter(self.successors(callee))))
+                    break
+                if callee in on_component_stack:
+                    lowlink[fn] = min(lowlink[fn], index[callee])
+            else:
+                work.pop()
+                if work:
+                    caller = work[-1][0]
+                    lowlink[caller] = min(lowlink[caller], lowlink[fn])
+                if lowlink[fn] == index[fn]:
+                    component: list[FuncName] = []
+                    while True:
+                        member = component_stack.pop()
+                        on_component_stack.discard(member)
+                        component.append(member)
+                        if member == fn:
+                            break
+                    yield component
+
+
+def find_witnesses(
+    roots: Iterable[Node],
+    expand: Callable[[Node], tuple[Iterable[Node], Iterable[FuncName]]],
+    name: Callable[[Node], FuncName],
+    call_effects: Callable[[FuncName], EffectMask] | None = None,
+) -> tuple[list[Node], Witnesses]:
+    """
+    Decide which of the functions reachable from roots are impure, and why.
+
+    expand gives the functions a function calls that may be impure, and the blacklisted calls it
+    makes. The reachable functions are first collected, then a breadth-first search runs backwards
+    from the functions that make blacklisted calls: the first time a function is reached, the
+    function it is reached from is the next step of its shortest path to a blacklisted call. Every
+    function and call is handled a bounded number of times, cycles included.
+
+    Returns:
+        The reachable functions, in the order they were found, and the witnesses of the impure ones,
+        with the names given by name and the effect kinds of the blacklisted calls given by call_effects.
+    """
+    reachable: list[Node] = []
+    successors: dict[Node, list[Node]] = {}
+    direct_calls: dict[Node, list[FuncName]] = {}
+    seen: set[Node] = set()
+    pending: list[Node] = []
+    for root in roots:
+        if root not in seen:
+            seen.add(root)
+            pending.append(root)
+            while pending:
+                fn = pending.pop()
+                reachable.append(fn)
+                callees, calls = expand(fn)
+                successors[fn] = list(callees)
+                found_calls = sorted(set(calls))
+                if found_calls:
+                    direct_calls[fn] = found_calls
+                for callee in reversed(successors[fn]):
+                    if callee not in seen:
+                        seen.add(callee)
+                        pending.append(callee)
+
+    callers: dict[Node, list[Node]] = {}
+    for fn in reachable:
+        for callee in successors[fn]:
+            callers.setdefault(callee, []).append(fn)
+
+    parents: dict[Node, Node | None] = {}
+    first_calls: dict[Node, FuncName] = {}
+    queue: deque[Node] = deque()
+    for fn in reachable:
+        if fn in direct_calls:
+            parents[fn] = None
+            first_calls[fn] = direct_calls[fn][0]
+            queue.append(fn)
+    while queue:
+        callee = queue.popleft()
+        for caller in callers.get(callee, ()):
+            if caller not in parents:
+                parents[caller] = callee
+                first_calls[caller] = first_calls[callee]
+                queue.append(caller)
+
+    witnesses = Witnesses(
+        parents={name(fn): None if parent is None else name(parent) for fn, parent in parents.items()},
+        first_calls={name(fn): call for fn, call in first_calls.items()},
+        successors={
+            name(fn): [name(callee) for callee in successors[fn] if callee in parents]
+            for fn in parents
+            if successors[fn]
+        },
+        direct_calls={name(fn): direct_calls[fn] for fn in parents if fn in direct_calls},
+        call_effects=call_effects,
+    )
+    return reachable, witnesses
+
+
+def impurity_message(
+    fn: FuncName, impure_calls: Iterable[FuncName], path: list[FuncName], disallowed: EffectMask = 0
+) -> str:
+    """
+    The error reported for a @pure function: what it reaches and, when it is indirect, how. For a
+    function with an allow policy, disallowed holds the effect kinds it reaches that are not allowed.
+    """
+    impure_list = ', '.join(f"'{call}'" for call in sorted(impure_calls))
+    message = f"Function '{fn}' is impure because it calls {impure_list}"
+    if len(path) > 2:
+        message += f" (via {' -> '.join(path)})"
+    if disallowed:
+        message += f"; effects not allowed: {', '.join(effect_names(disallowed))}"
+    return message
+
+
+def policy_violation(
+    witnesses: Witnesses, fn: FuncName, allowed: EffectMask
+) -> tuple[list[FuncName], list[FuncName], EffectMask] | None:
+    """
+    Why a @pure function breaks its policy: the blacklisted calls it reaches that are not allowed, the
+    shortest path to one of them and their effect kinds. None when it is pure or only has allowed effects.
+    """
+    if fn not in witnesses:
+        return None
+    if not allowed:
+        return sorted(witnesses[fn]), witnesses.path(fn), 0
+    disallowed = witnesses.effects(fn) & ~allowed
+    if not disallowed:
+        return None
+    calls = sorted(call for call in witnesses[fn] if witnesses.call_effects(call) & disallowed)
+    return calls, witnesses.path_to(fn, disallowed), disallowed
@@ -0,0 +1,179 @@
+"""
+Sharded checks: analyze a slice of a project per machine, then decide every @pure function at once.
+
+`mypy-pure export --shard i/n` parses the i-th of n slices of the sources and writes what the parsing
+found (module analyses, __mypy_pure__ declarations, errors) to an artifact. `mypy-pure merge` reads
+the artifacts of every shard, summarizes the modules and propagates the summaries, with the rules of
+the whole project, so its verdicts are those of a check of all the sources on one machine.
+
+Summaries are not exported themselves: the verdict of a call in one module depends on the
+__mypy_pure__ declarations of modules that may be in other shards.
+"""
+
+import json
+from collections.abc import Iterable
+from typing import Any
+
+from mypy.modulefinder import BuildSource
+
+from mypy_pure.cache import CACHE_VERSION, atomic_write
+from mypy_pure.purity.summary import ModuleAnalysis
+from mypy_pure.purity.types import FuncName
+
+# Artifacts hold module analyses: their format changes with the one of the cache entries
+ARTIFACT_VERSION = CACHE_VERSION
+
+
+class InvalidArtifact(Exception):
+    """An artifact that cannot be read, or a set of artifacts that do not make a whole project."""
+
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """Parse 'i/n', the i-th (from 1) of n shards."""
+    index, separator, count = text.partition('/')
+    if not separator or not index.isdigit() or not count.isdigit() or not 1 <= int(index) <= int(count):
+        raise ValueError(f'invalid shard {text!r}: expected i/n with 1 <= i <= n')
+    return int(index), int(count)
+
+
+def select_shard(sources: list[BuildSource], index: int, count: int) -> list[BuildSource]:
+    """
+    The sources of the index-th (from 1) of count shards. Sources are ordered by module and path
+    first, so that every machine that lists the same tree splits it the same way.
+    """
+    ordered = sorted(sources, key=lambda source: (source.module, source.path or ''))
+    return [source for i, source in enumerate(ordered) if i % count == index - 1]
+
+
+class ShardArtifact:
+    """What the parsing of a shard found, to be merged with the artifacts of the other shards."""
+
+    def __init__(
+        self,
+        shards: Iterable[tuple[int, int]],
+        sources: int,
+        analyses: dict[str, ModuleAnalysis],
+        declared_pure_functions: dict[str, list[FuncName]],
+        discovered_pure_functions: dict[str, list[FuncName]],
+        errors: dict[str, str],
+        skipped: dict[str, str],
+    ) -> None:
+        self.__shards = sorted(set(shards))
+        self.__sources = sources
+        self.__analyses = analyses
+        self.__declared_pure_functions = declared_pure_functions
+        self.__discovered_pure_functions = discovered_pure_functions
+        self.__errors = errors
+        self.__skipped = skipped
+
+    @property
+    def shards(self) -> list[tuple[int, int]]:
+        """The shards (index, count) the artifact covers: one, unless it was merged."""
+        return self.__shards
+
+    @property
+    def sources(self) -> int:
+        """Number of sources of the shards, skipped ones included."""
+        return self.__sources
+
+    @property
+    def analyses(self) -> dict[str, ModuleAnalysis]:
+        return self.__analyses
+
+    @property
+    def declared_pure_functions(self) -> dict[str, list[FuncName]]:
+        """The __mypy_pure__ declaration of every analyzed module."""
+        return self.__declared_pure_functions
+
+    @property
+    def discovered_pure_functions(self) -> dict[str, list[FuncName]]:
+        """The __mypy_pure__ declaration of the imported modules that were not analyzed."""
+        return self.__discovered_pure_functions
+
+    @property
+    def errors(self) -> dict[str, str]:
+        """Files that could not be analyzed (by path), formatted like mypy errors."""
+        return self.__errors
+
+    @property
+    def skipped(self) -> dict[str, str]:
+        return self.__skipped
+
+    @classmethod
+    def merge(cls, artifacts: list['ShardArtifact']) -> 'ShardArtifact':
+        """Merge the artifacts of all the shards of a project; raise InvalidArtifact if some are missing."""
+        if not artifacts:
+            raise InvalidArtifact('no artifacts to merge')
+        shards = [shard for artifact in artifacts for shard in artifact.shards]
+        counts = {count for _, count in shards}
+        if len(counts) != 1:
+            raise InvalidArtifact(f'artifacts of different shardings: {", ".join(sorted(map(str, counts)))} shards')
+        (count,) = counts
+        if len(set(shards)) != len(shards):
+            raise InvalidArtifact('several artifacts of the same shard')
+        missing = sorted(set(range(1, count + 1)) - {index for index, _ in shards})
+        if missing:
+            raise InvalidArtifact(f'missing shards: {", ".join(f"{index}/{count}" for index in missing)}')
+
+        analyses: dict[str, ModuleAnalysis] = {}
+        declared: dict[str, list[FuncName]] = {}
+        discovered: dict[str, list[FuncName]] = {}
+        for artifact in artifacts:
+            analyses.update(artifact.analyses)
+            declared.update(artifact.declared_pure_functions)
+            discovered.update(artifact.discovered_pure_functions)
+        # Other shards may have found the modules of a shard through imports, and read them on their own
+        discovered = {module: names for module, names in discovered.items() if module not in analyses}
+        return cls(
+            shards,
+            sum(artifact.sources for artifact in artifacts),
+            analyses,
+            declared,
+            discovered,
+            {path: error for artifact in artifacts for path, error in artifact.errors.items()},
+            {path: reason for artifact in artifacts for path, reason in artifact.skipped.items()},
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'version': ARTIFACT_VERSION,
+            'shards': [list(shard) for shard in self.__shards],
+            'sources': self.__sources,
+            'analyses': [analysis.to_dict() for analysis in self.__analyses.values()],
+            'declared_pure_functions': self.__declared_pure_functions,
+            'discovered_pure_functions': self.__discovered_pure_functions,
+            'errors': self.__errors,
+            'skipped': self.__skipped,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'ShardArtifact':
+        analyses = [ModuleAnalysis.from_dict(analysis) for analysis in data['analyses']]
+        return cls(
+            [(index, count) for index, count in data['shards']],
+            data['sources'],
+            {analysis.module: analysis for analysis in analyses},
+            data['declared_pure_functions'],
+            data['discovered_pure_functions'],
+            data['errors'],
+            data['skipped'],
+        )
+
+    def write(self, path: str) -> None:
+        """Write the artifact atomically, so that a merge never reads half of one."""
+        with atomic_write(path, '.json') as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+    @classmethod
+    def read(cls, path: str) -> 'ShardArtifact':
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as exc:
+            raise InvalidArtifact(f'{path}: {exc}') from exc
+        if not isinstance(data, dict) or data.get('version') != ARTIFACT_VERSION:
+            raise InvalidArtifact(f'{path}: not an artifact of this version of mypy-pure')
+        try:
+            return cls.from_dict(data)
+        except (KeyError, TypeError, ValueError) as exc:
+            raise InvalidArtifact(f'{path}: malformed artifact ({exc})') from exc
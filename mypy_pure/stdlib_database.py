@@ -0,0 +1,325 @@
+"""
+Build the stdlib purity database from the typeshed stubs bundled with mypy.
+
+Every function, class and method the stubs define is an entry. Entries are impure when the built-in
+blacklist shards or IMPURE_FAMILIES say so, pure when PURE_FAMILIES does, and unknown otherwise;
+impure entries carry the side-effect category of their name. The database is only built on request,
+in the user cache directory unless told otherwise; the plugin uses it once it exists:
+
+    python -m mypy_pure.stdlib_database [--output PATH] [--typeshed DIR]
+"""
+
+import argparse
+import ast
+import fnmatch
+import hashlib
+import os
+import re
+import sys
+from collections.abc import Iterable, Iterator
+
+from mypy.build import default_data_dir
+from mypy.version import __version__ as mypy_version
+
+from mypy_pure.blacklists import BlacklistShards, top_level_module
+from mypy_pure.purity.database import FORMAT_VERSION, PurityDatabase, write_database
+from mypy_pure.purity.effects import EFFECT_RULES, NO_EFFECT, effect_category
+from mypy_pure.purity.matcher import IMPURE, PURE, UNKNOWN, normalize_name
+from mypy_pure.purity.types import FuncName
+
+# Callables of the stubs that are impure although the blacklist does not list them one by one. Families
+# only cover classes and modules whose every callable has effects; elsewhere the callables are listed.
+IMPURE_FAMILIES = (
+    '_socket.socket.*',
+    'socket.socket.*',
+    'ssl.SSLSocket.*',
+    'http.client.HTTPConnection.*',
+    'urllib.request.*',
+    'ftplib.FTP.*',
+    'smtplib.SMTP.*',
+    'poplib.POP3.*',
+    'imaplib.IMAP4.*',
+    'subprocess.Popen.*',
+    'shutil.*',
+    'tempfile.*',
+    # The global generator of random
+    'random.random',
+    'random.randint',
+    'random.randrange',
+    'random.randbytes',
+    'random.getrandbits',
+    'random.choice',
+    'random.choices',
+    'random.sample',
+    'random.shuffle',
+    'random.uniform',
+    'random.triangular',
+    'random.*variate',
+    'random.gauss',
+    'random.getstate',
+    'random.SystemRandom.*',
+    'secrets.token_*',
+    'secrets.choice',
+    'secrets.randbelow',
+    'secrets.randbits',
+    'secrets.SystemRandom.*',
+    # Loggers and handlers emitting records, and changes to the logging configuration
+    'logging.warn',
+    'logging.fatal',
+    'logging.disable',
+    'logging.captureWarnings',
+    'logging.Logger.debug',
+    'logging.Logger.info',
+    'logging.Logger.warning',
+    'logging.Logger.warn',
+    'logging.Logger.error',
+    'logging.Logger.exception',
+    'logging.Logger.critical',
+    'logging.Logger.fatal',
+    'logging.Logger.log',
+    'logging.Logger.handle',
+    'logging.Logger.setLevel',
+    'logging.Logger.addHandler',
+    'logging.Logger.removeHandler',
+    'logging.LoggerAdapter.debug',
+    'logging.LoggerAdapter.info',
+    'logging.LoggerAdapter.warning',
+    'logging.LoggerAdapter.warn',
+    'logging.LoggerAdapter.error',
+    'logging.LoggerAdapter.exception',
+    'logging.LoggerAdapter.critical',
+    'logging.LoggerAdapter.log',
+    'logging.Handler.emit',
+    'logging.Handler.handle',
+    'logging.Handler.flush',
+    'logging.Handler.close',
+    # What pathlib.Path reads from the file system (its shard lists what it writes)
+    'pathlib.Path.open',
+    'pathlib.Path.read_text',
+    'pathlib.Path.read_bytes',
+    'pathlib.Path.exists',
+    'pathlib.Path.is_*',
+    'pathlib.Path.iterdir',
+    'pathlib.Path.glob',
+    'pathlib.Path.rglob',
+    'pathlib.Path.walk',
+    'pathlib.Path.stat',
+    'pathlib.Path.lstat',
+    'pathlib.Path.owner',
+    'pathlib.Path.group',
+    'pathlib.Path.readlink',
+    'pathlib.Path.resolve',
+    'pathlib.Path.absolute',
+    'pathlib.Path.expanduser',
+    'pathlib.Path.samefile',
+    'pathlib.Path.cwd',
+    'pathlib.Path.home',
+    'io.open',
+    'io.open_code',
+    'os.urandom',
+    'os.getrandom',
+    'uuid.uuid1',
+    'uuid.uuid4',
+    'time.time',
+    'time.time_ns',
+    'time.monotonic',
+    'time.monotonic_ns',
+    'time.perf_counter',
+    'time.perf_counter_ns',
+    'time.process_time',
+    'time.process_time_ns',
+    'time.localtime',
+    'time.ctime',
+    'datetime.datetime.now',
+    'datetime.datetime.utcnow',
+    'datetime.datetime.today',
+    'datetime.date.today',
+)
+
+# Callables of the stubs without side effects
+PURE_FAMILIES = (
+    'math.*',
+    'cmath.*',
+    'operator.*',
+    'statistics.*',
+    'string.*',
+    'textwrap.*',
+    'keyword.*',
+    'unicodedata.*',
+    'colorsys.*',
+    'json.dumps',
+    'json.loads',
+    'str.*',
+    'bytes.*',
+    'int.*',
+    'float.*',
+    'complex.*',
+    'tuple.*',
+    'frozenset.*',
+    'abs',
+    'all',
+    'any',
+    'bin',
+    'callable',
+    'chr',
+    'divmod',
+    'format',
+    'hash',
+    'hex',
+    'isinstance',
+    'issubclass',
+    'len',
+    'max',
+    'min',
+    'oct',
+    'ord',
+    'pow',
+    'repr',
+    'round',
+    'sorted',
+    'sum',
+)
+
+DATABASE_SUFFIX = '.puritydb'
+
+
+def typeshed_stdlib_dir() -> str:
+    return os.path.join(default_data_dir(), 'typeshed', 'stdlib')
+
+
+def user_cache_dir() -> str:
+    if sys.platform == 'win32':  # pragma: no cover
+        root = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(root, 'mypy-pure')
+
+
+def rules_digest() -> str:
+    """Identify the rules the database is built with, so that a database built with older rules is rebuilt."""
+    digest = hashlib.sha256()
+    # The rules themselves, not the files they are written in: a reinstall keeps the same database
+    shards = sorted(BlacklistShards(use_entry_points=False).load_all())
+    for rules in (IMPURE_FAMILIES, PURE_FAMILIES, shards, [f'{glob}={category}' for glob, category in EFFECT_RULES]):
+        digest.update('\n'.join(rules).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+def default_database_path() -> str:
+    """Where the plugin keeps the database of the running mypy: one file per mypy version and rules."""
+    return os.path.join(
+        user_cache_dir(), f'stdlib-mypy{mypy_version}-v{FORMAT_VERSION}-{rules_digest()}{DATABASE_SUFFIX}'
+    )
+
+
+def stdlib_blacklist() -> list[FuncName]:
+    """The names of the built-in shards of standard library modules."""
+    shards = BlacklistShards(use_entry_points=False)
+    stdlib_modules = set(sys.stdlib_module_names) | {'builtins'}
+    return [name for name in shards.load_all() if top_level_module(name) in stdlib_modules]
+
+
+def typeshed_modules(typeshed_dir: str) -> Iterator[tuple[str, str]]:
+    """Module names and paths of the stubs of a typeshed stdlib directory."""
+    for directory, subdirectories, files in os.walk(typeshed_dir):
+        subdirectories.sort()
+        for file_name in sorted(files):
+            if not file_name.endswith('.pyi'):
+                continue
+            relative = os.path.relpath(os.path.join(directory, file_name), typeshed_dir)
+            parts = relative.removesuffix('.pyi').split(os.sep)
+            if parts[-1] == '__init__':
+                parts.pop()
+            if parts:
+                yield '.'.join(parts), os.path.join(directory, file_name)
+
+
+def stub_callables(module: str, source: str) -> set[FuncName]:
+    """Functions, classes, methods and module aliases of one that a stub defines, under every version condition."""
+    names: set[FuncName] = set()
+    pending: list[tuple[list[ast.stmt], str]] = [(ast.parse(source).body, f'{module}.')]
+    while pending:
+        body, prefix = pending.pop()
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                names.add(normalize_name(f'{prefix}{node.name}'))
+            elif isinstance(node, ast.ClassDef):
+                names.add(normalize_name(f'{prefix}{node.name}'))
+                pending.append((node.body, f'{prefix}{node.name}.'))
+            elif isinstance(node, ast.If):
+                pending.append((node.body, prefix))
+                pending.append((node.orelse, prefix))
+            elif (
+                prefix == f'{module}.'
+                and isinstance(node, ast.Assign)
+                and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and isinstance(node.value, ast.Attribute)
+            ):
+                # Module functions bound to a hidden instance, as in random: randint = _inst.randint
+                names.add(normalize_name(f'{prefix}{node.targets[0].id}'))
+    return names
+
+
+def _compile(patterns: Iterable[str]) -> re.Pattern[str]:
+    return re.compile('|'.join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+def build_entries(typeshed_dir: str, blacklist: Iterable[FuncName] = ()) -> dict[FuncName, tuple[int, int]]:
+    """Verdict and category of every callable of the stubs and of every blacklisted name."""
+    impure_families = _compile(IMPURE_FAMILIES)
+    pure_families = _compile(PURE_FAMILIES)
+    entries: dict[FuncName, tuple[int, int]] = {}
+    for module, path in typeshed_modules(typeshed_dir):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                names = stub_callables(module, f.read())
+        except (OSError, SyntaxError, ValueError):  # pragma: no cover
+            continue
+        for name in names:
+            if impure_families.match(name):
+                entries[name] = (IMPURE, effect_category(name))
+            elif pure_families.match(name):
+                entries[name] = (PURE, NO_EFFECT)
+            else:
+                entries[name] = (UNKNOWN, NO_EFFECT)
+    for name in blacklist:
+        name = normalize_name(name)
+        entries[name] = (IMPURE, effect_category(name))
+    return entries
+
+
+def build_stdlib_database(path: str, typeshed_dir: str | None = None) -> int:
+    """Build the database of a typeshed stdlib directory (mypy's by default); return its number of entries."""
+    entries = build_entries(typeshed_dir or typeshed_stdlib_dir(), stdlib_blacklist())
+    write_database(path, entries, f'typeshed of mypy {mypy_version}; rules {rules_digest()}')
+    return len(entries)
+
+
+def load_stdlib_database(path: str | None = None) -> PurityDatabase | None:
+    """
+    Map the stdlib database; None if it was not built (or is unusable), and the blacklist shards apply alone.
+
+    Nothing is written here: type checks never build the database, `python -m mypy_pure.stdlib_database` does.
+    """
+    return PurityDatabase.open(path or default_database_path())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m mypy_pure.stdlib_database',
+        description='Build the stdlib purity database from the typeshed stubs bundled with mypy.',
+    )
+    parser.add_argument('--output', default=None, help=f'database file (default: {default_database_path()})')
+    parser.add_argument('--typeshed', default=None, help='typeshed stdlib directory (default: the one of mypy)')
+    args = parser.parse_args(argv)
+
+    output = args.output or default_database_path()
+    count = build_stdlib_database(output, args.typeshed)
+    print(f'Wrote {count} entries to {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest import TestCase
+
+from mypy_pure.cli import main
+
+# The helpers module of the projects checked by the command tests: an impure function and a pure one
+HELPERS = 'def log(x: int) -> None:\n    print(x)\n\n\ndef add(a: int, b: int) -> int:\n    return a + b\n'
+
+
+def run_main(*argv: str) -> tuple[str, int]:
+    """Run the mypy-pure command; return its output (stdout and stderr) and its exit status."""
+    output = StringIO()
+    with redirect_stdout(output), redirect_stderr(output):
+        exit_status = main(list(argv))
+    return output.getvalue(), exit_status
+
+
+class ProjectTestCase(TestCase):
+    """Tests of the mypy-pure command on projects written to a temporary directory, root."""
+
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = Path(tmp_dir.name)
+
+    def write_project(self, files: dict[str, str], directory: str = '') -> Path:
+        """Write the files of a project, by path relative to root/directory; return its directory."""
+        project = self.root / directory
+        for name, source in files.items():
+            (project / name).parent.mkdir(parents=True, exist_ok=True)
+            (project / name).write_text(source, encoding='utf-8')
+        return project
@@ -0,0 +1,11 @@
+def log(message: str) -> None:
+    print(message)
+
+
+def log_twice(message: str) -> None:
+    log(message)
+    log(message)
+
+
+def add(a: int, b: int) -> int:
+    return a + b
@@ -0,0 +1,9 @@
+"""Module whose import fails: its __mypy_pure__ can only be read statically."""
+
+__mypy_pure__ = ['pure_but_blacklisted']
+
+raise RuntimeError('This module must never be imported by the type checker')
+
+
+def pure_but_blacklisted() -> None:
+    pass
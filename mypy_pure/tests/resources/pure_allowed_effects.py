@@ -0,0 +1,37 @@
+import os
+import random
+import time
+
+from mypy_pure import pure
+
+
+def log(message: str) -> None:
+    print(message)
+
+
+def cleanup(path: str) -> None:
+    log(f'removing {path}')
+    os.remove(path)
+
+
+@pure(allow=['logging'])
+def pure_logs(x: int) -> int:
+    log(f'x = {x}')
+    return x
+
+
+@pure(allow=['logging'])
+def pure_cleans_up(path: str) -> None:
+    cleanup(path)
+
+
+@pure(allow=('nondeterminism', 'logging'))
+def pure_jitter(x: float) -> float:
+    log('jitter')
+    return x + random.random() + time.time()
+
+
+@pure
+def pure_without_policy(x: int) -> int:
+    log(f'x = {x}')
+    return x
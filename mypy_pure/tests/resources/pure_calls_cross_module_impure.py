@@ -0,0 +1,19 @@
+import cross_module_helpers
+from cross_module_helpers import add, log_twice
+
+from mypy_pure.decorators import pure
+
+
+@pure
+def pure_sum(a: int, b: int) -> int:
+    return add(a, b)
+
+
+@pure
+def pure_logs(message: str) -> None:
+    log_twice(message)
+
+
+@pure
+def pure_logs_through_module(message: str) -> None:
+    cross_module_helpers.log(message)
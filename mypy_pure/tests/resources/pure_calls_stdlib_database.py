@@ -0,0 +1,21 @@
+import logging
+import math
+import time
+
+from mypy_pure import pure
+
+
+@pure
+def pure_timestamp() -> float:
+    return time.time()
+
+
+@pure
+def pure_logs(logger: logging.Logger, x: int) -> int:
+    logger.info('x = %d', x)
+    return x
+
+
+@pure
+def pure_hypotenuse(a: float, b: float) -> float:
+    return math.sqrt(a * a + b * b)
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from typed_calls_helpers import name_of, remove, save
+
+from mypy_pure import pure
+
+
+class LogPath(Path):
+    def describe(self) -> str:
+        return self.name
+
+
+@pure
+def pure_writes(path: Path, text: str) -> None:
+    path.write_text(text)
+
+
+@pure
+def pure_writes_subclass(path: LogPath) -> None:
+    path.touch()
+
+
+@pure
+def pure_saves(path: Path) -> None:
+    save(path, 'text')
+
+
+@pure
+def pure_writes_later(path: Path) -> None:
+    write_bytes(path)
+
+
+def write_bytes(path: Path) -> None:
+    path.write_bytes(b'')
+
+
+@pure
+def pure_removes_reexported(path: str) -> None:
+    remove(path)
+
+
+@pure
+def pure_reads(path: LogPath) -> str:
+    return path.describe() + name_of(path)
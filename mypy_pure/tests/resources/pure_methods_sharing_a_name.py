@@ -0,0 +1,15 @@
+import os
+
+from mypy_pure.decorators import pure
+
+
+class Cleaner:
+    @pure
+    def run(self, path: str) -> None:
+        os.remove(path)
+
+
+class Adder:
+    @pure
+    def run(self, x: int) -> int:
+        return x + 1
@@ -11,4 +11,3 @@ class MyClass:
     @pure
     def impure_property(self) -> None:
         print('This is impure')
-        return None
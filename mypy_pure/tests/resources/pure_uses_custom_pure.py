@@ -3,7 +3,6 @@ from mypy_pure import pure
 
 def custom_pure_function() -> None:
     """This function is marked as pure via config."""
-    pass
 
 
 @pure
@@ -0,0 +1,8 @@
+import external_module_import_fails
+
+from mypy_pure import pure
+
+
+@pure
+def uses_declared_pure() -> None:
+    external_module_import_fails.pure_but_blacklisted()
@@ -0,0 +1,13 @@
+from os import remove
+from pathlib import Path
+
+
+def save(path: Path, text: str) -> None:
+    path.write_text(text)
+
+
+def name_of(path: Path) -> str:
+    return path.name
+
+
+__all__ = ['name_of', 'remove', 'save']
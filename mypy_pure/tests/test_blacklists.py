@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+from importlib.metadata import EntryPoint
+from unittest import TestCase
+from unittest.mock import patch
+
+from mypy_pure.blacklists import ENTRY_POINT_GROUP, BlacklistShards, shards
+
+PACK_FUNCTIONS = ['requests.extra_call', 'mylib.save', 42]
+
+
+def pack_functions() -> list[str]:
+    return ['mylib.delete']
+
+
+class TestBlacklistShards(TestCase):
+    def test_shards_are_loaded_once_when_imported(self):
+        shards = BlacklistShards(use_entry_points=False)
+        self.assertEqual([], shards.loaded)
+        self.assertIn('requests', shards.available)
+        self.assertIn('sqlalchemy', shards.available)
+
+        impure_functions = shards.load(['os.path', 'json', 'requests'])
+        self.assertIn('os.remove', impure_functions)
+        self.assertIn('requests.get', impure_functions)
+        self.assertNotIn('subprocess.run', impure_functions)
+        self.assertEqual(['json', 'os', 'requests'], shards.loaded)
+        self.assertEqual([], shards.load(['os']))
+
+    def test_load_all(self):
+        impure_functions = BlacklistShards(use_entry_points=False).load_all()
+        self.assertIn('builtins.print', impure_functions)
+        self.assertIn('boto3.client', impure_functions)
+
+    def test_entry_point_packs(self):
+        packs = [
+            EntryPoint('requests', f'{__name__}:PACK_FUNCTIONS', ENTRY_POINT_GROUP),
+            EntryPoint('mylib', f'{__name__}:pack_functions', ENTRY_POINT_GROUP),
+            EntryPoint('mylib', 'mypy_pure_missing_pack:IMPURE_FUNCTIONS', ENTRY_POINT_GROUP),
+        ]
+        with patch('mypy_pure.blacklists.entry_points', return_value=packs):
+            shards = BlacklistShards()
+
+        self.assertIn('mylib', shards.available)
+        self.assertIn(f'requests={__name__}:PACK_FUNCTIONS@', shards.fingerprint())
+        self.assertEqual([], shards.load(['other']))
+        with self.assertWarnsRegex(UserWarning, 'could not load the pack mypy_pure_missing_pack:IMPURE_FUNCTIONS'):
+            impure_functions = shards.load(['requests.api', 'mylib'])
+        # The broken pack is reported and ignored, names that are not strings are dropped
+        self.assertEqual(['mylib.delete'], impure_functions[:1])
+        self.assertIn('requests.extra_call', impure_functions)
+        self.assertIn('requests.get', impure_functions)
+        self.assertNotIn(42, impure_functions)
+
+    def test_fingerprint_does_not_load_shards(self):
+        shards = BlacklistShards(use_entry_points=False)
+        fingerprint = shards.fingerprint()
+        self.assertEqual(len(shards.available), len(fingerprint))
+        self.assertEqual([], shards.loaded)
+
+    def test_fingerprint_does_not_depend_on_modification_times(self):
+        fingerprint = BlacklistShards(use_entry_points=False).fingerprint()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Another installation of the same version: same files, other modification times
+            copy = shutil.copytree(shards.__path__[0], os.path.join(tmp_dir, 'shards'))
+            for name in os.listdir(copy):
+                os.utime(os.path.join(copy, name), ns=(0, 0))
+            with patch.object(shards, '__path__', [copy]):
+                self.assertEqual(fingerprint, BlacklistShards(use_entry_points=False).fingerprint())
+                with open(os.path.join(copy, 'os.py'), 'a', encoding='utf-8') as f:
+                    f.write("IMPURE_FUNCTIONS = [*IMPURE_FUNCTIONS, 'os.extra']\n")
+                self.assertNotEqual(fingerprint, BlacklistShards(use_entry_points=False).fingerprint())
+
+    def test_configuration_blacklist_is_still_available(self):
+        from mypy_pure.configuration import BLACKLIST
+
+        self.assertIn('builtins.print', BLACKLIST)
+        self.assertIn('os.remove', BLACKLIST)
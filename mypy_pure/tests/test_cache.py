@@ -0,0 +1,198 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from mypy_pure.cache import (
+    CACHE_DIR_NAME,
+    CACHE_VERSION,
+    DIRECTORY_BACKEND,
+    SQLITE_BACKEND,
+    SqliteSummaryCache,
+    SummaryCache,
+    atomic_write,
+    open_cache,
+)
+
+
+class TestSummaryCache(TestCase):
+    def setUp(self) -> None:
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.__tmp_dir.cleanup)
+        self.root = Path(self.__tmp_dir.name)
+
+    def test_put_and_get(self):
+        cache = SummaryCache(str(self.root))
+        key = SummaryCache.key('pkg.mod', SummaryCache.content_hash(b'x = 1\n'), SummaryCache.fingerprint({'a'}))
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {'module': 'pkg.mod', 'violations': []})
+        entry = cache.get(key)
+        assert entry is not None
+        self.assertEqual('pkg.mod', entry['module'])
+        self.assertEqual(CACHE_VERSION, entry['version'])
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_key_depends_on_content_and_configuration(self):
+        content = SummaryCache.content_hash(b'x = 1\n')
+        key = SummaryCache.key('m', content, SummaryCache.fingerprint({'os.remove'}, set()))
+        self.assertNotEqual(key, SummaryCache.key('m', SummaryCache.content_hash(b'x = 2\n'), content))
+        self.assertNotEqual(key, SummaryCache.key('m', content, SummaryCache.fingerprint({'os.remove'}, {'print'})))
+        self.assertEqual(key, SummaryCache.key('m', content, SummaryCache.fingerprint({'os.remove'}, set())))
+
+    def test_corrupt_and_foreign_entries_are_misses(self):
+        cache = SummaryCache(str(self.root))
+        cache.put('ab' * 32, {})
+        entry_path = next(Path(cache.directory).glob('*/*.json'))
+        entry_path.write_text('{not json', encoding='utf-8')
+        self.assertIsNone(cache.get('ab' * 32))
+
+        entry_path.write_text(json.dumps({'version': CACHE_VERSION + 1, 'key': 'ab' * 32}), encoding='utf-8')
+        self.assertIsNone(cache.get('ab' * 32))
+
+    def test_deleted_cache_is_a_miss(self):
+        cache = SummaryCache(str(self.root / 'cache'))
+        cache.put('cd' * 32, {})
+        for path in Path(cache.directory).glob('*/*.json'):
+            path.unlink()
+        self.assertIsNone(cache.get('cd' * 32))
+        cache.put('cd' * 32, {})
+        self.assertIsNotNone(cache.get('cd' * 32))
+
+    def test_lru_eviction(self):
+        cache = SummaryCache(str(self.root), max_entries=10)
+        keys = [f'{i:02d}' * 32 for i in range(10)]
+        for i, key in enumerate(keys):
+            cache.put(key, {})
+            path = Path(cache.directory) / key[:2] / f'{key}.json'
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+        # Touch the oldest entry so it becomes the most recently used one
+        self.assertIsNotNone(cache.get(keys[0]))
+
+        cache.put('ff' * 32, {})
+        remaining = {path.stem for path in Path(cache.directory).glob('*/*.json')}
+        self.assertEqual(9, len(remaining))
+        self.assertIn(keys[0], remaining)
+        self.assertIn('ff' * 32, remaining)
+        self.assertNotIn(keys[1], remaining)
+        self.assertNotIn(keys[2], remaining)
+
+
+def write_entries(path: str, prefix: str, count: int) -> None:
+    cache = SqliteSummaryCache(path)
+    for i in range(count):
+        cache.put(f'{prefix}{i:062d}', {'module': f'{prefix}{i}'})
+    cache.close()
+
+
+class TestSqliteSummaryCache(TestCase):
+    def setUp(self) -> None:
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.__tmp_dir.cleanup)
+        self.root = Path(self.__tmp_dir.name)
+
+    def __cache(self, **kwargs: int) -> SqliteSummaryCache:
+        cache = SqliteSummaryCache(str(self.root), **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_put_and_get(self):
+        cache = self.__cache()
+        key = SummaryCache.key('pkg.mod', SummaryCache.content_hash(b'x = 1\n'), SummaryCache.fingerprint({'a'}))
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {'module': 'pkg.mod', 'violations': []})
+        entry = cache.get(key)
+        assert entry is not None
+        self.assertEqual('pkg.mod', entry['module'])
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        self.assertEqual(str(self.root / f'summaries-v{CACHE_VERSION}.sqlite'), cache.location)
+        with sqlite3.connect(cache.location) as connection:
+            self.assertEqual('wal', connection.execute('PRAGMA journal_mode').fetchone()[0])
+
+        # Closed at the end of a build, opened again by the next one (e.g. in a dmypy daemon)
+        cache.close()
+        self.assertIsNotNone(cache.get(key))
+
+    def test_entries_survive_the_process(self):
+        write_entries(str(self.root), 'a', 3)
+        cache = self.__cache()
+        self.assertIsNotNone(cache.get(f'a{2:062d}'))
+
+    def test_corrupt_database_is_a_miss(self):
+        (self.root / f'summaries-v{CACHE_VERSION}.sqlite').write_bytes(b'not a database' * 100)
+        cache = self.__cache()
+        self.assertIsNone(cache.get('ab' * 32))
+        cache.put('ab' * 32, {})
+        self.assertEqual(1, cache.misses)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = self.__cache(max_entries=10)
+        keys = [f'{i:064x}' for i in range(10)]
+        for key in keys:
+            cache.put(key, {})
+        cache.flush()
+        # Use the oldest entry, so it becomes the most recently used one
+        self.assertIsNotNone(cache.get(keys[0]))
+        cache.put('ff' * 32, {})
+        cache.flush()
+        remaining = {key for key in [*keys, 'ff' * 32] if cache.get(key) is not None}
+        self.assertEqual(9, len(remaining))
+        self.assertIn(keys[0], remaining)
+        self.assertIn('ff' * 32, remaining)
+        self.assertNotIn(keys[1], remaining)
+        self.assertNotIn(keys[2], remaining)
+
+    def test_concurrent_writers(self):
+        processes = [
+            multiprocessing.Process(target=write_entries, args=(str(self.root), prefix, 50)) for prefix in 'abcd'
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual([0, 0, 0, 0], [process.exitcode for process in processes])
+        cache = self.__cache()
+        found = [cache.get(f'{prefix}{i:062d}') for prefix in 'abcd' for i in range(50)]
+        self.assertEqual((200, 0), (cache.hits, cache.misses))
+        self.assertEqual([f'{prefix}{i}' for prefix in 'abcd' for i in range(50)], [e and e['module'] for e in found])
+
+
+class TestOpenCache(TestCase):
+    def test_backends(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mypy_cache = os.path.join(tmp_dir, '.mypy_cache')
+            directory = open_cache(DIRECTORY_BACKEND, None, mypy_cache)
+            self.assertIsInstance(directory, SummaryCache)
+            assert directory is not None
+            self.assertEqual(os.path.join(tmp_dir, CACHE_DIR_NAME, f'v{CACHE_VERSION}'), directory.location)
+            database = open_cache(SQLITE_BACKEND, None, mypy_cache)
+            self.assertIsInstance(database, SqliteSummaryCache)
+            # A shared location is used even without mypy's cache
+            shared = open_cache(SQLITE_BACKEND, os.path.join(tmp_dir, 'shared'), os.devnull)
+            assert shared is not None
+            self.assertTrue(shared.location.startswith(os.path.join(tmp_dir, 'shared')))
+            self.assertIsNone(open_cache(SQLITE_BACKEND, None, os.devnull))
+
+
+class TestAtomicWrite(TestCase):
+    def test_replaces_the_file_or_leaves_it_alone(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'nested', 'data.json')
+            with atomic_write(path, '.json') as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+                # Written next to the file, which does not exist until the block succeeds
+                self.assertEqual(os.path.dirname(path), os.path.dirname(tmp_path))
+                self.assertFalse(os.path.exists(path))
+                f.write('old')
+            self.assertEqual('old', Path(path).read_text(encoding='utf-8'))
+
+            with (
+                self.assertRaises(KeyError),
+                atomic_write(path, '.json') as tmp_path,
+                open(tmp_path, 'w', encoding='utf-8') as f,
+            ):
+                f.write('new')
+                raise KeyError('x')
+            self.assertEqual('old', Path(path).read_text(encoding='utf-8'))
+            self.assertEqual(['data.json'], os.listdir(os.path.dirname(path)))
@@ -0,0 +1,143 @@
+from unittest import TestCase
+
+from mypy_pure.purity.checker import compute_purity
+from mypy_pure.purity.effects import FILE_IO, LOGGING, NETWORK, effect_bit
+from mypy_pure.purity.matcher import NameMatcher
+from mypy_pure.purity.witnesses import impurity_message, policy_violation
+
+BLACKLIST = {'print', 'os.remove'}
+
+
+class TestPurityChecker(TestCase):
+    def test_direct_and_indirect_impure_calls(self):
+        purity, impure_calls = compute_purity(
+            calls={'a': {'b', 'len'}, 'b': {'print'}, 'c': {'len'}},
+            pure_functions={'a', 'c'},
+            blacklist=BLACKLIST,
+        )
+        self.assertEqual({'a': False, 'b': False, 'c': True}, purity)
+        self.assertEqual({'a': {'print'}, 'b': {'print'}}, impure_calls)
+
+    def test_whitelist_stops_propagation(self):
+        purity, impure_calls = compute_purity(
+            calls={'a': {'b'}, 'b': {'print'}},
+            pure_functions={'a'},
+            blacklist=BLACKLIST,
+            whitelist={'b'},
+        )
+        self.assertTrue(purity['a'])
+        self.assertEqual({}, impure_calls)
+
+    def test_cycle_mate_of_impure_function_is_impure(self):
+        # b only reaches print through a: it must not be judged pure while a is still being analyzed
+        calls = {'a': {'b', 'print'}, 'b': {'a'}}
+        for pure_functions in ({'a'}, {'b'}, {'a', 'b'}):
+            purity, impure_calls = compute_purity(calls, pure_functions, BLACKLIST)
+            self.assertEqual({'a': False, 'b': False}, purity)
+            self.assertEqual({'a': {'print'}, 'b': {'print'}}, impure_calls)
+
+    def test_pure_cycle(self):
+        purity, impure_calls = compute_purity({'a': {'b'}, 'b': {'a'}, 'c': {'c'}}, {'a', 'c'}, BLACKLIST)
+        self.assertEqual({'a': True, 'b': True, 'c': True}, purity)
+        self.assertEqual({}, impure_calls)
+
+    def test_long_call_chain(self):
+        length = 100_000
+        calls = {f'f{i}': {f'f{i + 1}'} for i in range(length)}
+        calls[f'f{length}'] = {'os.remove'}
+        purity, impure_calls = compute_purity(calls, {'f0'}, BLACKLIST)
+        self.assertEqual(length + 1, len(purity))
+        self.assertFalse(any(purity.values()))
+        self.assertEqual({'os.remove'}, impure_calls['f0'])
+
+    def test_large_mutually_recursive_cycle(self):
+        length = 100_000
+        calls = {f'f{i}': {f'f{(i + 1) % length}'} for i in range(length)}
+        calls[f'f{length // 2}'].add('print')
+        calls['g'] = {'f0'}
+        calls['h'] = {'len'}
+        purity, impure_calls = compute_purity(calls, {'f0', 'g', 'h'}, BLACKLIST)
+        self.assertEqual(length + 2, len(purity))
+        self.assertTrue(purity['h'])
+        self.assertFalse(purity['g'])
+        self.assertTrue(all(impure_calls[f'f{i}'] == {'print'} for i in range(length)))
+
+    def test_chain_of_cycles(self):
+        # Many small cycles linked together, the impure call at the very end
+        count = 20_000
+        calls = {}
+        for i in range(count):
+            calls[f'a{i}'] = {f'b{i}'}
+            calls[f'b{i}'] = {f'a{i}', f'a{i + 1}'}
+        calls[f'a{count}'] = {'print'}
+        purity, impure_calls = compute_purity(calls, {'a0'}, BLACKLIST)
+        self.assertFalse(any(purity.values()))
+        self.assertEqual({'print'}, impure_calls['b0'])
+
+    def test_shortest_call_path(self):
+        calls = {'a': {'b', 'c'}, 'b': {'d'}, 'c': {'os.remove'}, 'd': {'print'}}
+        _, witnesses = compute_purity(calls, {'a'}, BLACKLIST)
+        self.assertEqual(['a', 'c', 'os.remove'], witnesses.path('a'))
+        self.assertEqual(['b', 'd', 'print'], witnesses.path('b'))
+        self.assertEqual(['d', 'print'], witnesses.path('d'))
+        self.assertEqual({'os.remove', 'print'}, witnesses['a'])
+
+    def test_call_path_through_a_cycle(self):
+        _, witnesses = compute_purity({'a': {'b'}, 'b': {'a', 'c'}, 'c': {'print'}}, {'a'}, BLACKLIST)
+        self.assertEqual(['a', 'b', 'c', 'print'], witnesses.path('a'))
+        self.assertEqual(['b', 'c', 'print'], witnesses.path('b'))
+
+    def test_long_call_chain_path(self):
+        length = 100_000
+        calls = {f'f{i}': {f'f{i + 1}'} for i in range(length)}
+        calls[f'f{length}'] = {'os.remove'}
+        _, witnesses = compute_purity(calls, {'f0'}, BLACKLIST)
+        self.assertEqual(length + 2, len(witnesses.path('f0')))
+        self.assertEqual('os.remove', witnesses.first_call('f0'))
+        self.assertEqual(length + 1, len(witnesses))
+
+    def test_effects_are_folded_across_cycles(self):
+        matcher = NameMatcher(blacklist={'print', 'os.remove', 'socket.socket.send'})
+        _, witnesses = compute_purity(
+            calls={
+                'a': {'b'},
+                'b': {'c', 'print'},
+                'c': {'b', 'd'},
+                'd': {'os.remove'},
+                'e': {'socket.socket.send', 'len'},
+                'f': {'len'},
+            },
+            pure_functions={'a', 'e', 'f'},
+            blacklist=set(),
+            matcher=matcher,
+        )
+        logging, file_io, network = effect_bit(LOGGING), effect_bit(FILE_IO), effect_bit(NETWORK)
+        self.assertEqual(logging | file_io, witnesses.effects('a'))
+        # b and c are one component: they share their mask
+        self.assertEqual(logging | file_io, witnesses.effects('c'))
+        self.assertEqual(file_io, witnesses.effects('d'))
+        self.assertEqual(network, witnesses.effects('e'))
+        self.assertEqual(0, witnesses.effects('f'))
+        self.assertEqual(['a', 'b', 'c', 'd', 'os.remove'], witnesses.path_to('a', file_io))
+        self.assertEqual(['a', 'b', 'print'], witnesses.path_to('a', logging))
+        self.assertEqual([], witnesses.path_to('a', network))
+
+    def test_policy_violation(self):
+        matcher = NameMatcher(blacklist={'print', 'os.remove'})
+        _, witnesses = compute_purity(
+            calls={'a': {'b', 'print'}, 'b': {'os.remove'}, 'c': {'print'}, 'd': {'len'}},
+            pure_functions={'a', 'c', 'd'},
+            blacklist=set(),
+            matcher=matcher,
+        )
+        logging, file_io = effect_bit(LOGGING), effect_bit(FILE_IO)
+        self.assertEqual((['os.remove', 'print'], ['a', 'print'], 0), policy_violation(witnesses, 'a', 0))
+        self.assertEqual((['os.remove'], ['a', 'b', 'os.remove'], file_io), policy_violation(witnesses, 'a', logging))
+        self.assertIsNone(policy_violation(witnesses, 'a', logging | file_io))
+        self.assertIsNone(policy_violation(witnesses, 'c', logging))
+        self.assertIsNone(policy_violation(witnesses, 'd', 0))
+        self.assertEqual(
+            "Function 'a' is impure because it calls 'os.remove' (via a -> b -> os.remove); "
+            'effects not allowed: file_io',
+            impurity_message('a', ['os.remove'], ['a', 'b', 'os.remove'], file_io),
+        )
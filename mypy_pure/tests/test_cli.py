@@ -0,0 +1,154 @@
+import gc
+import subprocess
+import sys
+from contextlib import redirect_stderr
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from mypy_pure.cli import main
+from mypy_pure.project import ProjectChecker
+from mypy_pure.tests import HELPERS, ProjectTestCase, run_main
+
+RESOURCES = Path(__file__).resolve().parent / 'resources'
+
+
+class TestCli(ProjectTestCase):
+    def test_reports_violations_across_modules(self):
+        root = self.write_project(
+            {
+                'helpers.py': HELPERS,
+                'app.py': (
+                    'from helpers import add, log\nfrom mypy_pure import pure\n\n\n'
+                    '@pure\ndef f(x: int) -> None:\n    log(x)\n\n\n'
+                    '@pure\ndef g(x: int) -> int:\n    return add(x, 1)\n'
+                ),
+            }
+        )
+        stdout, exit_status = run_main(str(root), '--jobs', '1')
+        self.assertEqual(1, exit_status)
+        self.assertEqual(
+            [
+                (
+                    f"{root / 'app.py'}:6: error: Function 'f' is impure because it calls 'print' "
+                    '(via f -> helpers.log -> print)  [impure]'
+                ),
+                'Found 1 error in 1 file (checked 2 source files)',
+            ],
+            stdout.splitlines(),
+        )
+
+    def test_success(self):
+        root = self.write_project(
+            {'ok.py': 'from mypy_pure import pure\n\n\n@pure\ndef f(x: int) -> int:\n    return x\n'}
+        )
+        stdout, exit_status = run_main(str(root))
+        self.assertEqual(0, exit_status)
+        self.assertEqual('Success: no issues found in 1 source files\n', stdout)
+
+    def test_reads_the_mypy_pure_config_section(self):
+        resource = RESOURCES / 'pure_calls_custom_impure.py'
+        stdout, exit_status = run_main(str(resource), '--config-file', str(RESOURCES / 'mypy_custom_impure.ini'))
+        self.assertEqual(1, exit_status)
+        self.assertIn('is impure because it calls', stdout)
+
+        stdout, exit_status = run_main(str(resource))
+        self.assertEqual(0, exit_status, stdout)
+
+    def test_output_does_not_depend_on_the_number_of_jobs(self):
+        config = str(RESOURCES / 'mypy_custom_multiple.ini')
+        sequential, sequential_status = run_main(str(RESOURCES), '--config-file', config, '--jobs', '1')
+        parallel, parallel_status = run_main(str(RESOURCES), '--config-file', config, '--jobs', '2')
+        self.assertEqual(sequential, parallel)
+        self.assertEqual(sequential_status, parallel_status)
+        self.assertIn("pure_calls_print.py:5: error: Function 'log' is impure because it calls 'print'", parallel)
+
+    def test_demand_driven_check_has_the_same_output(self):
+        config = str(RESOURCES / 'mypy_custom_multiple.ini')
+        self.assertEqual(
+            run_main(str(RESOURCES), '--config-file', config, '--jobs', '1'),
+            run_main(str(RESOURCES), '--config-file', config, '--demand-driven'),
+        )
+        root = self.write_project(
+            {
+                # Only reached through the re-export of the package
+                'pkg/__init__.py': 'from pkg.impl import helper\n',
+                'pkg/impl.py': (
+                    'import os\n\n\ndef helper() -> None:\n    os.remove("x")\n\n\n'
+                    'def unused() -> None:\n    print(1)\n'
+                ),
+                'app.py': (
+                    'import pkg\nfrom mypy_pure import pure\n\n\n'
+                    'def outer() -> None:\n    @pure\n    def inner() -> None:\n        pkg.helper()\n\n\n'
+                    '@pure\ndef f(x: int) -> int:\n    return g(x)\n\n\n'
+                    'def g(x: int) -> int:\n    print(x)\n    return x\n'
+                ),
+            }
+        )
+        expected = run_main(str(root), '--jobs', '1')
+        self.assertEqual(1, expected[1])
+        self.assertIn("Function 'inner' is impure because it calls 'os.remove'", expected[0])
+        self.assertIn("Function 'f' is impure because it calls 'print'", expected[0])
+        self.assertEqual(expected, run_main(str(root), '--demand-driven'))
+        # Garbage collection is only held off by the command, during the analysis
+        self.assertTrue(gc.isenabled())
+        gc_states: list[bool] = []
+        with patch.object(
+            ProjectChecker, 'check', side_effect=lambda *args, **kwargs: gc_states.append(gc.isenabled()) or []
+        ):
+            run_main(str(root), '--demand-driven')
+            run_main(str(root), '--jobs', '1')
+        self.assertEqual([False, True], gc_states)
+        self.assertTrue(gc.isenabled())
+
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            main([str(root), '--demand-driven', '--watch'])
+
+    def test_blacklist_packs_of_imported_libraries(self):
+        root = self.write_project(
+            {
+                'client.py': (
+                    'import requests\nfrom mypy_pure import pure\n\n\n'
+                    '@pure\ndef fetch(url: str) -> object:\n    return requests.get(url)\n'
+                ),
+            }
+        )
+        stdout, exit_status = run_main(str(root))
+        self.assertEqual(1, exit_status)
+        self.assertIn("Function 'fetch' is impure because it calls 'requests.get'", stdout)
+
+    def test_skip_modules(self):
+        root = self.write_project(
+            {
+                'mypy.ini': '[mypy-pure]\nskip_modules = generated_*\n',
+                'generated_api.py': 'from mypy_pure import pure\n\n\n@pure\ndef f() -> None:\n    print(1)\n',
+                'ok.py': 'x = 1\n',
+            }
+        )
+        stdout, exit_status = run_main(str(root), '--config-file', str(root / 'mypy.ini'))
+        self.assertEqual(0, exit_status)
+        self.assertEqual(
+            ['Skipped 1 source files (skip_modules: 1)', 'Success: no issues found in 1 source files'],
+            stdout.splitlines(),
+        )
+
+    def test_syntax_errors(self):
+        root = self.write_project({'broken.py': 'def f(:\n'})
+        stdout, exit_status = run_main(str(root))
+        self.assertEqual(2, exit_status)
+        self.assertIn('broken.py:1: error:', stdout)
+
+    def test_invalid_paths(self):
+        root = self.write_project({})
+        (root / 'bad-name').mkdir()
+        (root / 'bad-name' / '__init__.py').write_text('x = 1\n', encoding='utf-8')
+        (root / 'bad-name' / 'm.py').write_text('x = 1\n', encoding='utf-8')
+        self.assertEqual(2, run_main(str(root / 'bad-name' / 'm.py'))[1])
+
+    def test_python_dash_m(self):
+        root = self.write_project({'ok.py': 'x = 1\n'})
+        result = subprocess.run(
+            [sys.executable, '-m', 'mypy_pure', str(root)], capture_output=True, text=True, check=False
+        )
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertIn('Success', result.stdout)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from mypy_pure.purity.database import (
+    FORMAT_VERSION,
+    MAGIC,
+    PurityDatabase,
+    encode_database,
+    write_database,
+)
+from mypy_pure.purity.effects import FILE_IO, LOGGING, NETWORK, NO_EFFECT
+from mypy_pure.purity.matcher import IMPURE, PURE, UNKNOWN
+
+ENTRIES = {
+    'os.remove': (IMPURE, FILE_IO),
+    'builtins.print': (IMPURE, LOGGING),
+    'math.sqrt': (PURE, NO_EFFECT),
+    'socket.socket.send': (IMPURE, NETWORK),
+    'socket.socket': (UNKNOWN, NO_EFFECT),
+    'collections.OrderedDict.move_to_end': (UNKNOWN, NO_EFFECT),
+    'ünïcode.call': (PURE, NO_EFFECT),
+}
+
+
+class TestPurityDatabase(TestCase):
+    def setUp(self) -> None:
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.__tmp_dir.cleanup)
+        self.path = os.path.join(self.__tmp_dir.name, 'sub', 'stdlib.puritydb')
+
+    def __open(self) -> PurityDatabase:
+        database = PurityDatabase.open(self.path)
+        assert database is not None
+        self.addCleanup(database.close)
+        return database
+
+    def test_lookup(self):
+        write_database(self.path, ENTRIES, 'typeshed of tests')
+        database = self.__open()
+        self.assertEqual('typeshed of tests', database.metadata)
+        self.assertEqual(len(ENTRIES), len(database))
+        self.assertEqual((IMPURE, FILE_IO), database.lookup('os.remove'))
+        # Names are normalized like the rules of the matcher
+        self.assertEqual((IMPURE, LOGGING), database.lookup('print'))
+        self.assertEqual((IMPURE, LOGGING), database.lookup('builtins.print'))
+        self.assertEqual((PURE, NO_EFFECT), database.lookup('ünïcode.call'))
+        self.assertEqual((IMPURE, NETWORK), database.lookup('socket.socket.send'))
+        self.assertIsNone(database.lookup('os.rename'))
+        self.assertIsNone(database.lookup('zzz'))
+        self.assertIsNone(database.lookup(''))
+        self.assertEqual(PURE, database.verdict('math.sqrt'))
+        self.assertEqual(UNKNOWN, database.verdict('socket.socket'))
+        self.assertEqual(UNKNOWN, database.verdict('math.tau'))
+        self.assertEqual(sorted(database), list(database))
+
+    def test_covers(self):
+        database = PurityDatabase(encode_database(ENTRIES))
+        self.assertTrue(database.covers('socket.socket'))
+        self.assertTrue(database.covers('socket'))
+        self.assertTrue(database.covers('collections.OrderedDict'))
+        self.assertFalse(database.covers('socket.socket.send'))
+        self.assertFalse(database.covers('socket.sock'))
+        self.assertFalse(database.covers('collections.Counter'))
+
+    def test_empty_database(self):
+        database = PurityDatabase(encode_database({}))
+        self.assertEqual(0, len(database))
+        self.assertIsNone(database.lookup('os.remove'))
+        self.assertFalse(database.covers('os'))
+
+    def test_unusable_files_are_not_opened(self):
+        self.assertIsNone(PurityDatabase.open(self.path))
+        os.makedirs(os.path.dirname(self.path))
+        data = encode_database(ENTRIES)
+        for content in (
+            b'',
+            b'not a database',
+            data[:-3],
+            MAGIC + (FORMAT_VERSION + 1).to_bytes(2, 'little') + data[6:],
+        ):
+            with open(self.path, 'wb') as f:
+                f.write(content)
+            self.assertIsNone(PurityDatabase.open(self.path), content[:8])
+
+    def test_write_replaces_atomically(self):
+        write_database(self.path, {'os.remove': (IMPURE, FILE_IO)})
+        previous = self.__open()
+        write_database(self.path, ENTRIES)
+        # Readers of the previous file keep their mapping
+        self.assertEqual(1, len(previous))
+        self.assertEqual(len(ENTRIES), len(self.__open()))
+        self.assertEqual(['stdlib.puritydb'], os.listdir(os.path.dirname(self.path)))
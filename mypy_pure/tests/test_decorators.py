@@ -11,3 +11,20 @@ class TestPureDecorators(unittest.TestCase):
 
         self.assertTrue(getattr(add, '__pure__', False))
         self.assertEqual(add(2, 3), 5)
+
+    def test_pure_with_allowed_effects(self) -> None:
+        @pure(allow=['logging', 'nondeterminism'])
+        def add(a, b):
+            return a + b
+
+        self.assertTrue(getattr(add, '__pure__', False))
+        self.assertEqual(frozenset({'logging', 'nondeterminism'}), add.__pure_allow__)  # type: ignore[attr-defined]
+        self.assertEqual(add(2, 3), 5)
+
+    def test_pure_without_allowed_effects(self) -> None:
+        @pure()
+        def add(a, b):
+            return a + b
+
+        self.assertTrue(getattr(add, '__pure__', False))
+        self.assertFalse(hasattr(add, '__pure_allow__'))
@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from mypy.options import Options
+
+from mypy_pure.purity.discovery import (
+    PureDeclarationFinder,
+    may_define_pure_functions,
+    parse_mypy_pure,
+    qualify_pure_functions,
+)
+
+
+class TestParseMypyPure(TestCase):
+    def test_literal_declarations(self):
+        self.assertEqual(['a', 'b.c'], parse_mypy_pure(b"__mypy_pure__ = ['a', 'b.c']\n"))
+        self.assertEqual(['a'], parse_mypy_pure(b"__mypy_pure__: tuple[str, ...] = ('a',)\n"))
+        self.assertEqual(['a', 'b'], parse_mypy_pure(b"__mypy_pure__ = ['a']\n__mypy_pure__ += ['b']\n"))
+        self.assertEqual(['b'], parse_mypy_pure(b"__mypy_pure__ = ['a']\n__mypy_pure__ = ['b']\n"))
+
+    def test_ignores_what_is_not_a_literal_declaration(self):
+        self.assertEqual([], parse_mypy_pure(b'x = 1\n'))
+        self.assertEqual([], parse_mypy_pure(b'__mypy_pure__ = make_names()\n'))
+        self.assertEqual([], parse_mypy_pure(b"__mypy_pure__ = 'a'\n"))
+        self.assertEqual([], parse_mypy_pure(b"def f():\n    __mypy_pure__ = ['a']\n"))
+        self.assertEqual([], parse_mypy_pure(b'__mypy_pure__ = [\n'))
+        self.assertEqual(['a'], parse_mypy_pure(b"__mypy_pure__ = ['a', 1]\n"))
+
+    def test_may_define_pure_functions(self):
+        self.assertTrue(may_define_pure_functions(b'from mypy_pure import pure\n'))
+        self.assertTrue(may_define_pure_functions(b'import os, mypy_pure.decorators\n'))
+        self.assertTrue(may_define_pure_functions(b'@pure\ndef f(): ...\n'))
+        self.assertTrue(may_define_pure_functions(b'@ pure(allow=["logging"])\ndef f(): ...\n'))
+        self.assertTrue(may_define_pure_functions(b"__mypy_pure__ = ['f']\n"))
+        self.assertFalse(may_define_pure_functions(b'def impure(): ...\n'))
+        self.assertFalse(may_define_pure_functions(b'# purely functional, purge the cache\n'))
+        self.assertFalse(may_define_pure_functions(b'@purely\ndef f(): ...\nfrom not_mypy_pure import x\n'))
+
+    def test_qualify_pure_functions(self):
+        self.assertEqual(['mod.f', 'other.g'], qualify_pure_functions(['f', 'other.g'], 'mod'))
+
+
+class TestPureDeclarationFinder(TestCase):
+    def test_finds_modules_without_importing_them(self):
+        module_name = 'mypy_pure.tests.resources.external_module_import_fails'
+        finder = PureDeclarationFinder(Options())
+        path = finder.find(module_name)
+        assert path is not None
+        self.assertTrue(path.endswith('external_module_import_fails.py'))
+        _, declared = finder.declarations(module_name, path)
+        self.assertEqual([f'{module_name}.pure_but_blacklisted'], declared)
+        self.assertNotIn(module_name, sys.modules)
+        self.assertIsNone(finder.find('non_existent_module_xyz'))
+
+    def test_declarations_are_refreshed_when_the_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'mod.py'
+            path.write_text("__mypy_pure__ = ['f']\n", encoding='utf-8')
+            finder = PureDeclarationFinder(Options())
+            content_hash, declared = finder.declarations('mod', str(path))
+            self.assertEqual(['mod.f'], declared)
+
+            mtime = path.stat().st_mtime_ns
+            path.write_text("__mypy_pure__ = ['g']\n", encoding='utf-8')
+            os.utime(path, ns=(mtime + 1_000_000_000, mtime + 1_000_000_000))
+            changed_hash, declared = finder.declarations('mod', str(path))
+            self.assertEqual(['mod.g'], declared)
+            self.assertNotEqual(content_hash, changed_hash)
+
+            # Touched, or copied to another checkout: same content, same hash
+            os.utime(path, ns=(mtime + 2_000_000_000, mtime + 2_000_000_000))
+            self.assertEqual(changed_hash, finder.declarations('mod', str(path))[0])
@@ -0,0 +1,65 @@
+import pickle
+from unittest import TestCase
+
+from mypy_pure.purity.graph import CallGraph, CallGraphBuilder
+
+
+class TestCallGraph(TestCase):
+    def test_builder_deduplicates_calls(self):
+        builder = CallGraphBuilder()
+        builder.add_function('f')
+        builder.add_call('f', 'print')
+        builder.add_call('f', 'g')
+        builder.add_call('f', 'print')
+        builder.add_function('g')
+        graph = builder.build()
+
+        self.assertEqual({'f': {'print', 'g'}, 'g': set()}, graph)
+        self.assertEqual(2, graph.edge_count)
+        self.assertEqual({'print', 'g'}, graph.called_names())
+
+    def test_redefined_function_keeps_last_definition_calls(self):
+        builder = CallGraphBuilder()
+        builder.add_function('f')
+        builder.add_call('f', 'print')
+        builder.add_function('g')
+        builder.add_call('g', 'len')
+        builder.add_function('f')
+        builder.add_call('f', 'abs')
+        self.assertEqual({'f': {'abs'}, 'g': {'len'}}, builder.build())
+
+    def test_mapping_interface(self):
+        graph = CallGraph.from_mapping({'a': {'b', 'os.remove'}, 'b': set()})
+        self.assertEqual(['a', 'b'], sorted(graph))
+        self.assertEqual(2, len(graph))
+        self.assertIn('a', graph)
+        self.assertNotIn('os.remove', graph)  # Called, not defined
+        self.assertNotIn(1, graph)
+        self.assertEqual(frozenset({'b', 'os.remove'}), graph['a'])
+        with self.assertRaises(KeyError):
+            graph['os.remove']
+        with self.assertRaises(KeyError):
+            graph['missing']
+
+    def test_symbols_and_successors(self):
+        graph = CallGraph.from_mapping({'a': {'b'}, 'b': {'print'}})
+        a, b, print_ = (graph.symbols.get(name) for name in ('a', 'b', 'print'))
+        self.assertEqual([b], list(graph.successors(a)))
+        self.assertEqual([], list(graph.successors(print_)))
+        self.assertTrue(graph.is_function(b))
+        self.assertFalse(graph.is_function(print_))
+        self.assertIsNone(graph.symbols.get('missing'))
+
+    def test_built_graph_is_not_affected_by_later_calls(self):
+        builder = CallGraphBuilder()
+        builder.add_function('f')
+        graph = builder.build()
+        self.assertIs(graph, builder.build())
+
+        builder.add_call('f', 'print')
+        self.assertEqual({'f': set()}, graph)
+        self.assertEqual({'f': {'print'}}, builder.build())
+
+    def test_pickle(self):
+        graph = CallGraph.from_mapping({'a': {'b', 'print'}, 'b': {'a'}})
+        self.assertEqual(graph, pickle.loads(pickle.dumps(graph)))
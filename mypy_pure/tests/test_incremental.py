@@ -0,0 +1,323 @@
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stderr
+from io import StringIO
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from mypy.errors import Errors
+from mypy.nodes import MypyFile, SymbolTable
+from mypy.options import Options
+from mypy.parse import parse
+from mypy.plugin import ReportConfigContext
+
+from mypy_pure.plugin import PurityPlugin
+from mypy_pure.purity.summary import summarize_module
+
+APP = """
+from helpers import log
+from mypy_pure import pure
+
+
+@pure
+def compute(x: int) -> int:
+    return log(x)
+"""
+
+PURE_HELPERS = """
+def log(x: int) -> int:
+    return x
+"""
+
+IMPURE_HELPERS = """
+def log(x: int) -> int:
+    print(x)
+    return x
+"""
+
+
+class TestIncrementalRechecks(TestCase):
+    """Drive the plugin hooks the way a long-lived dmypy daemon does: one plugin, several rechecks."""
+
+    def setUp(self) -> None:
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.__tmp_dir.cleanup)
+        self.root = Path(self.__tmp_dir.name)
+        self.options = Options()
+        self.options.config_file = None
+        self.options.cache_dir = os.devnull
+        if hasattr(self.options, 'native_parser'):
+            self.options.native_parser = False
+        self.plugin = PurityPlugin(self.options)
+        self.modules: dict[str, MypyFile] = {}
+
+    def __write(self, module: str, source: str) -> None:
+        path = self.root / f'{module}.py'
+        previous_mtime = path.stat().st_mtime_ns if path.exists() else 0
+        path.write_text(source, encoding='utf-8')
+        # Make sure the change is visible even on file systems with a coarse mtime
+        mtime = max(path.stat().st_mtime_ns, previous_mtime + 1_000_000_000)
+        os.utime(path, ns=(mtime, mtime))
+
+    def __violations(self) -> list[tuple[str, list[str], list[str]]]:
+        # Without @pure(allow=...) policies, the disallowed effects of every violation are 0
+        violations = self.plugin._PurityPlugin__violations  # type: ignore[attr-defined]
+        return sorted(violation[:3] for violation in violations.values())
+
+    def __parse(self, module: str) -> MypyFile:
+        path = self.root / f'{module}.py'
+        tree = parse(path.read_text(encoding='utf-8'), str(path), module, Errors(self.options), self.options)
+        # Set by mypy's build when it parses a module
+        tree._fullname = module
+        tree.names = SymbolTable()
+        return tree
+
+    def __recheck(self, *changed: str) -> list[tuple[str, list[str], list[str]]]:
+        """Parse the changed modules, then let the plugin check the whole build; return the violations."""
+        for module in changed:
+            tree = self.__parse(module)
+            self.modules[module] = tree
+            self.plugin.get_additional_deps(tree)
+        self.__build()
+        return self.__violations()
+
+    def __build(self) -> None:
+        """End the build like mypy: set_modules, then the cache of every module is written."""
+        self.plugin.set_modules(dict(self.modules))
+        for module, tree in sorted(self.modules.items()):
+            self.plugin.report_config_data(ReportConfigContext(module, tree.path, is_check=False))
+
+    def test_change_in_a_callee_module_is_picked_up(self):
+        self.__write('helpers', PURE_HELPERS)
+        self.__write('app', APP)
+        self.assertEqual([], self.__recheck('helpers', 'app'))
+
+        self.__write('helpers', IMPURE_HELPERS)
+        self.assertEqual([('compute', ['print'], ['compute', 'helpers.log', 'print'])], self.__recheck('helpers'))
+
+        self.__write('helpers', PURE_HELPERS)
+        self.assertEqual([], self.__recheck('helpers'))
+
+    def test_unchanged_modules_are_not_analyzed_again(self):
+        self.__write('helpers', PURE_HELPERS)
+        self.__write('app', APP)
+        self.__recheck('helpers', 'app')
+        analysis = self.plugin._PurityPlugin__analyses['app']
+
+        # Touched but identical: the content hash decides
+        self.__write('app', APP)
+        self.__recheck('app')
+        self.assertIs(analysis, self.plugin._PurityPlugin__analyses['app'])
+
+        self.__write('app', APP.replace('log(x)', 'log(x + 1)'))
+        self.__recheck('app')
+        self.assertIsNot(analysis, self.plugin._PurityPlugin__analyses['app'])
+
+    def test_mypy_pure_declaration_change_updates_dependents(self):
+        self.__write('helpers', '__mypy_pure__ = ["log"]\n' + IMPURE_HELPERS)
+        self.__write('app', APP)
+        self.assertEqual([], self.__recheck('helpers', 'app'))
+
+        self.__write('helpers', IMPURE_HELPERS)
+        self.assertEqual([('compute', ['print'], ['compute', 'helpers.log', 'print'])], self.__recheck('helpers'))
+        self.assertNotIn('helpers.log', self.plugin._PurityPlugin__whitelist)
+
+    def test_removed_modules_are_forgotten(self):
+        self.__write('helpers', PURE_HELPERS)
+        self.__write('app', APP)
+        self.__recheck('helpers', 'app')
+
+        del self.modules['app']
+        self.__recheck()
+        self.assertNotIn('app', self.plugin._PurityPlugin__analyses)
+
+    def test_modules_without_pure_marker_are_only_analyzed_when_called(self):
+        self.__write('helpers', PURE_HELPERS)
+        self.__write('unrelated', IMPURE_HELPERS)
+        self.__write('app', APP)
+        for module in ('helpers', 'unrelated', 'app'):
+            tree = self.__parse(module)
+            self.modules[module] = tree
+            self.plugin.get_additional_deps(tree)
+        self.assertEqual({'app'}, set(self.plugin._PurityPlugin__analyses))
+
+        # helpers is analyzed from the tree mypy parsed, not parsed again
+        with patch.object(PurityPlugin, '_PurityPlugin__analyze_source', side_effect=AssertionError):
+            self.__build()
+        self.assertEqual({'app', 'helpers'}, set(self.plugin._PurityPlugin__analyses))
+        self.assertEqual({}, self.plugin._PurityPlugin__violations)
+
+        self.__write('helpers', IMPURE_HELPERS)
+        self.assertEqual([('compute', ['print'], ['compute', 'helpers.log', 'print'])], self.__recheck('helpers'))
+
+    def test_cache_entries_are_shared_between_checkouts(self):
+        config_file = self.root / 'mypy.ini'
+        config_file.write_text(f'[mypy-pure]\ncache_path = {self.root / "shared"}\n', encoding='utf-8')
+        self.options.config_file = str(config_file)
+        sources = {'helpers': '__mypy_pure__ = ["log"]\n' + IMPURE_HELPERS, 'app': APP}
+
+        def check(checkout: str, mtime: int) -> list[str]:
+            """Check a copy of the modules in another directory with a new plugin; return the modules it summarized."""
+            plugin = PurityPlugin(self.options)
+            trees = {}
+            for module, source in sources.items():
+                path = self.root / checkout / f'{module}.py'
+                path.parent.mkdir(exist_ok=True)
+                path.write_text(source, encoding='utf-8')
+                os.utime(path, ns=(mtime, mtime))
+                tree = parse(source, str(path), module, Errors(self.options), self.options)
+                tree._fullname = module
+                tree.names = SymbolTable()
+                trees[module] = tree
+                plugin.get_additional_deps(tree)
+            with patch('mypy_pure.plugin.summarize_module', wraps=summarize_module) as summarize:
+                plugin.set_modules(trees)
+                plugin.report_config_data(ReportConfigContext('app', str(trees['app'].path), is_check=False))
+            self.assertEqual({}, plugin._PurityPlugin__violations)  # type: ignore[attr-defined]
+            return sorted(call.kwargs['module'] for call in summarize.call_args_list)
+
+        self.assertEqual(['app'], check('first', 1_000_000_000))
+        # Other paths and modification times: the summaries, including the one of app that relied on
+        # the __mypy_pure__ of helpers, are restored from the shared cache
+        self.assertEqual([], check('second', 2_000_000_000))
+
+        # Not when the declaration changed
+        sources['helpers'] = '__mypy_pure__ = ["log"]\n\n' + IMPURE_HELPERS
+        self.assertEqual(['app'], check('third', 2_000_000_000))
+
+    def test_skipped_modules_are_not_analyzed_and_reported(self):
+        config_file = self.root / 'mypy.ini'
+        config_file.write_text('[mypy-pure]\nskip_modules = helpers, vendored.*\n', encoding='utf-8')
+        self.__write('helpers', IMPURE_HELPERS)
+        self.__write('app', APP)
+        # Nothing to tell without mypy -v when skip_modules skips nothing
+        stderr = StringIO()
+        with redirect_stderr(stderr):
+            self.__recheck('helpers', 'app')
+        self.assertEqual('', stderr.getvalue())
+
+        self.options.config_file = str(config_file)
+        self.plugin = PurityPlugin(self.options)
+        with redirect_stderr(stderr):
+            self.assertEqual([], self.__recheck('helpers', 'app'))
+        self.assertEqual({'app'}, set(self.plugin._PurityPlugin__analyses))
+        self.assertEqual('mypy-pure: skipped 1 of 2 modules (skip_modules: 1)\n', stderr.getvalue())
+
+    def test_modules_are_analyzed_in_the_background(self):
+        config_file = self.root / 'mypy.ini'
+        config_file.write_text('[mypy-pure]\nanalysis_jobs = 2\n', encoding='utf-8')
+        self.options.config_file = str(config_file)
+        self.plugin = PurityPlugin(self.options)
+        self.__write('helpers', IMPURE_HELPERS)
+        self.__write('app', APP)
+        pipeline = self.plugin._PurityPlugin__pipeline
+        self.assertEqual(2, pipeline.jobs)
+
+        # The workers visit the trees mypy parsed: no file is parsed again
+        with patch.object(PurityPlugin, '_PurityPlugin__analyze_source') as analyze_source:
+            for module in ('helpers', 'app'):
+                tree = self.__parse(module)
+                self.modules[module] = tree
+                self.plugin.get_additional_deps(tree)
+            # helpers has no @pure marker: it is only analyzed if a @pure function calls into it
+            self.assertEqual(['app'], pipeline.pending)
+            self.assertEqual({}, self.plugin._PurityPlugin__analyses)
+            # Not joined yet when mypy moves on to checking the build
+            self.plugin.set_modules(dict(self.modules))
+            self.assertEqual(['app'], pipeline.pending)
+
+            self.__build()
+        analyze_source.assert_not_called()
+        self.assertEqual([], pipeline.pending)
+        # The workers are stopped once the analyses of the build are joined
+        self.assertIsNone(pipeline._AnalysisPipeline__executor)
+        self.assertEqual(
+            [('compute', ['print'], ['compute', 'helpers.log', 'print'])],
+            self.__violations(),
+        )
+
+        self.__write('helpers', PURE_HELPERS)
+        self.assertEqual([], self.__recheck('helpers', 'app'))
+        self.assertIsNone(pipeline._AnalysisPipeline__executor)
+
+    def test_background_analysis_by_default_without_gil(self):
+        with patch('mypy_pure.pipeline.gil_enabled', return_value=True):
+            self.assertEqual(0, PurityPlugin(self.options)._PurityPlugin__pipeline.jobs)
+        with (
+            patch('mypy_pure.pipeline.gil_enabled', return_value=False),
+            patch('mypy_pure.pipeline.available_cpus', return_value=3),
+        ):
+            self.assertEqual(2, PurityPlugin(self.options)._PurityPlugin__pipeline.jobs)
+
+
+class TestDaemon(TestCase):
+    """Run the plugin in a real dmypy daemon: start it, edit a module, check again."""
+
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = Path(tmp_dir.name)
+        (self.root / 'mypy.ini').write_text(
+            f'[mypy]\nplugins = mypy_pure.plugin\ncache_dir = {self.root / ".mypy_cache"}\n', encoding='utf-8'
+        )
+        self.__env = {**os.environ, 'PYTHONPATH': str(Path(__file__).resolve().parents[2])}
+        self.__dmypy('start', '--', '--config-file', str(self.root / 'mypy.ini'))
+        self.addCleanup(self.__dmypy, 'stop')
+
+    def __dmypy(self, *args: str) -> subprocess.CompletedProcess[str]:
+        return subprocess.run(
+            [sys.executable, '-m', 'mypy.dmypy', '--status-file', str(self.root / '.dmypy.json'), *args],
+            cwd=self.root,
+            env=self.__env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+
+    def __write(self, module: str, source: str) -> None:
+        path = self.root / f'{module}.py'
+        previous_mtime = path.stat().st_mtime_ns if path.exists() else 0
+        path.write_text(source, encoding='utf-8')
+        mtime = max(path.stat().st_mtime_ns, previous_mtime + 1_000_000_000)
+        os.utime(path, ns=(mtime, mtime))
+
+    def __check(self) -> list[str]:
+        result = self.__dmypy('check', 'app.py', 'helpers.py', 'util.py')
+        self.assertEqual('', result.stderr)
+        return result.stdout.splitlines()
+
+    def test_change_in_a_callee_body_is_reported(self):
+        self.__write('helpers', PURE_HELPERS)
+        self.__write('util', 'def g(x: int) -> int:\n    return x\n')
+        self.__write('app', APP)
+        self.assertEqual(['Success: no issues found in 3 source files'], self.__check())
+
+        self.__write('helpers', IMPURE_HELPERS)
+        self.assertEqual(
+            [
+                (
+                    "app.py:7: error: Function 'compute' is impure because it calls 'print' "
+                    '(via compute -> helpers.log -> print)  [impure]'
+                ),
+                'Found 1 error in 1 file (checked 3 source files)',
+            ],
+            self.__check(),
+        )
+
+        # A module the callee only starts calling into is followed as well
+        self.__write('helpers', 'from util import g\n\n\ndef log(x: int) -> int:\n    return g(x)\n')
+        self.assertEqual(['Success: no issues found in 3 source files'], self.__check())
+        self.__write('util', 'def g(x: int) -> int:\n    print(x)\n    return x\n')
+        self.assertEqual(
+            [
+                (
+                    "app.py:7: error: Function 'compute' is impure because it calls 'print' "
+                    '(via compute -> helpers.log -> util.g -> print)  [impure]'
+                ),
+                'Found 1 error in 1 file (checked 3 source files)',
+            ],
+            self.__check(),
+        )
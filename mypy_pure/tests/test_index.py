@@ -0,0 +1,100 @@
+from mypy_pure.index import InvalidIndex, PurityIndex
+from mypy_pure.tests import HELPERS, ProjectTestCase, run_main
+
+PROJECT = {
+    'pkg/__init__.py': 'from pkg.impl import cleanup\n',
+    'pkg/impl.py': 'import os\n\n\ndef cleanup(path: str) -> None:\n    os.remove(path)\n',
+    'helpers.py': HELPERS,
+    'app.py': (
+        'import pkg\nfrom helpers import add, log\nfrom mypy_pure import pure\n\n\n'
+        '@pure\ndef compute(x: int) -> int:\n    log(x)\n    return add(x, 1)\n\n\n'
+        'def reset(path: str) -> None:\n    pkg.cleanup(path)\n\n\n'
+        'def main() -> None:\n    reset("a")\n    compute(1)\n'
+    ),
+}
+
+
+class TestIndex(ProjectTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.write_project(PROJECT)
+        self.index_path = str(self.root / 'index.sqlite')
+        stdout, exit_status = run_main('index', str(self.root), '--output', self.index_path, '--jobs', '1')
+        self.assertEqual(0, exit_status)
+        self.assertTrue(stdout.startswith('Indexed '), stdout)
+
+    def __query(self, *argv: str) -> tuple[list[str], int]:
+        stdout, exit_status = run_main('query', *argv, '--index', self.index_path)
+        return stdout.splitlines(), exit_status
+
+    def test_callers(self):
+        self.assertEqual((['pkg.impl.cleanup'], 0), self.__query('callers', 'os.remove'))
+        # Calls through re-exports are resolved to the function they reach
+        self.assertEqual((['app.reset'], 0), self.__query('callers', 'pkg.impl.cleanup'))
+        self.assertEqual(
+            (['app.main', 'app.reset', 'pkg.impl.cleanup'], 0), self.__query('callers', 'os.remove', '--transitive')
+        )
+        self.assertEqual((['app.compute'], 0), self.__query('callers', 'helpers.*'))
+        self.assertEqual(([], 1), self.__query('callers', 'requests.post'))
+
+    def test_callees(self):
+        self.assertEqual((['helpers.add', 'helpers.log'], 0), self.__query('callees', 'app.compute'))
+        self.assertEqual(
+            (['app.compute', 'app.reset', 'helpers.add', 'helpers.log', 'os.remove', 'pkg.impl.cleanup', 'print'], 0),
+            self.__query('callees', 'app.main', '--transitive'),
+        )
+
+    def test_why(self):
+        self.assertEqual(
+            (['app.reset is impure (file_io): app.reset -> pkg.impl.cleanup -> os.remove'], 0),
+            self.__query('why', 'app.reset'),
+        )
+        self.assertEqual(
+            (['app.compute is impure (logging): app.compute -> helpers.log -> print'], 0),
+            self.__query('why', 'app.compute'),
+        )
+        self.assertEqual((['helpers.add is pure'], 0), self.__query('why', 'helpers.add'))
+        self.assertEqual(
+            (['mypy-pure: app.missing is not a function of the index'], 2), self.__query('why', 'app.missing')
+        )
+
+    def test_effects_of_every_path(self):
+        index = PurityIndex(self.index_path)
+        self.addCleanup(index.close)
+        self.assertEqual(
+            (['app.main', 'app.compute', 'helpers.log', 'print'], ['file_io', 'logging']), index.why('app.main')
+        )
+
+    def test_methods_are_indexed_by_class(self):
+        shapes = self.root / 'shapes'
+        shapes.mkdir()
+        (shapes / 'models.py').write_text(
+            'import os\n\n\n'
+            'class Cleaner:\n    def run(self, path: str) -> None:\n        os.remove(path)\n\n\n'
+            'class Adder:\n    def run(self, x: int) -> int:\n        return abs(x)\n',
+            encoding='utf-8',
+        )
+        index_path = str(self.root / 'shapes.sqlite')
+        _, exit_status = run_main('index', str(shapes / 'models.py'), '--output', index_path, '--jobs', '1')
+        self.assertEqual(0, exit_status)
+
+        def query(*argv: str) -> list[str]:
+            return run_main('query', *argv, '--index', index_path)[0].splitlines()
+
+        # Both are run methods: each keeps its own verdict under the name mypy gives it
+        self.assertEqual(
+            ['models.Cleaner.run is impure (file_io): models.Cleaner.run -> os.remove'],
+            query('why', 'models.Cleaner.run'),
+        )
+        self.assertEqual(['models.Adder.run is pure'], query('why', 'models.Adder.run'))
+        self.assertEqual(['models.Cleaner.run'], query('callers', 'os.remove'))
+        self.assertEqual(['mypy-pure: models.run is not a function of the index'], query('why', 'models.run'))
+
+    def test_invalid_index(self):
+        with self.assertRaisesRegex(InvalidIndex, 'no such index'):
+            PurityIndex(str(self.root / 'missing.sqlite'))
+        (self.root / 'bad.sqlite').write_bytes(b'not a database' * 100)
+        with self.assertRaises(InvalidIndex):
+            PurityIndex(str(self.root / 'bad.sqlite'))
+        _, exit_status = run_main('query', 'why', 'app.main', '--index', str(self.root / 'missing.sqlite'))
+        self.assertEqual(2, exit_status)
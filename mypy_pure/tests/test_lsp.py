@@ -0,0 +1,148 @@
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from mypy_pure import project
+from mypy_pure.cli import main
+from mypy_pure.lsp import LanguageServer, path_to_uri, read_message, write_message
+
+HELPERS = 'def log(x: int) -> int:\n    return x\n'
+APP = 'from helpers import log\nfrom mypy_pure import pure\n\n\n@pure\ndef compute(x: int) -> int:\n    return log(x)\n'
+IMPURE_APP = APP.replace('return log(x)', 'print(x)\n    return log(x)')
+
+
+def frame(*messages: dict[str, Any]) -> BytesIO:
+    stream = BytesIO()
+    for message in messages:
+        write_message(stream, message)
+    stream.seek(0)
+    return stream
+
+
+def read_all(stream: BytesIO) -> list[dict[str, Any]]:
+    stream.seek(0)
+    messages = []
+    while (message := read_message(stream)) is not None:
+        messages.append(message)
+    return messages
+
+
+class TestLanguageServer(TestCase):
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = Path(tmp_dir.name)
+        (self.root / 'helpers.py').write_text(HELPERS, encoding='utf-8')
+        (self.root / 'app.py').write_text(APP, encoding='utf-8')
+        self.app_uri = path_to_uri(str(self.root / 'app.py'))
+        self.output = BytesIO()
+        self.server = LanguageServer(BytesIO(), self.output)
+
+    def __request(self, method: str, params: dict[str, Any], id: int | None = None) -> list[dict[str, Any]]:
+        self.output.seek(0)
+        self.output.truncate()
+        message: dict[str, Any] = {'jsonrpc': '2.0', 'method': method, 'params': params}
+        if id is not None:
+            message['id'] = id
+        self.server.handle(message)
+        return read_all(self.output)
+
+    def __initialize(self) -> None:
+        [response] = self.__request('initialize', {'rootUri': path_to_uri(str(self.root))}, id=1)
+        self.assertEqual(1, response['id'])
+        self.assertEqual(1, response['result']['capabilities']['textDocumentSync']['change'])
+
+    def __change(self, text: str, version: int = 2) -> list[dict[str, Any]]:
+        document = {'uri': self.app_uri, 'version': version}
+        return self.__request('textDocument/didChange', {'textDocument': document, 'contentChanges': [{'text': text}]})
+
+    def test_framing(self):
+        message = {'jsonrpc': '2.0', 'id': 1, 'method': 'shutdown'}
+        stream = frame(message, message)
+        self.assertEqual([message, message], read_all(stream))
+        self.assertTrue(stream.getvalue().startswith(b'Content-Length: '))
+
+    def test_diagnostics_of_unsaved_buffers(self):
+        self.__initialize()
+        document = {'uri': self.app_uri, 'languageId': 'python', 'version': 1, 'text': APP}
+        [notification] = self.__request('textDocument/didOpen', {'textDocument': document})
+        self.assertEqual('textDocument/publishDiagnostics', notification['method'])
+        self.assertEqual({'uri': self.app_uri, 'diagnostics': []}, notification['params'])
+
+        [notification] = self.__change(IMPURE_APP)
+        [diagnostic] = notification['params']['diagnostics']
+        self.assertEqual("Function 'compute' is impure because it calls 'print'", diagnostic['message'])
+        self.assertEqual(
+            {'start': {'line': 5, 'character': 0}, 'end': {'line': 5, 'character': 27}}, diagnostic['range']
+        )
+        self.assertEqual(('mypy-pure', 'impure', 1), (diagnostic['source'], diagnostic['code'], diagnostic['severity']))
+        # The file on disk is not changed
+        self.assertEqual(APP, (self.root / 'app.py').read_text(encoding='utf-8'))
+
+        [notification] = self.__change(APP, version=3)
+        self.assertEqual([], notification['params']['diagnostics'])
+
+    def test_only_the_changed_document_is_analyzed(self):
+        self.__initialize()
+        with patch.object(project, 'analyze_file', wraps=project.analyze_file) as spy:
+            self.__change(IMPURE_APP)
+        spy.assert_not_called()
+
+    def test_syntax_errors(self):
+        self.__initialize()
+        self.__change(IMPURE_APP)
+        with patch.object(project, 'summarize_module', wraps=project.summarize_module) as spy:
+            [notification] = self.__change(IMPURE_APP + '\ndef broken(:\n', version=3)
+        # The module keeps the analysis of the last version that parsed
+        spy.assert_not_called()
+        impure, syntax = notification['params']['diagnostics']
+        self.assertEqual(('impure', 'syntax'), (impure['code'], syntax['code']))
+        self.assertEqual(9, syntax['range']['start']['line'])
+
+        [notification] = self.__change(APP, version=4)
+        self.assertEqual([], notification['params']['diagnostics'])
+
+    def test_close_goes_back_to_the_file(self):
+        self.__initialize()
+        self.__change(IMPURE_APP)
+        [notification] = self.__request('textDocument/didClose', {'textDocument': {'uri': self.app_uri}})
+        self.assertEqual([], notification['params']['diagnostics'])
+        with patch.object(project, 'analyze_file', wraps=project.analyze_file) as spy:
+            [notification] = self.__request(
+                'textDocument/didOpen',
+                {'textDocument': {'uri': self.app_uri, 'languageId': 'python', 'version': 1, 'text': APP}},
+            )
+        self.assertEqual([], notification['params']['diagnostics'])
+        spy.assert_not_called()
+
+    def test_unknown_methods(self):
+        [response] = self.__request('textDocument/hover', {}, id=7)
+        self.assertEqual(
+            {'jsonrpc': '2.0', 'id': 7, 'error': {'code': -32601, 'message': 'unsupported method: textDocument/hover'}},
+            response,
+        )
+        self.assertEqual([], self.__request('$/cancelRequest', {'id': 7}))
+
+    def test_serve(self):
+        root_uri = path_to_uri(str(self.root))
+        reader = frame(
+            {'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {'rootUri': root_uri}},
+            {'jsonrpc': '2.0', 'method': 'initialized', 'params': {}},
+            {'jsonrpc': '2.0', 'id': 2, 'method': 'shutdown'},
+            {'jsonrpc': '2.0', 'method': 'exit'},
+        )
+        writer = BytesIO()
+        self.assertEqual(0, LanguageServer(reader, writer).serve())
+        self.assertEqual([1, 2], [message['id'] for message in read_all(writer)])
+        # Without a shutdown request first, or at the end of the input
+        self.assertEqual(1, LanguageServer(frame({'jsonrpc': '2.0', 'method': 'exit'}), BytesIO()).serve())
+        self.assertEqual(1, LanguageServer(BytesIO(), BytesIO()).serve())
+
+    def test_cli_subcommand(self):
+        lsp_main = Mock(return_value=0)
+        with patch.dict('mypy_pure.cli.COMMANDS', {'lsp': lsp_main}):
+            self.assertEqual(0, main(['lsp', '--config-file', 'setup.cfg']))
+        lsp_main.assert_called_once_with(['--config-file', 'setup.cfg'])
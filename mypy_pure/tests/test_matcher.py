@@ -0,0 +1,146 @@
+from unittest import TestCase
+
+from mypy_pure.purity.checker import compute_purity
+from mypy_pure.purity.database import PurityDatabase, encode_database
+from mypy_pure.purity.effects import (
+    FILE_IO,
+    GLOBAL_STATE,
+    LOGGING,
+    NETWORK,
+    NO_EFFECT,
+    NONDETERMINISM,
+    effect_bit,
+)
+from mypy_pure.purity.matcher import IMPURE, PURE, UNKNOWN, NameMatcher
+
+
+class TestNameMatcher(TestCase):
+    def test_exact_rules(self):
+        matcher = NameMatcher(blacklist={'os.remove', 'builtins.print'}, whitelist={'my.pure'})
+        self.assertEqual(IMPURE, matcher.verdict('os.remove'))
+        self.assertEqual(IMPURE, matcher.verdict('print'))
+        self.assertEqual(IMPURE, matcher.verdict('builtins.print'))
+        self.assertEqual(PURE, matcher.verdict('my.pure'))
+        self.assertEqual(UNKNOWN, matcher.verdict('os.path.join'))
+
+    def test_wildcard_rules(self):
+        matcher = NameMatcher(blacklist={'socket.*', 'boto3.client.*'})
+        self.assertTrue(matcher.is_impure('socket.socket'))
+        self.assertTrue(matcher.is_impure('socket.socket.connect'))
+        self.assertTrue(matcher.is_impure('boto3.client.upload_file'))
+        self.assertFalse(matcher.is_impure('socket'))
+        self.assertFalse(matcher.is_impure('boto3.session'))
+        self.assertFalse(matcher.is_impure('socketserver.run'))
+
+    def test_precedence(self):
+        matcher = NameMatcher(
+            blacklist={'socket.*', 'random.seed', 'lib.*', 'lib.io.*', 'both'},
+            whitelist={'socket.gethostname', 'random.*', 'lib.io.format.*', 'both'},
+        )
+        # Exact rules beat wildcards, whatever list they come from
+        self.assertTrue(matcher.is_pure('socket.gethostname'))
+        self.assertTrue(matcher.is_impure('random.seed'))
+        self.assertTrue(matcher.is_pure('random.randint'))
+        # The longest prefix wins
+        self.assertTrue(matcher.is_impure('lib.io.write'))
+        self.assertTrue(matcher.is_pure('lib.io.format.number'))
+        # The whitelist wins between rules of the same kind
+        self.assertTrue(matcher.is_pure('both'))
+
+    def test_rules_added_later_invalidate_memoized_verdicts(self):
+        matcher = NameMatcher(blacklist={'lib.save'})
+        self.assertTrue(matcher.is_impure('lib.save'))
+        matcher.add(['lib.save'], PURE)
+        self.assertTrue(matcher.is_pure('lib.save'))
+        matcher.add(['lib.save'], IMPURE)
+        self.assertTrue(matcher.is_pure('lib.save'))
+
+    def test_checker_with_wildcard_blacklist(self):
+        purity, impure_calls = compute_purity(
+            calls={'fetch': {'socket.create_connection'}, 'name': {'socket.gethostname'}},
+            pure_functions={'fetch', 'name'},
+            blacklist={'socket.*'},
+            whitelist={'socket.gethostname'},
+        )
+        self.assertEqual({'fetch': False, 'name': True}, purity)
+        self.assertEqual({'fetch': {'socket.create_connection'}}, impure_calls)
+
+    def test_covers(self):
+        matcher = NameMatcher(blacklist={'pathlib.Path.write_text', 'redis.Redis.*', 'socket.*', 'builtins.list.clear'})
+        self.assertTrue(matcher.covers('pathlib.Path'))
+        self.assertTrue(matcher.covers('redis.Redis'))
+        self.assertTrue(matcher.covers('socket.socket'))
+        self.assertTrue(matcher.covers('builtins.list'))
+        self.assertFalse(matcher.covers('pathlib.PurePath'))
+        self.assertFalse(matcher.covers('redis.client'))
+
+    def test_version_changes_with_rules(self):
+        matcher = NameMatcher()
+        version = matcher.version
+        matcher.add(['lib.save'], IMPURE)
+        self.assertNotEqual(version, matcher.version)
+
+    def test_database_verdicts_for_names_without_rules(self):
+        database = PurityDatabase(
+            encode_database(
+                {'time.time': (IMPURE, NONDETERMINISM), 'math.sqrt': (PURE, NO_EFFECT), 'json.JSONEncoder.x': (0, 0)}
+            )
+        )
+        matcher = NameMatcher(blacklist={'math.*'}, whitelist={'time.time'}, database=database)
+        # Rules beat the database
+        self.assertEqual(PURE, matcher.verdict('time.time'))
+        self.assertEqual(IMPURE, matcher.verdict('math.sqrt'))
+        matcher = NameMatcher(database=database)
+        self.assertIs(database, matcher.database)
+        self.assertEqual(IMPURE, matcher.verdict('time.time'))
+        self.assertEqual(PURE, matcher.verdict('math.sqrt'))
+        self.assertEqual(UNKNOWN, matcher.verdict('json.JSONEncoder.x'))
+        self.assertEqual(UNKNOWN, matcher.verdict('mylib.save'))
+        self.assertTrue(matcher.covers('json.JSONEncoder'))
+        self.assertFalse(matcher.covers('json.JSONDecoder'))
+
+    def test_local_functions_shadow_database_verdicts(self):
+        database = PurityDatabase(encode_database({'max': (PURE, NO_EFFECT), 'print': (IMPURE, LOGGING)}))
+        matcher = NameMatcher(whitelist={'helper'}, database=database)
+        self.assertEqual(UNKNOWN, matcher.rule_verdict('max'))
+        self.assertEqual(PURE, matcher.rule_verdict('helper'))
+        purity, impure_calls = compute_purity(
+            calls={'f': {'max'}, 'max': {'print'}, 'g': {'helper'}, 'helper': {'print'}},
+            pure_functions={'f', 'g'},
+            blacklist=set(),
+            matcher=matcher,
+        )
+        # def max(x): print(x) is not the builtin; whitelist rules still win over local functions
+        self.assertEqual({'f': False, 'max': False, 'g': True}, purity)
+        self.assertEqual({'f': {'print'}, 'max': {'print'}}, impure_calls)
+
+    def test_effects(self):
+        database = PurityDatabase(encode_database({'time.time': (IMPURE, NONDETERMINISM)}))
+        matcher = NameMatcher(
+            blacklist={
+                'print',
+                'os.remove',
+                'os.environ.get:global_state',
+                'boto3.*',
+                'mylib.save',
+                'mylib.send:network',
+            },
+            whitelist={'boto3.session.Session'},
+            database=database,
+        )
+        self.assertEqual(effect_bit(LOGGING), matcher.effects('builtins.print'))
+        self.assertEqual(effect_bit(FILE_IO), matcher.effects('os.remove'))
+        # Kinds spelled after the rule beat the kind derived from the name
+        self.assertEqual(IMPURE, matcher.verdict('os.environ.get'))
+        self.assertEqual(effect_bit(GLOBAL_STATE), matcher.effects('os.environ.get'))
+        self.assertEqual(effect_bit(NETWORK), matcher.effects('mylib.send'))
+        self.assertEqual(effect_bit(NETWORK), matcher.effects('boto3.client.put_object'))
+        self.assertEqual(effect_bit(GLOBAL_STATE), matcher.effects('mylib.save'))
+        self.assertEqual(effect_bit(NONDETERMINISM), matcher.effects('time.time'))
+        # Names that are not impure have no effect
+        self.assertEqual(0, matcher.effects('boto3.session.Session'))
+        self.assertEqual(0, matcher.effects('len'))
+        # An unknown kind is part of the name, as any other text
+        matcher.add(['mylib.load:disk'], IMPURE)
+        self.assertEqual(IMPURE, matcher.verdict('mylib.load:disk'))
+        self.assertEqual(UNKNOWN, matcher.verdict('mylib.load'))
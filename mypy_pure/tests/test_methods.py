@@ -0,0 +1,66 @@
+from unittest import TestCase
+
+from mypy.nodes import (
+    MDEF,
+    Block,
+    ClassDef,
+    FuncDef,
+    SymbolTable,
+    SymbolTableNode,
+    TypeInfo,
+)
+
+from mypy_pure.purity.matcher import IMPURE, PURE, NameMatcher
+from mypy_pure.purity.methods import MethodMatcher
+
+
+def make_class(fullname: str, methods: list[str], bases: list[TypeInfo]) -> TypeInfo:
+    module, _, name = fullname.rpartition('.')
+    defn = ClassDef(name, Block([]))
+    defn.fullname = fullname
+    info = TypeInfo(SymbolTable({method: SymbolTableNode(MDEF, FuncDef(method)) for method in methods}), defn, module)
+    info.mro = [info]
+    for base in bases:
+        info.mro.extend(cls for cls in base.mro if cls not in info.mro)
+    return info
+
+
+OBJECT = make_class('builtins.object', ['__init__'], [])
+PATH = make_class('pathlib.Path', ['write_text', 'read_text'], [OBJECT])
+COMMANDS = make_class('redis.commands.Commands', ['get', 'set'], [OBJECT])
+REDIS = make_class('redis.Redis', ['close'], [COMMANDS])
+
+
+class TestMethodMatcher(TestCase):
+    def setUp(self) -> None:
+        self.matcher = NameMatcher(blacklist={'pathlib.Path.write_text', 'redis.Redis.*'})
+        self.methods = MethodMatcher(self.matcher)
+
+    def test_rules_of_the_class_and_its_bases(self):
+        self.assertEqual('pathlib.Path.write_text', self.methods.impure_call(PATH, 'write_text'))
+        self.assertIsNone(self.methods.impure_call(PATH, 'read_text'))
+        # A wildcard covers the methods the class inherits
+        self.assertEqual('redis.Redis.get', self.methods.impure_call(REDIS, 'get'))
+        self.assertEqual('redis.Redis.close', self.methods.impure_call(REDIS, 'close'))
+        self.assertIsNone(self.methods.impure_call(COMMANDS, 'get'))
+
+    def test_subclasses(self):
+        log_path = make_class('app.LogPath', ['describe'], [PATH])
+        self.assertEqual('pathlib.Path.write_text', self.methods.impure_call(log_path, 'write_text'))
+        self.assertIsNone(self.methods.impure_call(log_path, 'describe'))
+
+        # An override is analyzed as code of the project, not matched with the rules of the base
+        safe_path = make_class('app.SafePath', ['write_text'], [PATH])
+        self.assertIsNone(self.methods.impure_call(safe_path, 'write_text'))
+        cache = make_class('app.Cache', ['lookup'], [REDIS])
+        self.assertIsNone(self.methods.impure_call(cache, 'lookup'))
+        self.assertEqual('redis.Redis.get', self.methods.impure_call(cache, 'get'))
+
+    def test_whitelist_and_rules_added_later(self):
+        self.assertEqual('redis.Redis.get', self.methods.impure_call(REDIS, 'get'))
+        self.matcher.add(['redis.Redis.get'], PURE)
+        self.assertIsNone(self.methods.impure_call(REDIS, 'get'))
+
+        self.assertIsNone(self.methods.impure_call(PATH, 'read_text'))
+        self.matcher.add(['pathlib.Path.read_text'], IMPURE)
+        self.assertEqual('pathlib.Path.read_text', self.methods.impure_call(PATH, 'read_text'))
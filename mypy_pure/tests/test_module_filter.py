@@ -0,0 +1,64 @@
+import os
+import sysconfig
+from unittest import TestCase
+
+from mypy.build import default_data_dir
+
+from mypy_pure.module_filter import (
+    SKIPPED_BY_CONFIG,
+    SKIPPED_BY_DEFAULT,
+    SKIPPED_SITE_PACKAGES,
+    SKIPPED_STDLIB,
+    ModuleFilter,
+    compile_module_patterns,
+)
+
+
+class TestModuleFilter(TestCase):
+    def test_compile_module_patterns(self):
+        pattern = compile_module_patterns(['pkg.*', ' *.migrations.* ', ''])
+        assert pattern is not None
+        self.assertTrue(pattern.match('pkg'))
+        self.assertTrue(pattern.match('pkg.sub.module'))
+        self.assertTrue(pattern.match('app.migrations.0001_initial'))
+        self.assertFalse(pattern.match('pkgs'))
+        self.assertFalse(pattern.match('app.models'))
+        self.assertIsNone(compile_module_patterns([' ', '']))
+
+    def test_default_skip_list_matches_whole_components(self):
+        module_filter = ModuleFilter(stdlib_dirs=[])
+        self.assertEqual(SKIPPED_BY_DEFAULT, module_filter.skip_reason('os'))
+        self.assertEqual(SKIPPED_BY_DEFAULT, module_filter.skip_reason('os.path'))
+        self.assertEqual(SKIPPED_BY_DEFAULT, module_filter.skip_reason('_collections_abc'))
+        self.assertIsNone(module_filter.skip_reason('oslo'))
+        self.assertIsNone(module_filter.skip_reason('system_utils'))
+
+    def test_skip_modules_and_include_modules(self):
+        module_filter = ModuleFilter(['generated.*', 'tests.*'], ['tests.pure_*'], stdlib_dirs=[])
+        self.assertEqual(SKIPPED_BY_CONFIG, module_filter.skip_reason('generated.api'))
+        self.assertEqual(SKIPPED_BY_CONFIG, module_filter.skip_reason('tests.test_app'))
+        self.assertIsNone(module_filter.skip_reason('tests.pure_helpers'))
+        self.assertIsNone(module_filter.skip_reason('app'))
+
+    def test_include_modules_overrides_automatic_exclusion(self):
+        path = os.path.join(os.sep, 'venv', 'lib', 'site-packages', 'mylib', '__init__.py')
+        self.assertEqual(SKIPPED_SITE_PACKAGES, ModuleFilter(stdlib_dirs=[]).skip_reason('mylib', path))
+        self.assertIsNone(ModuleFilter(include_modules=['mylib.*'], stdlib_dirs=[]).skip_reason('mylib', path))
+
+    def test_stdlib_and_typeshed_paths(self):
+        module_filter = ModuleFilter()
+        stdlib = sysconfig.get_paths()['stdlib']
+        self.assertEqual(SKIPPED_STDLIB, module_filter.skip_reason('json', os.path.join(stdlib, 'json', '__init__.py')))
+        typeshed_json = os.path.join(default_data_dir(), 'typeshed', 'stdlib', 'json', '__init__.pyi')
+        self.assertEqual(SKIPPED_STDLIB, module_filter.skip_reason('json.decoder', typeshed_json))
+        # site-packages of the interpreter usually lives in its standard library directory
+        site_packages = os.path.join(stdlib, 'site-packages', 'thirdparty.py')
+        self.assertEqual(SKIPPED_SITE_PACKAGES, module_filter.skip_reason('thirdparty', site_packages))
+        self.assertIsNone(module_filter.skip_reason('app', os.path.abspath('app.py')))
+
+    def test_reasons_are_only_memoized_once_the_path_is_known(self):
+        module_filter = ModuleFilter(stdlib_dirs=[])
+        path = os.path.join(os.sep, 'venv', 'lib', 'dist-packages', 'thirdparty.py')
+        self.assertFalse(module_filter.is_skipped('thirdparty'))
+        self.assertTrue(module_filter.is_skipped('thirdparty', path))
+        self.assertTrue(module_filter.is_skipped('thirdparty'))
@@ -0,0 +1,133 @@
+import ast
+from pathlib import Path
+from unittest import TestCase
+
+from mypy.errors import Errors
+from mypy.nodes import MypyFile
+from mypy.options import Options
+from mypy.parse import parse
+
+from mypy_pure.purity.effects import effect_mask
+from mypy_pure.purity.mypy_visitor import MypyPurityVisitor
+from mypy_pure.purity.visitor import PurityVisitor
+
+
+class TestMypyPurityVisitor(TestCase):
+    def __parse_with_mypy(self, path: Path, source: str) -> MypyFile:
+        options = Options()
+        if hasattr(options, 'native_parser'):
+            options.native_parser = False
+        return parse(source, str(path), path.stem, Errors(options), options)
+
+    def __visit_both(self, path: Path) -> tuple[PurityVisitor, MypyPurityVisitor]:
+        source = path.read_text(encoding='utf-8')
+        ast_visitor = PurityVisitor()
+        ast_visitor.visit(ast.parse(source, filename=str(path)))
+        tree_visitor = MypyPurityVisitor()
+        tree_visitor.visit(self.__parse_with_mypy(path, source))
+        return ast_visitor, tree_visitor
+
+    def test_same_results_as_ast_visitor_on_resources(self):
+        resources = sorted((Path(__file__).resolve().parent / 'resources').glob('*.py'))
+        self.assertTrue(resources)
+        for path in resources:
+            with self.subTest(resource=path.name):
+                ast_visitor, tree_visitor = self.__visit_both(path)
+                self.assertEqual(ast_visitor.calls, tree_visitor.calls)
+                self.assertEqual(ast_visitor.pure_functions_lineno, tree_visitor.pure_functions_lineno)
+                self.assertEqual(ast_visitor.allowed_effects, tree_visitor.allowed_effects)
+                self.assertEqual(ast_visitor.imports, tree_visitor.imports)
+
+    def test_same_results_as_ast_visitor_on_plugin_sources(self):
+        package = Path(__file__).resolve().parent.parent
+        for path in sorted(package.glob('**/*.py')):
+            if 'resources' in path.parts:
+                continue
+            with self.subTest(module=path.name):
+                ast_visitor, tree_visitor = self.__visit_both(path)
+                self.assertEqual(ast_visitor.calls, tree_visitor.calls)
+                self.assertEqual(ast_visitor.imports, tree_visitor.imports)
+
+    def test_methods_are_named_after_their_classes(self):
+        source = (
+            'import os\n'
+            'from typing import overload\n'
+            'from mypy_pure import pure\n'
+            '\n'
+            'class A:\n'
+            '    @pure\n'
+            '    def run(self) -> None:\n'
+            '        os.remove("a")\n'
+            '\n'
+            '    @overload\n'
+            '    def get(self, x: int) -> int: ...\n'
+            '    @overload\n'
+            '    def get(self, x: str) -> str: ...\n'
+            '    def get(self, x: object) -> object:\n'
+            '        return repr(x)\n'
+            '\n'
+            '    try:\n'
+            '        class Inner:\n'
+            '            def run(self) -> None:\n'
+            '                A.run(A())\n'
+            '    except ImportError:\n'
+            '        pass\n'
+            '\n'
+            'class B:\n'
+            '    @pure\n'
+            '    def run(self) -> None:\n'
+            '        def helper() -> None:\n'
+            '            print()\n'
+            '        helper()\n'
+        )
+        tree_visitor = MypyPurityVisitor()
+        tree_visitor.visit(self.__parse_with_mypy(Path('classes.py'), source))
+        ast_visitor = PurityVisitor()
+        ast_visitor.visit(ast.parse(source))
+        self.assertEqual(
+            {'A.run', 'A.get', 'A.Inner.run', 'B.run', 'helper'},
+            set(tree_visitor.calls),
+        )
+        self.assertEqual(['os.remove'], list(tree_visitor.calls['A.run']))
+        self.assertEqual({'A.run': 7, 'B.run': 26}, tree_visitor.pure_functions_lineno)
+        self.assertEqual(ast_visitor.calls, tree_visitor.calls)
+
+    def test_calls_in_nested_expressions(self):
+        source = (
+            'import os\n'
+            'from os import path as p\n'
+            'from mypy_pure import pure\n'
+            '\n'
+            '@pure\n'
+            'def f(x: int = abs(-1)) -> object:\n'
+            '    with open("a") as fd:\n'
+            '        pass\n'
+            '    y = {k: p.join(k) for k in [str(x)] if bool(k)}\n'
+            '    g = lambda: os.getcwd()\n'
+            '    return f"{repr(y)}"\n'
+        )
+        visitor = MypyPurityVisitor()
+        visitor.visit(self.__parse_with_mypy(Path('nested.py'), source))
+        self.assertEqual({'f': 6}, visitor.pure_functions_lineno)
+        self.assertTrue({'abs', 'open', 'os.path.join', 'str', 'bool', 'os.getcwd', 'repr'} <= visitor.calls['f'])
+        self.assertFalse(visitor.has_stripped_bodies)
+
+    def test_allowed_effects(self):
+        source = (
+            'from mypy_pure import pure\n'
+            '@pure(allow=["logging", "network", "unknown"])\n'
+            'def a(): pass\n'
+            '@pure(allow="process")\n'
+            'def b(): pass\n'
+            '@pure()\n'
+            'def c(): pass\n'
+        )
+        path = Path('allowed.py')
+        ast_visitor = PurityVisitor()
+        ast_visitor.visit(ast.parse(source))
+        tree_visitor = MypyPurityVisitor()
+        tree_visitor.visit(self.__parse_with_mypy(path, source))
+        expected = {'a': effect_mask(['logging', 'network']), 'b': effect_mask(['process'])}
+        self.assertEqual(expected, ast_visitor.allowed_effects)
+        self.assertEqual(expected, tree_visitor.allowed_effects)
+        self.assertEqual(['a', 'b', 'c'], sorted(tree_visitor.pure_functions_lineno))
@@ -0,0 +1,101 @@
+import threading
+from concurrent.futures import BrokenExecutor
+from unittest import TestCase
+from unittest.mock import patch
+
+from mypy_pure.pipeline import AnalysisPipeline, default_jobs, gil_enabled
+from mypy_pure.purity.summary import ModuleAnalysis
+
+
+def analysis(module: str) -> ModuleAnalysis:
+    return ModuleAnalysis(module, f'{module}.py', {'compute': ['print']}, {}, {'compute': 6})
+
+
+class TestAnalysisPipeline(TestCase):
+    def __pipeline(self, jobs: int) -> AnalysisPipeline:
+        pipeline = AnalysisPipeline(jobs)
+        self.addCleanup(pipeline.shutdown)
+        return pipeline
+
+    def test_modules_are_analyzed_by_workers(self):
+        pipeline = self.__pipeline(2)
+        started = threading.Event()
+        release = threading.Event()
+
+        def analyze_app() -> ModuleAnalysis:
+            started.set()
+            release.wait()
+            return analysis('app')
+
+        self.assertTrue(pipeline.submit('app', analyze_app))
+        self.assertTrue(pipeline.submit('broken', lambda: None))
+        # The analysis runs in a worker: the caller goes on
+        self.assertTrue(started.wait(10))
+        self.assertIn('app', pipeline)
+        self.assertEqual(['app', 'broken'], pipeline.pending)
+
+        release.set()
+        results = pipeline.join()
+        self.assertEqual([], pipeline.pending)
+        app = results['app']
+        assert app is not None
+        self.assertEqual({'compute': 6}, dict(app.pure_functions_lineno))
+        self.assertIsNone(results['broken'])
+
+    def test_resubmitted_and_cancelled_modules(self):
+        pipeline = self.__pipeline(1)
+        pipeline.submit('app', lambda: analysis('app'))
+        pipeline.submit('app', lambda: analysis('app'))
+        pipeline.submit('other', lambda: analysis('other'))
+        pipeline.cancel('other')
+        self.assertEqual(['app'], list(pipeline.join()))
+
+    def test_no_workers(self):
+        pipeline = self.__pipeline(0)
+        self.assertFalse(pipeline.submit('app', lambda: analysis('app')))
+        self.assertEqual({}, pipeline.join())
+
+    def test_failed_workers(self):
+        pipeline = self.__pipeline(1)
+
+        def fail(exc: BaseException) -> ModuleAnalysis:
+            raise exc
+
+        pipeline.submit('app', lambda: fail(BrokenExecutor()))
+        pipeline.submit('deep', lambda: fail(RecursionError()))
+        self.assertEqual({'app': None, 'deep': None}, pipeline.join())
+        # Not a failure of the worker: a bug of the analysis is not hidden
+        pipeline.submit('app', lambda: fail(KeyError('x')))
+        with self.assertRaises(KeyError):
+            pipeline.join()
+        self.assertEqual([], pipeline.pending)
+
+    def test_gil_enabled(self):
+        with patch('sys._is_gil_enabled', create=True, return_value=False):
+            self.assertFalse(gil_enabled())
+        with patch('sys._is_gil_enabled', create=True, return_value=True):
+            self.assertTrue(gil_enabled())
+
+    def test_default_jobs(self):
+        with patch('mypy_pure.pipeline.gil_enabled', return_value=True):
+            self.assertEqual(0, default_jobs())
+        with patch('mypy_pure.pipeline.gil_enabled', return_value=False):
+            with patch('mypy_pure.pipeline.available_cpus', return_value=1):
+                self.assertEqual(0, default_jobs())
+            with patch('mypy_pure.pipeline.available_cpus', return_value=3):
+                self.assertEqual(2, default_jobs())
+            with patch('mypy_pure.pipeline.available_cpus', return_value=64):
+                self.assertEqual(4, default_jobs())
+
+    def test_shutdown(self):
+        pipeline = self.__pipeline(1)
+        with patch('atexit.register') as register, patch('atexit.unregister') as unregister:
+            pipeline.submit('app', lambda: analysis('app'))
+            register.assert_called_once_with(pipeline.shutdown)
+            pipeline.shutdown()
+            unregister.assert_called_once_with(pipeline.shutdown)
+        self.assertEqual([], pipeline.pending)
+
+        # A new pool is started for the next build
+        pipeline.submit('app', lambda: analysis('app'))
+        self.assertEqual(['app'], list(pipeline.join()))
@@ -1,9 +1,22 @@
+import sys
+import tempfile
 from pathlib import Path
 from unittest import TestCase
+from unittest.mock import patch
+
+from mypy_pure.stdlib_database import build_stdlib_database
 
 
 class TestPlugin(TestCase):
-    def __run_mypy(self, file_path: Path, config_file: Path | None = None) -> tuple[str, str, int]:
+    def setUp(self) -> None:
+        # Keep mypy's cache (and the purity cache that lives next to it) out of the repository
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.__tmp_dir.cleanup)
+        self.__cache_dir = Path(self.__tmp_dir.name) / '.mypy_cache'
+
+    def __run_mypy(
+        self, file_path: Path, config_file: Path | None = None, follow_imports: str = 'silent'
+    ) -> tuple[str, str, int]:
         tests_path = Path(__file__).resolve().parent
         if config_file is None:
             config_file = tests_path / 'resources' / 'mypy.ini'
@@ -23,9 +36,10 @@ class TestPlugin(TestCase):
                     str(config_file),
                     '--no-error-summary',
                     '--hide-error-context',
-                    '--follow-imports=silent',
+                    f'--follow-imports={follow_imports}',
                     '--strict',
-                    '--no-incremental',
+                    '--cache-dir',
+                    str(self.__cache_dir),
                     str(file_path),
                 ]
             )
@@ -41,24 +55,94 @@ class TestPlugin(TestCase):
     def test_pure_function_calls_custom_impure(self):
         resource = self._get_resource_path('pure_calls_custom_impure.py')
         config = self._get_resource_path('mypy_custom_impure.ini')
-        stdout, stderr, exit_status = self.__run_mypy(resource, config)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource, config)
+        self.assertEqual(1, exit_status)
         self.assertIn(
             'is impure because it calls',
             stdout,
             f'Expected purity violation, got: {stdout}',
         )
 
+    def test_summary_cache_warm_run(self):
+        resource = self._get_resource_path('pure_calls_impure_indirect.py')
+        cold_stdout, _, cold_exit_status = self.__run_mypy(resource)
+        purity_cache = self.__cache_dir.parent / '.mypy_pure_cache'
+        self.assertTrue(list(purity_cache.glob('v*/*/*.json')), 'Expected the summary cache to be populated')
+
+        warm_stdout, _, warm_exit_status = self.__run_mypy(resource)
+        self.assertEqual(cold_exit_status, warm_exit_status)
+        self.assertEqual(cold_stdout, warm_stdout)
+        self.assertIn("Function 'bad' is impure because it calls 'os.remove'", warm_stdout)
+
+    def test_summary_cache_sqlite_backend(self):
+        resource = self._get_resource_path('pure_calls_impure_indirect.py')
+        config = self._get_resource_path('mypy_sqlite_cache.ini')
+        cold_stdout, _, cold_exit_status = self.__run_mypy(resource, config)
+        purity_cache = self.__cache_dir.parent / '.mypy_pure_cache'
+        self.assertEqual(1, len(list(purity_cache.glob('summaries-v*.sqlite'))))
+        self.assertFalse(list(purity_cache.glob('v*/*/*.json')))
+        # The database is closed at the end of the build: its write-ahead log is merged and removed
+        self.assertFalse(list(purity_cache.glob('summaries-v*.sqlite-wal')))
+
+        warm_stdout, _, warm_exit_status = self.__run_mypy(resource, config)
+        self.assertEqual((cold_stdout, cold_exit_status), (warm_stdout, warm_exit_status))
+        self.assertIn("Function 'bad' is impure because it calls 'os.remove'", warm_stdout)
+
+    def test_summary_cache_disabled(self):
+        resource = self._get_resource_path('pure_calls_print.py')
+        config = self._get_resource_path('mypy_no_cache.ini')
+        stdout, _, _ = self.__run_mypy(resource, config)
+        self.assertIn('is impure because it calls', stdout)
+        self.assertFalse((self.__cache_dir.parent / '.mypy_pure_cache').exists())
+
+    def test_incremental_run_rechecks_callers_of_changed_modules(self):
+        project = Path(self.__tmp_dir.name) / 'project'
+        project.mkdir()
+        helpers = project / 'helpers.py'
+        app = project / 'app.py'
+        helpers.write_text('def log(x: int) -> int:\n    return x\n', encoding='utf-8')
+        app.write_text(
+            'from helpers import log\nfrom mypy_pure import pure\n\n\n'
+            '@pure\ndef f(x: int) -> int:\n    return log(x)\n',
+            encoding='utf-8',
+        )
+        stdout, _, exit_status = self.__run_mypy(app)
+        self.assertEqual(0, exit_status, stdout)
+
+        # Only the body of the helper changes: its interface, and so mypy's view of app, does not
+        helpers.write_text('def log(x: int) -> int:\n    print(x)\n    return x\n', encoding='utf-8')
+        stdout, _, exit_status = self.__run_mypy(app)
+        self.assertEqual(1, exit_status)
+        self.assertIn(
+            "app.py:6: error: Function 'f' is impure because it calls 'print' (via f -> helpers.log -> print)"
+            '  [impure]',
+            stdout,
+        )
+
+        # Unchanged: the error is reported again from mypy's cache
+        stdout, _, exit_status = self.__run_mypy(app)
+        self.assertEqual(1, exit_status)
+        self.assertIn("Function 'f' is impure because it calls 'print'", stdout)
+
+    def test_violations_can_be_ignored_by_error_code(self):
+        resource = Path(self.__tmp_dir.name) / 'ignored.py'
+        resource.write_text(
+            'from mypy_pure import pure\n\n\n@pure\ndef f() -> None:  # type: ignore[impure]\n    print(1)\n',
+            encoding='utf-8',
+        )
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(0, exit_status, stdout)
+
     def test_simple_pure_function(self):
         resource = self._get_resource_path('pure_is_ok.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
+        stdout, _, exit_status = self.__run_mypy(resource)
         self.assertEqual(0, exit_status)
         self.assertEqual(stdout.strip(), '', f'Unexpected mypy output: {stdout}')
 
     def test_pure_function_calls_impure_stdlib(self):
         resource = self._get_resource_path('pure_calls_impure_stdlib.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
         self.assertIn(
             'is impure because it calls',
             stdout,
@@ -67,8 +151,8 @@ class TestPlugin(TestCase):
 
     def test_pure_function_calls_impure_function_indirectly(self):
         resource = self._get_resource_path('pure_calls_impure_indirect.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
         self.assertIn(
             'is impure because it calls',
             stdout,
@@ -77,8 +161,8 @@ class TestPlugin(TestCase):
 
     def test_pure_function_calls_impure_function_deeply_indirect(self):
         resource = self._get_resource_path('pure_calls_impure_deeply_indirect.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
         self.assertIn(
             'is impure because it calls',
             stdout,
@@ -87,8 +171,8 @@ class TestPlugin(TestCase):
 
     def test_pure_function_calls_print(self):
         resource = self._get_resource_path('pure_calls_print.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
         self.assertIn(
             'is impure because it calls',
             stdout,
@@ -97,8 +181,8 @@ class TestPlugin(TestCase):
 
     def test_pure_function_calls_sleep(self):
         resource = self._get_resource_path('pure_calls_sleep.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
         self.assertIn(
             'is impure because it calls',
             stdout,
@@ -107,7 +191,7 @@ class TestPlugin(TestCase):
 
     def test_pure_function_calls_pure_function(self):
         resource = self._get_resource_path('pure_calls_pure.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
+        stdout, _, exit_status = self.__run_mypy(resource)
         self.assertEqual(0, exit_status)
         self.assertEqual(stdout.strip(), '', f'Unexpected mypy output: {stdout}')
 
@@ -115,7 +199,11 @@ class TestPlugin(TestCase):
         resource = self._get_resource_path('pure_calls_multiple_impure.py')
         config = self._get_resource_path('mypy_custom_multiple.ini')
         stdout, stderr, exit_status = self.__run_mypy(resource, config)
-        self.assertEqual(0, exit_status, f'Mypy failed with exit code {exit_status}. Stdout: {stdout} Stderr: {stderr}')
+        self.assertEqual(
+            1,
+            exit_status,
+            f'Expected purity violations, got exit code {exit_status}. Stdout: {stdout} Stderr: {stderr}',
+        )
         self.assertIn(
             "Function 'pure_func' is impure because it calls",
             stdout,
@@ -126,72 +214,172 @@ class TestPlugin(TestCase):
         resource = self._get_resource_path('pure_calls_external_impure.py')
         config = self._get_resource_path('mypy_custom_multiple.ini')
         stdout, stderr, exit_status = self.__run_mypy(resource, config)
-        self.assertEqual(0, exit_status, f'Mypy failed with exit code {exit_status}. Stdout: {stdout} Stderr: {stderr}')
+        self.assertEqual(
+            1,
+            exit_status,
+            f'Expected purity violations, got exit code {exit_status}. Stdout: {stdout} Stderr: {stderr}',
+        )
         self.assertIn(
             "Function 'pure_func' is impure because it calls",
             stdout,
             f'Expected purity violation, got: {stdout}',
         )
 
+    def test_pure_function_calls_impure_function_of_another_module(self):
+        resource = self._get_resource_path('pure_calls_cross_module_impure.py')
+        config = self._get_resource_path('mypy_cross_module.ini')
+        stdout, _, _ = self.__run_mypy(resource, config)
+        self.assertIn("Function 'pure_logs' is impure because it calls 'print'", stdout)
+        self.assertIn("Function 'pure_logs_through_module' is impure because it calls 'print'", stdout)
+        self.assertNotIn("Function 'pure_sum'", stdout)
+
+    def test_background_analysis(self):
+        resource = self._get_resource_path('pure_calls_cross_module_impure.py')
+        stdout, _, exit_status = self.__run_mypy(resource, self._get_resource_path('mypy_background_analysis.ini'))
+        self.assertEqual(1, exit_status)
+        self.assertIn("Function 'pure_logs' is impure because it calls 'print'", stdout)
+        self.assertIn("Function 'pure_logs_through_module' is impure because it calls 'print'", stdout)
+        self.assertNotIn("Function 'pure_sum'", stdout)
+
+    def test_stdlib_database(self):
+        # Only used once built, never built by a type check
+        database = Path(self.__tmp_dir.name) / 'stdlib.puritydb'
+        build_stdlib_database(str(database))
+        config = Path(self.__tmp_dir.name) / 'mypy.ini'
+        config.write_text(
+            f'[mypy]\nplugins = mypy_pure.plugin\n\n[mypy-pure]\nstdlib_database_path = {database}\n', encoding='utf-8'
+        )
+        resource = self._get_resource_path('pure_calls_stdlib_database.py')
+        stdout, _, exit_status = self.__run_mypy(resource, config)
+        self.assertEqual(1, exit_status)
+        self.assertIn("Function 'pure_timestamp' is impure because it calls 'time.time'", stdout)
+        self.assertIn("Function 'pure_logs' is impure because it calls 'logging.Logger.info'", stdout)
+        self.assertNotIn("'pure_hypotenuse'", stdout)
+
+        stdout, _, exit_status = self.__run_mypy(resource, self._get_resource_path('mypy_no_stdlib_database.ini'))
+        self.assertEqual(0, exit_status, stdout)
+
+    def test_allowed_effects(self):
+        resource = self._get_resource_path('pure_allowed_effects.py')
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
+        self.assertIn(
+            "Function 'pure_cleans_up' is impure because it calls 'os.remove' "
+            '(via pure_cleans_up -> cleanup -> os.remove); effects not allowed: file_io',
+            stdout,
+        )
+        self.assertIn("Function 'pure_without_policy' is impure because it calls 'print'", stdout)
+        self.assertNotIn("'pure_logs'", stdout)
+        self.assertNotIn("'pure_jitter'", stdout)
+
+    def test_calls_resolved_from_types(self):
+        resource = self._get_resource_path('pure_calls_typed_methods.py')
+        config = self._get_resource_path('mypy_cross_module.ini')
+        stdout, _, exit_status = self.__run_mypy(resource, config)
+        self.assertEqual(1, exit_status)
+        self.assertIn("Function 'pure_writes' is impure because it calls 'pathlib.Path.write_text'", stdout)
+        # Through the MRO of a subclass
+        self.assertIn("Function 'pure_writes_subclass' is impure because it calls 'pathlib.Path.touch'", stdout)
+        # In a function mypy checks after the @pure function that calls it
+        self.assertIn(
+            "Function 'pure_writes_later' is impure because it calls 'pathlib.Path.write_bytes' "
+            '(via pure_writes_later -> write_bytes -> pathlib.Path.write_bytes)',
+            stdout,
+        )
+        # Through a re-export, resolved by mypy
+        self.assertIn("Function 'pure_removes_reexported' is impure because it calls 'os.remove'", stdout)
+        self.assertNotIn("'pure_reads'", stdout)
+        # mypy does not check the bodies of modules it follows silently
+        self.assertNotIn("'pure_saves'", stdout)
+
+    def test_calls_resolved_from_types_in_other_modules(self):
+        project = Path(self.__tmp_dir.name) / 'project'
+        project.mkdir()
+        for name in ('typed_calls_helpers.py', 'pure_calls_typed_methods.py', 'mypy_cross_module.ini'):
+            (project / name).write_text(self._get_resource_path(name).read_text(encoding='utf-8'), encoding='utf-8')
+        app = project / 'pure_calls_typed_methods.py'
+        config = project / 'mypy_cross_module.ini'
+        expected = (
+            "Function 'pure_saves' is impure because it calls 'pathlib.Path.write_text' "
+            '(via pure_saves -> typed_calls_helpers.save -> pathlib.Path.write_text)'
+        )
+        stdout, _, _ = self.__run_mypy(app, config, follow_imports='normal')
+        self.assertIn(expected, stdout)
+
+        # mypy does not check the helpers again: their typed calls come from the previous run
+        app.write_text(app.read_text(encoding='utf-8') + '\n# changed\n', encoding='utf-8')
+        stdout, _, _ = self.__run_mypy(app, config, follow_imports='normal')
+        self.assertIn(expected, stdout)
+
     def test_pure_instance_method(self):
         resource = self._get_resource_path('pure_instance_method.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
         self.assertIn(
-            "Function 'impure_instance_method' is impure because it calls",
+            "Function 'MyClass.impure_instance_method' is impure because it calls",
             stdout,
             f'Expected purity violation, got: {stdout}',
         )
 
+    def test_pure_methods_sharing_a_name(self):
+        resource = self._get_resource_path('pure_methods_sharing_a_name.py')
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
+        # Each method is decided on its own body, and reported on its own line
+        self.assertEqual(
+            ["pure_methods_sharing_a_name.py:8: error: Function 'Cleaner.run' is impure because it calls 'os.remove'"],
+            [line.rsplit('/', 1)[-1].removesuffix('  [impure]') for line in stdout.splitlines()],
+        )
+
     def test_pure_static_method(self):
         resource = self._get_resource_path('pure_static_method.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
         self.assertIn(
-            "Function 'impure_static_method' is impure because it calls",
+            "Function 'MyClass.impure_static_method' is impure because it calls",
             stdout,
             f'Expected purity violation, got: {stdout}',
         )
 
     def test_pure_class_method(self):
         resource = self._get_resource_path('pure_class_method.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
         self.assertIn(
-            "Function 'impure_class_method' is impure because it calls",
+            "Function 'MyClass.impure_class_method' is impure because it calls",
             stdout,
             f'Expected purity violation, got: {stdout}',
         )
 
     def test_pure_async_function(self):
         resource = self._get_resource_path('pure_async_function.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
         self.assertIn(
             "Function 'impure_async_function' is impure because it calls",
             stdout,
             f'Expected purity violation, got: {stdout}',
         )
         self.assertIn(
-            "Function 'impure_async_method' is impure because it calls",
+            "Function 'MyClass.impure_async_method' is impure because it calls",
             stdout,
             f'Expected purity violation, got: {stdout}',
         )
 
     def test_pure_property_method(self):
         resource = self._get_resource_path('pure_property_method.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
         self.assertIn(
-            "Function 'impure_property' is impure because it calls",
+            "Function 'MyClass.impure_property' is impure because it calls",
             stdout,
             f'Expected purity violation, got: {stdout}',
         )
 
     def test_pure_nested_function(self):
         resource = self._get_resource_path('pure_nested_function.py')
-        stdout, stderr, exit_status = self.__run_mypy(resource)
-        self.assertEqual(0, exit_status)
+        stdout, _, exit_status = self.__run_mypy(resource)
+        self.assertEqual(1, exit_status)
         self.assertIn(
             "Function 'impure_nested' is impure because it calls",
             stdout,
@@ -392,12 +580,36 @@ class TestPlugin(TestCase):
             f'Unexpected purity violation: {stdout}',
         )
 
+    def test_auto_discovery_does_not_import_modules(self):
+        """__mypy_pure__ is read from the source, so modules that fail to import are still discovered."""
+        resource = self._get_resource_path('pure_uses_import_failing_external.py')
+        config = self._get_resource_path('mypy_import_failing_external.ini')
+        stdout, stderr, exit_status = self.__run_mypy(resource, config)
+        self.assertEqual(0, exit_status, f'Expected success but got errors. stdout: {stdout}, stderr: {stderr}')
+        self.assertNotIn('is impure because it calls', stdout)
+
+    def test_auto_discovery_by_import_is_opt_in(self):
+        resource = self._get_resource_path('pure_uses_import_failing_external.py')
+        config = self._get_resource_path('mypy_discover_by_import.ini')
+        # Found, but its code raises: the failure is reported, and the type check goes on
+        with (
+            patch.object(sys, 'path', [str(resource.parent), *sys.path]),
+            self.assertWarnsRegex(UserWarning, 'could not import external_module_import_fails.*RuntimeError'),
+        ):
+            stdout, _, _ = self.__run_mypy(resource, config)
+        # The module cannot be imported, so its declaration is not seen and the blacklist applies
+        self.assertIn(
+            "Function 'uses_declared_pure' is impure because it calls "
+            "'external_module_import_fails.pure_but_blacklisted'",
+            stdout,
+        )
+
     def test_pure_relative_import(self):
         """Test that relative imports (module is None) are handled by visitor."""
         resource = self._get_resource_path('pure_relative_import.py')
         # We expect mypy to fail due to relative import in non-package, but plugin should run
         # and cover the else block in visitor.py
-        stdout, stderr, exit_status = self.__run_mypy(resource)
+        stdout, stderr, _ = self.__run_mypy(resource)
 
         # We don't check exit_status because mypy will likely fail on the import
         # We just want to ensure the plugin didn't crash and we covered the line.
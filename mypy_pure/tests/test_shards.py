@@ -0,0 +1,84 @@
+from mypy.find_sources import create_source_list
+from mypy.options import Options
+
+from mypy_pure.shards import (
+    InvalidArtifact,
+    ShardArtifact,
+    parse_shard,
+    select_shard,
+)
+from mypy_pure.tests import HELPERS, ProjectTestCase, run_main
+
+PROJECT = {
+    'helpers.py': HELPERS,
+    # Declared pure, although it prints: calls from other shards must trust the declaration
+    'trusted.py': "__mypy_pure__ = ['trusted.trace']\n\n\ndef trace(x: int) -> int:\n    print(x)\n    return x\n",
+    'app.py': (
+        'from helpers import add, log\nfrom trusted import trace\nfrom mypy_pure import pure\n\n\n'
+        '@pure\ndef f(x: int) -> None:\n    log(x)\n\n\n'
+        '@pure\ndef g(x: int) -> int:\n    return trace(add(x, 1))\n'
+    ),
+    'chain.py': 'from app import f\nfrom mypy_pure import pure\n\n\n@pure\ndef h(x: int) -> None:\n    f(x)\n',
+    'other.py': 'from mypy_pure import pure\n\n\n@pure\ndef ok(x: int) -> int:\n    return x\n',
+    'broken.py': 'def broken(:\n',
+}
+
+
+class TestShards(ProjectTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.project = self.write_project(PROJECT, 'project')
+
+    def __export(self, count: int) -> list[str]:
+        artifacts = []
+        for index in range(1, count + 1):
+            artifact = str(self.root / f'shard-{index}.json')
+            stdout, exit_status = run_main(
+                'export', str(self.project), '--shard', f'{index}/{count}', '--output', artifact, '--jobs', '1'
+            )
+            self.assertEqual(0, exit_status, stdout)
+            artifacts.append(artifact)
+        return artifacts
+
+    def test_parse_shard(self):
+        self.assertEqual((2, 3), parse_shard('2/3'))
+        for text in ('0/3', '4/3', '3', '1/x', '-1/2'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_shard(text)
+
+    def test_select_shard_partitions_the_sources(self):
+        sources = create_source_list([str(self.project)], Options())
+        shards = [select_shard(list(reversed(sources)), index, 4) for index in range(1, 5)]
+        modules = sorted(source.module for shard in shards for source in shard)
+        self.assertEqual(sorted(source.module for source in sources), modules)
+        self.assertEqual([2, 2, 1, 1], [len(shard) for shard in shards])
+
+    def test_merge_is_identical_to_an_unsharded_run(self):
+        expected = run_main(str(self.project), '--jobs', '1')
+        self.assertEqual(2, expected[1])
+        self.assertIn("Function 'h' is impure", expected[0])
+        self.assertNotIn("Function 'g'", expected[0])
+        for count in (1, 2, 3, len(PROJECT)):
+            with self.subTest(count=count):
+                self.assertEqual(expected, run_main('merge', *self.__export(count)))
+
+    def test_merge_needs_every_shard(self):
+        artifacts = self.__export(3)
+        stdout, exit_status = run_main('merge', *artifacts[:2])
+        self.assertEqual((2, 'mypy-pure: missing shards: 3/3\n'), (exit_status, stdout))
+        stdout, exit_status = run_main('merge', *artifacts, artifacts[0])
+        self.assertEqual((2, 'mypy-pure: several artifacts of the same shard\n'), (exit_status, stdout))
+        stdout, exit_status = run_main('merge', *artifacts, *self.__export(2))
+        self.assertEqual(2, exit_status)
+        self.assertIn('different shardings', stdout)
+
+    def test_unreadable_artifacts(self):
+        path = self.root / 'artifact.json'
+        path.write_text('{"version": 0}', encoding='utf-8')
+        with self.assertRaisesRegex(InvalidArtifact, 'not an artifact of this version'):
+            ShardArtifact.read(str(path))
+        path.write_text('{', encoding='utf-8')
+        with self.assertRaises(InvalidArtifact):
+            ShardArtifact.read(str(path))
+        with self.assertRaises(InvalidArtifact):
+            ShardArtifact.read(str(self.root / 'missing.json'))
@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from mypy_pure.blacklists import shards
+from mypy_pure.purity.effects import (
+    FILE_IO,
+    GLOBAL_STATE,
+    LOGGING,
+    NETWORK,
+    NO_EFFECT,
+    NONDETERMINISM,
+    PROCESS,
+    effect_category,
+)
+from mypy_pure.purity.matcher import IMPURE, PURE, UNKNOWN
+from mypy_pure.stdlib_database import (
+    build_entries,
+    build_stdlib_database,
+    default_database_path,
+    load_stdlib_database,
+    main,
+    rules_digest,
+    stdlib_blacklist,
+    stub_callables,
+)
+
+SOCKET_STUB = """
+import sys
+
+class socket:
+    def send(self, data: bytes) -> int: ...
+    if sys.version_info >= (3, 12):
+        def newer(self) -> None: ...
+    else:
+        async def older(self) -> None: ...
+
+def htons(x: int) -> int: ...
+"""
+
+
+class TestStdlibDatabase(TestCase):
+    def setUp(self) -> None:
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.__tmp_dir.cleanup)
+        self.root = Path(self.__tmp_dir.name)
+        self.typeshed = self.root / 'stdlib'
+        (self.typeshed / 'os').mkdir(parents=True)
+        (self.typeshed / 'socket.pyi').write_text(SOCKET_STUB, encoding='utf-8')
+        (self.typeshed / 'math.pyi').write_text('def sqrt(x: float) -> float: ...\n', encoding='utf-8')
+        (self.typeshed / 'os' / '__init__.pyi').write_text('def getcwd() -> str: ...\n', encoding='utf-8')
+        (self.typeshed / 'os' / 'path.pyi').write_text('def join(*paths: str) -> str: ...\n', encoding='utf-8')
+        (self.typeshed / 'builtins.pyi').write_text('def print(*values: object) -> None: ...\n', encoding='utf-8')
+        (self.typeshed / 'VERSIONS').write_text('socket: 3.0-\n', encoding='utf-8')
+
+    def test_stub_callables(self):
+        self.assertEqual(
+            {
+                'socket.socket',
+                'socket.socket.send',
+                'socket.socket.newer',
+                'socket.socket.older',
+                'socket.htons',
+            },
+            stub_callables('socket', SOCKET_STUB),
+        )
+        self.assertEqual({'print'}, stub_callables('builtins', 'def print() -> None: ...\n'))
+        self.assertEqual(
+            {'random.Random', 'random.randint'},
+            stub_callables('random', 'class Random:\n    x = y.z\n\n_inst: Random\nrandint = _inst.randint\n'),
+        )
+
+    def test_build_entries(self):
+        entries = build_entries(str(self.typeshed), ['os.remove', 'builtins.print'])
+        self.assertEqual((IMPURE, NETWORK), entries['socket.socket.send'])
+        self.assertEqual((IMPURE, NETWORK), entries['socket.socket.older'])
+        self.assertEqual((UNKNOWN, NO_EFFECT), entries['socket.htons'])
+        self.assertEqual((PURE, NO_EFFECT), entries['math.sqrt'])
+        self.assertEqual((UNKNOWN, NO_EFFECT), entries['os.getcwd'])
+        self.assertEqual((UNKNOWN, NO_EFFECT), entries['os.path.join'])
+        # Blacklisted names are in the database even when the stubs do not define them there
+        self.assertEqual((IMPURE, FILE_IO), entries['os.remove'])
+        self.assertEqual((IMPURE, LOGGING), entries['print'])
+
+    def test_stdlib_blacklist(self):
+        blacklist = stdlib_blacklist()
+        self.assertIn('builtins.print', blacklist)
+        self.assertIn('os.remove', blacklist)
+        self.assertNotIn('requests.get', blacklist)
+
+    def test_effect_category(self):
+        self.assertEqual(LOGGING, effect_category('print'))
+        self.assertEqual(LOGGING, effect_category('logging.Logger.info'))
+        self.assertEqual(FILE_IO, effect_category('os.remove'))
+        self.assertEqual(PROCESS, effect_category('os.execvp'))
+        self.assertEqual(PROCESS, effect_category('subprocess.run'))
+        self.assertEqual(GLOBAL_STATE, effect_category('os.putenv'))
+        self.assertEqual(NONDETERMINISM, effect_category('time.time'))
+        self.assertEqual(NETWORK, effect_category('requests.get'))
+        self.assertEqual(GLOBAL_STATE, effect_category('gc.collect'))
+
+    def test_database_is_only_loaded_once_built(self):
+        path = self.root / 'cache' / 'stdlib.puritydb'
+        with patch('mypy_pure.stdlib_database.typeshed_stdlib_dir', return_value=str(self.typeshed)):
+            # Type checks never write it
+            self.assertIsNone(load_stdlib_database(str(path)))
+            self.assertFalse(path.parent.exists())
+
+            build_stdlib_database(str(path))
+            database = load_stdlib_database(str(path))
+            assert database is not None
+            self.assertEqual((IMPURE, NETWORK), database.lookup('socket.socket.send'))
+            self.assertEqual(IMPURE, database.verdict('os.remove'))
+            self.assertEqual(PURE, database.verdict('math.sqrt'))
+            self.assertIn('typeshed of mypy', database.metadata)
+            database.close()
+
+        # An unusable file is not used
+        path.write_bytes(b'garbage')
+        self.assertIsNone(load_stdlib_database(str(path)))
+
+    def test_default_path_depends_on_the_user_cache_directory(self):
+        with patch.dict(os.environ, {'XDG_CACHE_HOME': str(self.root)}):
+            path = default_database_path()
+        self.assertTrue(path.startswith(str(self.root / 'mypy-pure' / 'stdlib-mypy')))
+        self.assertTrue(path.endswith('.puritydb'))
+
+    def test_rules_digest_only_depends_on_the_rules(self):
+        digest = rules_digest()
+        # Another installation of the same version: same rules, files with other modification times
+        copy = shutil.copytree(shards.__path__[0], self.root / 'shards')
+        for path in copy.iterdir():
+            os.utime(path, ns=(0, 0))
+        with patch.object(shards, '__path__', [str(copy)]):
+            self.assertEqual(digest, rules_digest())
+        with patch('mypy_pure.stdlib_database.BlacklistShards.load_all', return_value=['os.remove']):
+            self.assertNotEqual(digest, rules_digest())
+
+    def test_main(self):
+        output = self.root / 'out.puritydb'
+        stdout = StringIO()
+        with redirect_stdout(stdout):
+            self.assertEqual(0, main(['--output', str(output), '--typeshed', str(self.typeshed)]))
+        self.assertIn(f'to {output}', stdout.getvalue())
+        self.assertTrue(output.exists())
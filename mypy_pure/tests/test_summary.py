@@ -0,0 +1,104 @@
+from unittest import TestCase
+
+from mypy_pure.purity.matcher import NameMatcher
+from mypy_pure.purity.summary import (
+    ModuleAnalysis,
+    ModuleSummary,
+    module_of,
+    propagate_summaries,
+    resolve_reference,
+    summarize_module,
+)
+
+BLACKLIST = {'print', 'os.remove'}
+MATCHER = NameMatcher(BLACKLIST)
+
+
+class TestModuleSummaries(TestCase):
+    def test_summarize_module_keeps_the_functions_that_may_be_impure(self):
+        summary = summarize_module(
+            module='app',
+            calls={'run': {'helper', 'lib.save'}, 'helper': {'print'}, 'pure': {'len'}, 'calls_pure': {'pure'}},
+            imports={'lib': 'lib'},
+            matcher=MATCHER,
+        )
+        self.assertEqual({'app.helper': ['print']}, summary.witnesses)
+        self.assertEqual({'app.run': ['app.helper', 'lib.save'], 'app.helper': []}, summary.callees)
+
+    def test_whitelisted_imports_are_not_external(self):
+        summary = summarize_module(
+            module='app',
+            calls={'run': {'lib.save'}},
+            imports={'lib': 'lib'},
+            matcher=NameMatcher(BLACKLIST, {'lib.save'}),
+        )
+        self.assertEqual({}, summary.callees)
+
+    def test_propagation_across_modules(self):
+        summaries = {
+            'lib': summarize_module('lib', {'save': {'os.remove'}, 'add': set()}, {'os': 'os'}, MATCHER),
+            'app': summarize_module('app', {'run': {'lib.save'}, 'sum': {'lib.add'}}, {'lib': 'lib'}, MATCHER),
+        }
+        witnesses = propagate_summaries(summaries)
+        self.assertEqual({'os.remove'}, witnesses['app.run'])
+        self.assertNotIn('app.sum', witnesses)
+
+    def test_propagation_through_cycles_between_modules(self):
+        summaries = {
+            'a': summarize_module('a', {'f': {'b.g'}}, {'b': 'b'}, MATCHER),
+            'b': summarize_module('b', {'g': {'a.f', 'c.h'}}, {'a': 'a', 'c': 'c'}, MATCHER),
+            'c': summarize_module('c', {'h': {'print'}}, {}, MATCHER),
+        }
+        witnesses = propagate_summaries(summaries)
+        self.assertEqual({'print'}, witnesses['a.f'])
+        self.assertEqual({'print'}, witnesses['b.g'])
+
+    def test_shortest_call_path_across_modules(self):
+        summaries = {
+            'lib': summarize_module('lib', {'save': {'write'}, 'write': {'os.remove'}}, {'os': 'os'}, MATCHER),
+            'app': summarize_module(
+                'app', {'run': {'lib.save', 'log'}, 'log': {'print'}}, {'lib': 'lib', 'os': 'os'}, MATCHER
+            ),
+        }
+        witnesses = propagate_summaries(summaries, ['app.run'])
+        self.assertEqual(['app.run', 'app.log', 'print'], witnesses.path('app.run'))
+        self.assertEqual(['lib.save', 'lib.write', 'os.remove'], witnesses.path('lib.save'))
+        self.assertEqual({'os.remove', 'print'}, witnesses['app.run'])
+        self.assertEqual('print', witnesses.first_call('app.run'))
+
+    def test_propagation_only_decides_functions_reachable_from_roots(self):
+        summaries = {
+            'lib': summarize_module('lib', {'save': {'os.remove'}, 'log': {'print'}}, {'os': 'os'}, MATCHER),
+            'app': summarize_module('app', {'run': {'lib.save'}}, {'lib': 'lib'}, MATCHER),
+        }
+        witnesses = propagate_summaries(summaries, ['app.run', 'app.missing'])
+        self.assertEqual({'app.run', 'lib.save'}, set(witnesses))
+
+    def test_resolve_reference_follows_reexports(self):
+        summaries = {
+            'pkg': summarize_module('pkg', {}, {'save': 'pkg.impl.save'}, MATCHER),
+            'pkg.impl': summarize_module('pkg.impl', {'save': {'print'}}, {}, MATCHER),
+        }
+        self.assertEqual('pkg.impl.save', resolve_reference('pkg.save', summaries.get, summaries))
+        self.assertIsNone(resolve_reference('pkg.missing', summaries.get, summaries))
+        self.assertIsNone(resolve_reference('other.save', summaries.get, summaries))
+
+        app = summarize_module('app', {'run': {'pkg.save'}}, {'save': 'pkg.save'}, MATCHER)
+        self.assertEqual({'print'}, propagate_summaries({**summaries, 'app': app})['app.run'])
+
+    def test_module_of_picks_the_longest_module(self):
+        self.assertEqual('pkg.impl', module_of('pkg.impl.save', {'pkg', 'pkg.impl'}))
+        self.assertIsNone(module_of('save', {'pkg'}))
+
+    def test_serialization_round_trip(self):
+        summary = summarize_module('app', {'run': {'lib.save', 'print'}}, {'lib': 'lib'}, MATCHER)
+        restored = ModuleSummary.from_dict(summary.to_dict())
+        self.assertEqual(summary.witnesses, restored.witnesses)
+        self.assertEqual(summary.callees, restored.callees)
+        self.assertEqual(summary.aliases, restored.aliases)
+
+        analysis = ModuleAnalysis('app', 'app.py', {'run': {'print'}}, {'os': 'os'}, {'run': 3}, complete=False)
+        restored_analysis = ModuleAnalysis.from_dict(analysis.to_dict())
+        self.assertEqual(analysis.calls, restored_analysis.calls)
+        self.assertEqual(analysis.pure_functions_lineno, restored_analysis.pure_functions_lineno)
+        self.assertFalse(restored_analysis.complete)
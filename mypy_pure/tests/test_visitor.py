@@ -0,0 +1,114 @@
+import ast
+from unittest import TestCase
+
+from mypy_pure.purity.visitor import PurityVisitor
+
+
+class TestPurityVisitor(TestCase):
+    def __visit(self, source: str) -> PurityVisitor:
+        visitor = PurityVisitor('package.module')
+        visitor.visit(ast.parse(source))
+        return visitor
+
+    def test_imports_apply_to_the_calls_that_follow_them(self):
+        visitor = self.__visit(
+            'import os.path as p\n'
+            'def f():\n'
+            '    p.join.x()\n'
+            '    from posixpath import join as p\n'
+            '    p.join.x()\n'
+            'def g():\n'
+            '    p.join.x()\n'
+        )
+        self.assertEqual(['os.path.join.x', 'posixpath.join.join.x'], sorted(visitor.calls['f']))
+        self.assertEqual(['posixpath.join.join.x'], list(visitor.calls['g']))
+
+    def test_calls_in_every_part_of_a_function(self):
+        visitor = self.__visit(
+            'from . import helpers\n'
+            'from mypy_pure import pure\n'
+            'class C(helpers.Base):\n'
+            '    @pure(allow=["logging"])\n'
+            '    def m(self, x: int = helpers.default()) -> int:\n'
+            '        def inner():\n'
+            '            return helpers.a.b(x)\n'
+            '        return self.get(x)().run(helpers.c(lambda: len(x)), key=str(x))[0].pop()\n'
+        )
+        # The call of the decorator is one of the function, as are the calls of its default values
+        self.assertEqual(
+            {'self.get', 'package.helpers.c', 'len', 'str', 'package.helpers.default', 'mypy_pure.pure'},
+            set(visitor.calls['C.m']),
+        )
+        self.assertEqual(['package.helpers.a.b'], list(visitor.calls['inner']))
+        self.assertEqual({'C.m': 5}, visitor.pure_functions_lineno)
+        self.assertEqual(['C.m'], list(visitor.allowed_effects))
+
+    def test_methods_are_named_after_their_classes(self):
+        visitor = self.__visit(
+            'import os\n'
+            'from mypy_pure import pure\n'
+            'class A:\n'
+            '    @pure\n'
+            '    def run(self) -> None:\n'
+            '        os.remove("a")\n'
+            '    class Inner:\n'
+            '        if os.name:\n'
+            '            def run(self) -> None:\n'
+            '                A.run(self)\n'
+            'class B:\n'
+            '    @pure\n'
+            '    def run(self) -> None:\n'
+            '        def helper() -> None:\n'
+            '            class Local:\n'
+            '                def run(self) -> None: ...\n'
+            '        helper()\n'
+        )
+        self.assertEqual(
+            {
+                'A.run': ['os.remove'],
+                'A.Inner.run': ['A.run'],
+                'B.run': ['helper'],
+                'helper': [],
+                'Local.run': [],
+            },
+            {fn: list(callees) for fn, callees in visitor.calls.items()},
+        )
+        self.assertEqual({'A.run': 5, 'B.run': 13}, visitor.pure_functions_lineno)
+
+    def test_demand_driven_visit(self):
+        visitor = PurityVisitor('package.module')
+        visitor.index(
+            ast.parse(
+                'from mypy_pure import pure\n'
+                'def helper(x):\n'
+                '    def nested():\n'
+                '        return print(x)\n'
+                '    return nested() + abs(x)\n'
+                '@pure\n'
+                'def f(x):\n'
+                '    return helper(x)\n'
+                'def unused():\n'
+                '    open("a")\n'
+                'import os as helper_os\n'
+            )
+        )
+        self.assertEqual({'helper', 'nested', 'f', 'unused'}, set(visitor.indexed_functions))
+        self.assertEqual({'f': 7}, visitor.pure_functions_lineno)
+        self.assertEqual('os', visitor.imports['helper_os'])
+        self.assertEqual(['helper'], visitor.visit_function('f'))
+        self.assertEqual([], visitor.visit_function('f'))
+        # Nested functions are visited when they are asked for
+        self.assertEqual(['nested', 'abs'], visitor.visit_function('helper'))
+        self.assertEqual({'f', 'helper'}, set(visitor.calls))
+        self.assertEqual(['print'], visitor.visit_function('nested'))
+        self.assertEqual({'f', 'helper', 'nested'}, set(visitor.calls))
+
+    def test_demand_driven_visit_of_methods(self):
+        visitor = PurityVisitor('package.module')
+        visitor.index(
+            ast.parse('class A:\n    def run(self):\n        print(1)\nclass B:\n    def run(self):\n        pass\n')
+        )
+        self.assertEqual({'A.run', 'B.run'}, set(visitor.indexed_functions))
+        self.assertEqual(['print'], visitor.visit_function('A.run'))
+        self.assertEqual([], visitor.visit_function('B.run'))
+        self.assertEqual({'A.run', 'B.run'}, set(visitor.calls))
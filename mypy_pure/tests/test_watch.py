@@ -0,0 +1,146 @@
+import os
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from mypy.find_sources import create_source_list
+from mypy.options import Options
+
+from mypy_pure import project
+from mypy_pure.cli import main
+from mypy_pure.configuration import PurityConfig
+from mypy_pure.project import ProjectChecker, Violation
+from mypy_pure.watch import SourceWatcher, watch
+
+PURE_HELPERS = 'def log(x: int) -> int:\n    return x\n'
+IMPURE_HELPERS = 'def log(x: int) -> int:\n    print(x)\n    return x\n'
+APP = 'from helpers import log\nfrom mypy_pure import pure\n\n\n@pure\ndef compute(x: int) -> int:\n    return log(x)\n'
+OTHER = 'from mypy_pure import pure\n\n\n@pure\ndef other(x: int) -> int:\n    return x\n'
+
+
+class TestWatch(TestCase):
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = Path(tmp_dir.name)
+        self.options = Options()
+        self.__mtime = 1_000_000_000
+
+    def __write(self, name: str, source: str) -> None:
+        path = self.root / name
+        path.write_text(source, encoding='utf-8')
+        # Distinct modification times, whatever the resolution of the file system
+        self.__mtime += 1
+        os.utime(path, (self.__mtime, self.__mtime))
+
+    def __messages(self, violations: list[Violation]) -> list[str]:
+        return [violation.message for violation in violations]
+
+    def test_recheck_only_analyzes_changed_files(self):
+        self.__write('helpers.py', PURE_HELPERS)
+        self.__write('app.py', APP)
+        self.__write('other.py', OTHER)
+        sources = create_source_list([str(self.root)], self.options)
+        checker = ProjectChecker(PurityConfig(), self.options)
+        self.assertEqual([], checker.check(sources))
+
+        self.__write('helpers.py', IMPURE_HELPERS)
+        helpers = [source for source in sources if source.module == 'helpers']
+        with patch.object(project, 'analyze_file', wraps=project.analyze_file) as spy:
+            violations = checker.recheck(helpers)
+        self.assertEqual([str(self.root / 'helpers.py')], [call.args[0] for call in spy.call_args_list])
+        self.assertEqual(
+            ["Function 'compute' is impure because it calls 'print' (via compute -> helpers.log -> print)"],
+            self.__messages(violations),
+        )
+
+        self.__write('helpers.py', PURE_HELPERS)
+        self.assertEqual([], checker.recheck(helpers))
+
+    def test_recheck_added_and_removed_files(self):
+        self.__write('app.py', APP)
+        checker = ProjectChecker(PurityConfig(), self.options)
+        self.assertEqual([], checker.check(create_source_list([str(self.root)], self.options)))
+
+        # The call of app into helpers only resolves once helpers exists
+        self.__write('helpers.py', IMPURE_HELPERS)
+        helpers = [s for s in create_source_list([str(self.root)], self.options) if s.module == 'helpers']
+        self.assertEqual(1, len(checker.recheck(helpers)))
+        self.assertEqual([], checker.recheck([], [str(self.root / 'helpers.py')]))
+        self.assertEqual(['app'], sorted(checker.modules))
+
+    def test_recheck_syntax_errors(self):
+        self.__write('helpers.py', PURE_HELPERS)
+        self.__write('app.py', APP)
+        sources = create_source_list([str(self.root)], self.options)
+        checker = ProjectChecker(PurityConfig(), self.options)
+        checker.check(sources)
+        self.__write('helpers.py', 'def log(:\n')
+        helpers = [source for source in sources if source.module == 'helpers']
+        checker.recheck(helpers)
+        self.assertEqual(1, len(checker.errors))
+        self.__write('helpers.py', IMPURE_HELPERS)
+        self.assertEqual(1, len(checker.recheck(helpers)))
+        self.assertEqual([], checker.errors)
+
+    def test_recheck_matches_a_full_check(self):
+        self.__write('helpers.py', IMPURE_HELPERS)
+        self.__write('app.py', APP)
+        self.__write('other.py', OTHER)
+        sources = create_source_list([str(self.root)], self.options)
+        checker = ProjectChecker(PurityConfig(), self.options)
+        checker.check(sources)
+        self.__write('other.py', OTHER.replace('return x', 'print(x)\n    return x'))
+        rechecked = checker.recheck([source for source in sources if source.module == 'other'])
+        full = ProjectChecker(PurityConfig(), self.options).check(sources)
+        self.assertEqual([v.format() for v in full], [v.format() for v in rechecked])
+        self.assertEqual(2, len(rechecked))
+
+    def test_source_watcher(self):
+        self.__write('helpers.py', PURE_HELPERS)
+        self.__write('app.py', APP)
+        watcher = SourceWatcher([str(self.root)], self.options)
+        self.assertEqual(['app', 'helpers'], sorted(source.module for source in watcher.sources))
+        self.assertEqual(([], []), watcher.poll())
+
+        self.__write('helpers.py', IMPURE_HELPERS)
+        changed, removed = watcher.poll()
+        self.assertEqual(['helpers'], [source.module for source in changed])
+        self.assertEqual([], removed)
+
+        (self.root / 'helpers.py').unlink()
+        self.__write('other.py', OTHER)
+        os.utime(self.root, (self.__mtime + 1, self.__mtime + 1))
+        changed, removed = watcher.poll()
+        self.assertEqual(['other'], [source.module for source in changed])
+        self.assertEqual([str(self.root / 'helpers.py')], removed)
+
+    def test_watch(self) -> None:
+        self.__write('helpers.py', PURE_HELPERS)
+        self.__write('app.py', APP)
+        watcher = SourceWatcher([str(self.root)], self.options)
+        checker = ProjectChecker(PurityConfig(), self.options)
+        reports: list[list[str]] = []
+
+        def report(violations: list[Violation]) -> int:
+            reports.append(self.__messages(violations))
+            if len(reports) == 1:
+                self.__write('helpers.py', IMPURE_HELPERS)
+            return 1 if violations else 0
+
+        output = StringIO()
+        self.assertEqual(1, watch(checker, watcher, report, interval=0, polls=2, output=output))
+        self.assertEqual(2, len(reports))
+        self.assertEqual([], reports[0])
+        self.assertEqual(1, len(reports[1]))
+        self.assertRegex(output.getvalue(), r'^Rechecked 1 changed file in \d+ ms\n$')
+
+    def test_cli_watch_stops_when_interrupted(self):
+        self.__write('app.py', OTHER)
+        stdout = StringIO()
+        with patch('mypy_pure.watch.time.sleep', side_effect=KeyboardInterrupt), redirect_stdout(stdout):
+            self.assertEqual(0, main([str(self.root), '--watch', '--interval', '0.1']))
+        self.assertEqual('Success: no issues found in 1 source files\n', stdout.getvalue())
@@ -0,0 +1,135 @@
+"""
+Watch mode of the mypy-pure command: check a project once, then check again the files that change.
+
+Files are polled, so no file system notification service is needed. The checker keeps the analyses,
+summaries and verdicts of the unchanged modules in memory (see ProjectChecker.recheck).
+"""
+
+import os
+import sys
+import time
+from collections.abc import Callable
+from typing import TextIO
+
+from mypy.find_sources import InvalidSourceList, create_source_list
+from mypy.modulefinder import BuildSource
+from mypy.options import Options
+
+from mypy_pure.project import ProjectChecker, Violation
+
+DEFAULT_INTERVAL = 0.5  # seconds between two polls
+
+# Directories that never hold sources worth watching
+IGNORED_DIRECTORIES = frozenset({'__pycache__', 'node_modules'})
+
+
+class SourceWatcher:
+    """
+    Find the source files that changed, were added or were removed since the previous poll.
+
+    The state of a file is its modification time and size. The sources of the watched paths are only
+    listed again when the modification time of a directory below them changes, which is what adding,
+    removing or renaming a file does, so polling an unchanged tree costs one stat per file and directory.
+    """
+
+    def __init__(self, paths: list[str], options: Options) -> None:
+        self.__paths = paths
+        self.__options = options
+        self.__sources: list[BuildSource] = []
+        self.__states: dict[str, tuple[int, int]] = {}
+        self.__directories: dict[str, int] = {}
+        self.__stale = False  # the sources must be listed again at the next poll
+        self.__list_sources()
+        for source in self.__sources:
+            path, state = self.__state(source.path or '')
+            if state is not None:
+                self.__states[path] = state
+
+    @property
+    def sources(self) -> list[BuildSource]:
+        return self.__sources
+
+    def poll(self) -> tuple[list[BuildSource], list[str]]:
+        """The sources that changed or were added, and the paths of the files that were removed."""
+        if self.__stale or any(self.__mtime(directory) != mtime for directory, mtime in self.__directories.items()):
+            try:
+                self.__list_sources()
+            except InvalidSourceList:
+                # E.g. a watched file was removed: the sources are listed again at the next poll
+                self.__stale = True
+        changed: list[BuildSource] = []
+        states: dict[str, tuple[int, int]] = {}
+        for source in self.__sources:
+            path, state = self.__state(source.path or '')
+            if state is None:
+                continue
+            states[path] = state
+            if self.__states.get(path) != state:
+                changed.append(source)
+        removed = sorted(path for path in self.__states if path not in states)
+        self.__states = states
+        return changed, removed
+
+    def __list_sources(self) -> None:
+        self.__sources = create_source_list(self.__paths, self.__options)
+        directories: dict[str, int] = {}
+        for path in self.__paths:
+            for directory, subdirectories, _ in os.walk(path):
+                subdirectories[:] = [
+                    d for d in subdirectories if not d.startswith('.') and d not in IGNORED_DIRECTORIES
+                ]
+                directories[os.path.normpath(directory)] = self.__mtime(directory)
+        self.__directories = directories
+        self.__stale = False
+
+    @staticmethod
+    def __state(path: str) -> tuple[str, tuple[int, int] | None]:
+        path = os.path.normpath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path, None
+        return path, (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def __mtime(directory: str) -> int:
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return -1
+
+
+def watch(
+    checker: ProjectChecker,
+    watcher: SourceWatcher,
+    report: Callable[[list[Violation]], int],
+    jobs: int = 1,
+    interval: float = DEFAULT_INTERVAL,
+    polls: int | None = None,
+    output: TextIO | None = None,
+) -> int:
+    """
+    Check the sources of a watcher, then check them again whenever they change, until interrupted
+    (or after a number of polls). Results go through report; return the exit status of the last one.
+    """
+    output = output or sys.stdout
+    status = report(checker.check(watcher.sources, jobs=jobs))
+    output.flush()
+    try:
+        while polls is None or polls > 0:
+            time.sleep(interval)
+            if polls is not None:
+                polls -= 1
+            changed, removed = watcher.poll()
+            if not changed and not removed:
+                continue
+            start = time.perf_counter()
+            violations = checker.recheck(changed, removed)
+            elapsed = time.perf_counter() - start
+            status = report(violations)
+            files = len(changed) + len(removed)
+            output.write(f'Rechecked {files} changed file{"s" if files != 1 else ""} in {elapsed * 1000:.0f} ms\n')
+            output.flush()
+    except KeyboardInterrupt:
+        pass
+    return status